@@ -0,0 +1,92 @@
+"""
+Compares the scipy_gmres and scipy_direct linear solvers for the gradient
+of a chain of scalable disciplines.
+
+scipy_direct assembles the Jacobian once and then factors it, while
+scipy_gmres needs a few matrix-vector products for every right-hand side.
+Disciplines that provide a Jacobian (provideJ) have it placed in the matrix
+directly. Disciplines that only have apply_deriv are applied to one unit
+vector per entry of their inputs and outputs, so the table shows both kinds
+with a few and many right-hand sides.
+"""
+
+import sys
+from time import time
+
+import numpy as np
+
+from openmdao.lib.optproblems.scalable import Discipline, \
+                                             Discipline_No_Deriv
+from openmdao.main.api import Assembly, set_as_top
+
+
+class JacobianDiscipline(Discipline_No_Deriv):
+    """ A scalable discipline that provides its Jacobian. """
+
+    def provideJ(self):
+        """ Calculate the Jacobian """
+
+        c_y_out = self.c_y_out
+        return np.hstack((-self.C_x/c_y_out, self.C_y/c_y_out,
+                          -self.C_z/c_y_out))
+
+    def list_deriv_vars(self):
+        return ('x', 'y_in', 'z'), ('y_out',)
+
+
+class Chain(Assembly):
+    """ A chain of `ncomps` disciplines, each with `size` outputs. """
+
+    def __init__(self, ncomps, size, discipline=JacobianDiscipline):
+        self.ncomps = ncomps
+        self.size = size
+        self.discipline = discipline
+        super(Chain, self).__init__()
+
+    def configure(self):
+        random = np.random.RandomState(12345)
+        names = []
+        for i in range(self.ncomps):
+            name = 'd%d' % i
+            comp = self.add(name, self.discipline(prob_size=self.size))
+            comp.C_y = random.random_sample((self.size, self.size)) / self.size
+            comp.C_x = random.random_sample((self.size, self.size))
+            if i > 0:
+                self.connect('d%d.y_out' % (i-1), '%s.y_in' % name)
+            names.append(name)
+        self.driver.workflow.add(names)
+
+
+def run(ncomps, size, nrhs, lin_solver, discipline=JacobianDiscipline):
+    top = set_as_top(Chain(ncomps, size, discipline))
+    top.driver.gradient_options.lin_solver = lin_solver
+    top.run()
+
+    last = 'd%d.y_out' % (ncomps-1)
+    inputs = ['d0.x[%d, 0]' % i for i in range(nrhs)]
+    t0 = time()
+    J = top.driver.calc_gradient(inputs=inputs, outputs=[last],
+                                 mode='forward')
+    return time() - t0, J
+
+
+if __name__ == "__main__":
+
+    cases = [(5, 20, 2), (5, 20, 20), (10, 50, 5), (10, 50, 50),
+             (20, 50, 50)]
+    if len(sys.argv) > 1:
+        cases = [tuple(int(arg) for arg in sys.argv[1:4])]
+
+    print '%-12s %6s %6s %6s %8s %12s %12s' % ('derivatives', 'comps',
+                                               'size', 'RHS', 'unknowns',
+                                               'gmres (s)', 'direct (s)')
+    for kind, discipline in (('provideJ', JacobianDiscipline),
+                             ('apply_deriv', Discipline)):
+        for ncomps, size, nrhs in cases:
+            t_gmres, J1 = run(ncomps, size, nrhs, 'scipy_gmres', discipline)
+            t_direct, J2 = run(ncomps, size, nrhs, 'scipy_direct',
+                               discipline)
+            assert np.allclose(J1, J2, rtol=1e-6, atol=1e-8)
+            print '%-12s %6d %6d %6d %8d %12.3f %12.3f' % (kind, ncomps, size,
+                                                           nrhs, ncomps*size,
+                                                           t_gmres, t_direct)
@@ -0,0 +1,62 @@
+# pylint: disable-msg=C0111,C0103
+
+"""
+Time of DomainObj transforms and Plot3D writes for a synthetic multi-zone
+domain as the number of concurrent zone workers grows.
+"""
+
+import os
+import shutil
+import tempfile
+from time import time
+
+from multiprocessing import cpu_count
+
+from openmdao.lib.datatypes.domain import DomainObj, write_plot3d_q
+from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d
+
+nzones = 8
+shape = (100, 60, 40)
+
+def create_domain():
+    domain = DomainObj()
+    for i in range(nzones):
+        wedge = create_wedge_3d(shape, 5., 0.5+i, 1.5+i, 30.)
+        domain.add_zone('zone_%d' % (i+1), wedge.xyzzy)
+    return domain
+
+def run(domain, workers):
+    times = []
+
+    t0 = time()
+    domain.translate(1., 2., 3., workers=workers)
+    domain.rotate_about_x(30., workers=workers)
+    domain.rotate_about_z(-45., workers=workers)
+    times.append(time() - t0)
+
+    t0 = time()
+    domain.make_cylindrical(workers=workers)
+    domain.make_cartesian(workers=workers)
+    times.append(time() - t0)
+
+    t0 = time()
+    write_plot3d_q(domain, 'bench.xyz', 'bench.q', workers=workers)
+    times.append(time() - t0)
+    return times
+
+if __name__ == "__main__":
+
+    tempdir = tempfile.mkdtemp(prefix='domain_transforms-')
+    os.chdir(tempdir)
+    try:
+        domain = create_domain()
+        print '%d zones of %s, %d CPUs' % (nzones, shape, cpu_count())
+        print '%8s %14s %14s %14s' % ('workers', 'rotate (s)',
+                                      'cylindrical (s)', 'write (s)')
+        for workers in (1, 2, 4, 8):
+            times = run(domain, workers)
+            print '%8d %14.3f %14.3f %14.3f' % (workers, times[0], times[1],
+                                                times[2])
+    finally:
+        os.chdir('..')
+        shutil.rmtree(tempdir)
@@ -1,5 +1,8 @@
 """
 A component with a large number of inputs is finite differenced.
+
+The coupling matrix of the second model is tridiagonal, so a colored
+finite difference needs only 3 runs of the component instead of N.
 """
 
 import numpy as np
@@ -17,6 +20,14 @@ class Model(Assembly):
         self.add('comp', Discipline(prob_size=N))
         self.comp.C_y = np.random.random((N, N))
 
+class BandedModel(Assembly):
+
+    def configure(self):
+
+        self.add('comp', Discipline(prob_size=N))
+        C_y = np.random.random((N, N))
+        self.comp.C_y = np.triu(np.tril(C_y, 1), -1)
+
 if __name__ == "__main__":
 
     from time import time
@@ -35,5 +46,19 @@ if __name__ == "__main__":
                                  mode = 'fd')
     print 'Time elapsed', time() - t0
 
+    # Banded model. The first gradient finds the sparsity, so only time
+    # the ones after it, like an optimizer would see them.
+    for coloring in (False, True):
+        top = set_as_top(BandedModel())
+        top.driver.gradient_options.force_fd = True
+        top.driver.gradient_options.fd_coloring = coloring
+        top.run()
+        top.driver.calc_gradient(inputs=inputs, outputs=outputs)
+
+        count = top.comp.exec_count
+        t0 = time()
+        J = top.driver._calc_gradient(inputs, outputs)
+        print 'Banded, fd_coloring=%s: %d runs, time elapsed %f' % \
+              (coloring, top.comp.exec_count - count, time() - t0)
 
-    # python -m cProfile -s time fd_scalable.py >z
\ No newline at end of file
+    # python -m cProfile -s time fd_scalable.py >z
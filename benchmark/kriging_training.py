@@ -0,0 +1,41 @@
+# pylint: disable-msg=C0111,C0103
+
+"""
+Training time of the KrigingSurrogate as the number of training points
+grows, for the derivative free (COBYLA) and gradient based (L-BFGS-B)
+hyperparameter searches.
+"""
+
+from time import time
+
+import numpy as np
+from numpy import pi, cos
+
+from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate
+
+np.random.seed(12345)
+sizes = [100, 250, 500, 1000, 2000]
+
+def bran(x):
+    y = (x[1]-(5.1/(4.*pi**2.))*x[0]**2.+5.*x[0]/pi-6.)**2.+10.*(1.-1./(8.*pi))*cos(x[0])+10.
+    return y
+
+if __name__ == "__main__":
+
+    print '%8s %14s %14s' % ('N', 'COBYLA (s)', 'L-BFGS-B (s)')
+    for N in sizes:
+        x = np.random.random((N, 2))*10.0
+        y = np.array([bran(case) for case in x])
+
+        times = []
+        for method in ('COBYLA', 'L-BFGS-B'):
+            krig1 = KrigingSurrogate()
+            krig1.training_method = method
+
+            t0 = time()
+            krig1.train(x, y)
+            times.append(time() - t0)
+
+        print '%8d %14.3f %14.3f' % (N, times[0], times[1])
+
+    # python -m cProfile -s time kriging_training.py >z
@@ -2,6 +2,7 @@
 DB (Python's sqlite.)
 """
 
+import struct
 import sys
 
 try:
@@ -14,6 +15,7 @@ import time
 from cPickle import dumps, loads, HIGHEST_PROTOCOL, UnpicklingError
 from optparse import OptionParser
 
+from numpy import ascontiguousarray, frombuffer, ndarray
 from traits.trait_handlers import TraitListObject, TraitDictObject
 
 # pylint: disable=E0611,F0401
@@ -26,6 +28,62 @@ from openmdao.lib.casehandlers.util import driver_map
 _casetable_attrs = set(['id', 'uuid', 'parent', 'msg', 'model_id', 'timeEnter'])
 _vartable_attrs = set(['var_id', 'name', 'case_id', 'sense', 'value'])
 
+# Numeric arrays are stored as this tag, then the dtype string and shape,
+# then the raw data (see _encode_value). Pickles never start with it.
+_ARRAY_TAG = 'NDA\x00'
+
+
+def _connect(dbfile):
+    """Return a connection to `dbfile`, using write-ahead logging if it is
+    a file."""
+    connection = sqlite3.connect(dbfile)
+    if dbfile != ':memory:':
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+def _encode_value(value):
+    """Return `value` in the form stored in the casevars table. Numeric
+    arrays are stored as raw data, other values that aren't a float, int,
+    or string are pickled."""
+    if isinstance(value, (float, int, str)):
+        return value
+    if isinstance(value, ndarray) and value.dtype.kind in 'biufc':
+        dtype = value.dtype.str
+        header = struct.pack('<B%dsB%dq' % (len(dtype), value.ndim),
+                             len(dtype), dtype, value.ndim, *value.shape)
+        return sqlite3.Binary(_ARRAY_TAG + header +
+                              ascontiguousarray(value).tostring())
+    if isinstance(value, TraitDictObject):
+        value = dict(value)
+    elif isinstance(value, TraitListObject):
+        value = list(value)
+    return sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL))
+
+
+def _decode_value(value):
+    """Return the value stored in the casevars table as `value`."""
+    if isinstance(value, (float, int, long, basestring)):
+        return value
+    if value is None:  # Result when recorded value was NaN.
+        return float('NaN')
+
+    data = str(value)
+    if data.startswith(_ARRAY_TAG):
+        start = len(_ARRAY_TAG)
+        size = ord(data[start])
+        start += 1
+        dtype = data[start:start+size]
+        start += size
+        ndim = ord(data[start])
+        start += 1
+        shape = struct.unpack('<%dq' % ndim, data[start:start+8*ndim])
+        start += 8*ndim
+        return frombuffer(data, dtype, offset=start).reshape(shape).copy()
+    return loads(data)
+
+
 def _query_split(query):
     """Return a tuple of lhs, relation, rhs after splitting on
     a list of allowed operators.
@@ -104,18 +162,13 @@ class DBCaseIterator(object):
             inputs = []
             outputs = []
             for var_id, vname, case_id, sense, value in varcur:
-                if isinstance(value, (float, int, str)):
-                    pass
-                elif value is None:  # Result when recorded value was NaN.
-                    value = float('NaN')
-                else:
-                    try:
-                        value = loads(str(value))
-                    except UnpicklingError as err:
-                        print 'value', type(value), repr(value)
-                        raise UnpicklingError("can't unpickle value '%s' for"
-                                              " case '%s' from database: %s"
-                                              % (vname, text_id, str(err)))
+                try:
+                    value = _decode_value(value)
+                except UnpicklingError as err:
+                    print 'value', type(value), repr(value)
+                    raise UnpicklingError("can't unpickle value '%s' for"
+                                          " case '%s' from database: %s"
+                                          % (vname, text_id, str(err)))
                 if sense == 'i':
                     inputs.append((vname, value))
                 elif sense == 'o':
@@ -127,16 +180,24 @@ class DBCaseIterator(object):
 
 
 class DBCaseRecorder(object):
-    """Records Cases to a relational DB (sqlite). Values other than floats,
-    ints or strings are pickled and are opaque to SQL queries.
+    """Records Cases to a relational DB (sqlite). Numeric arrays are stored
+    as raw data, and values other than floats, ints or strings are pickled.
+    Both are opaque to SQL queries.
+
+    If `buffer_size` is greater than 1, cases are buffered and written
+    `buffer_size` at a time in a single transaction. Buffered cases are
+    written by :meth:`flush`, :meth:`close`, or :meth:`get_iterator`.
     """
 
     implements(ICaseRecorder)
 
-    def __init__(self, dbfile=':memory:', model_id='', append=False):
+    def __init__(self, dbfile=':memory:', model_id='', append=False,
+                 buffer_size=1):
         self.dbfile = dbfile  # this creates the connection
         self.model_id = model_id
+        self.buffer_size = buffer_size
         self._cfg_map = {}
+        self._buffer = []  # (case row, var rows) of unwritten cases.
 
         if append:
             exstr = 'if not exists'
@@ -173,7 +234,7 @@ class DBCaseRecorder(object):
     def dbfile(self, value):
         """Set the DB file and connect to it."""
         self._dbfile = value
-        self._connection = sqlite3.connect(value)
+        self._connection = _connect(value)
         self._iter_conn = sqlite3.connect(value)
 
     def startup(self):
@@ -193,51 +254,64 @@ class DBCaseRecorder(object):
         if self._connection is None:
             raise RuntimeError('Attempt to record on closed recorder')
 
-        cur = self._connection.cursor()
-
         msg = '' if exc is None else str(exc)
-        cur.execute("""insert into cases(id,uuid,parent,msg,model_id,timeEnter)
-                           values (?,?,?,?,?,DATETIME('NOW'))""",
-                    (None, case_uuid, parent_uuid, msg, self.model_id))
+        case = (case_uuid, parent_uuid, msg, self.model_id,
+                time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()))
 
-        case_id = cur.lastrowid
-        # insert the inputs and outputs into the vars table.  Pickle them if
-        # they're not one of the built-in types int, float, or str.
+        # The inputs and outputs go into the vars table, case_id is
+        # filled in when the case is written.
+        in_names, out_names = self._cfg_map[driver]
+        variables = [('timestamp', None, time.time())]
+        variables.extend([(name, 'i', _encode_value(value))
+                          for name, value in zip(in_names, inputs)])
+        variables.extend([(name, 'o', _encode_value(value))
+                          for name, value in zip(out_names, outputs)])
 
-        v = (None, 'timestamp', case_id, None, time.time())
-        cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)",
-                    v)
+        self._buffer.append((case, variables))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
 
-        in_names, out_names = self._cfg_map[driver]
+    def flush(self):
+        """Write any buffered cases in a single transaction."""
+        if not self._buffer or self._connection is None:
+            return
 
-        for name, value in zip(in_names, inputs):
-            if isinstance(value, (float, int, str)):
-                v = (None, name, case_id, 'i', value)
-            else:
-                if isinstance(value, TraitDictObject):
-                    value = dict(value)
-                elif isinstance(value, TraitListObject):
-                    value = list(value)
-                v = (None, name, case_id, 'i',
-                     sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)",
-                        v)
-        for name, value in zip(out_names, outputs):
-            if isinstance(value, (float, int, str)):
-                v = (None, name, case_id, 'o', value)
-            else:
-                if isinstance(value, TraitDictObject):
-                    value = dict(value)
-                elif isinstance(value, TraitListObject):
-                    value = list(value)
-                v = (None, name, case_id, 'o',
-                     sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)",
-                        v)
+        cur = self._connection.cursor()
+        rows = []
+        try:
+            for case, variables in self._buffer:
+                cur.execute("""insert into cases(id,uuid,parent,msg,model_id,timeEnter)
+                                   values (NULL,?,?,?,?,?)""", case)
+                case_id = cur.lastrowid
+                rows.extend([(name, case_id, sense, value)
+                             for name, sense, value in variables])
+            cur.executemany("insert into casevars(var_id,name,case_id,sense,value) values(NULL,?,?,?,?)",
+                            rows)
+        except Exception:
+            self._connection.rollback()
+            raise
+        else:
+            self._connection.commit()
+        finally:
+            self._buffer = []
+
+    def _create_indexes(self):
+        """Index the casevars table for queries by case and name. This is
+        done once recording is done since it's faster than maintaining the
+        indexes while recording."""
+        self._connection.execute("""
+        create index if not exists casevars_name_case on casevars(name, case_id)
+        """)
+        self._connection.execute("""
+        create index if not exists casevars_case on casevars(case_id)
+        """)
         self._connection.commit()
 
     def close(self):
         """Commit and close DB connection if not using ``:memory:``."""
+        if self._connection is not None:
+            self.flush()
+            self._create_indexes()
         if self._connection is not None and self._dbfile != ':memory:':
             self._connection.commit()
             self._connection.close()
@@ -245,6 +319,9 @@ class DBCaseRecorder(object):
 
     def get_iterator(self):
         """Return a DBCaseIterator that points to our current DB."""
+        if self._connection is not None:
+            self.flush()
+            self._create_indexes()
         return DBCaseIterator(dbfile=self._dbfile, connection=self._connection)
 
 
@@ -332,12 +409,11 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
         casedict = {}
         varcur.execute(combined % case_id)
         for vname, value in varcur:
-            if not isinstance(value, (float, int, str)):
-                try:
-                    value = loads(str(value))
-                except UnpicklingError as err:
-                    raise UnpicklingError("can't unpickle value '%s' from"
-                                          " database: %s" % (vname, str(err)))
+            try:
+                value = _decode_value(value)
+            except UnpicklingError as err:
+                raise UnpicklingError("can't unpickle value '%s' from"
+                                      " database: %s" % (vname, str(err)))
             casedict[vname] = value
 
         if len(casedict) != len(vardict):
@@ -5,6 +5,7 @@ HDF5 Case Recording.
 import sys
 import os
 import time
+import cPickle
 from uuid import uuid1
 import numpy as np
 
@@ -37,6 +38,21 @@ def dp(s):
 
 str_dtype = 'S50'
 
+# Record metadata: _driver_id, _id, _parent_id, error_message, error_status,
+# timestamp. From Python and HDF5 Book on Safari Online.
+_METADATA_DTYPE = np.dtype([
+    ('_driver_id', 'i8'),
+    ('_driver_name', np.str_, 40),
+    ('_id', np.str_, 40),
+    ('_parent_id', np.str_, 40),
+    ('_itername', np.str_, 40),
+    ('error_message', np.str_, 40),
+    ('error_status', 'i8'),
+    ('timestamp', 'f8')])
+
+# Upper bound on the size of one chunk of a column dataset.
+_MAX_CHUNK_BYTES = 1 << 20
+
 def write_to_hdf5( group, name, value ):
 
     filename = group.file.filename
@@ -130,8 +146,175 @@ def write_groups_to_hdf5( group, name, value ):
         dset = group.create_dataset(name, (), dtype=np.bool)
 
 
+def _metadata_row(info):
+    """ Return the record metadata from case `info` as a tuple matching
+    :data:`_METADATA_DTYPE`. """
+    metadata = []
+    for name in _METADATA_DTYPE.names:
+        value = info[name]
+        if name == 'error_status' and value is None:
+            value = sys.maxint
+        metadata.append(value)
+    return tuple(metadata)
+
+
+def _plain_value(value):
+    """ Return `value` with variable trees replaced by (nested) dicts so it
+    can be pickled without the model's classes. """
+    if isinstance(value, VariableTree):
+        return dict((name, _plain_value(value.get(name)))
+                    for name in value.list_vars())
+    elif isinstance(value, dict):
+        return dict((name, _plain_value(val)) for name, val in value.items())
+    return value
+
+
+class _ColumnarCaseFile(object):
+    """
+    Case data for one driver, stored as one chunked, resizable dataset per
+    recorded variable under ``/columns`` plus a structured ``/metadata``
+    table with one row per case. Cases are buffered in memory and appended
+    to the datasets `block_size` at a time.
+
+    Numbers, strings and fixed-shape numeric arrays are stored natively, so
+    row ``i`` of each dataset is the value from case ``i``. Anything else
+    (variable trees, lists, ``None``, ...) is pickled into a variable-length
+    byte dataset flagged with a ``pickled`` attribute.
+
+    Not every case records every variable, so each column has a boolean
+    dataset of the same name under ``/present`` that is True for the rows
+    holding a value. Other rows hold NaN (float columns), zero, an empty
+    string, or an empty blob.
+    """
 
+    def __init__(self, hdf5_file, chunk_size, compression, block_size,
+                 max_string_len):
+        import h5py  # do it here to avoid warning from autodoc in Sphinx
 
+        self._file = hdf5_file
+        self._chunk_size = chunk_size
+        self._compression = compression
+        self._block_size = block_size
+        self._str_dtype = 'S%d' % max_string_len
+        self._blob_dtype = h5py.special_dtype(vlen=np.dtype('uint8'))
+
+        hdf5_file.attrs['layout'] = 'columnar'
+        self._columns = hdf5_file.create_group('columns')
+        self._present = hdf5_file.create_group('present')
+        self._metadata = hdf5_file.create_dataset('metadata', (0,),
+                                                  maxshape=(None,),
+                                                  chunks=(chunk_size,),
+                                                  dtype=_METADATA_DTYPE,
+                                                  compression=compression)
+        self._shapes = {}  # Native shape per column, None if pickled.
+        self._rows = []
+        self._values = {}  # Buffered values (pickled if not native) or None.
+        self._count = 0
+
+    def append(self, metadata, data):
+        """ Buffer one case, writing the buffer out if it is full. """
+        for name, value in data.items():
+            if name not in self._shapes:
+                self._create(name, value)
+            shape = self._shapes[name]
+            if shape is not None and np.shape(value) != shape:
+                raise ValueError('%s: shape changed from %s to %s, use'
+                                 ' layout="groups" to record it'
+                                 % (name, shape, np.shape(value)))
+
+        # Every column gets a row, missing or not. Values are copied now,
+        # since the model may change them in place before the flush.
+        for name, values in self._values.items():
+            if name not in data:
+                values.append(None)
+            elif self._shapes[name] is None:
+                values.append(cPickle.dumps(_plain_value(data[name]),
+                                            cPickle.HIGHEST_PROTOCOL))
+            else:
+                values.append(np.array(data[name]))
+        self._rows.append(metadata)
+
+        if len(self._rows) >= self._block_size:
+            self.flush()
+
+    def flush(self):
+        """ Append buffered cases to the datasets. """
+        if not self._rows:
+            return
+
+        start = self._count
+        stop = start + len(self._rows)
+
+        self._metadata.resize((stop,))
+        self._metadata[start:stop] = np.array(self._rows,
+                                              dtype=_METADATA_DTYPE)
+        for name, values in self._values.items():
+            present = np.array([value is not None for value in values])
+            dset = self._columns[name]
+            dset.resize(stop, axis=0)
+            if self._shapes[name] is None:
+                # Written row by row: h5py makes a 2D array of a slice of
+                # blobs that all have the same length.
+                for i, blob in enumerate(values):
+                    dset[start+i] = np.frombuffer(blob or '', dtype=np.uint8)
+            else:
+                column = np.empty((len(values),)+self._shapes[name],
+                                  dtype=dset.dtype)
+                column[...] = dset.fillvalue
+                for i, value in enumerate(values):
+                    if value is not None:
+                        column[i] = value
+                dset[start:stop] = column
+
+            # Rows before the column's first value keep the False fill.
+            flags = self._present[name]
+            flags.resize((stop,))
+            flags[start:stop] = present
+
+        # Only drop the buffer once all of it is written, so a failed flush
+        # can be retried.
+        for values in self._values.values():
+            del values[:]
+        self._rows = []
+        self._count = stop
+        self._file.flush()
+
+    def _create(self, name, value):
+        """ Create the column dataset for `name` based on its first value. """
+        if isinstance(value, basestring):
+            dtype = np.dtype(self._str_dtype)
+            shape = ()
+        elif isinstance(value, (bool, int, long, float, np.number, np.bool_)):
+            dtype = np.asarray(value).dtype
+            shape = ()
+        elif isinstance(value, np.ndarray) and value.dtype.kind in 'biuf' \
+             and value.size:
+            dtype = value.dtype
+            shape = value.shape
+        else:
+            dtype = shape = None
+
+        if dtype is None:
+            dset = self._columns.create_dataset(name, (0,), maxshape=(None,),
+                                                chunks=(self._chunk_size,),
+                                                dtype=self._blob_dtype)
+            dset.attrs['pickled'] = True
+        else:
+            # Keep chunks of big arrays to a reasonable size.
+            row_bytes = dtype.itemsize * int(np.prod(shape))
+            rows = max(1, min(self._chunk_size, _MAX_CHUNK_BYTES // row_bytes))
+            fill = np.nan if dtype.kind == 'f' else None
+            self._columns.create_dataset(name, (0,)+shape,
+                                         maxshape=(None,)+shape,
+                                         chunks=(rows,)+shape, dtype=dtype,
+                                         compression=self._compression,
+                                         fillvalue=fill)
+        self._present.create_dataset(name, (0,), maxshape=(None,),
+                                     chunks=(self._chunk_size,),
+                                     dtype=np.bool_,
+                                     compression=self._compression)
+        self._shapes[name] = shape
+        self._values[name] = [None] * len(self._rows)
 
 
 class HDF5CaseRecorder(object):
@@ -141,14 +324,37 @@ class HDF5CaseRecorder(object):
     then that standard stream is used. Otherwise, if `out` is a string, then
     a file with that name will be opened in the current directory.
     If `out` is None, cases will be ignored.
+
+    `layout` selects how cases are stored in the per-driver files. The
+    default, ``'groups'``, writes an ``iteration_case_N`` group per case.
+    ``'columnar'`` writes one chunked, resizable dataset per recorded
+    variable plus a ``metadata`` table, appending `block_size` cases at a
+    time, which is much smaller and faster for large numbers of cases.
+    `chunk_size` is the number of cases per HDF5 chunk and `compression`
+    the filter (e.g. ``'gzip'``) for the columnar datasets. The columnar
+    layout is not available when running under MPI.
     """
 
     implements(ICaseRecorder)
 
-    def __init__(self, filename='model.hdf5', indent=4, sort_keys=True, max_string_len=50 ): # TODO need an option for the size of the strings
+    def __init__(self, filename='model.hdf5', indent=4, sort_keys=True, max_string_len=50, # TODO need an option for the size of the strings
+                 layout='groups', chunk_size=1024, compression=None, block_size=100):
 
         import h5py  # do it here to avoid warning from autodoc in Sphinx
 
+        if layout not in ('groups', 'columnar'):
+            raise ValueError("layout must be 'groups' or 'columnar'")
+        if layout == 'columnar' and MPI:
+            raise ValueError("layout 'columnar' is not supported under MPI")
+        if chunk_size < 1 or block_size < 1:
+            raise ValueError('chunk_size and block_size must be at least 1')
+
+        self.layout = layout
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self.block_size = block_size
+        self._columnar_files = {}
+
         self._cfg_map = {}
         self._uuid = None
         self._cases = None
@@ -202,6 +408,12 @@ class HDF5CaseRecorder(object):
         else:
             self.hdf5_case_record_file_objects[driver] = h5py.File(case_recording_filename, "w")
 
+        if self.layout == 'columnar':
+            self._columnar_files[driver] = \
+                _ColumnarCaseFile(self.hdf5_case_record_file_objects[driver],
+                                  self.chunk_size, self.compression,
+                                  self.block_size, self.max_string_len)
+
 
     def record_constants(self, constants):
         """ Record constant data. """
@@ -296,6 +508,12 @@ class HDF5CaseRecorder(object):
                                   case_uuid, parent_uuid)
 
         self._cases += 1
+
+        if self.layout == 'columnar':
+            self._columnar_files[driver].append(_metadata_row(info),
+                                                info['data'])
+            return
+
         iteration_case_name = 'iteration_case_%s' % self._cases
 
         int_names = []
@@ -305,16 +523,7 @@ class HDF5CaseRecorder(object):
         # create dataset for the record metadata: _driver_id, _id, _parent_id, error_message, error_status, timestamp
         # From Python and HDF5 Book on Safari Online
         if not "/metadatatype" in hdf5_file_object: # TODO use actual string lengths
-            hdf5_file_object['metadatatype'] =  np.dtype([
-                ('_driver_id', 'i8'),
-                ('_driver_name', np.str_, 40),
-                ('_id', np.str_, 40),
-                ('_parent_id', np.str_, 40),
-                ('_itername', np.str_, 40),
-                ('error_message', np.str_, 40),
-                ('error_status', 'i8'),
-                ('timestamp', 'f8')]
-                )
+            hdf5_file_object['metadatatype'] = _METADATA_DTYPE
 
         self._count += 1
         iteration_case_group = create_group(hdf5_file_object, iteration_case_name)
@@ -366,17 +575,8 @@ class HDF5CaseRecorder(object):
         ##### Write the datasets using only the data available to this process ######
         data_grp = iteration_case_group['data']
 
-        dp( 'determine metadata' )
-        metadata = []
-        for name in [ '_driver_id', '_driver_name', '_id', '_parent_id', '_itername', 'error_message', 'error_status', 'timestamp'] :
-            value = info[ name ]
-            if name == 'error_status' and value == None :
-                from sys import maxint
-                value = maxint
-            metadata.append( value )
-
         dp('set metadata_dset' )
-        metadata_dset[()] = np.array([ tuple(metadata), ], dtype = hdf5_file_object['metadatatype'])
+        metadata_dset[()] = np.array([ _metadata_row(info), ], dtype = hdf5_file_object['metadatatype'])
 
         dp('set values in data')
         for name, value in info[ 'data' ].items():
@@ -407,6 +607,10 @@ class HDF5CaseRecorder(object):
 
         import h5py  # do it here to avoid warning from autodoc in Sphinx
 
+        for columnar_file in self._columnar_files.values():
+            columnar_file.flush()
+        self._columnar_files = {}
+
         for hdf5_case_record_file in self.hdf5_case_record_file_objects.values() :
             hdf5_case_record_file.close()
 
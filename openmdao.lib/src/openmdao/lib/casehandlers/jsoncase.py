@@ -5,11 +5,15 @@ JSON/BSON Case Recording.
 import cStringIO
 import StringIO
 import logging
+import Queue
 import sys
+import threading
 import time
 import os
 import inspect
 
+from base64 import b64encode
+
 
 import json
 import bson
@@ -19,7 +23,7 @@ import cPickle
 from openmdao.lib.casehandlers.pymongo_bson.json_util import dumps
 from openmdao.lib.casehandlers.pymongo_bson.binary import Binary
 
-from numpy  import ndarray
+from numpy  import ascontiguousarray, ndarray
 from struct import pack
 from uuid   import uuid1
 
@@ -30,11 +34,33 @@ from openmdao.util.typegroups import real_types
 
 
 class _BaseRecorder(object):
-    """ Base class for JSONRecorder and BSONRecorder. """
+    """
+    Base class for JSONRecorder and BSONRecorder.
+
+    If `background` is True, records are encoded and written by a separate
+    thread, with at most `queue_size` records pending before recording
+    blocks. Values are copied when recorded, so later changes to the model
+    don't affect what is written.
+
+    If `fsync_interval` is not None, the file is synced to disk at most
+    every `fsync_interval` seconds (0 syncs after every record) in addition
+    to being flushed.
+
+    If `binary_arrays` is True, numeric arrays are written as their raw data
+    plus dtype and shape rather than as pickles.
+    """
 
     implements(ICaseRecorder)
 
-    def __init__(self):
+    def __init__(self, background=False, queue_size=100, fsync_interval=None,
+                 binary_arrays=False):
+        self.background = background
+        self.queue_size = queue_size
+        self.fsync_interval = fsync_interval
+        self.binary_arrays = binary_arrays
+        self._writer = None
+        self._last_sync = 0.
+
         self._cfg_map = {}
         self._uuid = None
         self._cases = None
@@ -51,6 +77,41 @@ class _BaseRecorder(object):
         """ Register names for later record call from `driver`. """
         self._cfg_map[driver] = (inputs, outputs)
 
+    def _emit(self, info, *args):
+        """
+        Write record `info` (see :meth:`_write` for `args`), either now or
+        via the writer thread.
+        """
+        if self.background:
+            if self._writer is None:
+                self._writer = _CaseWriter(self, self.queue_size)
+            self._writer.put((_snapshot(info),)+args)
+        else:
+            self._write(info, *args)
+            self._flush()
+
+    def _write(self, info, *args):
+        """ Encode and write record `info`. """
+        raise NotImplementedError('_write')
+
+    def _flush(self, sync=False):
+        """ Flush `out`, syncing to disk if due or `sync` is True. """
+        self.out.flush()
+        if self.fsync_interval is not None:
+            now = time.time()
+            if sync or now - self._last_sync >= self.fsync_interval:
+                try:
+                    os.fsync(self.out.fileno())
+                except (AttributeError, ValueError, OSError):
+                    pass  # Not a real file.
+                self._last_sync = now
+
+    def _close_writer(self):
+        """ Wait for queued records to be written. """
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+
     def get_simulation_info(self, constants):
         """ Return simulation info dictionary. """
         # Locate top level assembly from first driver registered.
@@ -210,10 +271,16 @@ class JSONCaseRecorder(_BaseRecorder):
     then that standard stream is used. Otherwise, if `out` is a string, then
     a file with that name will be opened in the current directory.
     If `out` is None, cases will be ignored.
+
+    See :class:`_BaseRecorder` for `background`, `queue_size`,
+    `fsync_interval`, and `binary_arrays`.
     """
 
-    def __init__(self, out='cases.json', indent=4, sort_keys=True):
-        super(JSONCaseRecorder, self).__init__()
+    def __init__(self, out='cases.json', indent=4, sort_keys=True,
+                 background=False, queue_size=100, fsync_interval=None,
+                 binary_arrays=False):
+        super(JSONCaseRecorder, self).__init__(background, queue_size,
+                                               fsync_interval, binary_arrays)
         if isinstance(out, basestring):
             if out == 'stdout':
                 out = sys.stdout
@@ -232,25 +299,11 @@ class JSONCaseRecorder(_BaseRecorder):
             return
 
         info = self.get_simulation_info(constants)
-        category = 'simulation_info'
-        data = self._dump(info, category,
-                          ('variable_metadata', 'expressions', 'constants'))
-        self._count += 1
-        self.out.write('{\n"__length_%s": %s\n, "%s": '
-                       % (self._count, len(data), category))
-        self.out.write(data)
-        self.out.write('\n')
+        self._emit(info, 'simulation_info',
+                   ('variable_metadata', 'expressions', 'constants'))
 
         for i, info in enumerate(self.get_driver_info()):
-            category = 'driver_info_%s' % (i+1)
-            data = self._dump(info, category)
-            self._count += 1
-            self.out.write(', "__length_%s": %s\n, "%s": '
-                           % (self._count, len(data), category))
-            self.out.write(data)
-            self.out.write('\n')
-
-        self.out.flush()
+            self._emit(info, 'driver_info_%s' % (i+1))
 
     def record(self, driver, inputs, outputs, exc, case_uuid, parent_uuid):
         """ Dump the given run data. """
@@ -260,22 +313,26 @@ class JSONCaseRecorder(_BaseRecorder):
         info = self.get_case_info(driver, inputs, outputs, exc,
                                   case_uuid, parent_uuid)
         self._cases += 1
-        category = 'iteration_case_%s' % self._cases
-        data = self._dump(info, category, ('data',))
+        self._emit(info, 'iteration_case_%s' % self._cases, ('data',))
+
+    def _write(self, info, category, subcategories=None):
+        """ Write `info` as the record for `category`. """
+        data = self._dump(info, category, subcategories)
         self._count += 1
-        self.out.write(', "__length_%s": %s\n, "%s": '
-                       % (self._count, len(data), category))
+        prefix = '{\n' if self._count == 1 else ', '
+        self.out.write('%s"__length_%s": %s\n, "%s": '
+                       % (prefix, self._count, len(data), category))
         self.out.write(data)
         self.out.write('\n')
-        self.out.flush()
 
     def _dump(self, info, category, subcategories=None):
         """ Return JSON data, report any bad keys & values encountered. """
+        encoder = _CompactEncoder if self.binary_arrays else _Encoder
         try:
             return json.dumps(info, indent=self.indent,
             #return dumps(info, indent=self.indent,
                               sort_keys=self.sort_keys,
-                              cls=_Encoder, check_circular=False)
+                              cls=encoder, check_circular=False)
         except Exception as exc:
             # Log bad keys & values.
             bad = []
@@ -316,8 +373,11 @@ class JSONCaseRecorder(_BaseRecorder):
         Closes `out` unless it's ``sys.stdout`` or ``sys.stderr``.
         Note that a closed recorder will do nothing in :meth:`record`.
         """
+        self._close_writer()
+
         if self.out is not None and self._cases is not None:
             self.out.write('}\n')
+            self._flush(sync=True)
 
         if self.out not in (None, sys.stdout, sys.stderr):
             if not isinstance(self.out,
@@ -333,42 +393,140 @@ class JSONCaseRecorder(_BaseRecorder):
         return None
 
 
+class _CaseWriter(threading.Thread):
+    """
+    Daemon thread which writes records queued for `recorder`, so encoding
+    and I/O don't hold up the caller. Once `queue_size` records are pending
+    :meth:`put` blocks. A failure is reported by the next :meth:`put` or
+    :meth:`close`.
+    """
+
+    def __init__(self, recorder, queue_size):
+        super(_CaseWriter, self).__init__(name='CaseWriter')
+        self.daemon = True
+        self._recorder = recorder
+        self._queue = Queue.Queue(queue_size)
+        self._error = None
+        self.start()
+
+    def put(self, record):
+        """ Queue `record` (arguments for the recorder's ``_write``). """
+        self._check()
+        self._queue.put(record)
+
+    def close(self):
+        """ Wait for queued records to be written. """
+        self._queue.put(None)
+        self.join()
+        self._check()
+
+    def _check(self):
+        """ Raise an exception if writing has failed. """
+        if self._error is not None:
+            raise RuntimeError('Case recording failed: %s' % self._error)
+
+    def run(self):
+        """ Write queued records until closed. """
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            if self._error is not None:
+                continue  # Discard, so put() doesn't block.
+            try:
+                self._recorder._write(*record)
+                self._recorder._flush()
+            except Exception as exc:
+                logging.exception('Case recording failed')
+                self._error = exc
+
+
+def _snapshot(value):
+    """
+    Return a copy of `value` that won't change when the model does.
+    Arrays are copied and variable trees converted to dictionaries.
+    """
+    if isinstance(value, ndarray):
+        return value.copy()
+    elif isinstance(value, dict):
+        return dict([(key, _snapshot(val)) for key, val in value.items()])
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return [_snapshot(val) for val in value]
+    elif isinstance(value, VariableTree):
+        return dict([(name, _snapshot(getattr(value, name)))
+                     for name in value.list_vars()])
+    elif value is None or isinstance(value, (basestring, bool, int, long,
+                                             float)):
+        return value
+    return _fix_object_for_json_encoder(value)
+
+
+def _encode_array(value, text=True):
+    """
+    Return numeric array `value` as a dictionary of its raw data, dtype and
+    shape. If `text` is True the data is base64 encoded.
+    """
+    data = ascontiguousarray(value).tostring()
+    if text:
+        data = b64encode(data)
+    return {'$ndarray': data, 'dtype': value.dtype.str,
+            'shape': list(value.shape)}
+
+
 class _Encoder(json.JSONEncoder):
     """ Special encoder to deal with types not handled by default encoder. """
 
+    encode_array = None
+
     def default(self, obj):
-        fixed = _fix_object_for_json_encoder(obj)
+        fixed = _fix_object_for_json_encoder(obj, self.encode_array)
         if fixed is obj:
             super(_Encoder, self).default(obj)
         return fixed
 
 
-def _fix_object_for_json_encoder(value):
+class _CompactEncoder(_Encoder):
+    """ Encoder which writes numeric arrays via :func:`_encode_array`. """
+
+    encode_array = staticmethod(_encode_array)
+
+
+def _fix_object_for_json_encoder(value, encode_array=None):
     """
     Fix object for json encoder, also bson. Stock bson doesn't handle a lot
-    of types, just skips them.
+    of types, just skips them. If `encode_array` is given, it is used to
+    convert numeric arrays rather than pickling them.
     """
     if isinstance(value, dict):
         new_value = {}
         for key, val in value.items():
-            new_value[key] = _fix_object_for_json_encoder(val)
+            new_value[key] = _fix_object_for_json_encoder(val, encode_array)
         return new_value
     elif isinstance(value, (list, tuple, set, frozenset)):
-        return [_fix_object_for_json_encoder(val) for val in value]
+        return [_fix_object_for_json_encoder(val, encode_array)
+                for val in value]
     elif isinstance(value, ndarray):
+        if encode_array is not None and value.dtype.kind in 'biufc':
+            return encode_array(value)
         d = dumps(Binary( cPickle.dumps( value, protocol=2) ) )
         return json.loads(d)
         #return dumps(Binary( cPickle.dumps( value, protocol=2) ) )
     elif isinstance(value, VariableTree):
-        return dict([(name, _fix_object_for_json_encoder(getattr(value, name)))
+        return dict([(name, _fix_object_for_json_encoder(getattr(value, name),
+                                                         encode_array))
                      for name in value.list_vars()])
     elif hasattr(value, 'json_encode') and callable(value.json_encode):
         return value.json_encode()
     elif hasattr(value, '__dict__'):
-        return _fix_object_for_json_encoder(value.__dict__)
+        return _fix_object_for_json_encoder(value.__dict__, encode_array)
     return value
 
 
+def _encode_bson_array(value):
+    """ :func:`_encode_array` with the data left as binary. """
+    return _encode_array(value, text=False)
+
+
 class BSONCaseRecorder(_BaseRecorder):
     """
     Dumps a run in BSON form to `out`, which may be a string or a file-like
@@ -401,10 +559,15 @@ class BSONCaseRecorder(_BaseRecorder):
 
                 data = inp.read(4)
 
+
+    See :class:`_BaseRecorder` for `background`, `queue_size`,
+    `fsync_interval`, and `binary_arrays`.
     """
 
-    def __init__(self, out='cases.bson'):
-        super(BSONCaseRecorder, self).__init__()
+    def __init__(self, out='cases.bson', background=False, queue_size=100,
+                 fsync_interval=None, binary_arrays=False):
+        super(BSONCaseRecorder, self).__init__(background, queue_size,
+                                               fsync_interval, binary_arrays)
         if isinstance(out, basestring):
             out = open(out, 'w')
         self.out = out
@@ -414,18 +577,10 @@ class BSONCaseRecorder(_BaseRecorder):
         if not self.out:
             return
 
-        data = self._dump(self.get_simulation_info(constants))
-        reclen = pack('<L', len(data))
-        self.out.write(reclen)
-        self.out.write(data)
+        self._emit(self.get_simulation_info(constants))
 
         for info in self.get_driver_info():
-            data = self._dump(info)
-            reclen = pack('<L', len(data))
-            self.out.write(reclen)
-            self.out.write(data)
-
-        self.out.flush()
+            self._emit(info)
 
     def record(self, driver, inputs, outputs, exc, case_uuid, parent_uuid):
         """ Dump the given run data in a "pretty" form. """
@@ -434,22 +589,29 @@ class BSONCaseRecorder(_BaseRecorder):
 
         info = self.get_case_info(driver, inputs, outputs, exc,
                                   case_uuid, parent_uuid)
+        self._emit(info)
+
+    def _write(self, info):
+        """ Write `info` as a length-prefixed record. """
         data = self._dump(info)
         reclen = pack('<L', len(data))
         self.out.write(reclen)
         self.out.write(data)
-        self.out.flush()
 
     def _dump(self, info):
         """ Return BSON data, report any bad keys & values encountered. """
-        return bson.dumps(_fix_object_for_json_encoder(info))
+        encode_array = _encode_bson_array if self.binary_arrays else None
+        return bson.dumps(_fix_object_for_json_encoder(info, encode_array))
 
     def close(self):
         """
         Closes `out`. Note that a closed recorder will do nothing in
         :meth:`record`.
         """
+        self._close_writer()
+
         if self.out is not None:
+            self._flush(sync=True)
             if not isinstance(self.out,
                               (StringIO.StringIO, cStringIO.OutputType)):
                 # Closing a StringIO deletes its contents.
@@ -2,11 +2,13 @@ import bson
 import json
 import logging
 import cPickle
+import os
 import StringIO
+from base64 import b64decode
 from struct import pack, unpack
 from weakref import ref
 
-from numpy import ndarray
+from numpy import array, frombuffer, ndarray
 
 from openmdao.main.api import Assembly, VariableTree
 from openmdao.lib.casehandlers.pymongo_bson.json_util import loads, dumps
@@ -58,9 +60,15 @@ class CaseDataset(object):
 
         cds.restore(assembly, cds.data.fetch()[-1]['_id'])
 
+    If `index` is True, the byte offset and metadata of every case are
+    saved to a sidecar file, ``<filename>.idx``, the first time the file is
+    opened (and whenever it has changed since). Queries then read only the
+    records they need rather than parsing the whole file, which makes
+    repeated post-processing of large case files much faster.
+
     """
 
-    def __init__(self, filename, format):
+    def __init__(self, filename, format, index=False):
         format = format.lower()
         if format == 'bson':
             self._reader = _BSONReader(filename)
@@ -69,6 +77,14 @@ class CaseDataset(object):
         else:
             raise ValueError("dataset format must be 'json' or 'bson'")
 
+        if index:
+            if isinstance(filename, basestring):
+                self._index = _CaseIndex(self._reader, filename)
+            else:
+                self._index = _CaseIndex(self._reader)
+        else:
+            self._index = None
+
         self._query_id = self._parent_id = self._driver_id = None
         self._case_ids = self._drivers = None
 
@@ -118,6 +134,10 @@ class CaseDataset(object):
             # Returning single row, not list of rows.
             return names
 
+        if self._index is not None:
+            rows = self._fetch_indexed(query, names, metadata_names)
+            return self._result(query, names, rows)
+
         nan = float('NaN')
         rows = ListResult()
         state = {}  # Retains last seen values.
@@ -170,13 +190,94 @@ class CaseDataset(object):
             if case_id == self._query_id or case_id == self._parent_id:
                 break  # Parent is last case recorded.
 
+        return self._result(query, names, rows)
+
+    def _fetch_indexed(self, query, names, metadata_names):
+        """
+        Return rows for `query` using the case index. The same values as a
+        full scan are returned, but only the records containing them are
+        read.
+        """
+        nan = float('NaN')
+        cases = self._index.cases
+        var_names = [name for name in names if name not in metadata_names]
+
+        # For each name, the key sets (recorded variables) containing it.
+        keysets = {}
+        for name in var_names:
+            keysets[name] = [i for i, keys in enumerate(self._index.keysets)
+                             if name in keys]
+
+        last = {}      # Position of the last case seen with each key set.
+        selected = []  # (position, source position of each var) per row.
+        needed = {}    # Names to read from each source position.
+        for i, (offset, keyset, header) in enumerate(cases):
+            case_id = header['_id']
+            case_driver_id = header['_driver_id']
+            last[keyset] = i
+
+            # Filter on driver.
+            if self._driver_id is not None and \
+               case_driver_id != self._driver_id:
+                continue
+
+            # Filter on case.
+            if self._case_ids is None or case_id in self._case_ids:
+                if query.local_only:
+                    driver = self._drivers[case_driver_id]
+                    lnames = set([driver['prefix']+rec
+                                  for rec in driver['recording']])
+                sources = []
+                for name in var_names:
+                    if query.local_only:
+                        src = i if name in lnames else None
+                    else:
+                        # Most recent value, as retained by a full scan.
+                        src = None
+                        for keyset in keysets[name]:
+                            pos = last.get(keyset)
+                            if pos is not None and (src is None or pos > src):
+                                src = pos
+                    if src is not None:
+                        needed.setdefault(src, set()).add(name)
+                    sources.append(src)
+                selected.append((i, sources))
+
+            if case_id == self._query_id or case_id == self._parent_id:
+                break  # Parent is last case recorded.
+
+        values = {}
+        for pos in sorted(needed):
+            data = self._reader.read_at(cases[pos][0])['data']
+            for name in needed[pos]:
+                values[pos, name] = data[name]
+
+        rows = ListResult()
+        for i, sources in selected:
+            header = cases[i][2]
+            sources = iter(sources)
+            row = DictList(names)
+            for name in names:
+                if name in metadata_names:
+                    row.append(header[name])
+                else:
+                    src = sources.next()
+                    row.append(nan if src is None else values[src, name])
+            rows.append(row)
+        return rows
+
+    def _result(self, query, names, rows):
+        """ Return `rows` in the form requested by `query`. """
         if self._query_id and not rows:
             raise ValueError('No case with _id %s' % self._query_id)
 
         if query.transpose:
             tmp = DictList(names)
             for i in range(len(rows[0])):
-                tmp.append([row[i] for row in rows])
+                column = [row[i] for row in rows]
+                if query.arrays:
+                    column = _as_array(column)
+                tmp.append(column)
             # Keep CDS as attribute for post-processing
             tmp.cds = self
             return tmp
@@ -185,6 +286,13 @@ class CaseDataset(object):
         rows.cds = self
         return rows
 
+    def _headers(self):
+        """ Return sequence of case dictionaries providing at least the
+        case metadata. """
+        if self._index is None:
+            return self._reader.cases()
+        return [header for offset, keyset, header in self._index.cases]
+
     def _write(self, query, out, format):
         """ Write data based on `query` to `out`. """
         if query.local_only:
@@ -312,7 +420,7 @@ class CaseDataset(object):
             # Collect tree of cases.
             self._parent_id = query.parent_id
             cases = {}
-            for case_data in self._reader.cases():
+            for case_data in self._headers():
                 _id = case_data['_id']
                 _driver_id = case_data['_driver_id']
                 _parent_id = case_data['_parent_id']
@@ -441,6 +549,7 @@ class Query(object):
         self.local_only = False
         self.names = False
         self.transpose = False
+        self.arrays = False
 
     def fetch(self):
         """ Return a list of rows of data, one for each selected case. """
@@ -501,12 +610,14 @@ class Query(object):
         self.transpose = False
         return self
 
-    def by_variable(self):
+    def by_variable(self, arrays=False):
         """
         Have :meth:`fetch` return data as ``[var][case]`` rather than the
-        default of ``[case][var]``.
+        default of ``[case][var]``. If `arrays` is True, numeric variables
+        are returned as NumPy arrays rather than lists.
         """
         self.transpose = True
+        self.arrays = arrays
         return self
 
     def var_names(self):
@@ -551,6 +662,81 @@ class ListResult(list):
     pass
 
 
+def _as_array(values):
+    """ Return `values` as an array if they are numeric, else unchanged. """
+    try:
+        result = array(values)
+    except Exception:
+        return values
+    return result if result.dtype.kind in 'biuf' else values
+
+
+class _CaseIndex(object):
+    """
+    Byte offset, recorded variable names and metadata of every case in a
+    case file read by `reader`. If `filename` is given, the index is saved
+    to ``<filename>.idx`` and reused until the case file changes.
+    """
+
+    version = 1
+
+    def __init__(self, reader, filename=None):
+        self.cases = []    # (offset, keyset, metadata) per case.
+        self.keysets = []  # Unique sets of data names.
+
+        if filename is None:
+            self._build(reader)
+            return
+
+        path = filename + '.idx'
+        stamp = (os.path.getsize(filename), os.path.getmtime(filename))
+        if not self._load(path, stamp):
+            self._build(reader)
+            self._save(path, stamp)
+
+    def _build(self, reader):
+        """ Scan all cases from `reader`. """
+        keysets = {}
+        for offset, info in reader.scan():
+            keys = frozenset(info['data'])
+            keyset = keysets.get(keys)
+            if keyset is None:
+                keyset = keysets[keys] = len(self.keysets)
+                self.keysets.append(keys)
+            header = dict([(name, value) for name, value in info.items()
+                           if name != 'data'])
+            self.cases.append((offset, keyset, header))
+
+    def _load(self, path, stamp):
+        """ Read index from `path`, returns False if missing or stale. """
+        try:
+            with open(path, 'rb') as inp:
+                saved = cPickle.load(inp)
+        except Exception:
+            return False
+
+        if saved.get('version') != self.version or saved.get('stamp') != stamp:
+            return False
+
+        self.cases = saved['cases']
+        self.keysets = saved['keysets']
+        return True
+
+    def _save(self, path, stamp):
+        """ Write index to `path` (if possible). """
+        saved = dict(version=self.version, stamp=stamp,
+                     cases=self.cases, keysets=self.keysets)
+        tmp = path + '.tmp'
+        try:
+            with open(tmp, 'wb') as out:
+                cPickle.dump(saved, out, cPickle.HIGHEST_PROTOCOL)
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp, path)
+        except (IOError, OSError) as exc:
+            logging.warning("Can't save case index %s: %s", path, exc)
+
+
 class _CaseNode(object):
     """ Represents a node in a tree of cases. """
 
@@ -624,6 +810,29 @@ class _Reader(object):
         self._state = 'eof'
         return driver_info
 
+    def scan(self):
+        """ Return sequence of ``(offset, info)`` for all cases, where
+        `offset` may be passed to :meth:`read_at`. """
+        self._inp.seek(0)
+        self._next()  # Skip 'simulation_info'.
+        self._state = 'scan'
+
+        offset = self._inp.tell()
+        info = self._next()
+        while info:
+            if '_driver_id' in info:
+                yield offset, info
+            offset = self._inp.tell()
+            info = self._next()
+        self._state = 'eof'
+
+    def read_at(self, offset):
+        """ Return the dictionary of data at `offset`. """
+        self._state = 'seek'
+        self._info = None
+        self._inp.seek(offset)
+        return self._next()
+
     def cases(self):
         """ Return sequence of 'iteration_case' dictionaries. """
         if self._state != 'cases' or self._info is None:
@@ -663,6 +872,8 @@ class _JSONReader(_Reader):
         #return loads(data)
 
 def object_hook(dct, compile_re=True):
+    if "$ndarray" in dct:
+        return _decode_array(dct)
     if "$binary" in dct:
         if isinstance(dct["$type"], int):
             dct["$type"] = "%02x" % dct["$type"]
@@ -675,6 +886,27 @@ def object_hook(dct, compile_re=True):
         #return cPickle.loads(dct["$binary"].encode('utf-8'))
     return dct
 
+def _decode_array(dct):
+    """ Return the array encoded in `dct` by :func:`_encode_array`. """
+    data = dct['$ndarray']
+    if isinstance(data, unicode):  # base64 text from JSON.
+        data = b64decode(data)
+    return frombuffer(data, dtype=str(dct['dtype'])).reshape(dct['shape']).copy()
+
+
+def _decode_arrays(value):
+    """ Replace encoded arrays in BSON data `value` with arrays. """
+    if isinstance(value, dict):
+        if '$ndarray' in value:
+            return _decode_array(value)
+        for key, val in value.items():
+            value[key] = _decode_arrays(val)
+    elif isinstance(value, list):
+        for i, val in enumerate(value):
+            value[i] = _decode_arrays(val)
+    return value
+
+
 class _BSONReader(_Reader):
     """ Reads a :class:`BSONCaseRecorder` file. """
 
@@ -687,7 +919,7 @@ class _BSONReader(_Reader):
         if not data:
             return None
         reclen = unpack('<L', data)[0]
-        return bson.loads(self._inp.read(reclen))
+        return _decode_arrays(bson.loads(self._inp.read(reclen)))
 
 
 class _JSONWriter(object):
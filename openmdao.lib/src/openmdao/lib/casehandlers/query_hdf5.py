@@ -1,3 +1,4 @@
+import cPickle
 from weakref import ref
 
 import numpy as np
@@ -41,6 +42,10 @@ class CaseDatasetHDF5(object):
 
     """
 
+    _all_metadata_names = ['_id', '_parent_id', '_driver_id', '_driver_name',
+                           '_itername', 'error_status', 'error_message',
+                           'timestamp']
+
     def __init__(self, filename, format):
         format = format.lower()
         if format == 'hdf5':
@@ -51,8 +56,7 @@ class CaseDatasetHDF5(object):
         # TODO: Clean up some of the old _id variables that we do not use any more
         self._query_id = self._query_itername = self._parent_id = self._parent_itername = self._driver_id = self._driver_name = None
         self._case_ids = self._drivers = self._case_iternames = None
-        self.metadata_names = ['_id', '_parent_id', '_driver_id', '_driver_name', '_itername', 'error_status',
-                          'error_message', 'timestamp']
+        self.metadata_names = list(self._all_metadata_names)
 
     @property
     def data(self):
@@ -71,6 +75,8 @@ class CaseDatasetHDF5(object):
 
     def _fetch(self, query):
         """ Return data based on `query`. """
+        # Narrowed below to the names in `query`.
+        self.metadata_names = list(self._all_metadata_names)
         self._setup(query)
 
 
@@ -100,6 +106,17 @@ class CaseDatasetHDF5(object):
             # Returning single row, not list of rows.
             return names
 
+        if self._case_iternames is None and self._driver_name is not None \
+           and self._reader.is_columnar(self._driver_name):
+            driver_info = self._drivers[self._driver_name]
+            prefix = driver_info['prefix']
+            local = set([prefix+name for name in driver_info['recording']])
+            local.update(self.metadata_names)
+            if all([name in local for name in names]):
+                rows = self._fetch_columns(query, names)
+                if rows is not None:
+                    return rows
+
         nan = float('NaN')
         rows = ListResult()
         state = {}  # Retains last seen values.
@@ -178,6 +195,40 @@ class CaseDatasetHDF5(object):
         rows.cds = self
         return rows
 
+    def _fetch_columns(self, query, names):
+        """
+        Return data for `query` by reading whole columns of a driver recorded
+        with the columnar layout. Only valid if every name in `names` was
+        recorded by that driver, so no values are carried over from other
+        drivers' cases. Returns None if some of those cases are missing a
+        value, which has to be carried over case by case.
+        """
+        metadata = self._reader.metadata_table(self._driver_name)
+        var_names = [name for name in names if name not in self.metadata_names]
+        present = self._reader.present(self._driver_name, var_names)
+        if not all([flags.all() for flags in present.values()]):
+            return None
+
+        columns = self._reader.columns(self._driver_name, var_names)
+        for name in self.metadata_names:
+            if name in names:
+                columns[name] = metadata[name]
+
+        if query.transpose:
+            tmp = DictList(names)
+            for name in names:
+                tmp.append(list(columns[name]))
+            # Keep CDS as attribute for post-processing
+            tmp.cds = self
+            return tmp
+
+        rows = ListResult()
+        for i in range(len(metadata)):
+            rows.append(DictList(names, [columns[name][i] for name in names]))
+        # Keep CDS as attribute for post-processing
+        rows.cds = self
+        return rows
+
     def _write(self, query, out, format):
         raise NotImplementedError
 
@@ -493,21 +544,92 @@ class _HDF5Reader(object):
 
         return driver_info
 
+    def is_columnar(self, driver_name):
+        """ Return True if the cases of `driver_name` were recorded with the
+        columnar layout. """
+        return 'columns' in self._inp['/iteration_cases'][driver_name]
+
+    def metadata_table(self, driver_name):
+        """ Return the structured array of case metadata for the columnar
+        cases of `driver_name`. """
+        return self._inp['/iteration_cases'][driver_name]['metadata'][...]
+
+    def columns(self, driver_name, names=None, start=None, stop=None):
+        """
+        Return a dictionary of the values of `names` (default all) recorded
+        by `driver_name` for cases `start` to `stop`, one column per name.
+        Each column is read as a single slice of its dataset.
+        """
+        columns_grp = self._inp['/iteration_cases'][driver_name]['columns']
+        if names is None:
+            names = columns_grp.keys()
+
+        columns = {}
+        for name in names:
+            dset = columns_grp[name]
+            values = dset[start:stop]
+            if dset.attrs.get('pickled'):
+                # Cases without a value have an empty blob.
+                values = [cPickle.loads(blob.tostring()) if len(blob) else None
+                          for blob in values]
+            columns[name] = values
+        return columns
+
+    def present(self, driver_name, names=None, start=None, stop=None):
+        """
+        Return a dictionary of boolean arrays, one per name in `names`
+        (default all), that are True for the cases from `start` to `stop`
+        that recorded a value for that name.
+        """
+        driver_grp = self._inp['/iteration_cases'][driver_name]
+        if names is None:
+            names = driver_grp['columns'].keys()
+
+        nrows = len(driver_grp['metadata'][start:stop])
+        present = {}
+        for name in names:
+            if 'present' in driver_grp:
+                present[name] = driver_grp['present'][name][start:stop]
+            else:
+                present[name] = np.ones(nrows, dtype=bool)
+        return present
+
     def cases(self):
         """ Return sequence of 'iteration_case' dictionaries. """
 
         iteration_cases_grp = self._inp['/iteration_cases']
         case_timestamps = {}
+        case_order = []
+        columnar = {}
         for driver_name in iteration_cases_grp:
+            if self.is_columnar(driver_name):
+                metadata = self.metadata_table(driver_name)
+                columnar[driver_name] = (metadata, self.columns(driver_name),
+                                         self.present(driver_name))
+                for i, timestamp in enumerate(metadata['timestamp']):
+                    case_order.append((timestamp, driver_name, i))
+                continue
+
             for iteration_case_name in iteration_cases_grp[driver_name] :
                 if iteration_case_name.startswith('iteration_case_') :
                     timestamp = iteration_cases_grp[driver_name][iteration_case_name]['metadata']['timestamp'][0]
                     case_timestamps[timestamp] = ( driver_name, iteration_case_name )
 
-        sorted_timestamps = sorted( case_timestamps )
-        for timestamp in sorted_timestamps:
-            driver_name, iteration_case_name = case_timestamps[ timestamp ]
-            info = self.read_iteration_case_from_hdf5( self._inp, driver_name, iteration_case_name )
+        for timestamp, (driver_name, iteration_case_name) in case_timestamps.items():
+            case_order.append((timestamp, driver_name, iteration_case_name))
+        case_order.sort(key=lambda item: item[0])
+
+        for timestamp, driver_name, case in case_order:
+            if driver_name in columnar:
+                metadata, columns, present = columnar[driver_name]
+                info = {}
+                info['metadata'] = dict((name, metadata[name][case])
+                                        for name in metadata.dtype.names)
+                info['data'] = dict((name, values[case])
+                                    for name, values in columns.items()
+                                    if present[name][case])
+            else:
+                info = self.read_iteration_case_from_hdf5( self._inp, driver_name, case )
             yield info
 
 
@@ -97,11 +97,15 @@ Constants:
    driver.gradient_options.atol: 1e-09
    driver.gradient_options.derivative_direction: auto
    driver.gradient_options.directional_fd: False
+   driver.gradient_options.fd_coloring: False
    driver.gradient_options.fd_form: forward
+   driver.gradient_options.fd_sparsity: {}
    driver.gradient_options.fd_step: 1e-06
    driver.gradient_options.fd_step_type: absolute
+   driver.gradient_options.fd_workers: 0
    driver.gradient_options.force_fd: False
    driver.gradient_options.iprint: 0
+   driver.gradient_options.krylov_recycle: 0
    driver.gradient_options.lin_solver: scipy_gmres
    driver.gradient_options.maxiter: 100
    driver.gradient_options.rtol: 1e-09
@@ -134,11 +138,15 @@ Constants:
    nested.doublenest.driver.gradient_options.atol: 1e-09
    nested.doublenest.driver.gradient_options.derivative_direction: auto
    nested.doublenest.driver.gradient_options.directional_fd: False
+   nested.doublenest.driver.gradient_options.fd_coloring: False
    nested.doublenest.driver.gradient_options.fd_form: forward
+   nested.doublenest.driver.gradient_options.fd_sparsity: {}
    nested.doublenest.driver.gradient_options.fd_step: 1e-06
    nested.doublenest.driver.gradient_options.fd_step_type: absolute
+   nested.doublenest.driver.gradient_options.fd_workers: 0
    nested.doublenest.driver.gradient_options.force_fd: False
    nested.doublenest.driver.gradient_options.iprint: 0
+   nested.doublenest.driver.gradient_options.krylov_recycle: 0
    nested.doublenest.driver.gradient_options.lin_solver: scipy_gmres
    nested.doublenest.driver.gradient_options.maxiter: 100
    nested.doublenest.driver.gradient_options.rtol: 1e-09
@@ -152,11 +160,15 @@ Constants:
    nested.driver.gradient_options.atol: 1e-09
    nested.driver.gradient_options.derivative_direction: auto
    nested.driver.gradient_options.directional_fd: False
+   nested.driver.gradient_options.fd_coloring: False
    nested.driver.gradient_options.fd_form: forward
+   nested.driver.gradient_options.fd_sparsity: {}
    nested.driver.gradient_options.fd_step: 1e-06
    nested.driver.gradient_options.fd_step_type: absolute
+   nested.driver.gradient_options.fd_workers: 0
    nested.driver.gradient_options.force_fd: False
    nested.driver.gradient_options.iprint: 0
+   nested.driver.gradient_options.krylov_recycle: 0
    nested.driver.gradient_options.lin_solver: scipy_gmres
    nested.driver.gradient_options.maxiter: 100
    nested.driver.gradient_options.rtol: 1e-09
@@ -323,11 +335,15 @@ Constants:
    driver.gradient_options.atol: 1e-09
    driver.gradient_options.derivative_direction: auto
    driver.gradient_options.directional_fd: False
+   driver.gradient_options.fd_coloring: False
    driver.gradient_options.fd_form: forward
+   driver.gradient_options.fd_sparsity: {}
    driver.gradient_options.fd_step: 1e-06
    driver.gradient_options.fd_step_type: absolute
+   driver.gradient_options.fd_workers: 0
    driver.gradient_options.force_fd: False
    driver.gradient_options.iprint: 0
+   driver.gradient_options.krylov_recycle: 0
    driver.gradient_options.lin_solver: scipy_gmres
    driver.gradient_options.maxiter: 100
    driver.gradient_options.rtol: 1e-09
@@ -387,11 +403,15 @@ Constants:
    driver.gradient_options.atol: 1e-09
    driver.gradient_options.derivative_direction: auto
    driver.gradient_options.directional_fd: False
+   driver.gradient_options.fd_coloring: False
    driver.gradient_options.fd_form: forward
+   driver.gradient_options.fd_sparsity: {}
    driver.gradient_options.fd_step: 1e-06
    driver.gradient_options.fd_step_type: absolute
+   driver.gradient_options.fd_workers: 0
    driver.gradient_options.force_fd: False
    driver.gradient_options.iprint: 0
+   driver.gradient_options.krylov_recycle: 0
    driver.gradient_options.lin_solver: scipy_gmres
    driver.gradient_options.maxiter: 100
    driver.gradient_options.rtol: 1e-09
@@ -8,6 +8,9 @@ import StringIO
 import os
 import logging
 import shutil
+import sqlite3
+
+import numpy
 
 from openmdao.main.api import Assembly, Case, set_as_top
 from openmdao.test.execcomp import ExecComp
@@ -239,6 +242,53 @@ class DBCaseRecorderTestCase(unittest.TestCase):
             except OSError:
                 logging.error("problem removing directory %s", tmpdir)
 
+    def test_buffered(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dfile = os.path.join(tmpdir, 'junk.db')
+            recorder = DBCaseRecorder(dfile, buffer_size=4)
+            recorder.register(self, ['x', 'label'], ['y'])
+            for i in range(10):
+                x = numpy.arange(i, i+6, dtype=numpy.int32).reshape((2, 3))
+                recorder.record(self, [x, 'case%d' % i], [x * 0.5], None,
+                                '', '')
+
+            # Two full buffers written, two cases still buffered.
+            connection = sqlite3.connect(dfile)
+            count = connection.execute('select count(*) from cases')
+            self.assertEqual(count.fetchone()[0], 8)
+            mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+            self.assertEqual(mode, 'wal')
+            connection.close()
+
+            # Arrays are stored as raw data, not pickles.
+            recorder.close()
+            connection = sqlite3.connect(dfile)
+            plan = connection.execute("""EXPLAIN QUERY PLAN SELECT value
+                   from casevars WHERE name='y' AND case_id=3""").fetchall()
+            self.assertTrue('USING INDEX' in str(plan))
+            connection.close()
+            varinfo = case_db_to_dict(dfile, ['x', 'y', 'label'])
+            self.assertEqual(varinfo['label'],
+                             ['case%d' % i for i in range(10)])
+            for i in range(10):
+                x = varinfo['x'][i]
+                self.assertEqual(x.dtype, numpy.int32)
+                self.assertEqual(x.shape, (2, 3))
+                self.assertEqual(x[1, 2], i+5)
+                self.assertEqual(varinfo['y'][i][1, 2], (i+5) * 0.5)
+
+            count = 0
+            for case in DBCaseIterator(dfile):
+                self.assertTrue(numpy.all(case['y'] == case['x'] * 0.5))
+                count += 1
+            self.assertEqual(count, 10)
+        finally:
+            try:
+                shutil.rmtree(tmpdir, onerror=onerror)
+            except OSError:
+                logging.error("problem removing directory %s", tmpdir)
+
 
 class NestedCaseTestCase(unittest.TestCase):
 
@@ -84,11 +84,15 @@ Constants:
    driver.gradient_options.atol: 1e-09
    driver.gradient_options.derivative_direction: auto
    driver.gradient_options.directional_fd: False
+   driver.gradient_options.fd_coloring: False
    driver.gradient_options.fd_form: forward
+   driver.gradient_options.fd_sparsity: {}
    driver.gradient_options.fd_step: 1e-06
    driver.gradient_options.fd_step_type: absolute
+   driver.gradient_options.fd_workers: 0
    driver.gradient_options.force_fd: False
    driver.gradient_options.iprint: 0
+   driver.gradient_options.krylov_recycle: 0
    driver.gradient_options.lin_solver: scipy_gmres
    driver.gradient_options.maxiter: 100
    driver.gradient_options.rtol: 1e-09
@@ -207,11 +211,15 @@ Constants:
    driver.gradient_options.atol: 1e-09
    driver.gradient_options.derivative_direction: auto
    driver.gradient_options.directional_fd: False
+   driver.gradient_options.fd_coloring: False
    driver.gradient_options.fd_form: forward
+   driver.gradient_options.fd_sparsity: {}
    driver.gradient_options.fd_step: 1e-06
    driver.gradient_options.fd_step_type: absolute
+   driver.gradient_options.fd_workers: 0
    driver.gradient_options.force_fd: False
    driver.gradient_options.iprint: 0
+   driver.gradient_options.krylov_recycle: 0
    driver.gradient_options.lin_solver: scipy_gmres
    driver.gradient_options.maxiter: 100
    driver.gradient_options.rtol: 1e-09
@@ -11,9 +11,11 @@ import copy
 from struct import unpack
 from cStringIO import StringIO
 
+import numpy as np
+
 from openmdao.main import __version__
 from openmdao.main.api import Assembly, Component, Case, VariableTree, set_as_top
-from openmdao.main.datatypes.api import Array, Instance, List, VarTree
+from openmdao.main.datatypes.api import Array, Float, Instance, List, VarTree
 from openmdao.test.execcomp import ExecComp
 from openmdao.lib.casehandlers.api import JSONCaseRecorder, BSONCaseRecorder, verify_json, CaseDataset
 
@@ -43,6 +45,14 @@ class LoadsComp(Component):
     def execute(self):
         self.loads_out = self.loads_in
 
+class InPlaceComp(Component):
+    x = Float(iotype='in')
+    y = Array(np.zeros(3), iotype='out')
+
+    def execute(self):
+        self.y[:] = self.x * np.arange(3)  # Same array object every case.
+
+
 class ComplexClass:
     def __init__(self, realpart, imagpart):
         self.r = realpart
@@ -290,6 +300,37 @@ class TestCase(unittest.TestCase):
         cdsold.data.vars('sub.comp.loads_out').fetch()[0][0]['loads'][0]['Fx'] == cdsnew.data.vars('sub.comp.loads_out').fetch()[0][0]['loads'][0]['Fx']
         cdsold.data.vars('sub.comp.loads_out').fetch()[1][0]['loads'][0]['Fz'] == cdsnew.data.vars('sub.comp.loads_out').fetch()[1][0]['loads'][0]['Fz']
 
+    def test_background(self):
+        # Background writing and binary arrays must record the same data.
+        top = set_as_top(Assembly())
+        top.add('comp', InPlaceComp())
+        driver = top.add('driver', CaseIteratorDriver())
+        driver.workflow.add('comp')
+        driver.add_parameter('comp.x')
+        driver.add_response('comp.y')
+        driver.case_inputs.comp.x = [1., 2., 3., 4., 5.]
+
+        sync_file = os.path.join(self.tempdir, 'sync.json')
+        json_file = os.path.join(self.tempdir, 'background.json')
+        bson_file = os.path.join(self.tempdir, 'background.bson')
+        top.recorders = [JSONCaseRecorder(sync_file),
+                         JSONCaseRecorder(json_file, background=True,
+                                          queue_size=1, fsync_interval=0,
+                                          binary_arrays=True),
+                         BSONCaseRecorder(bson_file, background=True,
+                                          queue_size=1, binary_arrays=True)]
+        top.run()
+
+        expected = CaseDataset(sync_file, 'json').data.vars('comp.y').fetch()
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(list(expected[1][0]), [0., 2., 4.])
+        for filename, format in ((json_file, 'json'), (bson_file, 'bson')):
+            cases = CaseDataset(filename, format).data.vars('comp.y').fetch()
+            self.assertEqual(len(cases), len(expected))
+            for exp, act in zip(expected, cases):
+                self.assertTrue(isinstance(act[0], np.ndarray))
+                self.assertEqual(list(act[0]), list(exp[0]))
+
 
 if __name__ == '__main__':
     unittest.main()
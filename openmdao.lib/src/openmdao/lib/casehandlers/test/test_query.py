@@ -361,6 +361,40 @@ class TestCase(unittest.TestCase):
         self.assertEqual(len(reduced), 10)
         self.assertEqual(len(reduced[0]), 10)
 
+    def test_index(self):
+        # Indexed queries must return the same data as a full scan.
+        for filename, format in (('sellar.json', 'json'),
+                                 ('sellar.bson', 'bson')):
+            path = os.path.join(os.path.dirname(__file__), filename)
+            shutil.copy(path, filename)
+            scan = CaseDataset(filename, format)
+            indexed = CaseDataset(filename, format, index=True)
+            self.assertTrue(os.path.exists(filename+'.idx'))
+            reopened = CaseDataset(filename, format, index=True)
+
+            parent = scan.data.driver('driver').fetch()[1]['_id']
+            names = ['half.z2a', 'sub.globals.z1', 'sub.x1']
+            queries = (lambda cds: cds.data,
+                       lambda cds: cds.data.vars(names),
+                       lambda cds: cds.data.local().vars(names),
+                       lambda cds: cds.data.driver('sub.driver'),
+                       lambda cds: cds.data.parent_case(parent),
+                       lambda cds: cds.data.case(parent),
+                       lambda cds: cds.data.vars(names).by_variable())
+            for query in queries:
+                expected = query(scan).fetch()
+                for cds in (indexed, reopened):
+                    cases = query(cds).fetch()
+                    self.assertEqual(len(cases), len(expected))
+                    for exp, act in zip(expected, cases):
+                        np.testing.assert_equal(list(act), list(exp))
+
+            vars = indexed.data.vars(names).by_variable(arrays=True).fetch()
+            self.assertTrue(isinstance(vars['half.z2a'], np.ndarray))
+            self.assertEqual(vars['half.z2a'].shape, (242,))
+            assert_rel_error(self, vars['sub.globals.z1'][-1],
+                             1.9776387704500034, 0.001)
+
 
 if __name__ == '__main__':
     unittest.main()
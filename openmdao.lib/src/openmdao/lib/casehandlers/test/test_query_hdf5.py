@@ -255,6 +255,100 @@ class TestCase(unittest.TestCase):
 
 
 
+class ColumnarTestCase(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import h5py
+        except ImportError:
+            raise SkipTest("this test requires h5py")
+
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_query-')
+        os.chdir(self.tempdir)
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        if not os.environ.get('OPENMDAO_KEEPDIRS', False):
+            try:
+                shutil.rmtree(self.tempdir)
+            except OSError:
+                pass
+
+    def run_sellar(self, filename, **kwargs):
+        from openmdao.lib.casehandlers.api import CaseDatasetHDF5, HDF5CaseRecorder
+
+        prob = set_as_top(SellarMDF())
+        prob.recorders = [HDF5CaseRecorder(filename, **kwargs)]
+        prob.run()
+        return CaseDatasetHDF5(filename, 'hdf5')
+
+    def test_columnar(self):
+        groups = self.run_sellar('groups.hdf5')
+        columnar = self.run_sellar('columnar.hdf5', layout='columnar',
+                                   chunk_size=16, compression='gzip',
+                                   block_size=7)
+
+        self.assertEqual(columnar.data.var_names().fetch(),
+                         groups.data.var_names().fetch())
+
+        # Mixed drivers, read case by case.
+        names = ['half.z2a', 'sub.globals.z1', 'sub.x1', 'sub.dis1.y1']
+        expected = groups.data.vars(names).fetch()
+        cases = columnar.data.vars(names).fetch()
+        self.assertEqual(len(cases), len(expected))
+        for exp, act in zip(expected, cases):
+            for name in names:
+                if isnan(exp[name]):
+                    self.assertTrue(isnan(act[name]))
+                else:
+                    self.assertAlmostEqual(exp[name], act[name])
+
+        # Single driver, read by column.
+        names = ['sub.x1', 'half.z2a', '_itername']
+        expected = groups.data.driver('driver').vars(names).by_variable().fetch()
+        cases = columnar.data.driver('driver').vars(names).by_variable().fetch()
+        self.assertEqual(cases['_itername'], expected['_itername'])
+        for name in ('sub.x1', 'half.z2a'):
+            for exp, act in zip(expected[name], cases[name]):
+                self.assertAlmostEqual(exp, act)
+
+        cases = columnar.data.driver('driver').fetch()
+        self.assertEqual(len(cases), 10)
+        assert_rel_error(self, cases[0]['sub.states']['y'][0],
+                         24.80392945, 0.0001)
+
+    def test_columnar_missing(self):
+        import cPickle
+        import h5py
+        from openmdao.lib.casehandlers.hdf5case import _ColumnarCaseFile
+
+        cases = [{'a': 1.0}, {'a': 2.0, 'b': 'x'}, {'b': 'y', 'c': [1]},
+                 {'a': 4.0}, {'c': None}]
+
+        hdf5_file = h5py.File('missing.hdf5', 'w')
+        columnar = _ColumnarCaseFile(hdf5_file, chunk_size=4,
+                                     compression=None, block_size=2,
+                                     max_string_len=10)
+        for i, data in enumerate(cases):
+            columnar.append((0, 'driver', str(i), '', str(i+1), '', 0, 0.),
+                            data)
+        columnar.flush()
+
+        self.assertEqual(len(hdf5_file['metadata']), 5)
+        for name in ('a', 'b', 'c'):
+            self.assertEqual(list(hdf5_file['present'][name]),
+                             [name in data for data in cases])
+
+        a = hdf5_file['columns']['a'][...]
+        self.assertEqual(list(a[[0, 1, 3]]), [1.0, 2.0, 4.0])
+        self.assertTrue(isnan(a[2]) and isnan(a[4]))
+        self.assertEqual(list(hdf5_file['columns']['b'][1:3]), ['x', 'y'])
+        c = hdf5_file['columns']['c']
+        self.assertEqual(len(c[0]), 0)
+        self.assertEqual(cPickle.loads(c[2].tostring()), [1])
+        self.assertEqual(cPickle.loads(c[4].tostring()), None)
+        hdf5_file.close()
 
 
 if __name__ == '__main__':
@@ -6,12 +6,14 @@
 
 from copy import deepcopy
 
+from numpy import zeros
+
 from openmdao.main.api import Component
 from openmdao.main.datatypes.api import List, Bool, Dict, Float, Slot, Str, \
                                         VarTree
 from openmdao.main.datatypes.uncertaindist import UncertainDistVar
 from openmdao.main.interfaces import ISurrogate, ICaseRecorder, \
-                                     IUncertainVariable
+                                     IUncertainVariable, IIncrementalSurrogate
 from openmdao.main.mp_support import has_interface
 from openmdao.main.vartree import VariableTree
 from openmdao.util.typegroups import int_types, real_types
@@ -23,6 +25,10 @@ class MetaModel(Component):
     be provided in the params and responses variable trees.
 
     For a Float variable, the training data is an array of length m.
+
+    The training set is kept in contiguous arrays that grow as needed, and
+    the surrogates are trained with (m, n) array views of it, where m is the
+    number of training samples and n the number of params.
     """
 
     default_surrogate = Slot(ISurrogate, allow_none=True,
@@ -46,7 +52,9 @@ class MetaModel(Component):
                              "retrains with the new dataset whenever the "
                              "training data values are changed. When set to "
                              "True, the new data is appended to the old data "
-                             "and all of the data is used to train.")
+                             "and all of the data is used to train. "
+                             "Surrogates that support incremental training "
+                             "are updated with only the new data.")
 
     def __init__(self, params=None, responses=None):
         super(MetaModel, self).__init__()
@@ -64,24 +72,31 @@ class MetaModel(Component):
         # Inputs and Outputs created immediately.
 
         input_tree = self.get('params')
-        self._param_data = []
         for name in params:
             self.add(name, Float(0.0, iotype='in', desc='metamodel param'))
             input_tree.add(name, List([], desc='training param'))
 
         output_tree = self.get('responses')
-        self._response_data = {}
         for name in responses:
             self.add(name, Float(0.0, iotype='out', desc='metamodel response'))
             output_tree.add(name, List([], desc='training response'))
-            self._response_data[name] = []
             self.surrogates[name] = None
 
+        # Training data storage. Only the first _n_training rows are valid,
+        # the rest is spare capacity for warm restarts.
+        self._n_training = 0
+        self._training_inputs = zeros((0, len(params)))
+        self._training_outputs = dict((name, zeros(0)) for name in responses)
+
         self._surrogate_input_names = params
         self._surrogate_output_names = responses
 
         self._train = True
 
+        # surrogates that were trained on the current warm restart data set,
+        # keyed by output name, so they can be updated incrementally
+        self._trained_surrogates = {}
+
         # keeps track of which sur_<name> slots are full
         self._surrogate_overrides = set()
 
@@ -134,43 +149,57 @@ class MetaModel(Component):
         # Train first
         if self._train:
 
-            input_data = self._param_data
             if self.warm_restart is False:
-                input_data = []
-                base = 0
-            else:
-                base = len(input_data)
-
-            for name in self._surrogate_input_names:
+                self._n_training = 0
+                self._trained_surrogates = {}
+            base = self._n_training
+
+            train_names = ["params.%s" % name
+                           for name in self._surrogate_input_names] + \
+                          ["responses.%s" % name
+                           for name in self._surrogate_output_names]
+            num_sample = None
+            for train_name in train_names:
+                length = len(self.get(train_name))
+                if num_sample is None:
+                    num_sample = length
+                elif length != num_sample:
+                    self.raise_exception("Training data '%s' has %d samples,"
+                                         " but %d were expected." %
+                                         (train_name, length, num_sample),
+                                         ValueError)
+
+            size = base + num_sample
+            self._reserve_training_data(size)
+
+            for i, name in enumerate(self._surrogate_input_names):
                 train_name = "params.%s" % name
-                val = self.get(train_name)
-                num_sample = len(val)
-
-                for j in xrange(base, base + num_sample):
+                self._training_inputs[base:size, i] = self.get(train_name)
 
-                    if j > len(input_data) - 1:
-                        input_data.append([])
-                    input_data[j].append(val[j-base])
-
-            # Surrogate models take an (m, n) list of lists
-            # m = number of training samples
-            # n = number of inputs
-            #
-            # TODO - Why not numpy array instead?
+            self._n_training = size
+            input_data = self._training_inputs[:size]
+            new_input_data = self._training_inputs[base:size]
 
             for name in self._surrogate_output_names:
 
                 train_name = "responses.%s" % name
-                output_data = self._response_data[name]
+                outputs = self._training_outputs[name]
+                outputs[base:size] = self.get(train_name)
+                surrogate = self._get_surrogate(name)
 
-                if self.warm_restart is False:
-                    output_data = []
+                if surrogate is None:
+                    continue
 
-                output_data.extend(self.get(train_name))
-                surrogate = self._get_surrogate(name)
+                if self._trained_surrogates.get(name) is surrogate and \
+                   has_interface(surrogate, IIncrementalSurrogate):
+                    if num_sample > 0:
+                        surrogate.add_training_points(new_input_data,
+                                                      outputs[base:size])
+                else:
+                    surrogate.train(input_data, outputs[:size])
 
-                if surrogate is not None:
-                    surrogate.train(input_data, output_data)
+                if self.warm_restart:
+                    self._trained_surrogates[name] = surrogate
 
             self._train = False
 
@@ -186,6 +215,59 @@ class MetaModel(Component):
             if surrogate is not None:
                 setattr(self, name, surrogate.predict(inputs))
 
+    def predict_batch(self, X):
+        """Predicts all of the outputs for a whole set of points at once,
+        without changing the values of the inputs or outputs of this
+        component. The metamodel must already have been trained by running
+        it.
+
+        X: (n_points, n_params) array_like
+            Values of the params, in the order given at initialization,
+            at each point.
+
+        Returns a dict keyed by output name. Surrogates that support batch
+        prediction provide the result of their *predict_batch* method, and
+        the others a list of their *predict* results for each point.
+        """
+
+        if self._train:
+            self.raise_exception("MetaModel must be run to train its "
+                                 "surrogates before batch predictions can "
+                                 "be made.", RuntimeError)
+
+        results = {}
+        for name in self._surrogate_output_names:
+            surrogate = self._get_surrogate(name)
+            if surrogate is None:
+                continue
+            if hasattr(surrogate, 'predict_batch'):
+                results[name] = surrogate.predict_batch(X)
+            else:
+                results[name] = [surrogate.predict(x) for x in X]
+
+        return results
+
+    def _reserve_training_data(self, size):
+        """Grows the training data arrays, if necessary, so that they can
+        hold *size* samples. Capacity is at least doubled on each growth so
+        that repeated warm restarts only copy the data O(log n) times."""
+
+        capacity = self._training_inputs.shape[0]
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2*capacity)
+        n = self._n_training
+
+        inputs = zeros((capacity, self._training_inputs.shape[1]))
+        inputs[:n] = self._training_inputs[:n]
+        self._training_inputs = inputs
+
+        for name, outputs in self._training_outputs.items():
+            new_outputs = zeros(capacity)
+            new_outputs[:n] = outputs[:n]
+            self._training_outputs[name] = new_outputs
+
     def _get_surrogate(self, name):
         """Return the designated surrogate for the given output."""
 
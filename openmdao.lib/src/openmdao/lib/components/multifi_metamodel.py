@@ -43,6 +43,7 @@ class MultiFiMetaModel(MetaModel):
         
         if self.nfi > 1:
             self._param_data = [[] for i in np.arange(self.nfi)]
+            self._response_data = {}
             for name in responses:
                 self._response_data[name] = [[] for i in np.arange(self.nfi)]
             
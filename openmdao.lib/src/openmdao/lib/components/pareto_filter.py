@@ -1,12 +1,163 @@
 """ Pareto Filter -- finds non-dominated cases. """
 
 # pylint: disable-msg=E0611,F0401
-from numpy import array, zeros
+from numpy import array, zeros, empty, arange, clip, concatenate, isnan, \
+                  inf, lexsort, ones, sort
 
-from openmdao.main.datatypes.api import Array, List, VarTree
+from openmdao.main.datatypes.api import Array, Bool, List, VarTree
 from openmdao.main.api import Component
 from openmdao.main.vartree import VariableTree
 
+# Maximum number of point pairs compared in a single vectorized operation.
+_MAX_PAIRS = 2**20
+
+# Number of candidate points (in sorted order) filtered at once.
+_BLOCK_SIZE = 1024
+
+
+def _as_float_array(values, n_points):
+    """Returns values as an (n_points, n) float array, with missing (None)
+    entries replaced by infinity. The caller's array is not modified."""
+    values = array(values, dtype=float).reshape(n_points, -1)
+    values[isnan(values)] = inf
+    return values
+
+
+def _dominates(obj1, viol1, obj2, viol2, strict=False):
+    """Returns a boolean matrix, True where point i of the first set
+    dominates point j of the second set.
+
+    A point with smaller constraint violations (in the Pareto sense) always
+    dominates. If the violations are equal, the objectives are compared.
+    """
+    o1 = obj1[:, None, :]
+    o2 = obj2[None, :, :]
+    if strict:
+        dom = (o1 < o2).all(2)
+    else:
+        dom = (o1 <= o2).all(2) & (o1 < o2).any(2)
+
+    if viol1.shape[1] > 0:
+        v1 = viol1[:, None, :]
+        v2 = viol2[None, :, :]
+        vdom = (v1 <= v2).all(2) & (v1 < v2).any(2)
+        dom = vdom | ((v1 == v2).all(2) & dom)
+
+    return dom
+
+
+def _dominated_by_any(obj1, viol1, obj2, viol2, strict=False):
+    """Returns a boolean array, True for each point of the second set that
+    is dominated by at least one point of the first set."""
+    result = zeros(len(obj2), dtype=bool)
+    if len(obj1) == 0:
+        return result
+
+    step = max(1, _MAX_PAIRS // len(obj1))
+    for i in xrange(0, len(obj2), step):
+        result[i:i+step] = _dominates(obj1, viol1, obj2[i:i+step],
+                                      viol2[i:i+step], strict).any(0)
+    return result
+
+
+def _first_front(objectives, violations):
+    """Returns the sorted indices of the non-dominated points.
+
+    Points are visited in lexicographic order of (violations, objectives),
+    so a point can only be dominated by points visited before it. Each block
+    of points is filtered against the front found so far and then against
+    itself, which needs O(n*f) comparisons for a front of size f.
+    """
+    keys = concatenate((violations, objectives), 1)
+    order = lexsort(keys.T[::-1])
+
+    front = []
+    front_obj = objectives[:0]
+    front_viol = violations[:0]
+    for start in xrange(0, len(order), _BLOCK_SIZE):
+        idx = order[start:start+_BLOCK_SIZE]
+        obj, viol = objectives[idx], violations[idx]
+
+        keep = ~_dominated_by_any(front_obj, front_viol, obj, viol)
+        idx, obj, viol = idx[keep], obj[keep], viol[keep]
+
+        keep = ~_dominates(obj, viol, obj, viol).any(0)
+        idx, obj, viol = idx[keep], obj[keep], viol[keep]
+
+        front.append(idx)
+        front_obj = concatenate((front_obj, obj))
+        front_viol = concatenate((front_viol, viol))
+
+    return sort(concatenate(front)) if front else array([], dtype=int)
+
+
+def nondominated_sort(objectives, constraints=None, first_front_only=False):
+    """Sorts points into non-dominated fronts, assuming all objectives are
+    minimized.
+
+    objectives: (n_points, n_objectives) array_like
+        Objective values of each point. None is treated as the worst value.
+
+    constraints: (n_points, n_constraints) array_like (optional)
+        Constraint values of each point, where <= 0 means satisfied. A
+        point satisfying all constraints dominates any point that doesn't,
+        and a point with smaller violations dominates one with larger
+        violations regardless of the objective values.
+
+    first_front_only: bool
+        If True, only the first front is found, and every dominated point
+        is given rank 1.
+
+    Returns an integer array with the front rank of each point, where 0 is
+    the Pareto frontier.
+    """
+    n_points = len(objectives)
+    objectives = _as_float_array(objectives, n_points)
+    if constraints is None:
+        violations = zeros((n_points, 0))
+    else:
+        violations = clip(_as_float_array(constraints, n_points), 0., inf)
+
+    ranks = empty(n_points, dtype=int)
+    remaining = arange(n_points)
+    rank = 0
+    while len(remaining) > 0:
+        front = _first_front(objectives[remaining], violations[remaining])
+        ranks[remaining[front]] = rank
+
+        mask = ones(len(remaining), dtype=bool)
+        mask[front] = False
+        remaining = remaining[mask]
+
+        if first_front_only:
+            ranks[remaining] = 1
+            break
+        rank += 1
+
+    return ranks
+
+
+def is_dominated(points, reference, strict=False):
+    """Returns a boolean array, True for each of the points that is dominated
+    by at least one of the reference points, assuming all objectives are
+    minimized.
+
+    points: (n_points, n_objectives) array_like
+        Points to test.
+
+    reference: (n_reference, n_objectives) array_like
+        Points to test against, e.g., a Pareto frontier.
+
+    strict: bool
+        If True, domination requires every objective to be strictly smaller.
+    """
+    points = _as_float_array(points, len(points))
+    reference = _as_float_array(reference, len(reference))
+    none = zeros((0, 0))
+    return _dominated_by_any(reference, none.reshape(len(reference), 0),
+                             points, none.reshape(len(points), 0), strict)
+
+
 class ParetoFilter(Component):
     """Takes a set of cases and filters out the subset of cases which are
     pareto optimal. Assumes that smaller values for model responses are
@@ -40,6 +191,14 @@ class ParetoFilter(Component):
     pareto_outcons = Array(
         iotype='out', desc='Array of constraints values in the Pareto frontier')
 
+    compute_ranks = Bool(False, iotype='in', desc='Set to True to sort all '
+                         'cases into non-dominated fronts and output their '
+                         'ranks, rather than only finding the Pareto frontier.')
+
+    ranks = Array(iotype='out', dtype=int, desc='Front rank of each case, where '
+                  '0 is the Pareto frontier. If compute_ranks is False, all '
+                  'dominated cases have rank 1.')
+
     def __init__(self, params=None, responses=None, constraints=None):
         super(ParetoFilter, self).__init__()
 
@@ -92,145 +251,37 @@ class ParetoFilter(Component):
         self.pareto_outputs = zeros((1, len(responses)))
         self.pareto_outcons = zeros((1, len(constraints)))
 
-    def _is_dominated(self, y1, y2):
-        """Tests to see if the point y1 is dominated by the point y2.
-        True if y1 is dominated by y2, False otherwise.
-        """
-        if y1 == y2:
-            return False
-        for a, b in zip(y1, y2):
-            if a is None:
-                return True
-            if b is None:
-                return False
-            if a < b:
-                return False
-
-        return True
-
-    def _is_constrained(self, c1, c2):
-        """ Tests to see if the point c1 is more or less constrained than
-        the point c2.
-        Constrained means value <= 0.0
-        return:
-            isLessConstrained,
-                True if some constraint values are more than c2
-                while the other same, False Otherwise
-            NeedCompareDominating
-                True if need furthermore comparison of dominating
-                False otherwise
-        """
-        c1 = array(c1)
-        c2 = array(c2)
-        b1 = (c1 <= 0).all()
-        b2 = (c2 <= 0).all()
-
-        if b1 and b2:
-            return False, True
-        if b1 and not b2:
-            return False, False
-        if not b1 and b2:
-            return True, False
-        if not b2 and not b1:
-            c1[c1<=0] = 0
-            c2[c2<=0] = 0
-            if (c1 == c2).all():
-                return False, True
-
-            if (c1 >= c2).all():
-                return True, False
-            else:
-                return False, False
-
     def execute(self):
         """Returns an araray of pareto optimal points and their response values.
         """
 
         first_name = "responses.%s" % self._response_names[0]
-        n_param = len(self._param_names)
-        n_response = len(self._response_names)
-        n_constraint = len(self._constraint_names)
         n_points = len(self.get(first_name))
 
-        # Get our output data once, then rearrange it after.
-        data = []
-        for varname in self._response_names:
-            name = "responses.%s" % varname
-            val = self.get(name)
-            data.append(val)
-
-        all_points = []
-        for j in xrange(0, n_points):
-            point = []
-            for i in xrange(0, n_response):
-                point.append(data[i][j])
-            all_points.append(point)
-
-        nondominated_output = list(all_points)
-
-        # Optionally, get our inputs data once, then rearrange it after.
-        if n_param > 0:
-
-            data = []
-            for varname in self._param_names:
-                name = "params.%s" % varname
-                val = self.get(name)
-                data.append(val)
-
-            nondominated_input = []
-            for j in xrange(0, n_points):
-                point = []
-                for i in xrange(0, n_param):
-                    point.append(data[i][j])
-                nondominated_input.append(point)
-
-        # Optionally, get our constraint data once, then rearrange it after.
-        if n_constraint > 0:
-
-            data = []
-            for varname in self._constraint_names:
-                name = "constraints.%s" % varname
-                val = self.get(name)
-                data.append(val)
-
-            all_cons = []
-            for j in xrange(0, n_points):
-                point = []
-                for i in xrange(0, n_constraint):
-                    point.append(data[i][j])
-                all_cons.append(point)
-            nondominated_constraint = list(all_cons)
-
-
-            # Find non-dominated points with constraint filtering
-            nd_input_list = []
-            for j, (point1, cons1) in enumerate(zip(all_points, all_cons)):
-                for point2, cons2 in zip(nondominated_output,
-                                  nondominated_constraint):
-                    is_less_cons, need_comp = self._is_constrained(cons1, cons2)
-                    if is_less_cons or \
-                       (need_comp and self._is_dominated(point1, point2)):
-                        nondominated_output.remove(point1)
-                        nondominated_constraint.remove(cons1)
-                        nd_input_list.append(j)
-                        break
+        # Get our data once, with one row per case.
+        outputs = self._get_data('responses', self._response_names, n_points)
+
+        if self._constraint_names:
+            constraints = self._get_data('constraints',
+                                         self._constraint_names, n_points)
         else:
-            # Find non-dominated points directly
-            nd_input_list = []
-            for j, point1 in enumerate(all_points):
-                for point2 in nondominated_output:
-                    if self._is_dominated(point1, point2):
-                        nondominated_output.remove(point1)
-                        nd_input_list.append(j)
-                        break
+            constraints = None
+
+        self.ranks = nondominated_sort(outputs, constraints,
+                                       not self.compute_ranks)
+        front = self.ranks == 0
 
-        self.pareto_outputs = array(nondominated_output)
+        self.pareto_outputs = outputs[front]
 
-        if n_param > 0:
-            data = [nondominated_input[j] for j in xrange(0, n_points) \
-                    if j not in nd_input_list]
-            self.pareto_inputs = array(data)
-        if n_constraint > 0:
-            self.pareto_outcons = array(nondominated_constraint)
+        if self._param_names:
+            inputs = self._get_data('params', self._param_names, n_points)
+            self.pareto_inputs = inputs[front]
 
+        if constraints is not None:
+            self.pareto_outcons = constraints[front]
 
+    def _get_data(self, tree, names, n_points):
+        """Returns an (n_points, len(names)) array of the data in the given
+        vartree."""
+        data = [self.get("%s.%s" % (tree, name)) for name in names]
+        return array(data).reshape(len(names), n_points).T
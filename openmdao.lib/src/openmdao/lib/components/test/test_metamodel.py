@@ -118,6 +118,126 @@ class MetaModelTestCase(unittest.TestCase):
         assert_rel_error(self, model.meta.y1, 2.0, .00001)
         assert_rel_error(self, model.meta.y2, 4.0, .00001)
 
+    def test_warm_start_incremental(self):
+
+        model = set_as_top(Assembly())
+        model.add('meta', MetaModel(params=('x1', 'x2'),
+                                    responses=('y1',)))
+        model.driver.workflow.add('meta')
+        model.meta.default_surrogate = KrigingSurrogate()
+        model.meta.warm_restart = True
+
+        model.meta.params.x1 = [1.0, 3.0, 1.5, 4.0]
+        model.meta.params.x2 = [1.0, 4.0, 2.5, 0.5]
+        model.meta.responses.y1 = [3.0, 1.0, 2.0, 2.5]
+        model.meta.run()
+
+        surrogate = model.meta._get_surrogate('y1')
+        self.assertEqual(surrogate.n, 4)
+        thetas = surrogate.thetas.copy()
+
+        # New points are added to the trained surrogate instead of
+        # retraining it from scratch.
+        model.meta.params.x1 = [2.0]
+        model.meta.params.x2 = [3.0]
+        model.meta.responses.y1 = [2.0]
+        model.meta.x1 = 2.0
+        model.meta.x2 = 3.0
+        model.meta.run()
+
+        self.assertTrue(model.meta._get_surrogate('y1') is surrogate)
+        self.assertEqual(surrogate.n, 5)
+        self.assertEqual(surrogate._n_updates, 1)
+        self.assertTrue(all(surrogate.thetas == thetas))
+        assert_rel_error(self, model.meta.y1.mu, 2.0, .00001)
+
+    def test_training_data_storage(self):
+
+        model = set_as_top(Assembly())
+        model.add('meta', MetaModel(params=('x1', 'x2'),
+                                    responses=('y1',)))
+        model.driver.workflow.add('meta')
+        model.meta.default_surrogate = ResponseSurface()
+        model.meta.warm_restart = True
+
+        for i in range(5):
+            model.meta.params.x1 = [float(i), i + 0.5, i + 0.25]
+            model.meta.params.x2 = [1.0, 2.0, float(i)]
+            model.meta.responses.y1 = [1.0*i, 2.0*i, 3.0*i]
+            model.meta.run()
+
+        self.assertEqual(model.meta._n_training, 15)
+        self.assertTrue(model.meta._training_inputs.shape[0] >= 15)
+        X = model.meta._training_inputs[:15]
+        self.assertEqual(list(X[:, 0]),
+                         [float(i) + dx for i in range(5)
+                                       for dx in (0.0, 0.5, 0.25)])
+        self.assertEqual(list(model.meta._training_outputs['y1'][12:15]),
+                         [4.0, 8.0, 12.0])
+
+        # without warm restart the data is replaced
+        model.meta.warm_restart = False
+        model.meta.params.x1 = [1.0, 2.0]
+        model.meta.params.x2 = [1.0, 3.0]
+        model.meta.responses.y1 = [3.0, 2.0]
+        model.meta.run()
+        self.assertEqual(model.meta._n_training, 2)
+
+    def test_training_data_length_mismatch(self):
+
+        model = set_as_top(Assembly())
+        model.add('meta', MetaModel(params=('x1', 'x2'),
+                                    responses=('y1',)))
+        model.driver.workflow.add('meta')
+        model.meta.default_surrogate = ResponseSurface()
+
+        model.meta.params.x1 = [1.0, 2.0, 3.0]
+        model.meta.params.x2 = [1.0, 3.0]
+        model.meta.responses.y1 = [3.0, 2.0, 1.0]
+        try:
+            model.meta.run()
+        except ValueError as err:
+            self.assertEqual("meta: Training data 'params.x2' has 2 samples,"
+                             " but 3 were expected.", str(err))
+        else:
+            self.fail('ValueError expected')
+
+    def test_predict_batch(self):
+
+        model = set_as_top(Assembly())
+        model.add('meta', MetaModel(params=('x1', 'x2'),
+                                    responses=('y1', 'y2')))
+        model.driver.workflow.add('meta')
+
+        model.meta.params.x1 = [1.0, 2.0, 3.0, 1.5, 2.5, 0.5]
+        model.meta.params.x2 = [1.0, 3.0, 4.0, 2.0, 0.5, 3.5]
+        model.meta.responses.y1 = [3.0, 2.0, 1.0, 2.5, 4.0, 1.0]
+        model.meta.responses.y2 = [1.0, 4.0, 7.0, 2.0, 5.0, 3.0]
+
+        model.meta.default_surrogate = ResponseSurface()
+        model.meta.surrogates['y2'] = KrigingSurrogate()
+
+        try:
+            model.meta.predict_batch([[2.0, 3.0]])
+        except RuntimeError as err:
+            self.assertEqual("meta: MetaModel must be run to train its "
+                             "surrogates before batch predictions can be "
+                             "made.", str(err))
+        else:
+            self.fail('RuntimeError expected')
+
+        model.meta.run()
+
+        points = [[2.0, 3.0], [2.5, 3.5], [1.2, 0.7]]
+        results = model.meta.predict_batch(points)
+        y2_mu, y2_rmse = results['y2']
+        for i, (x1, x2) in enumerate(points):
+            model.meta.x1 = x1
+            model.meta.x2 = x2
+            model.meta.run()
+            assert_rel_error(self, results['y1'][i], model.meta.y1, 1e-8)
+            assert_rel_error(self, y2_mu[i], model.meta.y2.mu, 1e-8)
+
     def test_multi_surrogate_models_bad_surrogate_dict(self):
 
         model = set_as_top(Assembly())
@@ -1,6 +1,7 @@
 # pylint: disable-msg=C0111,C0103
 import unittest
 import mock
+import numpy as np
 
 # pylint: disable-msg=F0401,E0611
 from openmdao.main.api import Assembly, set_as_top
@@ -65,7 +66,9 @@ class MultiFiMetaModelTestCase(unittest.TestCase):
                 
         expected_xtrain=[ [0.0], [0.4], [1.0] ]
         expected_ytrain=[ 3.02720998, 0.11477697, 15.82973195 ]               
-        mock_surr.train.assert_called_with(expected_xtrain, expected_ytrain)        
+        xtrain, ytrain = mock_surr.train.call_args[0]
+        np.testing.assert_array_equal(xtrain, expected_xtrain)
+        np.testing.assert_array_equal(ytrain, expected_ytrain)
 
         model.meta.x = 0.5
         model.meta.run()
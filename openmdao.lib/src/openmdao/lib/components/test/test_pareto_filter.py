@@ -2,7 +2,10 @@
 
 import unittest
 
-from openmdao.lib.components.pareto_filter import ParetoFilter
+from numpy import array, isnan, nan
+
+from openmdao.lib.components.pareto_filter import ParetoFilter, \
+                                                 nondominated_sort, is_dominated
 
 
 class ParetoFilterTests(unittest.TestCase):
@@ -59,7 +62,44 @@ class ParetoFilterTests(unittest.TestCase):
         self.assertEqual(1, pf.pareto_outcons[0, 0])
         self.assertTrue(pf.pareto_outcons.shape == (1, 1))
 
+    def test_ranks(self):
+        pf = ParetoFilter(params=('xin',), responses=('x', 'y'))
+        pf.params.xin = [0, 1, 2, 3, 4, 5, 6]
+        pf.responses.x = [1, 2, 3, 2, 3, 4, 1]
+        pf.responses.y = [3, 2, 1, 3, 2, 4, 3]
+        pf.execute()
+
+        self.assertEqual(list(pf.ranks), [0, 0, 0, 1, 1, 1, 0])
+        self.assertEqual(list(pf.pareto_inputs[:, 0]), [0, 1, 2, 6])
+
+        pf.compute_ranks = True
+        pf.execute()
 
+        self.assertEqual(list(pf.ranks), [0, 0, 0, 1, 1, 2, 0])
+        self.assertEqual(list(pf.pareto_inputs[:, 0]), [0, 1, 2, 6])
+
+    def test_nondominated_sort(self):
+        objectives = [[1, 4], [2, 3], [3, 3], [2, 2], [4, 1], [5, 5]]
+        self.assertEqual(list(nondominated_sort(objectives)),
+                         [0, 1, 2, 0, 0, 3])
+
+        # feasible points first, then by smaller violation
+        constraints = [[1], [0], [0], [2], [-1], [1]]
+        self.assertEqual(list(nondominated_sort(objectives, constraints)),
+                         [2, 0, 1, 4, 0, 3])
+
+        # missing values are treated as infinite, without changing the input
+        objectives = array([[2., nan], [1., 1.]])
+        self.assertEqual(list(nondominated_sort(objectives)), [1, 0])
+        self.assertTrue(isnan(objectives[0, 1]))
+
+    def test_is_dominated(self):
+        front = [[1, 3], [2, 2], [3, 1]]
+        points = [[2, 3], [2, 2], [0, 5], [4, 4]]
+        self.assertEqual(list(is_dominated(points, front)),
+                         [True, False, False, True])
+        self.assertEqual(list(is_dominated(points, front, strict=True)),
+                         [False, False, False, True])
 
 
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ from vector  import Vector
 from zone    import Zone
 
 from metrics import get_metric, list_metrics
+from parallel import map_zones
 from probe   import mesh_probe
 from plot3d  import read_plot3d_q, read_plot3d_f, read_plot3d_grid, \
                     write_plot3d_q, write_plot3d_f, write_plot3d_grid, \
@@ -2,6 +2,8 @@ import copy
 
 from openmdao.util.log import NullLogger
 
+from openmdao.lib.datatypes.domain.parallel import map_zones
+
 
 class DomainObj(object):
     """
@@ -163,7 +165,7 @@ class DomainObj(object):
                 return False
         return True
 
-    def extract(self, zone_args):
+    def extract(self, zone_args, workers=1):
         """
         Construct a new :class:`DomainObj` from grid and flow data extracted
         from the specified regions of each zone. Existing zone names are used
@@ -173,18 +175,21 @@ class DomainObj(object):
             Sequence of argument tuples to be used to extract data from each
             zone. If an argument tuple is empty or ``None`` then that zone
             is skipped.
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
+        indices = [i for i, args in enumerate(zone_args) if args]
+        zones = map_zones(lambda i: self.zones[i].extract(*zone_args[i]),
+                          indices, workers=workers)
         domain = DomainObj()
-        for i, args in enumerate(zone_args):
-            if args:
-                zone = self.zones[i]
-                name = self.zone_name(zone)
-                domain.add_zone(name, zone.extract(*args))
+        for i, zone in zip(indices, zones):
+            domain.add_zone(self.zone_name(self.zones[i]), zone)
         if self.reference_state is not None:
             domain.reference_state = self.reference_state.copy()
         return domain
 
-    def extend(self, zone_args):
+    def extend(self, zone_args, workers=1):
         """
         Construct a new :class:`DomainObj` from zones extended according to
         `zone_args`. Existing zone names are used for the new domain's zones.
@@ -193,34 +198,43 @@ class DomainObj(object):
             Sequence of argument tuples to be used to extend each zone.
             If an argument tuple is empty or ``None``, then that zone
             is skipped.
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
+        indices = [i for i, args in enumerate(zone_args) if args]
+        zones = map_zones(lambda i: self.zones[i].extend(*zone_args[i]),
+                          indices, workers=workers)
         domain = DomainObj()
-        for i, args in enumerate(zone_args):
-            if args:
-                zone = self.zones[i]
-                name = self.zone_name(zone)
-                domain.add_zone(name, zone.extend(*args))
+        for i, zone in zip(indices, zones):
+            domain.add_zone(self.zone_name(self.zones[i]), zone)
         return domain
 
-    def make_cartesian(self, axis='z'):
+    def make_cartesian(self, axis='z', workers=1):
         """
         Convert to Cartesian coordinate system.
 
         axis: string
             Specifies which is the cylinder axis ('z' or 'x').
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
-        for zone in self.zones:
-            zone.make_cartesian(axis)
+        map_zones(lambda zone: zone.make_cartesian(axis), self.zones,
+                  workers=workers)
 
-    def make_cylindrical(self, axis='z'):
+    def make_cylindrical(self, axis='z', workers=1):
         """
         Convert to cylindrical coordinate system.
 
         axis: string
             Specifies which is the cylinder axis ('z' or 'x').
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
-        for zone in self.zones:
-            zone.make_cylindrical(axis)
+        map_zones(lambda zone: zone.make_cylindrical(axis), self.zones,
+                  workers=workers)
 
     def make_left_handed(self):
         """ Convert to left-handed coordinate system. """
@@ -232,45 +246,57 @@ class DomainObj(object):
         for zone in self.zones:
             zone.make_right_handed()
 
-    def translate(self, delta_x, delta_y, delta_z):
+    def translate(self, delta_x, delta_y, delta_z, workers=1):
         """
         Translate coordinates.
 
         delta_x, delta_y, delta_z: float
             Amount of translation along the corresponding axis.
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
-        for zone in self.zones:
-            zone.translate(delta_x, delta_y, delta_z)
+        map_zones(lambda zone: zone.translate(delta_x, delta_y, delta_z),
+                  self.zones, workers=workers)
 
-    def rotate_about_x(self, deg):
+    def rotate_about_x(self, deg, workers=1):
         """
         Rotate about the X axis.
 
         deg: float (degrees)
             Amount of rotation.
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
-        for zone in self.zones:
-            zone.rotate_about_x(deg)
+        map_zones(lambda zone: zone.rotate_about_x(deg), self.zones,
+                  workers=workers)
 
-    def rotate_about_y(self, deg):
+    def rotate_about_y(self, deg, workers=1):
         """
         Rotate about the Y axis.
 
         deg: float (degrees)
             Amount of rotation.
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
-        for zone in self.zones:
-            zone.rotate_about_y(deg)
+        map_zones(lambda zone: zone.rotate_about_y(deg), self.zones,
+                  workers=workers)
 
-    def rotate_about_z(self, deg):
+    def rotate_about_z(self, deg, workers=1):
         """
         Rotate about the Z axis.
 
         deg: float (degrees)
             Amount of rotation.
+
+        workers: int
+            Maximum number of zones to process concurrently.
         """
-        for zone in self.zones:
-            zone.rotate_about_z(deg)
+        map_zones(lambda zone: zone.rotate_about_z(deg), self.zones,
+                  workers=workers)
 
     def promote(self):
         """ Promote from N-dimensional to N+1 dimensional index space. """
@@ -1,9 +1,9 @@
 import copy
-from math import atan2, cos, hypot, sin
 
 import numpy
 
-from openmdao.lib.datatypes.domain.vector import Vector
+from openmdao.lib.datatypes.domain.vector import Vector, _from_polar, \
+                                                _to_polar
 
 class GridCoordinates(Vector):
     """
@@ -149,8 +149,8 @@ class GridCoordinates(Vector):
     def extract(self, imin, imax, jmin=None, jmax=None, kmin=None, kmax=None,
                 ghosts=None):
         """
-        Construct a new :class:`GridCoordinates` from data extracted from the
-        specified region.
+        Construct a new :class:`GridCoordinates` from a copy of the data in
+        the specified region.
 
         imin, imax, jmin, jmax, kmin, kmax: int
             Specifies the region to extract neglecting ghost/rind planes.
@@ -517,33 +517,14 @@ class GridCoordinates(Vector):
             Specifies which is the cylinder axis ('z' or 'x').
             Only used for 3D data.
         """
-        r_flat = self.r.flat
-        t_flat = self.t.flat
-
         if axis == 'z' or self.z is None:
-            self.x = self.r.copy()
-            self.y = self.r.copy()
-            x_flat = self.x.flat
-            y_flat = self.y.flat
-            for i in range(self.r.size):
-                r = r_flat[i]
-                t = t_flat[i]
-                x_flat[i] = r * cos(t)
-                y_flat[i] = r * sin(t)
+            self.x, self.y = _from_polar(self.r, self.t)
             self.r = None
             self.t = None
 
         elif axis == 'x':
             self.x = self.z
-            self.y = self.r.copy()
-            self.z = self.r.copy()
-            y_flat = self.y.flat
-            z_flat = self.z.flat
-            for i in range(self.r.size):
-                r = r_flat[i]
-                t = t_flat[i]
-                y_flat[i] = r * cos(t)
-                z_flat[i] = r * sin(t)
+            self.y, self.z = _from_polar(self.r, self.t)
             self.r = None
             self.t = None
 
@@ -558,30 +539,13 @@ class GridCoordinates(Vector):
             Specifies which is the cylinder axis ('z' or 'x').
             Only used for 3D data.
         """
-        self.r = self.x.copy()
-        self.t = self.x.copy()
-        r_flat = self.r.flat
-        t_flat = self.t.flat
-
         if axis == 'z' or self.z is None:
-            x_flat = self.x.flat
-            y_flat = self.y.flat
-            for i in range(self.x.size):
-                x = x_flat[i]
-                y = y_flat[i]
-                r_flat[i] = hypot(x, y)
-                t_flat[i] = atan2(y, x)
+            self.r, self.t = _to_polar(self.x, self.y)
             self.x = None
             self.y = None
 
         elif axis == 'x':
-            y_flat = self.y.flat
-            z_flat = self.z.flat
-            for i in range(self.y.size):
-                y = y_flat[i]
-                z = z_flat[i]
-                r_flat[i] = hypot(y, z)
-                t_flat[i] = atan2(z, y)
+            self.r, self.t = _to_polar(self.y, self.z)
             self.z = self.x
             self.x = None
             self.y = None
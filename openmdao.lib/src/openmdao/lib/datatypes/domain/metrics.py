@@ -10,7 +10,7 @@ be used with polar (2D) or cylindrical (3D) coordinates. :meth:`calculate`
 should be prepared for this.
 """
 
-from math import sqrt
+import numpy
 
 from openmdao.units.units import PhysicalQuantity
 
@@ -43,6 +43,11 @@ def register_metric(name, cls, integrate, geometry='any'):
         :meth:`dimensionalize` is called with the accumulated value.
         It should return a :class:`PhysicalQuantity` for the dimensionalized
         value.
+        The class may also provide :meth:`calculate_all`, called with
+        `(loc, geom)` where `loc` is a tuple of slices and `geom` holds
+        arrays of the corresponding shape. It should return an array of
+        values for the whole index range. Classes without it are evaluated
+        one item at a time via :meth:`calculate`.
 
     integrate: bool
         If True, then calculated values are integrated, not averaged.
@@ -65,6 +70,35 @@ def list_metrics():
     return sorted(_METRICS.keys())
 
 
+class _DoubleArray(object):
+    """
+    Wraps a (possibly single precision or memory-mapped) array so that
+    indexing returns double precision values.
+    """
+
+    def __init__(self, arr):
+        self._arr = arr
+
+    def __getitem__(self, index):
+        return self._arr[index].astype(numpy.float64, copy=False)
+
+
+def _double(arr):
+    """ Return `arr` wrapped by :class:`_DoubleArray`, or None. """
+    return None if arr is None else _DoubleArray(arr)
+
+
+class _ArrayMetric(object):
+    """
+    Base for the predefined metrics. :meth:`calculate_all` works equally
+    well for a single index tuple, so :meth:`calculate` just forwards to it.
+    """
+
+    def calculate(self, loc, geom):
+        """ Return metric value. """
+        return self.calculate_all(loc, geom)
+
+
 def create_scalar_metric(var_name):
     """
     Creates a minimal metric calculation class for `var_name` and registers it.
@@ -74,15 +108,15 @@ def create_scalar_metric(var_name):
     """
     cls_name = var_name.capitalize()
     exec '''
-class %(cls_name)s(object):
+class %(cls_name)s(_ArrayMetric):
     """ Computes %(var_name)s. """
 
     def __init__(self, zone, zone_name, reference_state):
-        self.%(var_name)s = zone.flow_solution.%(var_name)s.item
+        self.%(var_name)s = _double(zone.flow_solution.%(var_name)s)
 
-    def calculate(self, loc, length):
-        """ Return metric value. """
-        return self.%(var_name)s(*loc)
+    def calculate_all(self, loc, length):
+        """ Return metric values. """
+        return self.%(var_name)s[loc]
 
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
@@ -92,7 +126,7 @@ register_metric('%(var_name)s', %(cls_name)s, False, 'any')
 ''' % {'var_name': var_name, 'cls_name': cls_name}
 
 
-class Area(object):
+class Area(_ArrayMetric):
     """ Computes area of mesh surface. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -108,13 +142,13 @@ class Area(object):
             self.units = aref.get_unit_name()
             self.aref = aref.value
 
-    def calculate(self, loc, normal):
-        """ Return metric value. """
+    def calculate_all(self, loc, normal):
+        """ Return metric values. """
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
-        return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
+        return numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
@@ -123,7 +157,7 @@ class Area(object):
 register_metric('area', Area, True, 'surface')
 
 
-class Length(object):
+class Length(_ArrayMetric):
     """ Computes length of mesh curve. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -138,8 +172,8 @@ class Length(object):
             self.units = lref.get_unit_name()
             self.lref = lref.value
 
-    def calculate(self, loc, length):
-        """ Return metric value. """
+    def calculate_all(self, loc, length):
+        """ Return metric values. """
         return length * self.lref
 
     def dimensionalize(self, value):
@@ -149,7 +183,7 @@ class Length(object):
 register_metric('length', Length, True, 'curve')
 
 
-class MassFlow(object):
+class MassFlow(_ArrayMetric):
     """ Computes mass flow across a mesh surface. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -186,23 +220,23 @@ class MassFlow(object):
             self.momref = momref.value
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = _double(momentum.z)
+            self.mom_c2 = _double(momentum.r)
+            self.mom_c3 = _double(momentum.t)
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
-
-    def calculate(self, loc, normal):
-        """ Return metric value. """
-        rvu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref
-        rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
-        rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
+            self.mom_c1 = _double(momentum.x)
+            self.mom_c2 = _double(momentum.y)
+            self.mom_c3 = _double(momentum.z)
+
+    def calculate_all(self, loc, normal):
+        """ Return metric values. """
+        rvu = 0. if self.mom_c1 is None else self.mom_c1[loc] * self.momref
+        rvv = 0. if self.mom_c2 is None else self.mom_c2[loc] * self.momref
+        rvw = 0. if self.mom_c3 is None else self.mom_c3[loc] * self.momref
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         return rvu*sc1 + rvv*sc2 + rvw*sc3
 
     def dimensionalize(self, value):
@@ -212,7 +246,7 @@ class MassFlow(object):
 register_metric('mass_flow', MassFlow, True, 'surface')
 
 
-class CorrectedMassFlow(object):
+class CorrectedMassFlow(_ArrayMetric):
     """ Computes corrected mass flow across a mesh surface. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -222,15 +256,15 @@ class CorrectedMassFlow(object):
         # 'pressure' required until we can determine dimensionalized
         # static pressure from 'Q' variables.
         try:
-            self.density = flow.density.item
+            self.density = _double(flow.density)
             momentum = flow.momentum
-            self.pressure = flow.pressure.item
+            self.pressure = _double(flow.pressure)
         except AttributeError:
             vnames = ('density', 'momentum', 'pressure')
             raise AttributeError('For corrected_mass_flow, zone %s is missing'
                                  ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = _double(flow.gamma)
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -271,29 +305,29 @@ class CorrectedMassFlow(object):
         self.tstd = tstd.value
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = _double(momentum.z)
+            self.mom_c2 = _double(momentum.r)
+            self.mom_c3 = _double(momentum.t)
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
-
-    def calculate(self, loc, normal):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        rvu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref
-        rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
-        rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
-        ps = self.pressure(*loc) * self.pref
+            self.mom_c1 = _double(momentum.x)
+            self.mom_c2 = _double(momentum.y)
+            self.mom_c3 = _double(momentum.z)
+
+    def calculate_all(self, loc, normal):
+        """ Return metric values. """
+        rho = self.density[loc] * self.rhoref
+        rvu = 0. if self.mom_c1 is None else self.mom_c1[loc] * self.momref
+        rvv = 0. if self.mom_c2 is None else self.mom_c2[loc] * self.momref
+        rvw = 0. if self.mom_c3 is None else self.mom_c3[loc] * self.momref
+        ps = self.pressure[loc] * self.pref
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = self.gam[loc]
         else:
             gamma = self.gamma
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         w = rvu*sc1 + rvv*sc2 + rvw*sc3
 
         u2 = (rvu*rvu + rvv*rvv + rvw*rvw) / (rho*rho)
@@ -302,9 +336,9 @@ class CorrectedMassFlow(object):
         ts = ps / (rho * self.rgas)
         tt = ts * (1. + (gamma-1.)/2. * mach2)
 
-        pt = ps * pow(1. + (gamma-1.)/2. * mach2, gamma/(gamma-1.))
+        pt = ps * numpy.power(1. + (gamma-1.)/2. * mach2, gamma/(gamma-1.))
 
-        return w * sqrt(tt/self.tstd) / (pt/self.pstd)
+        return w * numpy.sqrt(tt/self.tstd) / (pt/self.pstd)
 
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
@@ -313,7 +347,7 @@ class CorrectedMassFlow(object):
 register_metric('corrected_mass_flow', CorrectedMassFlow, True, 'surface')
 
 
-class StaticPressure(object):
+class StaticPressure(_ArrayMetric):
     """ Computes weighted static pressure for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -321,20 +355,20 @@ class StaticPressure(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:  # Some codes have this directly available.
-            self.pressure = flow.pressure.item
+            self.pressure = _double(flow.pressure)
         except AttributeError:
             self.pressure = None
             try:  # Look for typical Q variables.
-                self.density = flow.density.item
+                self.density = _double(flow.density)
                 momentum = flow.momentum
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = _double(flow.energy_stagnation_density)
             except AttributeError:
                 vnames = ('pressure', 'density', 'momentum',
                           'energy_stagnation_density')
                 raise AttributeError('For pressure, zone %s is missing'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = _double(flow.gamma)
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -376,26 +410,26 @@ class StaticPressure(object):
 
         if self.pressure is None:
             if cylindrical:
-                self.mom_c1 = None if momentum.z is None else momentum.z.item
-                self.mom_c2 = momentum.r.item
-                self.mom_c3 = momentum.t.item
+                self.mom_c1 = _double(momentum.z)
+                self.mom_c2 = _double(momentum.r)
+                self.mom_c3 = _double(momentum.t)
             else:
-                self.mom_c1 = momentum.x.item
-                self.mom_c2 = None if momentum.y is None else momentum.y.item
-                self.mom_c3 = None if momentum.z is None else momentum.z.item
+                self.mom_c1 = _double(momentum.x)
+                self.mom_c2 = _double(momentum.y)
+                self.mom_c3 = _double(momentum.z)
 
-    def calculate(self, loc, geom):
-        """ Return metric value. """
+    def calculate_all(self, loc, geom):
+        """ Return metric values. """
         if self.pressure is not None:
-            return self.pressure(*loc) * self.pref
+            return self.pressure[loc] * self.pref
         else:
-            rho = self.density(*loc) * self.rhoref
-            vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-            vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-            vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
-            e0 = self.energy(*loc) * self.e0ref / rho
+            rho = self.density[loc] * self.rhoref
+            vu = 0. if self.mom_c1 is None else self.mom_c1[loc] * self.momref / rho
+            vv = 0. if self.mom_c2 is None else self.mom_c2[loc] * self.momref / rho
+            vw = 0. if self.mom_c3 is None else self.mom_c3[loc] * self.momref / rho
+            e0 = self.energy[loc] * self.e0ref / rho
             if self.gam is not None:
-                gamma = self.gam(*loc)
+                gamma = self.gam[loc]
             else:
                 gamma = self.gamma
 
@@ -408,7 +442,7 @@ class StaticPressure(object):
 register_metric('pressure', StaticPressure, False)
 
 
-class TotalPressure(object):
+class TotalPressure(_ArrayMetric):
     """ Computes weighted total pressure for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -416,24 +450,24 @@ class TotalPressure(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:
-            self.density = flow.density.item
+            self.density = _double(flow.density)
             momentum = flow.momentum
         except AttributeError:
             vnames = ('density', 'momentum')
             raise AttributeError('For pressure_stagnation, zone %s is missing'
                              ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.pressure = flow.pressure.item
+            self.pressure = _double(flow.pressure)
         except AttributeError:
             self.pressure = None
             try:
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = _double(flow.energy_stagnation_density)
             except AttributeError:
                 vnames = ('pressure', 'energy_stagnation_density')
                 raise AttributeError('For pressure_stagnation, zone %s is missing'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = _double(flow.gamma)
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -468,34 +502,34 @@ class TotalPressure(object):
             self.pref = pref.value
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = _double(momentum.z)
+            self.mom_c2 = _double(momentum.r)
+            self.mom_c3 = _double(momentum.t)
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
-
-    def calculate(self, loc, geom):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-        vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-        vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
+            self.mom_c1 = _double(momentum.x)
+            self.mom_c2 = _double(momentum.y)
+            self.mom_c3 = _double(momentum.z)
+
+    def calculate_all(self, loc, geom):
+        """ Return metric values. """
+        rho = self.density[loc] * self.rhoref
+        vu = 0. if self.mom_c1 is None else self.mom_c1[loc] * self.momref / rho
+        vv = 0. if self.mom_c2 is None else self.mom_c2[loc] * self.momref / rho
+        vw = 0. if self.mom_c3 is None else self.mom_c3[loc] * self.momref / rho
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = self.gam[loc]
         else:
             gamma = self.gamma
 
         u2 = vu*vu + vv*vv + vw*vw
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = self.pressure[loc] * self.pref
         else:
-            e0 = self.energy(*loc) * self.e0ref / rho
+            e0 = self.energy[loc] * self.e0ref / rho
             ps = (gamma-1.) * rho * (e0 - 0.5*u2)
         a2 = (gamma * ps) / rho
         mach2 = u2 / a2
-        return ps * pow(1. + (gamma-1.)/2. * mach2, gamma/(gamma-1.))
+        return ps * numpy.power(1. + (gamma-1.)/2. * mach2, gamma/(gamma-1.))
 
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
@@ -504,7 +538,7 @@ class TotalPressure(object):
 register_metric('pressure_stagnation', TotalPressure, False)
 
 
-class StaticTemperature(object):
+class StaticTemperature(_ArrayMetric):
     """ Computes weighted static temperature for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -512,23 +546,23 @@ class StaticTemperature(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:
-            self.density = flow.density.item
+            self.density = _double(flow.density)
         except AttributeError:
             raise AttributeError('For temperature, zone %s is missing'
                                  ' density.' % zone_name)
         try:
-            self.pressure = flow.pressure.item
+            self.pressure = _double(flow.pressure)
         except AttributeError:
             self.pressure = None
             try:  # Look for typical Q variables.
                 momentum = flow.momentum
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = _double(flow.energy_stagnation_density)
             except AttributeError:
                 vnames = ('pressure', 'momentum', 'energy_stagnation_density')
                 raise AttributeError('For temperature, zone %s is missing'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = _double(flow.gamma)
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -569,26 +603,26 @@ class StaticTemperature(object):
 
         if self.pressure is None:
             if cylindrical:
-                self.mom_c1 = None if momentum.z is None else momentum.z.item
-                self.mom_c2 = momentum.r.item
-                self.mom_c3 = momentum.t.item
+                self.mom_c1 = _double(momentum.z)
+                self.mom_c2 = _double(momentum.r)
+                self.mom_c3 = _double(momentum.t)
             else:
-                self.mom_c1 = momentum.x.item
-                self.mom_c2 = None if momentum.y is None else momentum.y.item
-                self.mom_c3 = None if momentum.z is None else momentum.z.item
+                self.mom_c1 = _double(momentum.x)
+                self.mom_c2 = _double(momentum.y)
+                self.mom_c3 = _double(momentum.z)
 
-    def calculate(self, loc, geom):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
+    def calculate_all(self, loc, geom):
+        """ Return metric values. """
+        rho = self.density[loc] * self.rhoref
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = self.pressure[loc] * self.pref
         else:
-            vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-            vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-            vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
-            e0 = self.energy(*loc) * self.e0ref / rho
+            vu = 0. if self.mom_c1 is None else self.mom_c1[loc] * self.momref / rho
+            vv = 0. if self.mom_c2 is None else self.mom_c2[loc] * self.momref / rho
+            vw = 0. if self.mom_c3 is None else self.mom_c3[loc] * self.momref / rho
+            e0 = self.energy[loc] * self.e0ref / rho
             if self.gam is not None:
-                gamma = self.gam(*loc)
+                gamma = self.gam[loc]
             else:
                 gamma = self.gamma
             ps = (gamma-1.) * rho * (e0 - 0.5*(vu*vu + vv*vv + vw*vw))
@@ -601,7 +635,7 @@ class StaticTemperature(object):
 register_metric('temperature', StaticTemperature, False)
 
 
-class TotalTemperature(object):
+class TotalTemperature(_ArrayMetric):
     """ Computes weighted total temperature for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -609,24 +643,24 @@ class TotalTemperature(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:
-            self.density = flow.density.item
+            self.density = _double(flow.density)
             momentum = flow.momentum
         except AttributeError:
             vnames = ('density', 'momentum')
             raise AttributeError('For temperature_stagnation, zone %s is missing'
                                  ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.pressure = flow.pressure.item
+            self.pressure = _double(flow.pressure)
         except AttributeError:
             self.pressure = None
             try:
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = _double(flow.energy_stagnation_density)
             except AttributeError:
                 vnames = ('pressure', 'energy_stagnation_density')
                 raise AttributeError('For temperature_stagnation, zone %s is'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = _double(flow.gamma)
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -662,30 +696,30 @@ class TotalTemperature(object):
             self.tref = tref
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = _double(momentum.z)
+            self.mom_c2 = _double(momentum.r)
+            self.mom_c3 = _double(momentum.t)
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
-
-    def calculate(self, loc, geom):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-        vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-        vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
+            self.mom_c1 = _double(momentum.x)
+            self.mom_c2 = _double(momentum.y)
+            self.mom_c3 = _double(momentum.z)
+
+    def calculate_all(self, loc, geom):
+        """ Return metric values. """
+        rho = self.density[loc] * self.rhoref
+        vu = 0. if self.mom_c1 is None else self.mom_c1[loc] * self.momref / rho
+        vv = 0. if self.mom_c2 is None else self.mom_c2[loc] * self.momref / rho
+        vw = 0. if self.mom_c3 is None else self.mom_c3[loc] * self.momref / rho
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = self.gam[loc]
         else:
             gamma = self.gamma
 
         u2 = vu*vu + vv*vv + vw*vw
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = self.pressure[loc] * self.pref
         else:
-            e0 = self.energy(*loc) * self.e0ref / rho
+            e0 = self.energy[loc] * self.e0ref / rho
             ps = (gamma-1.) * rho * (e0 - 0.5*u2)
         a2 = (gamma * ps) / rho
         mach2 = u2 / a2
@@ -699,7 +733,7 @@ class TotalTemperature(object):
 register_metric('temperature_stagnation', TotalTemperature, False)
 
 
-class Volume(object):
+class Volume(_ArrayMetric):
     """ Computes volume of mesh volume. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -715,8 +749,8 @@ class Volume(object):
             self.units = volref.get_unit_name()
             self.volref = volref.value
 
-    def calculate(self, loc, volume):
-        """ Return metric value. """
+    def calculate_all(self, loc, volume):
+        """ Return metric values. """
         return volume * self.volref
 
     def dimensionalize(self, value):
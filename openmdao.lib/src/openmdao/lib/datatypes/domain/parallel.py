@@ -0,0 +1,95 @@
+"""
+Support for processing the zones of a :class:`DomainObj` concurrently.
+The heavy array operations in :mod:`numpy` release the GIL, so threads
+are normally sufficient and allow zones to be updated in place.
+"""
+
+import os
+import sys
+import threading
+from multiprocessing import Pool, cpu_count, current_process
+from Queue import Queue, Empty
+
+# Set while a pool of forked processes is running map_zones().
+_PARALLEL_ZONES = None
+
+
+def map_zones(func, zones, args=(), workers=None, processes=False):
+    """
+    Returns ``[func(zone, *args) for zone in zones]``, with up to `workers`
+    zones processed concurrently.
+
+    func: callable
+        Called with each zone followed by `args`.
+
+    zones: list
+        Zones (or other objects) to be processed.
+
+    args: tuple
+        Additional arguments for `func`.
+
+    workers: int or None
+        Maximum number of concurrent workers. If None, the number of CPUs
+        is used. If less than 2, the zones are processed serially.
+
+    processes: bool
+        If True, use forked worker processes rather than threads, for work
+        that does not release the GIL. Each process has its own copy of the
+        zones, so only the values returned by `func` are seen by the caller.
+        Threads are used where forking is not available.
+    """
+    if workers is None:
+        workers = cpu_count()
+    workers = min(workers, len(zones))
+    if workers < 2:
+        return [func(zone, *args) for zone in zones]
+
+    if processes and hasattr(os, 'fork') and not current_process().daemon:
+        # Workers are forked so that they inherit the zones, only the
+        # results need to be sent back.
+        global _PARALLEL_ZONES
+        _PARALLEL_ZONES = (func, zones, args)
+        try:
+            pool = Pool(workers)
+            try:
+                return pool.map(_run_zone, range(len(zones)), chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            _PARALLEL_ZONES = None
+
+    # Plain threads rather than a ThreadPool, whose shutdown polls
+    # every 0.1 seconds.
+    tasks = Queue()
+    for i in range(len(zones)):
+        tasks.put(i)
+    results = [None] * len(zones)
+    errors = []
+
+    def run():
+        while not errors:
+            try:
+                i = tasks.get_nowait()
+            except Empty:
+                return
+            try:
+                results[i] = func(zones[i], *args)
+            except Exception:
+                errors.append(sys.exc_info())
+
+    threads = [threading.Thread(target=run) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        exc_type, exc_value, exc_traceback = errors[0]
+        raise exc_type, exc_value, exc_traceback
+    return results
+
+
+def _run_zone(i):
+    """ Runs in a forked worker process. """
+    func, zones, args = _PARALLEL_ZONES
+    return func(zones[i], *args)
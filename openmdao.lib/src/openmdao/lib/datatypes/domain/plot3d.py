@@ -29,6 +29,16 @@ unformatted: bool
     If True, the data is surrounded by Fortran record length markers.
     Only meaningful if `binary`.
 
+lazy: bool
+    If True, coordinate and variable arrays are copy-on-write
+    :class:`numpy.memmap` views of the file rather than in-memory copies.
+    Data is only read when first touched, so very large files may be
+    processed a zone at a time.  Only meaningful if `binary`.
+
+workers: int
+    When writing binary data, the maximum number of zones to write
+    concurrently.  Each zone's position in the file is computed up front.
+
 logger: Logger or None
     Used to record progress.
 
@@ -43,13 +53,15 @@ from openmdao.util.log import NullLogger
 from openmdao.util.stream import Stream
 
 from openmdao.lib.datatypes.domain.domain import DomainObj
+from openmdao.lib.datatypes.domain.parallel import map_zones
 from openmdao.lib.datatypes.domain.zone import Zone
 from openmdao.lib.datatypes.domain.vector import Vector
 
 
 def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                   planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  lazy=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `q_file`.  Q variables are assigned to 'density', 'momentum', and
@@ -66,7 +78,7 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, lazy)
 
     mode = 'rb' if binary else 'r'
     with open(q_file, mode) as inp:
@@ -116,14 +128,15 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
             name = domain.zone_name(zone)
             logger.debug('reading data for %s', name)
             _read_plot3d_qscalars(zone, stream, logger)
-            _read_plot3d_qvars(zone, stream, planes, logger)
+            _read_plot3d_qvars(zone, stream, planes, logger, lazy)
 
     return domain
 
 
 def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                   blanking=False, planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  lazy=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `f_file`.  Variables are assigned to names of the form `f_N`.
@@ -138,7 +151,7 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, lazy)
 
     mode = 'rb' if binary else 'r'
     with open(f_file, mode) as inp:
@@ -189,13 +202,14 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
             name = domain.zone_name(zone)
             logger.debug('reading data for %s', name)
             _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes,
-                               logger)
+                               logger, lazy)
     return domain
 
 
 def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
                      planes=False, binary=True, big_endian=False,
-                     single_precision=True, unformatted=True, logger=None):
+                     single_precision=True, unformatted=True, logger=None,
+                     lazy=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file`.
 
@@ -220,7 +234,7 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
             name = domain.zone_name(zone)
             logger.debug('reading coordinates for %s', name)
             _read_plot3d_coords(zone, stream, shape[i], blanking, planes,
-                                logger)
+                                logger, lazy)
     return domain
 
 
@@ -311,7 +325,7 @@ def _read_plot3d_dims(stream, dim, f_file=False):
         return (imax, jmax, kmax)
 
 
-def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
+def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger, lazy):
     """ Reads coordinates (& blanking) from given Plot3D stream. """
     if blanking:
         raise NotImplementedError('blanking not supported yet')
@@ -332,18 +346,10 @@ def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
             logger.warning('unexpected coords recordlength'
                            ' %d vs. %d', reclen, expected)
 
-    zone.grid_coordinates.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    x min %g, max %g',
-                 zone.grid_coordinates.x.min(), zone.grid_coordinates.x.max())
-
-    zone.grid_coordinates.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    y min %g, max %g',
-                 zone.grid_coordinates.y.min(), zone.grid_coordinates.y.max())
-
+    zone.grid_coordinates.x = _read_array(stream, shape, 'x', lazy, logger)
+    zone.grid_coordinates.y = _read_array(stream, shape, 'y', lazy, logger)
     if dim > 2:
-        zone.grid_coordinates.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    z min %g, max %g',
-                     zone.grid_coordinates.z.min(), zone.grid_coordinates.z.max())
+        zone.grid_coordinates.z = _read_array(stream, shape, 'z', lazy, logger)
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -363,7 +369,7 @@ def _read_plot3d_qscalars(zone, stream, logger):
     zone.flow_solution.time = time
 
 
-def _read_plot3d_qvars(zone, stream, planes, logger):
+def _read_plot3d_qvars(zone, stream, planes, logger, lazy):
     """ Reads 'density', 'momentum' and 'energy_stagnation_density'. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -384,27 +390,18 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
             logger.warning('unexpected Q variables recordlength'
                            ' %d vs. %d', reclen, expected)
     name = 'density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_array(stream, shape, name, lazy, logger)
     zone.flow_solution.add_array(name, arr)
 
     vec = Vector()
-
-    vec.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.x min %g, max %g', vec.x.min(), vec.x.max())
-
-    vec.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.y min %g, max %g', vec.y.min(), vec.y.max())
-
+    vec.x = _read_array(stream, shape, 'momentum.x', lazy, logger)
+    vec.y = _read_array(stream, shape, 'momentum.y', lazy, logger)
     if dim > 2:
-        vec.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    momentum.z min %g, max %g', vec.z.min(), vec.z.max())
-
+        vec.z = _read_array(stream, shape, 'momentum.z', lazy, logger)
     zone.flow_solution.add_vector('momentum', vec)
 
     name = 'energy_stagnation_density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_array(stream, shape, name, lazy, logger)
     zone.flow_solution.add_array(name, arr)
 
     if stream.unformatted:
@@ -414,7 +411,8 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
-def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
+def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger,
+                       lazy):
     """ Reads 'function' variables. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -439,9 +437,8 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
             name = varnames[i]
         else:
             name = 'f_%d' % (i+1)
-        arr = stream.read_floats(shape, order='Fortran')
+        arr = _read_array(stream, shape, name, lazy, logger)
         zone.flow_solution.add_array(name, arr)
-        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -450,9 +447,31 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
+def _read_array(stream, shape, name, lazy, logger):
+    """
+    Returns float data of `shape` in Fortran order from Plot3D `stream`.
+    If `lazy` and the stream is binary, the returned array is a copy-on-write
+    :class:`numpy.memmap` of the file and the stream is positioned after it.
+    """
+    if not (lazy and stream.binary):
+        arr = stream.read_floats(shape, order='Fortran')
+        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+        return arr
+
+    dtype = numpy.dtype(numpy.float32 if stream.single_precision
+                                      else numpy.float64)
+    dtype = dtype.newbyteorder('>' if stream.big_endian else '<')
+    offset = stream.file.tell()
+    arr = numpy.memmap(stream.file.name, dtype=dtype, mode='c', offset=offset,
+                       shape=shape, order='F')
+    stream.file.seek(offset + arr.nbytes)
+    logger.debug('    %s mapped at offset %d', name, offset)
+    return arr
+
+
 def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                    big_endian=False, single_precision=True, unformatted=True,
-                   logger=None):
+                   logger=None, workers=1):
     """
     Writes `domain` to `grid_file` and `q_file` in Plot3D format.
     Requires 'density', 'momentum', and 'energy_stagnation_density' variables
@@ -496,7 +515,7 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                                  % (name, missing))
     # Write grid file.
     write_plot3d_grid(domain, grid_file, planes, binary, big_endian,
-                      single_precision, unformatted, logger)
+                      single_precision, unformatted, logger, workers)
     # Write Q file.
     mode = 'wb' if binary else 'w'
     with open(q_file, mode) as out:
@@ -512,7 +531,7 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
 
         # Write zone scalars and variables.
         varnames = ('density', 'momentum', 'energy_stagnation_density')
-        for zone in zones:
+        def write_zone(zone, stream):
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
@@ -521,10 +540,17 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
             _write_plot3d_qscalars(zone, stream, logger)
             _write_plot3d_vars(zone, stream, varnames, planes, logger)
 
+        def zone_nbytes(zone):
+            nvars = len(zone.shape) + 2
+            return _record_nbytes(stream, 4) + \
+                   _record_nbytes(stream, nvars * _npoints(zone))
+
+        _write_zones(zones, stream, write_zone, zone_nbytes, workers)
+
 
 def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
                    binary=True, big_endian=False, single_precision=True,
-                   unformatted=True, logger=None):
+                   unformatted=True, logger=None, workers=1):
     """
     Writes `domain` to `grid_file` and `f_file` in Plot3D format.
     If `varnames` is None, then all arrays and then all vectors are written.
@@ -571,7 +597,7 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
                                  % (name, missing))
     # Write grid file.
     write_plot3d_grid(domain, grid_file, planes, binary, big_endian,
-                      single_precision, unformatted, logger)
+                      single_precision, unformatted, logger, workers)
     # Write F file.
     mode = 'wb' if binary else 'w'
     with open(f_file, mode) as out:
@@ -586,7 +612,7 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
         _write_plot3d_dims(domain, stream, logger, varnames)
 
         # Write zone variables.
-        for zone in zones:
+        def write_zone(zone, stream):
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
@@ -594,10 +620,20 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
             logger.debug('writing data for %s', name)
             _write_plot3d_vars(zone, stream, varnames, planes, logger)
 
+        def zone_nbytes(zone):
+            dim = len(zone.shape)
+            nvars = 0
+            for name in varnames:
+                obj = getattr(zone.flow_solution, name)
+                nvars += dim if isinstance(obj, Vector) else 1
+            return _record_nbytes(stream, nvars * _npoints(zone))
+
+        _write_zones(zones, stream, write_zone, zone_nbytes, workers)
+
 
 def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
                       big_endian=False, single_precision=True,
-                      unformatted=True, logger=None):
+                      unformatted=True, logger=None, workers=1):
     """
     Writes `domain` to `grid_file` in Plot3D format.
     Ghost data is not written.
@@ -632,7 +668,7 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
         _write_plot3d_dims(domain, stream, logger)
 
         # Write zone coordinates.
-        for zone in zones:
+        def write_zone(zone, stream):
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
@@ -640,6 +676,61 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
             logger.debug('writing coords for %s', name)
             _write_plot3d_coords(zone, stream, planes, logger)
 
+        def zone_nbytes(zone):
+            return _record_nbytes(stream, len(zone.shape) * _npoints(zone))
+
+        _write_zones(zones, stream, write_zone, zone_nbytes, workers)
+
+
+def _write_zones(zones, stream, writer, nbytes, workers):
+    """
+    Writes `zones` to `stream` via ``writer(zone, stream)``.  If `workers`
+    is greater than one and `stream` is binary, zones are written
+    concurrently, each through its own file object positioned using the
+    sizes returned by ``nbytes(zone)``.
+    """
+    if workers < 2 or len(zones) < 2 or not stream.binary:
+        for zone in zones:
+            writer(zone, stream)
+        return
+
+    out = stream.file
+    out.flush()
+    offsets = [out.tell()]
+    for zone in zones:
+        offsets.append(offsets[-1] + nbytes(zone))
+    out.truncate(offsets[-1])
+
+    def write_zone(i):
+        with open(out.name, 'r+b') as zone_out:
+            zone_out.seek(offsets[i])
+            writer(zones[i], Stream(zone_out, True, stream.big_endian,
+                                    stream.single_precision, stream.integer_8,
+                                    stream.unformatted, stream.recordmark_8))
+            if zone_out.tell() != offsets[i+1]:
+                raise RuntimeError('zone %d wrote %d bytes, expected %d'
+                                   % (i+1, zone_out.tell() - offsets[i],
+                                      offsets[i+1] - offsets[i]))
+
+    map_zones(write_zone, range(len(zones)), workers=workers)
+    out.seek(offsets[-1])
+
+
+def _record_nbytes(stream, count):
+    """ Returns size of a record of `count` floats in binary `stream`. """
+    nbytes = stream.reclen_floats(count)
+    if stream.unformatted:
+        nbytes += 16 if stream.recordmark_8 else 8
+    return nbytes
+
+
+def _npoints(zone):
+    """ Returns number of points written for `zone` (ghosts excluded). """
+    npoints = 1
+    for size in zone.shape:
+        npoints *= size
+    return npoints
+
 
 def _write_plot3d_dims(domain, stream, logger, varnames=None):
     """ Write dimensions of each zone to Plot3D stream. """
@@ -3,12 +3,14 @@ Support for calculating one or more scalar averages across one or more
 regions in a domain.
 """
 
-from math import cos, sin, sqrt
+from itertools import product
+
+import numpy
 
 from openmdao.lib.datatypes.domain.flow import CELL_CENTER
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
 from openmdao.lib.datatypes.domain.metrics import get_metric, list_metrics, \
-                                                  create_scalar_metric
+                                                  create_scalar_metric, _double
 _SCHEMES = ('area', 'mass')
 
 # TODO: account for ghost cells in index calculations.
@@ -250,16 +252,16 @@ def _calc_weights(scheme, domain, regions):
             else:
                 zone_weights = _curve_weights_1d(scheme, domain, region)
         else:
-            zone_weights = [1.]
+            zone_weights = numpy.ones(1)
 
         zone_name = region[0]
         zone = getattr(domain, zone_name)
-        zone_weights *= zone.symmetry_instances  # Adjust for symmetry.
         if zone_name in weights:
             raise RuntimeError('Zone %r used more than once' % zone_name)
         else:
             weights[zone_name] = zone_weights
-        weight_total += sum(zone_weights)
+        # Adjust for symmetry (metric values are adjusted in mesh_probe()).
+        weight_total += zone_weights.sum() * zone.symmetry_instances
 
     return (weights, weight_total)
 
@@ -279,24 +281,24 @@ def _surface_weights_3d(scheme, domain, region):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical:
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
 
     if scheme == 'mass':
         try:
             if cylindrical:
-                mom_c1 = flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
+                mom_c1 = _double(flow.momentum.z)
+                mom_c2 = _double(flow.momentum.r)
+                mom_c3 = _double(flow.momentum.t)
             else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = flow.momentum.z.item
+                mom_c1 = _double(flow.momentum.x)
+                mom_c2 = _double(flow.momentum.y)
+                mom_c3 = _double(flow.momentum.z)
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
                                  " 'momentum'." % zone_name)
@@ -313,20 +315,16 @@ def _surface_weights_3d(scheme, domain, region):
         face_normal = _kface_normal
         face_value = _kface_cell_value if cell_center else _kface_node_value
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                sc1, sc2, sc3 = face_normal(c1, c2, c3, i, j, k, cylindrical)
-                if scheme == 'mass':
-                    loc = (i, j, k)
-                    rvu = face_value(mom_c1, loc)
-                    rvv = face_value(mom_c2, loc)
-                    rvw = face_value(mom_c3, loc)
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+    rng = (slice(imin, imax), slice(jmin, jmax), slice(kmin, kmax))
+    sc1, sc2, sc3 = face_normal(c1, c2, c3, rng, cylindrical)
+    if scheme == 'mass':
+        rvu = face_value(mom_c1, rng)
+        rvv = face_value(mom_c2, rng)
+        rvw = face_value(mom_c3, rng)
+        weights = rvu*sc1 + rvv*sc2 + rvw*sc3
+    else:
+        weights = numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+    return weights.ravel()
 
 
 def _surface_weights_2d(scheme, domain, region):
@@ -339,59 +337,47 @@ def _surface_weights_2d(scheme, domain, region):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
 
     if scheme == 'mass':
         try:
             if cylindrical:
-                mom_c1 = None if flow.momentum.z is None else flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
+                mom_c1 = _double(flow.momentum.z)
+                mom_c2 = _double(flow.momentum.r)
+                mom_c3 = _double(flow.momentum.t)
             else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = None if flow.momentum.z is None else flow.momentum.z.item
+                mom_c1 = _double(flow.momentum.x)
+                mom_c2 = _double(flow.momentum.y)
+                mom_c3 = _double(flow.momentum.z)
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
                                  " 'momentum'." % zone_name)
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                sc1, sc2, sc3 = _cell_normal(c1, c2, c3, i, j, cylindrical)
-                if scheme == 'mass':
-                    ip1 = i + 1
-                    jp1 = j + 1
-                    if cell_center:
-                        # Cell value is value.
+    rng = (slice(imin, imax), slice(jmin, jmax))
+    sc1, sc2, sc3 = _cell_normal(c1, c2, c3, rng, cylindrical)
+    if scheme == 'mass':
+        if cell_center:
+            # Cell value is value.
 # FIXME: built-in ghosts
-                        rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
-                        rvv = mom_c2(ip1, jp1)
-                        rvw = 0. if mom_c1 is None else mom_c3(ip1, jp1)
-                    else:
-                        # Average across vertices.
-                        if mom_c1 is None:
-                            rvu = 0.
-                        else:
-                            rvu = 0.25 * (mom_c1(i, j) + mom_c1(ip1, j) + \
-                                          mom_c1(i, jp1) + mom_c1(ip1, jp1))
-                        rvv = 0.25 * (mom_c2(i, j) + mom_c2(ip1, j) + \
-                                      mom_c2(i, jp1) + mom_c2(ip1, jp1))
-                        if mom_c3 is None:
-                            rvw = 0.
-                        else:
-                            rvw = 0.25 * (mom_c3(i, j) + mom_c3(ip1, j) + \
-                                          mom_c3(i, jp1) + mom_c3(ip1, jp1))
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+            cell = _offset(rng, 1, 1)
+            rvu = 0. if mom_c1 is None else mom_c1[cell]
+            rvv = mom_c2[cell]
+            rvw = 0. if mom_c3 is None else mom_c3[cell]
+        else:
+            # Average across vertices.
+            rvu = 0. if mom_c1 is None else _cell_node_value(mom_c1, rng)
+            rvv = _cell_node_value(mom_c2, rng)
+            rvw = 0. if mom_c3 is None else _cell_node_value(mom_c3, rng)
+        weights = rvu*sc1 + rvv*sc2 + rvw*sc3
+    else:
+        weights = numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+    return weights.ravel()
 
 
 def _curve_weights_3d(scheme, domain, region):
@@ -403,45 +389,28 @@ def _curve_weights_3d(scheme, domain, region):
 
     if cylindrical:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
-    along_i, along_j = False, False
     if imin != imax:
-        along_i = True
+        axis = 0
         jmax += 1
         kmax += 1
     elif jmin != jmax:
-        along_j = True
+        axis = 1
         imax += 1
         kmax += 1
     else:
+        axis = 2
         imax += 1
         jmax += 1
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                if along_i:
-                    dx = x(i+1, j, k) - x(i, j, k)
-                    dy = y(i+1, j, k) - y(i, j, k)
-                    dz = z(i+1, j, k) - z(i, j, k)
-                elif along_j:
-                    dx = x(i, j+1, k) - x(i, j, k)
-                    dy = y(i, j+1, k) - y(i, j, k)
-                    dz = z(i, j+1, k) - z(i, j, k)
-                else:
-                    dx = x(i, j, k+1) - x(i, j, k)
-                    dy = y(i, j, k+1) - y(i, j, k)
-                    dz = z(i, j, k+1) - z(i, j, k)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    rng = (slice(imin, imax), slice(jmin, jmax), slice(kmin, kmax))
+    x = _double(grid.x)
+    y = _double(grid.y)
+    z = _double(grid.z)
+    return _edge_length(x, y, z, rng, axis, False).ravel()
 
 
 def _curve_weights_2d(scheme, domain, region):
@@ -453,34 +422,22 @@ def _curve_weights_2d(scheme, domain, region):
 
     if cylindrical:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = None if grid.z is None else grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
     if imin != imax:
-        along_i = True
+        axis = 0
         jmax += 1
     else:
-        along_i = False
+        axis = 1
         imax += 1
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                if along_i:
-                    dx = x(i+1, j) - x(i, j)
-                    dy = y(i+1, j) - y(i, j)
-                    dz = 0. if z is None else z(i+1, j) - z(i, j)
-                else:
-                    dx = x(i, j+1) - x(i, j)
-                    dy = y(i, j+1) - y(i, j)
-                    dz = 0. if z is None else z(i, j+1) - z(i, j)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    rng = (slice(imin, imax), slice(jmin, jmax))
+    x = _double(grid.x)
+    y = _double(grid.y)
+    z = _double(grid.z)
+    return _edge_length(x, y, z, rng, axis, False).ravel()
 
 
 def _curve_weights_1d(scheme, domain, region):
@@ -492,21 +449,15 @@ def _curve_weights_1d(scheme, domain, region):
 
     if cylindrical:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = None if grid.y is None else grid.y.item
-        z = None if grid.z is None else grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
-    weights = []
-    for i in range(imin, imax):
-        dx = x(i+1) - x(i)
-        dy = 0. if y is None else y(i+1) - y(i)
-        dz = 0. if z is None else z(i+1) - z(i)
-        weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    rng = (slice(imin, imax),)
+    x = _double(grid.x)
+    y = _double(grid.y)
+    z = _double(grid.z)
+    return _edge_length(x, y, z, rng, 0, False)
 
 
 def _calc_metric(name, domain, region, weights, reference_state):
@@ -552,6 +503,44 @@ def _calc_metric(name, domain, region, weights, reference_state):
         return metric.dimensionalize(total)
 
 
+def _calculator(metric):
+    """
+    Return a function computing `metric` over a whole index range.
+    Metrics without :meth:`calculate_all` are evaluated item by item.
+    """
+    try:
+        return metric.calculate_all
+    except AttributeError:
+        pass
+
+    def calculate_all(loc, geom):
+        """ Return array of :meth:`calculate` values across `loc`. """
+        indices = product(*[range(s.start, s.stop) for s in loc])
+        values = numpy.empty(tuple(s.stop - s.start for s in loc))
+        for n, index in enumerate(indices):
+            if geom is None:
+                item = None
+            elif isinstance(geom, tuple):
+                item = tuple(float(arr.flat[n]) for arr in geom)
+            else:
+                item = float(geom.flat[n])
+            values.flat[n] = metric.calculate(index, item)
+        return values
+
+    return calculate_all
+
+
+def _total(val, integrate, weights, rng):
+    """ Return sum of `val` over `rng`, weighted if not integrating. """
+    shape = tuple(s.stop - s.start for s in rng)
+    if numpy.shape(val) != shape:
+        val = val * numpy.ones(shape)
+    if integrate:
+        return float(val.sum())
+    else:
+        return float((val.ravel() * weights).sum())
+
+
 def _volume(metric, integrate, zone, region, weights):
     """ Calculate metric on a volume. """
     raise NotImplementedError('metric calculation on volume')
@@ -615,13 +604,13 @@ def _surface_3d(metric, integrate, zone, region, weights):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
 
     if imin == imax: 
         face = 'i'
@@ -636,51 +625,42 @@ def _surface_3d(metric, integrate, zone, region, weights):
         kmax += 1
         get_normal = _kface_normal
 
+    rng = (slice(imin, imax), slice(jmin, jmax), slice(kmin, kmax))
+    calculate = _calculator(metric)
+
     normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
+    if integrate:
+        normal = get_normal(c1, c2, c3, rng, cylindrical)
 
-                if integrate:
-                    normal = get_normal(c1, c2, c3, i, j, k, cylindrical)
-    
-                if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                    # Average across cells sharing surface.
-                    val = metric.calculate((i+1, j+1, k+1), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j+1, k), normal)
-                    val *= 0.5
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k), normal)
-                    val *= 0.25
+        # Average across cells sharing surface.
+        val = calculate(_offset(rng, 1, 1, 1), normal)
+        if face == 'i':
+            val = val + calculate(_offset(rng, 0, 1, 1), normal)
+        elif face == 'j':
+            val = val + calculate(_offset(rng, 1, 0, 1), normal)
+        else:
+            val = val + calculate(_offset(rng, 1, 1, 0), normal)
+        val = val * 0.5
+    else:
+        # Average across vertices.
+        val = calculate(rng, normal)
+        if face == 'i':
+            val = val + calculate(_offset(rng, 0, 1, 0), normal)
+            val = val + calculate(_offset(rng, 0, 1, 1), normal)
+            val = val + calculate(_offset(rng, 0, 0, 1), normal)
+        elif face == 'j':
+            val = val + calculate(_offset(rng, 1, 0, 0), normal)
+            val = val + calculate(_offset(rng, 1, 0, 1), normal)
+            val = val + calculate(_offset(rng, 0, 0, 1), normal)
+        else:
+            val = val + calculate(_offset(rng, 1, 0, 0), normal)
+            val = val + calculate(_offset(rng, 1, 1, 0), normal)
+            val = val + calculate(_offset(rng, 0, 1, 0), normal)
+        val = val * 0.25
 
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
+    return _total(val, integrate, weights, rng)
 
 
 def _surface_2d(metric, integrate, zone, region, weights):
@@ -692,42 +672,34 @@ def _surface_2d(metric, integrate, zone, region, weights):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
+
+    rng = (slice(imin, imax), slice(jmin, jmax))
+    calculate = _calculator(metric)
 
     normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
+    if integrate:
+        normal = _cell_normal(c1, c2, c3, rng, cylindrical)
 
-            if integrate:
-                normal = _cell_normal(c1, c2, c3, i, j, cylindrical)
-    
-            if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                # Cell value is value.
-                val = metric.calculate((i+1, j+1), normal)
-            else:
-                # Average across vertices.
-                val  = metric.calculate((i, j), normal)
-                val += metric.calculate((i, j+1), normal)
-                val += metric.calculate((i+1, j+1), normal)
-                val += metric.calculate((i+1, j), normal)
-                val *= 0.25
-
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
+        # Cell value is value.
+        val = calculate(_offset(rng, 1, 1), normal)
+    else:
+        # Average across vertices.
+        val = calculate(rng, normal)
+        val = val + calculate(_offset(rng, 0, 1), normal)
+        val = val + calculate(_offset(rng, 1, 1), normal)
+        val = val + calculate(_offset(rng, 1, 0), normal)
+        val = val * 0.25
+
+    return _total(val, integrate, weights, rng)
 
 
 def _curve_3d(metric, integrate, zone, region, weights):
@@ -739,75 +711,66 @@ def _curve_3d(metric, integrate, zone, region, weights):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
 
     if imin != imax:
         edge = 'i'
+        axis = 0
         jmax += 1
         kmax += 1
-        get_length = _iedge_length
     elif jmin != jmax:
         edge = 'j'
+        axis = 1
         imax += 1
         kmax += 1
-        get_length = _jedge_length
     else:
         edge = 'k'
+        axis = 2
         imax += 1
         jmax += 1
-        get_length = _kedge_length
 
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
+    rng = (slice(imin, imax), slice(jmin, jmax), slice(kmin, kmax))
+    calculate = _calculator(metric)
 
-                if integrate:
-                    length = get_length(c1, c2, c3, (i, j, k), cylindrical)
+    length = None
+    if integrate:
+        length = _edge_length(c1, c2, c3, rng, axis, cylindrical)
 
-                if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                    # Average across cells sharing edge.
-                    val = metric.calculate((i+1, j+1, k+1), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i, j+1, k), length)
-                    else:
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i, j, k+1), length)
-                    val *= 0.25
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                         val +=metric.calculate((i, j+1, k), length)
-                    else:
-                         val +=metric.calculate((i, j, k+1), length)
-                    val *= 0.5
+        # Average across cells sharing edge.
+        val = calculate(_offset(rng, 1, 1, 1), length)
+        if edge == 'i':
+            val = val + calculate(_offset(rng, 1, 0, 1), length)
+            val = val + calculate(_offset(rng, 1, 1, 0), length)
+            val = val + calculate(_offset(rng, 1, 0, 0), length)
+        elif edge == 'j':
+            val = val + calculate(_offset(rng, 0, 1, 1), length)
+            val = val + calculate(_offset(rng, 1, 1, 0), length)
+            val = val + calculate(_offset(rng, 0, 1, 0), length)
+        else:
+            val = val + calculate(_offset(rng, 0, 1, 1), length)
+            val = val + calculate(_offset(rng, 1, 0, 1), length)
+            val = val + calculate(_offset(rng, 0, 0, 1), length)
+        val = val * 0.25
+    else:
+        # Average across vertices.
+        val = calculate(rng, length)
+        if edge == 'i':
+            val = val + calculate(_offset(rng, 1, 0, 0), length)
+        elif edge == 'j':
+            val = val + calculate(_offset(rng, 0, 1, 0), length)
+        else:
+            val = val + calculate(_offset(rng, 0, 0, 1), length)
+        val = val * 0.5
 
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
+    return _total(val, integrate, weights, rng)
 
 
 def _curve_2d(metric, integrate, zone, region, weights):
@@ -819,57 +782,49 @@ def _curve_2d(metric, integrate, zone, region, weights):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
 
     if imin != imax:
         edge = 'i'
+        axis = 0
         jmax += 1
-        get_length = _iedge_length
     else:
         edge = 'j'
+        axis = 1
         imax += 1
-        get_length = _jedge_length
 
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
+    rng = (slice(imin, imax), slice(jmin, jmax))
+    calculate = _calculator(metric)
 
-            if integrate:
-                length = get_length(c1, c2, c3, (i, j), cylindrical)
+    length = None
+    if integrate:
+        length = _edge_length(c1, c2, c3, rng, axis, cylindrical)
 
-            if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                # Average across cells sharing edge.
-                val = metric.calculate((i+1, j+1), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
-            else:
-                # Average across vertices.
-                val = metric.calculate((i, j), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
+        # Average across cells sharing edge.
+        val = calculate(_offset(rng, 1, 1), length)
+        if edge == 'i':
+            val = val + calculate(_offset(rng, 1, 0), length)
+        else:
+            val = val + calculate(_offset(rng, 0, 1), length)
+        val = val * 0.5
+    else:
+        # Average across vertices.
+        val = calculate(rng, length)
+        if edge == 'i':
+            val = val + calculate(_offset(rng, 1, 0), length)
+        else:
+            val = val + calculate(_offset(rng, 0, 1), length)
+        val = val * 0.5
 
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
+    return _total(val, integrate, weights, rng)
 
 
 def _curve_1d(metric, integrate, zone, region, weights):
@@ -881,41 +836,32 @@ def _curve_1d(metric, integrate, zone, region, weights):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _double(grid.z)
+        c2 = _double(grid.r)
+        c3 = _double(grid.t)
     else:
-        c1 = grid.x.item
-        c2 = None if grid.y is None else grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _double(grid.x)
+        c2 = _double(grid.y)
+        c3 = _double(grid.z)
 
-    get_length = _iedge_length
+    rng = (slice(imin, imax),)
+    calculate = _calculator(metric)
 
     length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-
-        if integrate:
-            length = get_length(c1, c2, c3, (i,), cylindrical)
+    if integrate:
+        length = _edge_length(c1, c2, c3, rng, 0, cylindrical)
 
-        if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-            # Cell value is value.
-            val = metric.calculate((i+1,), length)
-        else:
-            # Average across vertices.
-            val  = metric.calculate((i,), length)
-            val += metric.calculate((i+1,), length)
-            val *= 0.5
+        # Cell value is value.
+        val = calculate(_offset(rng, 1), length)
+    else:
+        # Average across vertices.
+        val = calculate(rng, length)
+        val = val + calculate(_offset(rng, 1), length)
+        val = val * 0.5
 
-        if integrate:
-            total += val
-        else:
-            weight = weights[weight_index]
-            weight_index += 1
-            total += val * weight
-    return total
+    return _total(val, integrate, weights, rng)
 
 
 def _point(metric, zone, region):
@@ -963,27 +909,36 @@ def _point(metric, zone, region):
             return metric.calculate((imin,), None)
 
 
-def _iface_normal(c1, c2, c3, i, j, k, cylindrical):
+def _offset(rng, *deltas):
+    """ Return index slices `rng` shifted by `deltas`. """
+    return tuple(slice(s.start + delta, s.stop + delta)
+                 for s, delta in zip(rng, deltas))
+
+
+def _iface_normal(c1, c2, c3, rng, cylindrical):
     """
-    Return non-dimensional vector normal to I face with magnitude equal to area.
+    Return non-dimensional vectors normal to the I faces in `rng`
+    with magnitude equal to area.
     """
 # FIXME: built-in ghosts
-    jp1 = j + 1
-    kp1 = k + 1
+    i_j_k = rng
+    i_jp1_k = _offset(rng, 0, 1, 0)
+    i_j_kp1 = _offset(rng, 0, 0, 1)
+    i_jp1_kp1 = _offset(rng, 0, 1, 1)
 
     # upper-left - lower-right.
-    diag_c11 = c1(i, jp1, k) - c1(i, j, kp1)
-    diag_c21 = c2(i, jp1, k) - c2(i, j, kp1)
-    diag_c31 = c3(i, jp1, k) - c3(i, j, kp1)
+    diag_c11 = c1[i_jp1_k] - c1[i_j_kp1]
+    diag_c21 = c2[i_jp1_k] - c2[i_j_kp1]
+    diag_c31 = c3[i_jp1_k] - c3[i_j_kp1]
 
     # upper-right - lower-left.
-    diag_c12 = c1(i, jp1, kp1) - c1(i, j, k)
-    diag_c22 = c2(i, jp1, kp1) - c2(i, j, k)
-    diag_c32 = c3(i, jp1, kp1) - c3(i, j, k)
+    diag_c12 = c1[i_jp1_kp1] - c1[i_j_k]
+    diag_c22 = c2[i_jp1_kp1] - c2[i_j_k]
+    diag_c32 = c3[i_jp1_kp1] - c3[i_j_k]
 
     if cylindrical:
-        r1 = (c2(i, j, kp1) + c2(i, jp1, k  )) / 2.
-        r2 = (c2(i, j, k  ) + c2(i, jp1, kp1)) / 2.
+        r1 = (c2[i_j_kp1] + c2[i_jp1_k  ]) / 2.
+        r2 = (c2[i_j_k  ] + c2[i_jp1_kp1]) / 2.
     else:
         r1 = 1.
         r2 = 1.
@@ -995,27 +950,30 @@ def _iface_normal(c1, c2, c3, i, j, k, cylindrical):
     return (sc1, sc2, sc3)
 
 
-def _jface_normal(c1, c2, c3, i, j, k, cylindrical):
+def _jface_normal(c1, c2, c3, rng, cylindrical):
     """
-    Return non-dimensional vector normal to J face with magnitude equal to area.
+    Return non-dimensional vectors normal to the J faces in `rng`
+    with magnitude equal to area.
     """
 # FIXME: built-in ghosts
-    ip1 = i + 1
-    kp1 = k + 1
+    i_j_k = rng
+    ip1_j_k = _offset(rng, 1, 0, 0)
+    i_j_kp1 = _offset(rng, 0, 0, 1)
+    ip1_j_kp1 = _offset(rng, 1, 0, 1)
 
     # upper-left - lower-right.
-    diag_c11 = c1(ip1, j, k) - c1(i, j, kp1)
-    diag_c21 = c2(ip1, j, k) - c2(i, j, kp1)
-    diag_c31 = c3(ip1, j, k) - c3(i, j, kp1)
+    diag_c11 = c1[ip1_j_k] - c1[i_j_kp1]
+    diag_c21 = c2[ip1_j_k] - c2[i_j_kp1]
+    diag_c31 = c3[ip1_j_k] - c3[i_j_kp1]
 
     # upper-right - lower-left.
-    diag_c12 = c1(ip1, j, kp1) - c1(i, j, k)
-    diag_c22 = c2(ip1, j, kp1) - c2(i, j, k)
-    diag_c32 = c3(ip1, j, kp1) - c3(i, j, k)
+    diag_c12 = c1[ip1_j_kp1] - c1[i_j_k]
+    diag_c22 = c2[ip1_j_kp1] - c2[i_j_k]
+    diag_c32 = c3[ip1_j_kp1] - c3[i_j_k]
 
     if cylindrical:
-        r1 = (c2(i, j, kp1) + c2(ip1, j, k  )) / 2.
-        r2 = (c2(i, j, k  ) + c2(ip1, j, kp1)) / 2.
+        r1 = (c2[i_j_kp1] + c2[ip1_j_k  ]) / 2.
+        r2 = (c2[i_j_k  ] + c2[ip1_j_kp1]) / 2.
     else:
         r1 = 1.
         r2 = 1.
@@ -1027,27 +985,30 @@ def _jface_normal(c1, c2, c3, i, j, k, cylindrical):
     return (sc1, sc2, sc3)
 
 
-def _kface_normal(c1, c2, c3, i, j, k, cylindrical):
+def _kface_normal(c1, c2, c3, rng, cylindrical):
     """
-    Return non-dimensional vector normal to K face with magnitude equal to area.
+    Return non-dimensional vectors normal to the K faces in `rng`
+    with magnitude equal to area.
     """
 # FIXME: built-in ghosts
-    ip1 = i + 1
-    jp1 = j + 1
+    i_j_k = rng
+    ip1_j_k = _offset(rng, 1, 0, 0)
+    i_jp1_k = _offset(rng, 0, 1, 0)
+    ip1_jp1_k = _offset(rng, 1, 1, 0)
 
     # upper-left - lower-right.
-    diag_c11 = c1(i, jp1, k) - c1(ip1, j, k)
-    diag_c21 = c2(i, jp1, k) - c2(ip1, j, k)
-    diag_c31 = c3(i, jp1, k) - c3(ip1, j, k)
+    diag_c11 = c1[i_jp1_k] - c1[ip1_j_k]
+    diag_c21 = c2[i_jp1_k] - c2[ip1_j_k]
+    diag_c31 = c3[i_jp1_k] - c3[ip1_j_k]
 
     # upper-right - lower-left.
-    diag_c12 = c1(ip1, jp1, k) - c1(i, j, k)
-    diag_c22 = c2(ip1, jp1, k) - c2(i, j, k)
-    diag_c32 = c3(ip1, jp1, k) - c3(i, j, k)
+    diag_c12 = c1[ip1_jp1_k] - c1[i_j_k]
+    diag_c22 = c2[ip1_jp1_k] - c2[i_j_k]
+    diag_c32 = c3[ip1_jp1_k] - c3[i_j_k]
 
     if cylindrical:
-        r1 = (c2(i, jp1, k) + c2(ip1, j,   k)) / 2.
-        r2 = (c2(i, j,   k) + c2(ip1, jp1, k)) / 2.
+        r1 = (c2[i_jp1_k] + c2[ip1_j_k  ]) / 2.
+        r2 = (c2[i_j_k  ] + c2[ip1_jp1_k]) / 2.
     else:
         r1 = 1.
         r2 = 1.
@@ -1059,29 +1020,32 @@ def _kface_normal(c1, c2, c3, i, j, k, cylindrical):
     return (sc1, sc2, sc3)
 
 
-def _cell_normal(c1, c2, c3, i, j, cylindrical):
+def _cell_normal(c1, c2, c3, rng, cylindrical):
     """
-    Return non-dimensional vector normal with magnitude equal to area.
+    Return non-dimensional vectors normal to the cells in `rng` with
+    magnitude equal to area.
     If there is no 'z' coordinate, `c1` will be None in cylindrical
     coordinates, otherwise `c3` will be None.
     """
 # FIXME: built-in ghosts
-    ip1 = i + 1
-    jp1 = j + 1
+    i_j = rng
+    ip1_j = _offset(rng, 1, 0)
+    i_jp1 = _offset(rng, 0, 1)
+    ip1_jp1 = _offset(rng, 1, 1)
 
     # upper-left - lower-right.
-    diag_c11 = 0. if c1 is None else c1(i, jp1) - c1(ip1, j)
-    diag_c21 = c2(i, jp1) - c2(ip1, j)
-    diag_c31 = 0. if c3 is None else c3(i, jp1) - c3(ip1, j)
+    diag_c11 = 0. if c1 is None else c1[i_jp1] - c1[ip1_j]
+    diag_c21 = c2[i_jp1] - c2[ip1_j]
+    diag_c31 = 0. if c3 is None else c3[i_jp1] - c3[ip1_j]
 
     # upper-right - lower-left.
-    diag_c12 = 0. if c1 is None else c1(ip1, jp1) - c1(i, j)
-    diag_c22 = c2(ip1, jp1) - c2(i, j)
-    diag_c32 = 0. if c3 is None else c3(ip1, jp1) - c3(i, j)
+    diag_c12 = 0. if c1 is None else c1[ip1_jp1] - c1[i_j]
+    diag_c22 = c2[ip1_jp1] - c2[i_j]
+    diag_c32 = 0. if c3 is None else c3[ip1_jp1] - c3[i_j]
 
     if cylindrical:
-        r1 = (c2(i, jp1) + c2(ip1, j)) / 2.
-        r2 = (c2(i, j) + c2(ip1, jp1)) / 2.
+        r1 = (c2[i_jp1] + c2[ip1_j]) / 2.
+        r2 = (c2[i_j] + c2[ip1_jp1]) / 2.
     else:
         r1 = 1.
         r2 = 1.
@@ -1093,138 +1057,57 @@ def _cell_normal(c1, c2, c3, i, j, cylindrical):
     return (sc1, sc2, sc3)
 
 
-def _iedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'i'. """
-    if cylindrical:
-        if len(loc) > 2:
-            i, j, k = loc
-            ip1 = i + 1
-            theta = c3(ip1, j, k) - c3(i, j, k)
-            dx = c2(ip1, j, k) * cos(theta) - c2(i, j, k)
-            dy = c2(ip1, j, k) * sin(theta)
-            dz = c1(ip1, j, k) - c1(i, j, k)
-        elif len(loc) > 1:
-            i, j = loc
-            ip1 = i + 1
-            theta = c3(ip1, j) - c3(i, j)
-            dx = c2(ip1, j) * cos(theta) - c2(i, j)
-            dy = c2(ip1, j) * sin(theta)
-            dz = 0. if c1 is None else c1(ip1, j) - c1(i, j)
-        else:
-            i, = loc
-            ip1 = i + 1
-            theta = c3(ip1) - c3(i)
-            dx = c2(ip1) * cos(theta) - c2(i)
-            dy = c2(ip1) * sin(theta)
-            dz = 0. if c1 is None else c1(ip1) - c1(i)
-    else:
-        if len(loc) > 2:
-            i, j, k = loc
-            ip1 = i + 1
-            dx = c1(ip1, j, k) - c1(i, j, k)
-            dy = c2(ip1, j, k) - c2(i, j, k)
-            dz = c3(ip1, j, k) - c3(i, j, k)
-        elif len(loc) > 1:
-            i, j = loc
-            ip1 = i + 1
-            dx = c1(ip1, j) - c1(i, j)
-            dy = c2(ip1, j) - c2(i, j)
-            dz = 0. if c3 is None else c3(ip1, j) - c3(i, j)
-        else:
-            i, = loc
-            ip1 = i + 1
-            dx = c1(ip1) - c1(i)
-            dy = 0. if c2 is None else c2(ip1) - c2(i)
-            dz = 0. if c3 is None else c3(ip1) - c3(i)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
-
-
-def _jedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'j'. """
-    if cylindrical:
-        if len(loc) > 2:
-            i, j, k = loc
-            jp1 = j + 1
-            theta = c3(i, jp1, k) - c3(i, j, k)
-            dx = c2(i, jp1, k) * cos(theta) - c2(i, j, k)
-            dy = c2(i, jp1, k) * sin(theta)
-            dz = c1(i, jp1, k) - c1(i, j, k)
-        else:
-            i, j = loc
-            jp1 = j + 1
-            theta = c3(i, jp1) - c3(i, j)
-            dx = c2(i, jp1) * cos(theta) - c2(i, j)
-            dy = c2(i, jp1) * sin(theta)
-            dz = 0. if c1 is None else c1(i, jp1) - c1(i, j)
-    else:
-        if len(loc) > 2:
-            i, j, k = loc
-            jp1 = j + 1
-            dx = c1(i, jp1, k) - c1(i, j, k)
-            dy = c2(i, jp1, k) - c2(i, j, k)
-            dz = c3(i, jp1, k) - c3(i, j, k)
-        else:
-            i, j = loc
-            jp1 = j + 1
-            dx = c1(i, jp1) - c1(i, j)
-            dy = c2(i, jp1) - c2(i, j)
-            dz = 0. if c3 is None else c3(i, jp1) - c3(i, j)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
-
+def _edge_length(c1, c2, c3, rng, axis, cylindrical):
+    """ Return lengths of the edges in `rng` along index `axis`. """
+    deltas = [0] * len(rng)
+    deltas[axis] = 1
+    nxt = _offset(rng, *deltas)
 
-def _kedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'k'. """
-    i, j, k = loc
-    kp1 = k + 1
     if cylindrical:
-        theta = c3(i, j, kp1) - c3(i, j, k)
-        dx = c2(i, j, kp1) * cos(theta) - c2(i, j, k)
-        dy = c2(i, j, kp1) * sin(theta)
-        dz = c1(i, j, kp1) - c1(i, j, k)
+        theta = c3[nxt] - c3[rng]
+        dx = c2[nxt] * numpy.cos(theta) - c2[rng]
+        dy = c2[nxt] * numpy.sin(theta)
+        dz = 0. if c1 is None else c1[nxt] - c1[rng]
     else:
-        dx = c1(i, j, kp1) - c1(i, j, k)
-        dy = c2(i, j, kp1) - c2(i, j, k)
-        dz = c3(i, j, kp1) - c3(i, j, k)
+        dx = c1[nxt] - c1[rng]
+        dy = 0. if c2 is None else c2[nxt] - c2[rng]
+        dz = 0. if c3 is None else c3[nxt] - c3[rng]
 
-    return sqrt(dx*dx + dy*dy + dz*dz)
+    return numpy.sqrt(dx*dx + dy*dy + dz*dz)
 
 
-def _iface_cell_value(arr, loc):
-    """ Returns I face value for cell-centered data. """
-    i, j, k = loc
+def _iface_cell_value(arr, rng):
+    """ Returns I face values for cell-centered data. """
 # FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i, j+1, k+1))
+    return 0.5 * (arr[_offset(rng, 1, 1, 1)] + arr[_offset(rng, 0, 1, 1)])
 
-def _jface_cell_value(arr, loc):
-    """ Returns J face value for cell-centered data. """
-    i, j, k = loc
+def _jface_cell_value(arr, rng):
+    """ Returns J face values for cell-centered data. """
 # FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j, k+1))
+    return 0.5 * (arr[_offset(rng, 1, 1, 1)] + arr[_offset(rng, 1, 0, 1)])
 
-def _kface_cell_value(arr, loc):
-    """ Returns K face value for cell-centered data. """
-    i, j, k = loc
+def _kface_cell_value(arr, rng):
+    """ Returns K face values for cell-centered data. """
 # FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j+1, k))
+    return 0.5 * (arr[_offset(rng, 1, 1, 1)] + arr[_offset(rng, 1, 1, 0)])
 
 
-def _iface_node_value(arr, loc):
-    """ Returns I face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i, j+1, k+1) + arr(i, j, k+1) +
-                   arr(i, j+1, k) + arr(i, j, k))
+def _iface_node_value(arr, rng):
+    """ Returns I face values for vertex data. """
+    return 0.25 * (arr[_offset(rng, 0, 1, 1)] + arr[_offset(rng, 0, 0, 1)] +
+                   arr[_offset(rng, 0, 1, 0)] + arr[rng])
 
-def _jface_node_value(arr, loc):
-    """ Returns J face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j, k+1) + arr(i, j, k+1) +
-                   arr(i+1, j, k) + arr(i, j, k))
+def _jface_node_value(arr, rng):
+    """ Returns J face values for vertex data. """
+    return 0.25 * (arr[_offset(rng, 1, 0, 1)] + arr[_offset(rng, 0, 0, 1)] +
+                   arr[_offset(rng, 1, 0, 0)] + arr[rng])
 
-def _kface_node_value(arr, loc):
-    """ Returns K face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j+1, k) + arr(i, j+1, k) +
-                   arr(i+1, j, k) + arr(i, j, k))
+def _kface_node_value(arr, rng):
+    """ Returns K face values for vertex data. """
+    return 0.25 * (arr[_offset(rng, 1, 1, 0)] + arr[_offset(rng, 0, 1, 0)] +
+                   arr[_offset(rng, 1, 0, 0)] + arr[rng])
 
+def _cell_node_value(arr, rng):
+    """ Returns 2D cell values for vertex data. """
+    return 0.25 * (arr[rng] + arr[_offset(rng, 1, 0)] +
+                   arr[_offset(rng, 0, 1)] + arr[_offset(rng, 1, 1)])
@@ -10,7 +10,8 @@ import numpy  # don't remove, this is needed in globals
 
 from openmdao.lib.datatypes.domain import DomainObj, FlowSolution, \
                                           GridCoordinates, Vector, Zone, \
-                                          read_plot3d_q, write_plot3d_q
+                                          map_zones, read_plot3d_q, \
+                                          write_plot3d_q
 
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d, \
                                                      create_wedge_2d, \
@@ -410,6 +411,19 @@ class TestCase(unittest.TestCase):
                          (1.116717, 1.2894737, 0.0, 0.64473683, 5.0, 5.0),
                          0.000001)
 
+        # Transforms are done in place, so neither an extracted zone nor its
+        # parent may see the other's transforms.
+        original = wedge.copy()
+        volume = wedge.extract([(10, -10, 10, 15, 0, -1)]).xyzzy
+        volume.grid_coordinates.make_cylindrical(axis='z')
+        volume.flow_solution.momentum.rotate_about_z(30.)
+        self.assertTrue(wedge.is_equivalent(original, logging.getLogger()))
+
+        extracted = volume.copy()
+        wedge.xyzzy.grid_coordinates.rotate_about_x(30.)
+        wedge.xyzzy.flow_solution.momentum.rotate_about_x(30.)
+        self.assertTrue(volume.is_equivalent(extracted, logging.getLogger()))
+
         code = 'wedge.xyzzy.flow_solution.extract(0, -1)'
         assert_raises(self, code, globals(), locals(), ValueError,
                       '3D extract requires jmin, jmax, kmin, and kmax')
@@ -875,6 +889,56 @@ class TestCase(unittest.TestCase):
                       globals(), locals(),
                       RuntimeError, 'Vector is 1D')
 
+    def test_parallel(self):
+        logging.debug('')
+        logging.debug('test_parallel')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((90, 40, 30), 5., 0.5, 2., 30.)
+        wedge.add_domain(create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.))
+        wedge.add_domain(create_wedge_3d((50, 20, 10), 5., 2.5, 4., 30., 'x'))
+
+        # Concurrent, in-place transforms match serial ones.
+        serial = wedge.copy()
+        domain = wedge.copy()
+        x = domain.zones[0].grid_coordinates.x
+        for workers in (1, 3):
+            dom = serial if workers == 1 else domain
+            dom.translate(1., 2., 3., workers=workers)
+            dom.rotate_about_x(30., workers=workers)
+            dom.rotate_about_y(-45., workers=workers)
+            dom.rotate_about_z(60., workers=workers)
+            dom.make_cylindrical(workers=workers)
+        self.assertTrue(domain.zones[0].grid_coordinates.r is x)
+        self.assertTrue(domain.is_equivalent(serial, logger))
+
+        domain.make_cartesian(workers=3)
+        domain.rotate_about_z(-60., workers=3)
+        domain.rotate_about_y(45., workers=3)
+        domain.rotate_about_x(-30., workers=3)
+        domain.translate(-1., -2., -3., workers=3)
+        self.assertTrue(domain.is_equivalent(wedge, logger, tolerance=1e-5))
+
+        # Read-only data is replaced rather than overwritten.
+        domain = wedge.copy()
+        x = domain.zones[0].grid_coordinates.x
+        x.flags.writeable = False
+        domain.rotate_about_z(60., workers=3)
+        self.assertFalse(domain.zones[0].grid_coordinates.x is x)
+        serial = wedge.copy()
+        serial.rotate_about_z(60.)
+        self.assertTrue(domain.is_equivalent(serial, logger))
+
+        regions = [(0, 10, 0, -1, 0, -1), None, (0, -1, 0, 5, 0, -1)]
+        domain = wedge.extract(regions, workers=3)
+        self.assertTrue(domain.is_equivalent(wedge.extract(regions), logger))
+        self.assertEqual(domain.shape, [(11, 40, 30), (50, 6, 10)])
+
+        # Process pool returns results.
+        shapes = map_zones(lambda zone: zone.shape, wedge.zones, workers=3,
+                           processes=True)
+        self.assertEqual(shapes, wedge.shape)
+
 
 if __name__ == '__main__':
     import nose
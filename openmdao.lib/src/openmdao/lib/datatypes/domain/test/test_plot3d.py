@@ -8,6 +8,8 @@ import tempfile
 import shutil
 import unittest
 
+import numpy
+
 from openmdao.lib.datatypes.domain import read_plot3d_q, write_plot3d_q, \
                                           read_plot3d_f, write_plot3d_f, \
                                           read_plot3d_shape, write_plot3d_grid
@@ -205,6 +207,72 @@ class TestCase(unittest.TestCase):
         self.assertTrue((test_flow.f_3 == wedge_flow.momentum.y).all())
         self.assertTrue((test_flow.f_4 == wedge_flow.energy_stagnation_density).all())
 
+    def test_lazy(self):
+        logging.debug('')
+        logging.debug('test_lazy')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge.add_domain(create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.))
+
+        # Big-endian unformatted, mapped rather than read.
+        write_plot3d_q(wedge, 'be.xyz', 'be.q', logger=logger,
+                       big_endian=True)
+        domain = read_plot3d_q('be.xyz', 'be.q', logger=logger,
+                               big_endian=True, lazy=True)
+        for zone in domain.zones:
+            self.assertTrue(isinstance(zone.grid_coordinates.z, numpy.memmap))
+            self.assertTrue(isinstance(zone.flow_solution.momentum.x,
+                                       numpy.memmap))
+        expected = read_plot3d_q('be.xyz', 'be.q', logger=logger,
+                                 big_endian=True)
+        self.assertTrue(domain.is_equivalent(expected, logger=logger))
+
+        # Zone-wise operations work on the mapped data.
+        zone = domain.zone_2.extract(0, 10, 0, -1, 0, -1)
+        self.assertEqual(zone.shape, (11, 19, 9))
+        domain.zone_1.rotate_about_z(90.)
+        self.assertFalse(domain.is_equivalent(expected, logger=logger))
+
+        # Write (and remap) in the other byte order.
+        write_plot3d_q(expected, 'le.xyz', 'le.q', logger=logger)
+        domain = read_plot3d_q('le.xyz', 'le.q', logger=logger, lazy=True)
+        self.assertTrue(domain.is_equivalent(expected, logger=logger))
+
+        # Function file.
+        write_plot3d_f(expected, 'le.xyz', 'le.f', logger=logger)
+        domain = read_plot3d_f('le.xyz', 'le.f', logger=logger, lazy=True)
+        flow = domain.zone_2.flow_solution
+        self.assertTrue(isinstance(flow.f_1, numpy.memmap))
+        self.assertTrue((flow.f_5 == expected.zone_2.flow_solution.momentum.z).all())
+
+    def test_concurrent_write(self):
+        logging.debug('')
+        logging.debug('test_concurrent_write')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge.add_domain(create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.))
+        wedge.add_domain(create_wedge_3d((9, 8, 7), 5., 2.5, 4., 30.))
+
+        for big_endian, unformatted in ((False, True), (True, False)):
+            write_plot3d_q(wedge, 'serial.xyz', 'serial.q', logger=logger,
+                           big_endian=big_endian, unformatted=unformatted)
+            write_plot3d_q(wedge, 'parallel.xyz', 'parallel.q', workers=3,
+                           logger=logger, big_endian=big_endian,
+                           unformatted=unformatted)
+            write_plot3d_f(wedge, 'serial.xyz', 'serial.f', logger=logger,
+                           big_endian=big_endian, unformatted=unformatted,
+                           single_precision=False)
+            write_plot3d_f(wedge, 'parallel.xyz', 'parallel.f', workers=3,
+                           logger=logger, big_endian=big_endian,
+                           unformatted=unformatted, single_precision=False)
+            for ext in ('xyz', 'q', 'f'):
+                with open('serial.'+ext, 'rb') as inp:
+                    expected = inp.read()
+                with open('parallel.'+ext, 'rb') as inp:
+                    self.assertEqual(inp.read(), expected)
+
 
 if __name__ == '__main__':
     import nose
@@ -10,6 +10,7 @@ import unittest
 from math import pi
 
 from openmdao.lib.datatypes.domain import mesh_probe
+from openmdao.lib.datatypes.domain.metrics import register_metric
 from openmdao.lib.datatypes.domain.test import restart, overflow
 from openmdao.lib.datatypes.domain.test.cube import create_cube
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d
@@ -237,6 +238,31 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, metrics[5], -149.525, 0.00001)
         assert_rel_error(self, metrics[6], -262.976, 0.00001)
 
+    def test_item_metric(self):
+        logging.debug('')
+        logging.debug('test_item_metric')
+
+        # Metrics without calculate_all() are evaluated item by item.
+        class Density(object):
+            def __init__(self, zone, zone_name, reference_state):
+                self.density = zone.flow_solution.density.item
+
+            def calculate(self, loc, geom):
+                return self.density(*loc)
+
+            def dimensionalize(self, value):
+                raise NotImplementedError('Dimensional density')
+
+        register_metric('item_density', Density, False)
+
+        cube = create_cube((41, 17, 9), 5., 4., 3.)
+        variables = (('item_density', None), ('density', None))
+        for region in (('xyzzy', 2, 2, 0, -1, 0, -1),
+                       ('xyzzy', 0, -1, 2, 2, 3, 3),
+                       ('xyzzy', 3, 3, 2, 2, 4, 4)):
+            item_density, density = mesh_probe(cube, (region,), variables)
+            self.assertEqual(item_density, density)
+
     def test_errors(self):
         logging.debug('')
         logging.debug('test_errors')
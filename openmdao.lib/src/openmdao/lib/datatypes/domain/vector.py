@@ -1,7 +1,103 @@
 import copy
-from math import atan2, cos, hypot, radians, sin
+from math import radians
 import numpy
 
+# Transforms process this many elements at a time, so temporaries stay small.
+_BLOCK_SIZE = 65536
+
+
+def _in_place(*arrays):
+    """ Returns True if `arrays` can be overwritten with float results. """
+    shape = arrays[0].shape
+    for i, arr in enumerate(arrays):
+        if arr.dtype.kind != 'f' or not arr.flags.writeable or \
+           arr.shape != shape:
+            return False
+        for other in arrays[:i]:
+            if numpy.may_share_memory(arr, other):
+                return False
+    return True
+
+
+def _blocks(arr):
+    """
+    Yields indices which split `arr` into blocks of about `_BLOCK_SIZE`
+    elements along its slowest varying axis.
+    """
+    if not arr.ndim or arr.size <= _BLOCK_SIZE:
+        yield Ellipsis
+        return
+    axis = int(numpy.argmax(numpy.abs(arr.strides)))
+    npoints = arr.shape[axis]
+    step = max(1, (_BLOCK_SIZE * npoints) // arr.size)
+    index = [slice(None)] * arr.ndim
+    for start in range(0, npoints, step):
+        index[axis] = slice(start, start+step)
+        yield tuple(index)
+
+
+def _rotate(a, b, theta):
+    """
+    Rotates the (`a`, `b`) component pair by `theta` radians, which may be an
+    array of the same shape.  Returns the rotated pair, which overwrites the
+    originals if possible.
+    """
+    if not _in_place(a, b) or numpy.shape(theta) not in ((), a.shape):
+        sine = numpy.sin(theta)
+        cosine = numpy.cos(theta)
+        return (a*cosine - b*sine, b*cosine + a*sine)
+
+    scalar = numpy.isscalar(theta)
+    if scalar:
+        sine = numpy.sin(theta)
+        cosine = numpy.cos(theta)
+    for index in _blocks(a):
+        a_blk = a[index]
+        b_blk = b[index]
+        if not scalar:
+            sine = numpy.sin(theta[index])
+            cosine = numpy.cos(theta[index])
+        tmp = a_blk * sine
+        a_blk *= cosine
+        a_blk -= b_blk * sine
+        b_blk *= cosine
+        b_blk += tmp
+    return (a, b)
+
+
+def _to_polar(a, b):
+    """
+    Returns the (radius, angle) of the (`a`, `b`) component pair,
+    overwriting the originals if possible.
+    """
+    if not _in_place(a, b):
+        return (numpy.hypot(a, b), numpy.arctan2(b, a))
+
+    for index in _blocks(a):
+        a_blk = a[index]
+        b_blk = b[index]
+        tmp = numpy.arctan2(b_blk, a_blk)
+        numpy.hypot(a_blk, b_blk, out=a_blk)
+        b_blk[...] = tmp
+    return (a, b)
+
+
+def _from_polar(r, t):
+    """
+    Returns the Cartesian component pair of radius `r` and angle `t`,
+    overwriting the originals if possible.
+    """
+    if not _in_place(r, t):
+        return (r * numpy.cos(t), r * numpy.sin(t))
+
+    for index in _blocks(r):
+        r_blk = r[index]
+        t_blk = t[index]
+        tmp = r_blk * numpy.sin(t_blk)
+        r_blk *= numpy.cos(t_blk)
+        t_blk[...] = tmp
+    return (r, t)
+
 
 class Vector(object):
     """
@@ -123,8 +219,9 @@ class Vector(object):
     def extract(self, imin, imax, jmin=None, jmax=None, kmin=None, kmax=None,
                 ghosts=None):
         """
-        Construct a new :class:`Vector` from data extracted from the
-        specified region.
+        Construct a new :class:`Vector` from a copy of the data in the
+        specified region. It is a copy rather than a view because the
+        coordinate transforms overwrite their arrays in place.
 
         imin, imax, jmin, jmax, kmin, kmax: int
             Specifies the region to extract.
@@ -203,7 +300,7 @@ class Vector(object):
             arr = getattr(self, component)
             if arr is not None:
                 setattr(vec, component,
-                        arr[imin:imax+1, jmin:jmax+1, kmin:kmax+1])
+                        arr[imin:imax+1, jmin:jmax+1, kmin:kmax+1].copy())
         return vec
 
     def _extract_2d(self, imin, imax, jmin, jmax, new_ghosts):
@@ -238,7 +335,7 @@ class Vector(object):
             arr = getattr(self, component)
             if arr is not None:
                 setattr(vec, component,
-                        arr[imin:imax+1, jmin:jmax+1])
+                        arr[imin:imax+1, jmin:jmax+1].copy())
         return vec
 
     def _extract_1d(self, imin, imax, new_ghosts):
@@ -265,7 +362,7 @@ class Vector(object):
         for component in ('x', 'y', 'z', 'r', 't'):
             arr = getattr(self, component)
             if arr is not None:
-                setattr(vec, component, arr[imin:imax+1])
+                setattr(vec, component, arr[imin:imax+1].copy())
         return vec
 
     def extend(self, axis, delta, npoints):
@@ -430,40 +527,14 @@ class Vector(object):
         if grid.shape != self.shape:
             raise NotImplementedError('make_cartesian: grid shape mismatch'
                                       ' not supported')
-        gt_flat = grid.t.flat
-        r_flat = self.r.flat
-        t_flat = self.t.flat
-
         if axis == 'z' or self.z is None:
-            self.x = self.r.copy()
-            self.y = self.r.copy()
-            x_flat = self.x.flat
-            y_flat = self.y.flat
-            for i in range(self.r.size):
-                gt = gt_flat[i]
-                sine = sin(gt)
-                cosine = cos(gt)
-                r = r_flat[i]
-                t = t_flat[i]
-                x_flat[i] = r*cosine - t*sine
-                y_flat[i] = r*sine   + t*cosine
+            self.x, self.y = _rotate(self.r, self.t, grid.t)
             self.r = None
             self.t = None
 
         elif axis == 'x':
             self.x = self.z
-            self.y = self.r.copy()
-            self.z = self.r.copy()
-            y_flat = self.y.flat
-            z_flat = self.z.flat
-            for i in range(self.r.size):
-                gt = gt_flat[i]
-                sine = sin(gt)
-                cosine = cos(gt)
-                r = r_flat[i]
-                t = t_flat[i]
-                y_flat[i] = r*cosine - t*sine
-                z_flat[i] = r*sine   + t*cosine
+            self.y, self.z = _rotate(self.r, self.t, grid.t)
             self.r = None
             self.t = None
 
@@ -483,37 +554,13 @@ class Vector(object):
         if grid.shape != self.shape:
             raise NotImplementedError('make_cylindrical: grid shape mismatch'
                                       ' not supported')
-        gt_flat = grid.t.flat
-        self.r = self.x.copy()
-        self.t = self.x.copy()
-        r_flat = self.r.flat
-        t_flat = self.t.flat
-
         if axis == 'z' or self.z is None:
-            x_flat = self.x.flat
-            y_flat = self.y.flat
-            for i in range(self.x.size):
-                gt = gt_flat[i]
-                x = x_flat[i]
-                y = y_flat[i]
-                magnitude = hypot(x, y)
-                rel_theta = atan2(y, x) - gt
-                r_flat[i] = magnitude * cos(rel_theta)
-                t_flat[i] = magnitude * sin(rel_theta)
+            self.t, self.r = _rotate(self.y, self.x, grid.t)
             self.x = None
             self.y = None
 
         elif axis == 'x':
-            y_flat = self.y.flat
-            z_flat = self.z.flat
-            for i in range(self.y.size):
-                gt = gt_flat[i]
-                y = y_flat[i]
-                z = z_flat[i]
-                magnitude = hypot(y, z)
-                rel_theta = atan2(z, y) - gt
-                r_flat[i] = magnitude * cos(rel_theta)
-                t_flat[i] = magnitude * sin(rel_theta)
+            self.t, self.r = _rotate(self.z, self.y, grid.t)
             self.z = self.x
             self.x = None
             self.y = None
@@ -533,11 +580,7 @@ class Vector(object):
         if self.z is None:
             raise AttributeError('rotate_about_x: no Z component')
 
-        sine   = sin(radians(deg))
-        cosine = cos(radians(deg))
-        y_new  = self.y*cosine - self.z*sine
-        self.z = self.z*cosine + self.y*sine
-        self.y = y_new
+        self.y, self.z = _rotate(self.y, self.z, radians(deg))
 
     def rotate_about_y(self, deg):
         """
@@ -551,11 +594,7 @@ class Vector(object):
         if self.z is None:
             raise AttributeError('rotate_about_y: no Z component')
 
-        sine   = sin(radians(deg))
-        cosine = cos(radians(deg))
-        x_new  = self.x*cosine - self.z*sine
-        self.z = self.z*cosine + self.x*sine
-        self.x = x_new
+        self.x, self.z = _rotate(self.x, self.z, radians(deg))
 
     def rotate_about_z(self, deg):
         """
@@ -569,11 +608,7 @@ class Vector(object):
         if self.y is None:
             raise AttributeError('rotate_about_z: no Y component')
 
-        sine   = sin(radians(deg))
-        cosine = cos(radians(deg))
-        x_new  = self.x*cosine - self.y*sine
-        self.y = self.y*cosine + self.x*sine
-        self.x = x_new
+        self.x, self.y = _rotate(self.x, self.y, radians(deg))
 
     def promote(self):
         """ Promote from N-dimensional to N+1 dimensional index space. """
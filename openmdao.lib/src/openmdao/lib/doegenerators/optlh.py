@@ -21,8 +21,8 @@ import logging
 from random import randint, shuffle, seed
 
 # pylint: disable-msg=E0611,F0401
-from numpy import array, size, sum, floor, zeros
-from numpy.linalg import norm
+from numpy import array, size, sum, floor, zeros, ones
+from scipy.spatial.distance import pdist, cdist
 
 from openmdao.main.datatypes.api import Int, Enum
 from openmdao.main.interfaces import implements, IDOEgenerator
@@ -71,6 +71,18 @@ def is_latin_hypercube(lh):
     return True
 
 
+def _pdist(X, p):
+    """Returns the condensed p-norm distances between all pairs of rows
+    of X."""
+    return pdist(X, 'minkowski', p)
+
+
+def _cdist(X, Y, p):
+    """Returns the p-norm distances between each row of X and each row
+    of Y."""
+    return cdist(X, Y, 'minkowski', p)
+
+
 class LHC_indivudal(object):
 
     def __init__(self, doe, q=2, p=1):
@@ -79,6 +91,13 @@ class LHC_indivudal(object):
         self.doe = doe
         self.phi = None # Morris-Mitchell sampling criterion
 
+        # Sum of d**-q over all pairs of points. When this individual is a
+        # perturbation of a parent, _parent holds the parent's doe and sum
+        # along with the changed rows, so only their distances are
+        # recomputed.
+        self._dsum = None
+        self._parent = None
+
     @property
     def shape(self):
         """Size of the LatinHypercube DOE (rows,cols)."""
@@ -88,27 +107,36 @@ class LHC_indivudal(object):
         """Returns the Morris-Mitchell sampling criterion for this Latin hypercube."""
 
         if self.phi is None:
-            n,m = self.doe.shape
-            distdict = {}
+            if self._parent is not None:
+                parent_doe, parent_dsum, rows = self._parent
+                removed = self._rows_dsum(parent_doe, rows)
+                self._dsum = parent_dsum - removed + \
+                             self._rows_dsum(self.doe, rows)
+                self._parent = None
 
-            #calculate the norm between each pair of points in the DOE
-            # TODO: This norm takes up the majority of the computation time. It
-            # should be converted to C or ShedSkin.
-            arr = self.doe
-            for i in range(n):
-                for j in range(i+1, n):
-                    nrm = norm(arr[i]-arr[j], ord=self.p)
-                    distdict[nrm] = distdict.get(nrm, 0) + 1
+                # for large q a few pairs dominate the sum, so the update
+                # can lose precision when they are among the removed ones
+                if removed > 1e4*self._dsum:
+                    self._dsum = None
 
-            distinct_d = array(distdict.keys())
+            if self._dsum is None:
+                self._dsum = sum(_pdist(self.doe, self.p)**(-self.q))
 
-            #mutltiplicity array with a count of how many pairs of points have a given distance
-            J = array(distdict.values())
-
-            self.phi = sum(J*(distinct_d**(-self.q)))**(1.0/self.q)
+            self.phi = self._dsum**(1.0/self.q)
 
         return self.phi
 
+    def _rows_dsum(self, doe, rows):
+        """Returns the sum of d**-q over all pairs of points in the doe that
+        include at least one of the given rows."""
+        others = ones(doe.shape[0], dtype=bool)
+        others[rows] = False
+
+        dsum = sum(_cdist(doe[rows], doe[others], self.p)**(-self.q))
+        if len(rows) > 1:
+            dsum += sum(_pdist(doe[rows], self.p)**(-self.q))
+        return dsum
+
     def perturb(self, mutation_count):
         """ Interchanges pairs of randomly chosen elements within randomly chosen
         columns of a DOE a number of times. The result of this operation will also
@@ -116,6 +144,7 @@ class LHC_indivudal(object):
         """
         new_doe = self.doe.copy()
         n,k = self.doe.shape
+        rows = set()
         for count in range(mutation_count):
             col = randint(0, k-1)
 
@@ -127,8 +156,16 @@ class LHC_indivudal(object):
 
             new_doe[el1, col] = self.doe[el2, col]
             new_doe[el2, col] = self.doe[el1, col]
+            rows.update((el1, el2))
+
+        child = LHC_indivudal(new_doe, self.q, self.p)
+
+        # phi of the child can be updated from ours if we're evaluated and
+        # only a small part of the doe changed.
+        if self._dsum is not None and 2*len(rows) < n:
+            child._parent = (self.doe, self._dsum, sorted(rows))
 
-        return LHC_indivudal(new_doe, self.q, self.p)
+        return child
 
     def __iter__(self):
         return self._get_rows()
@@ -24,6 +24,18 @@ class TestCase(unittest.TestCase):
         self.assertTrue(is_latin_hypercube(lh_opt))
         self.assertTrue(opt_phi < phi1)
         
+    def test_mmphi_update(self):
+        for p in (1, 2):
+            for q in (1, 2, 5):
+                lh = LHC_indivudal(rand_latin_hypercube(30, 4), q, p)
+                lh.mmphi()
+                for mutations in (1, 3):
+                    lh_try = lh.perturb(mutations)
+                    self.assertTrue(lh_try._parent is not None)
+                    full = LHC_indivudal(lh_try.doe, q, p)
+                    self.assertAlmostEqual(lh_try.mmphi()/full.mmphi(), 1.0,
+                                           places=10)
+
     def test_OptLatinHypercube(self):
         olh = OptLatinHypercube()
         olh.num_samples = 10
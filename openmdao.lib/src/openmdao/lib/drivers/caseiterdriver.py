@@ -4,6 +4,7 @@
 """
 
 from cStringIO import StringIO
+import cPickle
 import gc
 import logging
 import os.path
@@ -11,12 +12,14 @@ import Queue
 import sys
 import thread
 import threading
+import time
 from uuid import uuid1, getnode
 
-from numpy import array
+from numpy import array, asarray, concatenate, ndarray, median
 
 from openmdao.main.api import Driver, VariableTree
-from openmdao.main.datatypes.api import Bool, Dict, Enum, Int
+from openmdao.main.datatypes.api import Bool, Dict, Enum, Float, Int, \
+                                        List
 from openmdao.main.exceptions import traceback_str, exception_str
 from openmdao.main.expreval import ExprEvaluator
 from openmdao.main.hasparameters import HasVarTreeParameters
@@ -55,6 +58,9 @@ class _Case(object):
         self.retries = 0    # Retry counter.
         self.exc = None     # a sys.exec_info() tuple
         self._exprs = None  # Dictionary of ExprEvaluators.
+        self.results = None # Outputs returned by a batch (see fetch_outputs).
+        self.cost = None    # Estimated cost, used for scheduling.
+        self.features = None  # Flattened inputs, used to learn costs.
 
         self._inputs = {}
         for name, value in inputs:
@@ -80,6 +86,14 @@ class _Case(object):
             self.uuid = _Case.next_uuid()
         self.parent_uuid = str(parent_uuid)  # identifier of parent case, if any
 
+    def copy(self):
+        """ Return a copy of this case, to be run on another server. """
+        case = _Case.__new__(_Case)
+        case.__dict__.update(self.__dict__)
+        case.exc = None
+        case.results = None
+        return case
+
     def _register_expr(self, name):
         """
         If the given string contains an expression, create an ExprEvaluator
@@ -114,7 +128,12 @@ class _Case(object):
         Return list of ``(name, value)`` of outputs from `scope`.
         If `extra` is True, then fetch extra case recording outputs,
         but skip `itername`, it should be handled by the caller.
+        If this case was evaluated as part of a batch, the outputs returned
+        by the server are used rather than fetching from `scope`.
         """
+        if self.results is not None:
+            return self.results[1 if extra else 0]
+
         outputs = self._extra_outputs if extra else self._outputs
         data = []
         exc = None
@@ -176,6 +195,11 @@ class _ServerData(object):
         self.top = None         # Top level object in server.
         self.state = _EMPTY     # See states above.
         self.case = None        # Current case being evaluated.
+        self.cases = None       # Current batch of cases being evaluated.
+        self.batch_size = 1     # Number of cases in last batch.
+        self.case_time = None   # Time per case in last batch.
+        self.start_time = None  # When current case(s) were started.
+        self.busy_time = 0.     # Time spent evaluating cases.
         self.exception = None   # sys.exc_info() from last operation.
 
         self.server = None      # Remote server proxy.
@@ -185,6 +209,151 @@ class _ServerData(object):
         self.load_failures = 0  # Load failure count.
 
 
+def _pack(values):
+    """
+    Return `values` as a single array if they are all numbers or numeric
+    arrays of the same shape, else return `values` unchanged.
+    """
+    for value in values:
+        if not isinstance(value, (float, int, long, ndarray)):
+            return values
+    try:
+        packed = array(values)
+    except Exception:
+        return values
+    if packed.dtype.kind not in 'biuf' or len(packed) != len(values):
+        return values
+    return packed
+
+
+def _unpack(column, index):
+    """ Return the value at `index` of a column returned by :func:`_pack`. """
+    value = column[index]
+    if isinstance(column, ndarray):
+        if column.ndim == 1:
+            value = value.item()  # Back to Python scalar.
+        else:
+            value = value.copy()  # Don't keep the whole column alive.
+    return value
+
+
+def _picklable(exc):
+    """ Return `exc`, or a RuntimeError with its message if it won't pickle. """
+    try:
+        cPickle.dumps(exc, cPickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return RuntimeError(exception_str(exc))
+    return exc
+
+
+def _exc_info(exc):
+    """ Return a ``sys.exc_info()`` tuple for `exc`, or None. """
+    if exc is None:
+        return None
+    try:
+        raise exc
+    except Exception:
+        return sys.exc_info()
+
+
+def _case_features(values):
+    """
+    Return array of flattened input `values` for each case, or None if some
+    value isn't numeric.
+    """
+    try:
+        columns = [asarray(column, dtype=float).reshape((len(column), -1))
+                   for column in values]
+        return concatenate(columns, axis=1)
+    except (TypeError, ValueError):
+        return None
+
+
+def _nearest_costs(features, history):
+    """
+    Return estimated cost for each row of `features`, the time of the nearest
+    (in scaled input space) case in `history`, a list of
+    ``(features, time)`` of previously evaluated cases.
+    """
+    ncols = features.shape[1]
+    history = [(x, t) for x, t in history if len(x) == ncols]
+    if not history:
+        return None
+
+    past = array([x for x, t in history])
+    times = array([t for x, t in history])
+    scale = past.std(axis=0)
+    scale[scale == 0] = 1.
+    past /= scale
+    costs = []
+    for row in features:
+        dist = ((past - row / scale)**2).sum(axis=1)
+        costs.append(times[dist.argmin()])
+    return costs
+
+
+class _BatchDriver(Driver):
+    """
+    Top level driver of the model replicated to servers. When `batch` is set
+    it runs all the cases in the batch back to back and returns their outputs
+    in `batch_results`, so a batch takes a single request to set up, one to
+    run, and one to retrieve results. Otherwise it runs its workflow once.
+    """
+
+    batch = Dict(iotype='in', desc='Cases to be evaluated.')
+
+    batch_results = Dict(iotype='out', desc='Outputs of evaluated cases.')
+
+    def execute(self):
+        """ Run each case in `batch`. """
+        batch = self.batch
+        if not batch:
+            super(_BatchDriver, self).execute()
+            return
+
+        scope = self.parent
+        outputs = batch['outputs']
+        extra_outputs = batch['extra_outputs']
+        names = outputs + extra_outputs
+        columns = [[] for name in names]
+        missing = []  # (case, column) pairs with no value.
+        errors = {}
+        extra_errors = {}
+
+        for i, (index, case_uuid, inputs) in enumerate(batch['cases']):
+            case = _Case(index, inputs.items(), outputs, extra_outputs,
+                         case_uuid=case_uuid)
+            try:
+                case.apply_inputs(scope, self)
+                scope.set_itername(batch['itername'], index+1)
+                self.workflow.reset()
+                self.run_iteration(case_uuid)
+            except Exception:
+                errors[i] = _picklable(sys.exc_info()[1])
+                data, extra = [], []
+            else:
+                data, exc = case.fetch_outputs(scope)
+                if exc is not None:
+                    errors[i] = _picklable(exc[1])
+                extra, exc = case.fetch_outputs(scope, extra=True)
+                if exc is not None:
+                    extra_errors[i] = _picklable(exc[1])
+
+            values = dict(data)
+            values.update(extra)
+            for j, name in enumerate(names):
+                if name in values:
+                    columns[j].append(values[name])
+                else:
+                    columns[j].append(None)
+                    missing.append((i, j))
+
+        incomplete = set(j for i, j in missing)
+        self.batch_results = dict(
+            columns=[column if j in incomplete else _pack(column)
+                     for j, column in enumerate(columns)],
+            missing=missing, errors=errors, extra_errors=extra_errors)
+
 
 @add_delegate(HasVarTreeParameters, HasVarTreeResponses)
 class CaseIteratorDriver(Driver):
@@ -217,6 +386,51 @@ class CaseIteratorDriver(Driver):
                                         ' requirements will be included in the'
                                         ' generated egg.')
 
+    batch_size = Int(1, low=1, iotype='in',
+                     desc='Maximum number of cases sent to a server in one'
+                          ' request during concurrent evaluation. Cases in'
+                          ' a batch are run back to back, the model is only'
+                          ' reloaded between batches.')
+
+    batch_time = Float(1.0, low=0.0, iotype='in', units='s',
+                       desc='Target time for evaluating a batch. Batch sizes'
+                            ' grow from one case toward batch_size based on'
+                            ' the observed time per case. If zero, batches'
+                            ' are always batch_size cases.')
+
+    schedule = Enum('FIFO', values=('FIFO', 'LONGEST_FIRST'), iotype='in',
+                    desc='Order in which cases are started. LONGEST_FIRST'
+                         ' starts the cases with the largest estimated cost'
+                         ' first, using case_costs if set, else the times of'
+                         ' the most similar cases from earlier executions.')
+
+    case_costs = List(Float, iotype='in',
+                      desc='Estimated relative cost of each case, used by'
+                           ' LONGEST_FIRST scheduling.')
+
+    speculate = Bool(False, iotype='in',
+                     desc='If True, a server with nothing left to do starts'
+                          ' another copy of the case that is most overdue on'
+                          ' another server. The first result to arrive is'
+                          ' kept. Not done for batches.')
+
+    speculate_factor = Float(2.0, low=1.0, iotype='in',
+                             desc='A case is overdue, and may be run'
+                                  ' speculatively, once it has taken this many'
+                                  ' times its expected time. That is its'
+                                  ' estimated cost from earlier executions,'
+                                  ' else the median time of the cases done so'
+                                  ' far, scaled by case_costs if set.')
+
+    max_cost_history = Int(1000, low=0, iotype='in',
+                           desc='Number of case timings kept for estimating'
+                                ' costs of future cases.')
+
+    server_utilization = Dict(iotype='out',
+                              desc='Fraction of the last execution that each'
+                                   ' server spent evaluating cases, keyed by'
+                                   ' server name.')
+
     def __init__(self, *args, **kwargs):
         super(CaseIteratorDriver, self).__init__(*args, **kwargs)
         self._iter = None  # Set to None when iterator is empty.
@@ -236,6 +450,11 @@ class CaseIteratorDriver(Driver):
 
         self._todo = []   # Cases grabbed during server startup.
         self._rerun = []  # Cases that failed and should be retried.
+        self._executing = {}     # Servers running each case, by index.
+        self._completed = set()  # Indices of cases that are done.
+        self._case_times = []    # (time, cost) of cases done so far.
+        self._idle = []          # Servers waiting for a case to be overdue.
+        self._cost_history = []  # (features, time) of evaluated cases.
         self._generation = 0  # Used to keep worker names unique.
 
         # var wasn't showing up in parent depgraph without this
@@ -265,6 +484,7 @@ class CaseIteratorDriver(Driver):
         Uses :meth:`setup` and :meth:`resume` with default arguments.
         """
         self._setup()
+        start = time.time()
 
         try:
             if self.sequential:
@@ -288,6 +508,7 @@ class CaseIteratorDriver(Driver):
                 self._logger.info('Start concurrent evaluation.')
                 self._start()
         finally:
+            self._update_utilization(time.time() - start)
             self._cleanup()
 
         if self._abort_exc is not None:
@@ -325,7 +546,7 @@ class CaseIteratorDriver(Driver):
             # various workflow quantities.
             replicant = self.parent.copy()
             workflow = replicant.get(self.name+'.workflow')
-            driver = replicant.add('driver', Driver())
+            driver = replicant.add('driver', _BatchDriver())
             workflow.parent = driver
             workflow.scope = None
             replicant.driver.workflow = workflow
@@ -362,9 +583,56 @@ class CaseIteratorDriver(Driver):
                                parent_uuid=self._case_uuid))
         self.init_responses(length)
 
+        if cases and self.max_cost_history:
+            features = _case_features(inp_values)
+            if features is not None:
+                for case, row in zip(cases, features):
+                    case.features = row
+
+        if self.schedule == 'LONGEST_FIRST':
+            self._estimate_costs(cases)
+            cases.sort(key=lambda case: case.cost, reverse=True)
+
+        self._seq_server.busy_time = 0.
         self._iter = iter(cases)
         self._abort_exc = None
 
+    def _estimate_costs(self, cases):
+        """
+        Set `cost` of each case from ``case_costs`` if set, otherwise from
+        the timings of the most similar cases previously evaluated.
+        """
+        if self.case_costs:
+            if len(self.case_costs) != len(cases):
+                self.raise_exception('case_costs has %d entries, expecting %d'
+                                     % (len(self.case_costs), len(cases)),
+                                     ValueError)
+            for case, cost in zip(cases, self.case_costs):
+                case.cost = cost
+            return
+
+        costs = None
+        if cases and cases[0].features is not None:
+            features = array([case.features for case in cases])
+            costs = _nearest_costs(features, self._cost_history)
+
+        if costs is None:  # Nothing to go on, keep the given order.
+            costs = [0.] * len(cases)
+        for case, cost in zip(cases, costs):
+            case.cost = cost
+
+    def _update_utilization(self, wall_time):
+        """ Set ``server_utilization`` for an execution of `wall_time`. """
+        now = time.time()
+        utilization = {}
+        for server in self._servers.values():
+            busy = server.busy_time
+            if server.state == _EXECUTING and server.start_time is not None:
+                busy += now - server.start_time  # Abandoned copy.
+            name = server.name or 'sequential'
+            utilization[name] = min(busy / wall_time, 1.) if wall_time else 0.
+        self.server_utilization = utilization
+
     def _start(self):
         """ Start evaluating cases concurrently. """
         # Need credentials in case we're using a PublicKey server.
@@ -394,12 +662,9 @@ class CaseIteratorDriver(Driver):
                 break
 
             # Get next case. Limits servers started if max_servers > cases.
-            try:
-                case = self._iter.next()
-            except StopIteration:
-                if not self._rerun:
-                    self._iter = None
-                    break
+            case = self._next_case()
+            if case is None:
+                break
 
             self._todo.append(case)
 
@@ -454,7 +719,10 @@ class CaseIteratorDriver(Driver):
 
         # Continue until no servers are busy.
         while self._busy():
-            if self._more_to_go():
+            if self._idle:
+                # Wake up when the next case would be overdue.
+                timeout = self._speculate_wait()
+            elif self._more_to_go():
                 timeout = None
             else:
                 # Don't wait indefinitely for a server we don't need.
@@ -463,8 +731,12 @@ class CaseIteratorDriver(Driver):
                 timeout = 60
             try:
                 name, result, exc = self._reply_q.get(timeout=timeout)
-            # Hard to force worker to hang, which is handled here.
-            except Queue.Empty:  # pragma no cover
+            except Queue.Empty:
+                if self._idle:
+                    self._speculate_idle()
+                    continue
+
+                # Hard to force worker to hang, which is handled here.
                 msgs = []
                 for name, server in self._servers.items():
                     if server.in_use:
@@ -485,6 +757,8 @@ class CaseIteratorDriver(Driver):
             else:
                 server = self._servers[name]
                 server.in_use = self._server_ready(server)
+                if self._idle:
+                    self._speculate_idle()
 
         # Shut-down (started) servers.
         self._logger.debug('Shut-down (started) servers')
@@ -492,15 +766,24 @@ class CaseIteratorDriver(Driver):
         for server in self._servers.values():
             if server.queue is not None:
                 server.queue.put(None)
-                n_queues += 1
-        for i in range(n_queues):
+                if self._abandoned(server):
+                    # Don't wait, its thread will release the server when
+                    # the case finishes.
+                    self._logger.debug('Abandoning %r', server.name)
+                    server.queue = None
+                else:
+                    n_queues += 1
+        while n_queues:
             try:
                 name, status, exc = self._reply_q.get(True, 60)
             # Hard to force worker to hang, which is handled here.
             except Queue.Empty:  # pragma no cover
-                pass
+                n_queues -= 1
             else:
-                self._servers[name].queue = None
+                server = self._servers[name]
+                if server.queue is not None:  # Else late abandoned reply.
+                    server.queue = None
+                    n_queues -= 1
         # Hard to force worker to hang, which is handled here.
         for server in self._servers.values():  # pragma no cover
             if server.queue is not None:
@@ -508,12 +791,20 @@ class CaseIteratorDriver(Driver):
                                      server.name)
 
     def _busy(self):
-        """ Return True while at least one server is in use. """
+        """
+        Return True while at least one server is in use, other than those
+        running copies of cases that are already done.
+        """
         for server in self._servers.values():
-            if server.in_use:
+            if server.in_use and not self._abandoned(server):
                 return True
         return False
 
+    def _abandoned(self, server):
+        """ Return True if `server` is running a case that's already done. """
+        return server.state == _EXECUTING and server.case is not None and \
+               server.case.index in self._completed
+
     def _cleanup(self):
         """
         Cleanup internal state, and egg file if necessary.
@@ -527,6 +818,10 @@ class CaseIteratorDriver(Driver):
         self._seq_server.top = None  # Avoid leak.
         self._todo = []
         self._rerun = []
+        self._executing = {}
+        self._completed = set()
+        self._case_times = []
+        self._idle = []
 
         if self._egg_file and os.path.exists(self._egg_file):
             os.remove(self._egg_file)
@@ -564,32 +859,16 @@ class CaseIteratorDriver(Driver):
                         in_use = False
 
         elif state == _EXECUTING:
-            case = server.case
-            server.case = None
-            if server.exception is None:
-                # Grab the results from the model and record.
-                try:
-                    self._record_case(server.top, case)
-                except Exception as exc:
-                    msg = 'Exception recording case: %s' % exc
-                    self._logger.debug('    %s', msg)
-                    self._logger.debug('%s', case)
-                    case.msg = '%s: %s' % (self.get_pathname(), msg)
+            if server.cases is None:
+                cases = [server.case]
             else:
-                self._logger.debug('    exception while executing: %r', server.exception[1])
-                case.exc = server.exception
-
-            if case.exc is not None:
-                if self.error_policy == 'ABORT':
-                    if self._abort_exc is None:
-                        self._abort_exc = case.exc
-                    self._stop = True
-                elif case.retries < self.max_retries:
-                    case.exc = None
-                    case.retries += 1
-                    self._rerun.append(case)
-                else:
-                    self._logger.error('Too many retries for %s', case)
+                cases = server.cases
+            server.case = server.cases = None
+            elapsed = time.time() - server.start_time
+            server.busy_time += elapsed
+            server.start_time = None
+            for case in cases:
+                self._case_done(server, case, elapsed / len(cases))
 
             # Set up for next case.
             in_use = self._start_processing(server, reload=True)
@@ -624,6 +903,61 @@ class CaseIteratorDriver(Driver):
 
         return in_use
 
+    def _case_done(self, server, case, elapsed):
+        """
+        Record results of `case` and handle any error. `elapsed` is the time
+        the case took. Results of a case that another server has already
+        completed are discarded.
+        """
+        servers = self._executing.get(case.index, [])
+        if server in servers:
+            servers.remove(server)
+        if not servers:
+            self._executing.pop(case.index, None)
+
+        if case.index in self._completed:
+            self._logger.debug('    discard case %s, already done', case.index)
+            return
+        if servers and (server.exception is not None or case.exc is not None):
+            self._logger.debug('    case %s failed, still running elsewhere',
+                               case.index)
+            return
+        self._completed.add(case.index)
+
+        if server.exception is None:
+            # Grab the results from the model and record.
+            try:
+                self._record_case(server.top, case)
+            except Exception as exc:
+                msg = 'Exception recording case: %s' % exc
+                self._logger.debug('    %s', msg)
+                self._logger.debug('%s', case)
+                case.msg = '%s: %s' % (self.get_pathname(), msg)
+        else:
+            self._logger.debug('    exception while executing: %r', server.exception[1])
+            case.exc = server.exception
+        case.results = None
+
+        if case.exc is None:
+            self._case_times.append((elapsed, case.cost))
+
+        if case.exc is not None:
+            if self.error_policy == 'ABORT':
+                if self._abort_exc is None:
+                    self._abort_exc = case.exc
+                self._stop = True
+            elif case.retries < self.max_retries:
+                case.exc = None
+                case.retries += 1
+                self._completed.discard(case.index)
+                self._rerun.append(case)
+            else:
+                self._logger.error('Too many retries for %s', case)
+
+        elif case.features is not None and self.max_cost_history:
+            self._cost_history.append((case.features, elapsed))
+            del self._cost_history[:-self.max_cost_history]
+
     def _more_to_go(self):
         """ Return True if there's more work to do. """
         if self._stop:
@@ -632,6 +966,8 @@ class CaseIteratorDriver(Driver):
             return True
         if self._iter is not None:
             return True
+        if self.speculate and self._straggler() is not None:
+            return True
         return False
 
     def _start_processing(self, server, reload=False):
@@ -655,6 +991,11 @@ class CaseIteratorDriver(Driver):
                 self._load_model(server)
                 server.state = _LOADING
                 in_use = True
+        elif self.speculate and any(self._single_runs()):
+            # A case may be overdue later.
+            self._logger.debug('    wait for a straggler')
+            self._idle.append(server)
+            in_use = True
         else:
             self._logger.debug('    no more cases')
             server.state = _EMPTY
@@ -662,31 +1003,144 @@ class CaseIteratorDriver(Driver):
         return in_use
 
     def _start_next_case(self, server):
-        """ Look for the next case and start it. """
+        """ Look for the next case (or batch of cases) and start it. """
+
+        if server.queue is not None and self.batch_size > 1:
+            size = self._next_batch_size(server)
+            cases = []
+            while len(cases) < size:
+                case = self._next_case()
+                if case is None:
+                    break
+                cases.append(case)
+            if cases:
+                self._logger.debug('    run batch of %d cases', len(cases))
+                return self._run_batch(cases, server)
+            self._logger.debug('    no more cases')
+            return False
 
-        if self._todo:
-            self._logger.debug('    run startup case')
-            case = self._todo.pop(0)
-            in_use = self._run_case(case, server)
-        elif self._rerun:
-            self._logger.debug('    rerun case')
-            case = self._rerun.pop(0)
-            in_use = self._run_case(case, server)
-        elif self._iter is None:
+        case = self._next_case()
+        if case is None and self.speculate:
+            case = self._straggler()
+            if case is not None:
+                # The original is still being filled in by its server.
+                case = case.copy()
+                self._logger.debug('    speculatively run case %s', case.index)
+        if case is None:
             self._logger.debug('    no more cases')
-            in_use = False
-        else:
+            return False
+
+        self._logger.debug('    run case %s', case.index)
+        return self._run_case(case, server)
+
+    def _next_case(self):
+        """ Return the next case to be run, or None. """
+        if self._todo:
+            return self._todo.pop(0)
+        if self._rerun:
+            return self._rerun.pop(0)
+        if self._iter is not None:
             try:
-                case = self._iter.next()
+                return self._iter.next()
             except StopIteration:
-                self._logger.debug('    no more cases')
                 self._iter = None
-                in_use = False
+        return None
+
+    def _single_runs(self):
+        """
+        Generate ``(case, server)`` for each case that is running on just
+        one server.
+        """
+        for index, servers in self._executing.items():
+            if len(servers) != 1 or index in self._completed:
+                continue
+            server = servers[0]
+            if server.case is None or server.start_time is None:
+                continue  # Batch, or not started yet.
+            yield server.case, server
+
+    def _expected_time(self, case):
+        """
+        Return the time `case` is expected to take, or None if there's
+        nothing to go on yet.
+        """
+        if case.cost and not self.case_costs:
+            return case.cost  # From the times of earlier executions.
+        if not self._case_times:
+            return None
+        if case.cost:
+            rates = [elapsed / cost for elapsed, cost in self._case_times
+                     if cost]
+            if rates:
+                return case.cost * median(rates)
+        return median([elapsed for elapsed, cost in self._case_times])
+
+    def _straggler(self):
+        """
+        Return the case running on a single server which is most overdue
+        relative to its expected time, or None. A case isn't overdue until
+        it has taken ``speculate_factor`` times its expected time.
+        """
+        now = time.time()
+        straggler = None
+        worst = self.speculate_factor
+        for case, server in self._single_runs():
+            expected = self._expected_time(case)
+            if not expected:
+                continue
+            overdue = (now - server.start_time) / expected
+            if overdue > worst:
+                straggler = case
+                worst = overdue
+        return straggler
+
+    def _speculate_wait(self):
+        """
+        Return the time until the next case running on a single server is
+        overdue, checking at least once a second.
+        """
+        now = time.time()
+        wait = 1.
+        for case, server in self._single_runs():
+            expected = self._expected_time(case)
+            if expected:
+                due = server.start_time + self.speculate_factor * expected
+                wait = min(wait, due - now)
+        return max(wait, 0.01)
+
+    def _speculate_idle(self):
+        """
+        Start cases, such as overdue ones, on idle servers. Idle servers are
+        released once no case can become overdue.
+        """
+        while self._idle:
+            if self._more_to_go():
+                server = self._idle.pop(0)
+                server.in_use = self._start_processing(server, reload=True)
+                if server.state == _LOADING:
+                    break  # Its case is chosen once it's loaded.
+            elif not self._stop and any(self._single_runs()):
+                break
             else:
-                self._logger.debug('    run next case')
-                in_use = self._run_case(case, server)
+                for server in self._idle:
+                    self._logger.debug('server %r: no more cases', server.name)
+                    server.state = _EMPTY
+                    server.in_use = False
+                self._idle = []
 
-        return in_use
+    def _next_batch_size(self, server):
+        """
+        Return the number of cases to send to `server` next. Batches start
+        with a single case, then are sized so they take about `batch_time`,
+        growing by at most a factor of two each time.
+        """
+        if self.batch_time <= 0:
+            return self.batch_size
+        if server.case_time is None:
+            return 1
+        size = int(self.batch_time / max(server.case_time, 1e-6))
+        size = min(size, 2 * server.batch_size, self.batch_size)
+        return max(size, 1)
 
     def _run_case(self, case, server):
         """ Setup and start a case. Returns True if started. """
@@ -708,10 +1162,30 @@ class CaseIteratorDriver(Driver):
             return self._start_processing(server)
 
         server.case = case
+        server.start_time = time.time()
+        self._executing.setdefault(case.index, []).append(server)
         self._model_execute(server)
         server.state = _EXECUTING
         return True
 
+    def _run_batch(self, cases, server):
+        """ Setup and start a batch of cases. Returns True if started. """
+        for case in cases:
+            case.exc = None
+            case.results = None
+            case.uuid = _Case.next_uuid()
+            case.parent_uuid = self._case_uuid
+
+        server.cases = cases
+        server.batch_size = len(cases)
+        server.start_time = time.time()
+        for case in cases:
+            self._executing.setdefault(case.index, []).append(server)
+        server.exception = None
+        server.queue.put((self._remote_batch_execute, server))
+        server.state = _EXECUTING
+        return True
+
     def _record_case(self, scope, case):
         """
         Record case data from `scope` in ``case_outputs``.
@@ -879,3 +1353,47 @@ class CaseIteratorDriver(Driver):
                                ' PID %d on %s: %r',
                                server.info['name'], server.info['pid'],
                                server.info['host'], exc)
+
+    def _remote_batch_execute(self, server):
+        """
+        Execute a batch of cases in remote server. The case inputs are sent
+        in a single request, and all outputs are returned in a single reply
+        with numeric outputs packed into arrays.
+        """
+        cases = server.cases
+        outputs = cases[0]._outputs
+        itername = '%s.workflow.itername' % self.name
+        extra_outputs = [name for name in cases[0]._extra_outputs
+                         if name != itername]
+        batch = dict(itername=self.get_itername(),
+                     outputs=outputs, extra_outputs=extra_outputs,
+                     cases=[(case.index, case.uuid, case._inputs)
+                            for case in cases])
+        start = time.time()
+        try:
+            server.top.set('driver.batch', batch)
+            server.top.run()
+            results = server.top.get('driver.batch_results')
+        except Exception as exc:
+            server.exception = sys.exc_info()
+            self._logger.error('Caught exception from server %r,'
+                               ' PID %d on %s: %r',
+                               server.info['name'], server.info['pid'],
+                               server.info['host'], exc)
+            return
+        server.case_time = (time.time() - start) / len(cases)
+
+        columns = results['columns']
+        missing = set(results['missing'])
+        names = outputs + extra_outputs
+        nout = len(outputs)
+        for i, case in enumerate(cases):
+            data = []
+            extra = []
+            for j, name in enumerate(names):
+                if (i, j) not in missing:
+                    value = _unpack(columns[j], i)
+                    (data if j < nout else extra).append((name, value))
+            case.results = ((data, _exc_info(results['errors'].get(i))),
+                            (extra, _exc_info(results['extra_errors'].get(i))))
+            case.exc = case.results[0][1]
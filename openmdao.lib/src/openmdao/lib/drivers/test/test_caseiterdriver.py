@@ -30,8 +30,12 @@ from openmdao.main.datatypes.api import Float, Bool, Array, Int, Str, \
 from openmdao.lib.casehandlers.api import ListCaseRecorder
 from openmdao.lib.drivers.api import CaseIteratorDriver, SimpleCaseIterDriver, \
                                      SLSQPdriver
+from openmdao.lib.drivers.caseiterdriver import _nearest_costs, _Case, \
+                                               _ServerData
 
 from openmdao.main.case import Case, CaseTreeNode
+from openmdao.main.resource import ResourceAllocationManager as RAM, \
+                                  LocalAllocator
 
 from openmdao.test.cluster import init_cluster
 
@@ -174,6 +178,37 @@ class TreeModel(Assembly):
         self.driver.workflow.add('driver1')
 
 
+_EXECUTED = []  # Values of x in order of execution by TimedComponent.
+
+
+class TimedComponent(Component):
+    """ Takes x/50 seconds to run. """
+
+    x = Float(iotype='in')
+    y = Float(iotype='out')
+
+    def execute(self):
+        _EXECUTED.append(self.x)
+        time.sleep(self.x / 50.)
+        self.y = 2. * self.x
+
+
+class StragglerComponent(Component):
+    """ The first execution on any server is slow. """
+
+    x = Float(iotype='in')
+    y = Float(iotype='out')
+    flag = Str(iotype='in', desc='Created by first execution.')
+
+    def execute(self):
+        if os.path.exists(self.flag):
+            time.sleep(0.1)
+        else:
+            open(self.flag, 'w').close()
+            time.sleep(5)
+        self.y = 2. * self.x
+
+
 class TestCase(unittest.TestCase):
     """ Test CaseIteratorDriver. """
 
@@ -248,10 +283,29 @@ class TestCase(unittest.TestCase):
         self.model.driver.extra_resources = {'allocator': name}
         self.run_cases(sequential=False)
 
-    def run_cases(self, sequential, forced_errors=False, retry=True):
+    def test_concurrent_batch(self):
+        logging.debug('')
+        logging.debug('test_concurrent_batch')
+        init_cluster(encrypted=True, allow_shell=True)
+        self.model.driver.batch_time = 0  # Fixed size batches.
+        self.run_cases(sequential=False, batch_size=4)
+
+    def test_concurrent_batch_errors(self):
+        logging.debug('')
+        logging.debug('test_concurrent_batch_errors')
+        init_cluster(encrypted=True, allow_shell=True)
+        self.generate_cases(force_errors=True)
+        self.run_cases(sequential=False, forced_errors=True, retry=False,
+                       batch_size=4)
+        self.run_cases(sequential=False, forced_errors=True, retry=True,
+                       batch_size=4)
+
+    def run_cases(self, sequential, forced_errors=False, retry=True,
+                  batch_size=1):
         """ Evaluate cases, either sequentially or across multiple servers. """
         driver = self.model.driver
         driver.sequential = sequential
+        driver.batch_size = batch_size
         if not sequential:
             # Try to ensure more than one worker is used.
             self.model.driven.sleep = 0.2
@@ -503,6 +557,109 @@ class TestCase(unittest.TestCase):
         for i, name in enumerate(roots[0].iternames()):
             self.assertEqual(name, expected[i])
 
+    def timed_model(self, comp):
+        """ Return model which runs cases through `comp`. """
+        top = set_as_top(Assembly())
+        top.add('comp', comp)
+        driver = top.add('driver', CaseIteratorDriver())
+        driver.workflow.add('comp')
+        driver.add_parameter('comp.x')
+        driver.add_response('comp.y')
+        return top
+
+    def test_longest_first(self):
+        logging.debug('')
+        logging.debug('test_longest_first')
+        top = self.timed_model(TimedComponent())
+        driver = top.driver
+        driver.case_inputs.comp.x = [3., 1., 4., 0., 2.]
+        driver.schedule = 'LONGEST_FIRST'
+
+        # Given costs.
+        driver.case_costs = [0., 1., 2., 3., 4.]
+        del _EXECUTED[:]
+        top.run()
+        self.assertEqual(_EXECUTED, [2., 0., 4., 1., 3.])
+        self.assertEqual(driver.case_outputs.comp.y, [6., 2., 8., 0., 4.])
+        self.assertEqual(driver.server_utilization.keys(), ['sequential'])
+
+        # Costs learned from the run above.
+        driver.case_costs = []
+        driver.case_inputs.comp.x = [1.1, 3.1, 0.1, 4.1, 2.1]
+        del _EXECUTED[:]
+        top.run()
+        self.assertEqual(_EXECUTED, [4.1, 3.1, 2.1, 1.1, 0.1])
+        self.assertEqual(driver.case_outputs.comp.y, [2.2, 6.2, 0.2, 8.2, 4.2])
+
+        driver.case_costs = [1.]
+        assert_raises(self, 'top.run()', globals(), locals(), ValueError,
+                      'driver: case_costs has 1 entries, expecting 5')
+
+    def test_nearest_costs(self):
+        history = [(asarray([0., 100.]), 1.), (asarray([1., 0.]), 2.),
+                   (asarray([0.]), 3.)]  # Different parameters.
+        features = asarray([[0.1, 90.], [0.9, 10.], [0.4, 0.]])
+        self.assertEqual(_nearest_costs(features, history), [1., 2., 2.])
+        self.assertEqual(_nearest_costs(features, history[2:]), None)
+
+    def test_speculate(self):
+        logging.debug('')
+        logging.debug('test_speculate')
+        RAM.add_allocator(LocalAllocator('SpeculateHost', total_cpus=3,
+                                         max_load=100., allow_shell=True))
+        try:
+            top = self.timed_model(StragglerComponent())
+            top.comp.flag = os.path.join(self.tempdir, 'straggler')
+            driver = top.driver
+            driver.sequential = False
+            driver.reload_model = False
+            driver.speculate = True
+            driver.extra_resources = {'allocator': 'SpeculateHost'}
+            driver.case_inputs.comp.x = [float(i) for i in range(6)]
+            top.run()
+            done = time.time()
+        finally:
+            RAM.remove_allocator('SpeculateHost')
+
+        self.assertEqual(driver.case_outputs.comp.y,
+                         [2. * i for i in range(6)])
+        # Didn't wait for the slow first execution.
+        self.assertTrue(done - os.path.getmtime(top.comp.flag) < 4)
+        self.assertEqual(len(driver.server_utilization), 3)
+        for utilization in driver.server_utilization.values():
+            self.assertTrue(0. < utilization <= 1.)
+
+    def test_speculate_factor(self):
+        driver = CaseIteratorDriver()
+        case = _Case(0, [('comp.x', 1.)], ['comp.y'], None)
+        server = _ServerData('server')
+        server.case = case
+        server.start_time = time.time() - 1.
+        driver._executing = {0: [server]}
+
+        # Nothing to go on yet.
+        self.assertEqual(driver._straggler(), None)
+
+        # Expected to take 0.6 seconds, so not overdue until 1.2.
+        driver._case_times = [(0.5, None), (0.6, None), (2., None)]
+        self.assertEqual(driver._straggler(), None)
+        driver.speculate_factor = 1.5
+        self.assertTrue(driver._straggler() is case)
+
+        # Relative case_costs scale the median time per unit cost.
+        driver.case_costs = [2.]
+        case.cost = 2.
+        driver._case_times = [(0.5, 1.), (1., 4.), (2., 4.)]
+        self.assertEqual(driver._expected_time(case), 1.)
+        self.assertEqual(driver._straggler(), None)
+
+        # A speculative copy doesn't share results with the original.
+        case.exc = 'failed'
+        copy = case.copy()
+        self.assertEqual(copy.index, 0)
+        self.assertEqual(copy.exc, None)
+        self.assertEqual(case.exc, 'failed')
+
     def test_noflat(self):
 
         class A(Component):
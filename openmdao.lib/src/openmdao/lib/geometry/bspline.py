@@ -1,14 +1,12 @@
-import cPickle
-import os.path
+import numpy as np
+
+from numpy import linspace, hstack
 
-from numpy import linspace, hstack, dstack, less ,less_equal, logical_and, \
-    array, empty, matrix, dot
-    
-from scipy.optimize import fsolve, newton
 from scipy.sparse import csr_matrix
 
-class Bspline(object): 
-    def __init__(self,controls,points,order=3): #controls and points are 2-d arrays of points 
+
+class Bspline(object):
+    def __init__(self,controls,points,order=3): #controls and points are 2-d arrays of points
 
         self.controls = controls
         self.order = order
@@ -17,99 +15,114 @@ class Bspline(object):
         self.knots =  hstack(([0,]*(self.degree),
                               hstack((linspace(0,1,self.n-self.order+2),[1,]*(self.degree)))
                              ))
-        self.__b_cache = {} #uses for memoizing the b_jn function
-        self.max_x = max(points[:,0]) 
-
-        #see if we can 
-        h1 = str(hash(tuple(points.flatten()))).replace("-","n")
-        h2 = str(hash(tuple(controls.flatten()))).replace("-","n")
-        pkl_file_name = "%s__%s.bspline_pkl"%(h1,h2)
-        pkl_folder = "pyBspline_pkl"
-        pkl_file_name = os.path.join(pkl_folder,pkl_file_name)
-        if not os.path.exists(pkl_folder): 
-            os.mkdir(pkl_folder)
-        if os.path.exists(pkl_file_name): 
-
-            self.B = cPickle.load(open(pkl_file_name))
-        else: 
-            self.B = self._calc_jacobian(points)
-            cPickle.dump(self.B,open(pkl_file_name,'w'))
-
-   
-    def _calc_jacobian(self,points):                       
-        #pre-calculate the B matrix
-        n_p = points.shape[0]
-        B = matrix(empty((n_p,self.n))) #1 row per point, one column per control_point
-        
-        r = range(0,self.n)
-        for i,p in enumerate(points): 
-            t = self.find(p[0])
-            for j in r: 
-                B[i,j] = self.b_jn_wrapper(j,self.degree,t)    
-                
-        #self.B = csr_matrix(B)
-        self.B = B
-        return self.B
-                    
+        self.max_x = max(points[:,0])
+
+        self.B = self._calc_jacobian(points)
+
+    def _calc_jacobian(self,points):
+        """returns the sparse B matrix, 1 row per point, one column per
+        control point"""
+        return self.basis(self.find(points[:,0]))
+
     def calc(self,C,points=None):
         self.controls = C
-        if points: 
+        if points is not None:
             self.B = self._calc_jacobian(points)
-            
-        return array(self.B.dot(C))     
-                    
-     
-    def find(self,X):
-        """returns the parametric coordinate that matches the given x location""" 
-        
-        try:     
-            return array([fsolve(lambda f: self(f)[:,0][0] - x,[x/self.max_x,],xtol=1e-5) for x in X])[:,0]
-        except TypeError:
-            return fsolve(lambda f: self(f)[:,0] - X,[X/self.max_x,],xtol=1e-5)
-                 
-        
-    def b_jn(self,j,n,t):         
-        t_j   = self.knots[j]
-        t_j1  = self.knots[j+1]
-        t_jn  = self.knots[j+n]
-        t_jn1 = self.knots[j+n+1]
-        
-        if n==0:       
-            return logical_and(less_equal(t_j,t),less(t,t_j1))                
-        
-        if t_jn-t_j:     
-            q1 = (t-t_j)/(t_jn-t_j)
-        else: 
-            q1 = 0    
-            
-        if t_jn1-t_j1: 
-            q2 = (t_jn1-t)/(t_jn1-t_j1)
-        else: 
-            q2 = 0
-                
-        B = q1*self.b_jn(j,n-1,t) + q2*self.b_jn(j+1,n-1,t)   
-        
-        return B
-        
-    #dirty hack to fix some weird corner case that shows up    
-    def b_jn_wrapper(self,j,n,t): 
-        tuple_t = tuple(t)
-        try: 
-            return self.__b_cache[(j,n,tuple_t)]
-        except KeyError:     
-            B = self.b_jn(j,n,t)
-            if j == self.n-1: 
-                try: 
-                    B[t==1]=1 #anywhere t=1, set B = 1
-                except TypeError: 
-                    B = 1   
-            self.__b_cache[(j,n,tuple_t)] = B         
-            return B 
-        
-    def __call__(self,t): 
-        rng = range(0,self.n)
-        b = [self.b_jn_wrapper(i,self.degree,t) for i in rng]
-        X = dot(self.controls[:,0],b)
-        Y = dot(self.controls[:,1],b)
-        return dstack((X,Y))[0]     
-        
\ No newline at end of file
+
+        return self.B.dot(C)
+
+    def _span(self,t):
+        """returns the index of the knot span containing each value of t"""
+        span = np.searchsorted(self.knots,t,side='right')-1
+        return np.clip(span,self.degree,self.n-1)
+
+    def _basis_funs(self,t,span,degree):
+        """Cox-de Boor recursion for all of the t values at once. Returns an
+        array with the degree+1 non-zero basis functions of each t, which
+        belong to controls span-degree through span."""
+        knots = self.knots
+        N = np.empty((len(t),degree+1))
+        left = np.empty((len(t),degree+1))
+        right = np.empty((len(t),degree+1))
+        N[:,0] = 1.
+        for j in xrange(1,degree+1):
+            left[:,j] = t-knots[span+1-j]
+            right[:,j] = knots[span+j]-t
+            saved = 0.
+            for r in xrange(j):
+                temp = N[:,r]/(right[:,r+1]+left[:,j-r])
+                N[:,r] = saved+right[:,r+1]*temp
+                saved = left[:,j-r]*temp
+            N[:,j] = saved
+        return N
+
+    def basis(self,t):
+        """returns a sparse (len(t),n) matrix of the basis functions evaluated
+        at each parametric coordinate in t"""
+        t = np.atleast_1d(np.asarray(t,dtype=np.float64))
+        span = self._span(t)
+        N = self._basis_funs(t,span,self.degree)
+
+        indices = span[:,np.newaxis]+np.arange(-self.degree,1)
+        indptr = np.arange(0,N.size+1,self.order)
+        return csr_matrix((N.ravel(),indices.ravel(),indptr),
+                          shape=(len(t),self.n))
+
+    def find(self,X,xtol=1e-12,maxiter=50):
+        """returns the parametric coordinate that matches the given x location.
+        All of the locations are solved together with a Newton iteration that
+        falls back to bisection whenever a step leaves the bracket."""
+        X = np.asarray(X,dtype=np.float64)
+        x = np.atleast_1d(X).ravel()
+
+        cx = np.asarray(self.controls[:,0],dtype=np.float64)
+        sign = 1. if cx[-1] >= cx[0] else -1.
+        tol = xtol*max(np.max(np.abs(cx)),1.)
+        p = self.degree
+
+        #divided differences of the controls give the derivative curve
+        dcx = np.zeros(self.n)
+        if p:
+            i = np.arange(1,self.n)
+            dcx[1:] = p*(cx[1:]-cx[:-1])/(self.knots[i+p]-self.knots[i])
+
+        t = np.zeros(x.shape)
+        if cx[-1] != cx[0]:
+            t = np.clip((x-cx[0])/(cx[-1]-cx[0]),0.,1.)
+        lo = np.zeros(x.shape)
+        hi = np.ones(x.shape)
+
+        active = np.arange(len(x))
+        cols = np.arange(-p,1)
+        for i in xrange(maxiter):
+            ta = t[active]
+            span = self._span(ta)
+            N = self._basis_funs(ta,span,p)
+            f = (N*cx[span[:,np.newaxis]+cols]).sum(axis=1)-x[active]
+
+            not_done = np.abs(f) > tol
+            active, ta, span, f = active[not_done], ta[not_done], span[not_done], f[not_done]
+            if not len(active):
+                break
+
+            lo[active] = np.where(sign*f < 0, ta, lo[active])
+            hi[active] = np.where(sign*f > 0, ta, hi[active])
+
+            if p:
+                dN = self._basis_funs(ta,span,p-1)
+                df = (dN*dcx[span[:,np.newaxis]+cols[1:]]).sum(axis=1)
+            else:
+                df = np.zeros(f.shape)
+
+            with np.errstate(divide='ignore',invalid='ignore'):
+                step = ta-f/df
+            bad = ~np.logical_and(step > lo[active],step < hi[active])
+            step[bad] = .5*(lo[active]+hi[active])[bad]
+            t[active] = step
+
+        if X.ndim == 0:
+            return t
+        return t.reshape(X.shape)
+
+    def __call__(self,t):
+        return self.basis(t).dot(self.controls[:,:2])
@@ -81,21 +81,18 @@ class Body(object):
 
         #sgrab the theta values from the points 
         self.Theta = self.P[:,2]
-        #this is too complex. shouldn't need to tile, then flatten later.
-        self.sin_theta = np.tile(np.sin(self.Theta),(self.n_controls,1)).T.flatten()
-        self.cos_theta = np.tile(np.cos(self.Theta),(self.n_controls,1)).T.flatten()
-        # self.sin_theta = np.tile(np.sin(self.Theta),self.n_controls)
-        # self.cos_theta = np.tile(np.cos(self.Theta),self.n_controls)
+        sin_theta = np.sin(self.Theta)[:,np.newaxis]
+        cos_theta = np.cos(self.Theta)[:,np.newaxis]
 
         #calculate derivatives
-        #in polar coordinates
-        self.dP_bar_xqdC = np.array(self.x_mag*self.bs.B.flatten())
-        self.dP_bar_rqdC = np.array(self.r_mag*self.bs.B.flatten())
+        #in polar coordinates, kept sparse like B
+        B = self.bs.B
+        dP_bar_rqdC = self.r_mag*B
 
         #Project Polar derivatives into revolved cartisian coordinates
-        self.dXqdC = self.dP_bar_xqdC.reshape(-1,self.n_controls)
-        self.dYqdC = (self.dP_bar_rqdC*self.sin_theta).reshape(-1,self.n_controls)
-        self.dZqdC = (self.dP_bar_rqdC*self.cos_theta).reshape(-1,self.n_controls)
+        self.dXqdC = self.x_mag*B
+        self.dYqdC = dP_bar_rqdC.multiply(sin_theta).tocsr()
+        self.dZqdC = dP_bar_rqdC.multiply(cos_theta).tocsr()
 
     def copy(self): 
         return copy.deepcopy(self)
@@ -208,41 +205,36 @@ class Shell(object):
 
 
         self.outer_theta = self.Po[:,2]
-        self.sin_outer_c_theta = np.tile(np.sin(self.outer_theta),(self.n_c_controls,1)).T.flatten()
-        self.cos_outer_c_theta = np.tile(np.cos(self.outer_theta),(self.n_c_controls,1)).T.flatten()
-        self.sin_outer_t_theta = np.tile(np.sin(self.outer_theta),(self.n_t_controls,1)).T.flatten()
-        self.cos_outer_t_theta = np.tile(np.cos(self.outer_theta),(self.n_t_controls,1)).T.flatten()
+        sin_outer_theta = np.sin(self.outer_theta)[:,np.newaxis]
+        cos_outer_theta = np.cos(self.outer_theta)[:,np.newaxis]
 
         self.inner_theta = self.Pi[:,2]
-        self.sin_inner_c_theta = np.tile(np.sin(self.inner_theta),(self.n_c_controls,1)).T.flatten()
-        self.cos_inner_c_theta = np.tile(np.cos(self.inner_theta),(self.n_c_controls,1)).T.flatten()
-        self.sin_inner_t_theta = np.tile(np.sin(self.inner_theta),(self.n_t_controls,1)).T.flatten()
-        self.cos_inner_t_theta = np.tile(np.cos(self.inner_theta),(self.n_t_controls,1)).T.flatten()
+        sin_inner_theta = np.sin(self.inner_theta)[:,np.newaxis]
+        cos_inner_theta = np.cos(self.inner_theta)[:,np.newaxis]
 
         #calculate derivatives
-        #in polar coordinates
-        self.dPo_bar_xqdCc = np.array(self.x_mag*self.bsc_o.B.flatten())
-        self.dPo_bar_rqdCc = np.array(self.r_mag*self.bsc_o.B.flatten())
+        #in polar coordinates, kept sparse like B
+        Bc_o = self.bsc_o.B
+        Bc_i = self.bsc_i.B
+        dPo_bar_rqdCc = self.r_mag*Bc_o
+        dPi_bar_rqdCc = self.r_mag*Bc_i
 
-        self.dPi_bar_xqdCc = np.array(self.x_mag*self.bsc_i.B.flatten())
-        self.dPi_bar_rqdCc = np.array(self.r_mag*self.bsc_i.B.flatten())
-
-        self.dPo_bar_rqdCt = np.array(self.r_mag*self.bst_o.B.flatten())
-        self.dPi_bar_rqdCt = -1*np.array(self.r_mag*self.bst_i.B.flatten())
+        dPo_bar_rqdCt = self.r_mag*self.bst_o.B
+        dPi_bar_rqdCt = -1*(self.r_mag*self.bst_i.B)
 
         #Project Polar derivatives into revolved cartisian coordinates
-        self.dXoqdCc = self.dPo_bar_xqdCc.reshape(-1,self.n_c_controls)
-        self.dYoqdCc = (self.dPo_bar_rqdCc*self.sin_outer_c_theta).reshape(-1,self.n_c_controls)
-        self.dZoqdCc = (self.dPo_bar_rqdCc*self.cos_outer_c_theta).reshape(-1,self.n_c_controls)
-
-        self.dXiqdCc = self.dPi_bar_xqdCc.reshape(-1,self.n_c_controls)
-        self.dYiqdCc = (self.dPi_bar_rqdCc*self.sin_inner_c_theta).reshape(-1,self.n_c_controls)
-        self.dZiqdCc = (self.dPi_bar_rqdCc*self.cos_inner_c_theta).reshape(-1,self.n_c_controls)
-
-        self.dYoqdCt = (self.dPo_bar_rqdCt*self.sin_outer_t_theta).reshape(-1,self.n_t_controls)
-        self.dZoqdCt = (self.dPo_bar_rqdCt*self.cos_outer_t_theta).reshape(-1,self.n_t_controls)
-        self.dYiqdCt = (self.dPi_bar_rqdCt*self.sin_inner_t_theta).reshape(-1,self.n_t_controls)
-        self.dZiqdCt = (self.dPi_bar_rqdCt*self.cos_inner_t_theta).reshape(-1,self.n_t_controls)
+        self.dXoqdCc = self.x_mag*Bc_o
+        self.dYoqdCc = dPo_bar_rqdCc.multiply(sin_outer_theta).tocsr()
+        self.dZoqdCc = dPo_bar_rqdCc.multiply(cos_outer_theta).tocsr()
+
+        self.dXiqdCc = self.x_mag*Bc_i
+        self.dYiqdCc = dPi_bar_rqdCc.multiply(sin_inner_theta).tocsr()
+        self.dZiqdCc = dPi_bar_rqdCc.multiply(cos_inner_theta).tocsr()
+
+        self.dYoqdCt = dPo_bar_rqdCt.multiply(sin_outer_theta).tocsr()
+        self.dZoqdCt = dPo_bar_rqdCt.multiply(cos_outer_theta).tocsr()
+        self.dYiqdCt = dPi_bar_rqdCt.multiply(sin_inner_theta).tocsr()
+        self.dZiqdCt = dPi_bar_rqdCt.multiply(cos_inner_theta).tocsr()
 
     def copy(self): 
         return copy.deepcopy(self)
@@ -1,8 +1,10 @@
 import struct
 import copy
-import time
-import cPickle
+import hashlib
 import os
+import tempfile
+
+from cStringIO import StringIO
 
 import numpy as np
 
@@ -30,6 +32,12 @@ ASCII_FACET = """  facet normal  {face[0]:e}  {face[1]:e}  {face[2]:e}
 BINARY_HEADER ="80sI"
 BINARY_FACET = "12fH"
 
+# One binary facet: normal, 3 vertices, attribute byte count.
+_BINARY_FACET_DTYPE = np.dtype([('data', '<f4', (12,)), ('attr', '<u2')])
+
+# Bump when the cached data changes.
+_CACHE_VERSION = '1'
+
 
 def parse_ascii_stl(f):
     """expects a filelike object, and returns a nx12 array. One row for every facet in the STL file."""
@@ -62,115 +70,140 @@ def parse_ascii_stl(f):
     return np.array(facets)
 
 def parse_binary_stl(f):
+    """expects a filelike object (or the contents of the file as a string),
+    and returns a nx12 array. One row for every facet in the STL file."""
 
-    header,n_triangles = struct.unpack(BINARY_HEADER,f.read(84))
+    data = f if isinstance(f, basestring) else f.read()
+    header,n_triangles = struct.unpack(BINARY_HEADER,data[:84])
 
-    facets = []
+    facets = np.frombuffer(data, dtype=_BINARY_FACET_DTYPE,
+                           count=n_triangles, offset=84)
+    return facets['data'].astype(float)
 
-    for i in xrange(0,n_triangles):
-        facet = struct.unpack(BINARY_FACET,f.read(50))
-        facets.append(facet[:12])
 
-    return np.array(facets)
+def _is_binary_stl(data):
+    """returns True if `data` (file contents) is a binary STL. Some binary
+    files have headers starting with 'solid', so check the size too."""
+
+    if len(data) < 84:
+        return False
+    n_triangles = struct.unpack('<I', data[80:84])[0]
+    if len(data) == 84 + n_triangles*_BINARY_FACET_DTYPE.itemsize:
+        return True
+    return data.lstrip()[:5] != 'solid'
+
+
+def unique_points(points):
+    """given an (n,3) array of points, returns the unique points in order of
+    first appearance and, for each point, its index in the unique points."""
+
+    # Adding 0. makes -0. and 0. compare equal.
+    keys = np.ascontiguousarray(points + 0.)
+    keys = keys.view(np.dtype((np.void, keys.dtype.itemsize*keys.shape[1])))
+    _, first, inverse = np.unique(keys.ravel(), return_index=True,
+                                  return_inverse=True)
+
+    # np.unique sorts, renumber in order of first appearance.
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return points[first[order]], rank[inverse]
 
 
 class STL(object):
     """Manages the points extracted from an STL file"""
 
-    def __init__(self,stl_file):
-        """given an stl file object, imports points and reshapes array to an
-        array of n_facetsx3 points."""
+    _cached = ('facets', 'stl_indecies', 'points', 'point_indecies',
+               'triangles')
 
-        if not hasattr(stl_file,'readline'):
-            stl_file_name = stl_file
-            stl_file = open(stl_file,'rb')
+    def __init__(self,stl_file,cache_dir="pyBspline_pkl"):
+        """given an stl file object or file name, imports points and reshapes
+        array to an array of n_facetsx3 points.
+
+        The results are cached in `cache_dir` under a hash of the file's
+        contents, so the cache can be shared between runs. If `cache_dir` is
+        None, no cache is used."""
+
+        if not hasattr(stl_file,'read'):
+            with open(stl_file,'rb') as inp:
+                data = inp.read()
         else:
-            stl_file_name = stl_file.name
-
-        #check for a pickle, to skip all the loading calcs if possible
-        last_edited = time.ctime(os.path.getmtime(stl_file_name))
-        h1 = str(hash(last_edited)).replace('-','n')
-        h2 = str(hash(stl_file_name)).replace('-','n')
-        pkl_file_name = '%s_%s.stl_pkl'%(h1,h2)
-        pkl_folder = "pyBspline_pkl"
-        pkl_file_name = os.path.join(pkl_folder,pkl_file_name)
-        if not os.path.exists(pkl_folder):
-            os.mkdir(pkl_folder)
-
-        if os.path.exists(pkl_file_name):
-            self.facets, self.stl_i0, self.stl_i1, self.p_count, self.stl_indecies, \
-            self.stl_i0, self.points, self.point_indecies, \
-            self.triangles = cPickle.load(open(pkl_file_name))
-            return
-
-        ascii = (stl_file.readline().strip().split()[0] == 'solid')
-        stl_file.seek(0)
-
-        if ascii:
-            self.facets = parse_ascii_stl(stl_file)
+            data = stl_file.read()
+
+        #check for a cached copy, to skip all the loading calcs if possible
+        cache_file_name = None
+        if cache_dir is not None:
+            key = hashlib.sha1(_CACHE_VERSION)
+            key.update(data)
+            cache_file_name = os.path.join(cache_dir,
+                                           '%s.stl.npz' % key.hexdigest())
+            if self._load_cache(cache_file_name):
+                return
+
+        if _is_binary_stl(data):
+            self.facets = parse_binary_stl(data)
         else:
-            self.facets = parse_binary_stl(stl_file)
-
-        #list of points and the associated index from the facet array
-        points = []
-        stl_indecies = []
-        point_indecies = [] #same size as stl_indecies, but points to locations in the points data
+            self.facets = parse_ascii_stl(StringIO(data))
+        n_facets = len(self.facets)
 
         #stl files have duplicate points, which we don't want to compute on
         #so instead we keep a mapping between duplicates and their index in
-        #the point array
-        point_locations = {}
-        triangles = [] #used to track connectivity information
-
-        #extract the 9 points from each facet into one 3*n_facets set of (x,y,z)
-        #    points and keep track of the original indcies at the same time so
-        #    I can reconstruct the stl file later
-        column = np.arange(3,12,dtype=np.int)
-        row_base = np.ones(9,dtype=np.int)
-
-        p_count = 0 #I'm using this to avoid calling len(points) a lot
-        for i,facet in enumerate(self.facets):
-            row = row_base*i
-            ps = facet[3:].reshape((3,3))
-            triangle = []
-            for p in ps:
-                t_p = tuple(p)
-                try:
-                    p_index = point_locations[t_p]
-                    point_indecies.append(p_index) #we already have that point, so just point back to it
-                    triangle.append(p_index)
-                except KeyError:
-                    points.append(p)
-                    point_locations[t_p] = p_count
-                    point_indecies.append(p_count)
-                    triangle.append(p_count)
-                    p_count += 1
-            triangles.append(tuple(triangle))
-
-            index = np.vstack((row_base*i,column)).T.reshape((3,3,2))
-            stl_indecies.extend(index)
-
-        self.p_count = p_count
-        self.stl_indecies = np.array(stl_indecies)
-        #just need to re-shape these for the assignment call later
-        self.stl_i0 = self.stl_indecies[:,:,0]
-        self.stl_i1 = self.stl_indecies[:,:,1]
-        self.points = np.array(points)
-        self.point_indecies = point_indecies
-        self.triangles = np.array(triangles)
-
-        #pickle for efficiency, instead of re-doing the load every time
-        pkl_data = (self.facets,
-            self.stl_i0,
-            self.stl_i1,
-            self.p_count,
-            self.stl_indecies,
-            self.stl_i0,
-            self.points,
-            self.point_indecies,
-            self.triangles)
-
-        cPickle.dump(pkl_data,open(pkl_file_name,'w'))
+        #the point array. point_indecies has one entry per facet vertex.
+        self.points, self.point_indecies = \
+            unique_points(self.facets[:,3:].reshape((-1,3)))
+        self.triangles = self.point_indecies.reshape((n_facets,3)) #used to track connectivity information
+
+        #the (facet, column) of each vertex coordinate, so I can reconstruct
+        #    the stl file later
+        stl_i0 = np.repeat(np.arange(n_facets),9).reshape((-1,3))
+        stl_i1 = np.tile(np.arange(3,12).reshape((3,3)),(n_facets,1))
+        self.stl_indecies = np.dstack((stl_i0,stl_i1))
+
+        if cache_file_name is not None:
+            self._save_cache(cache_file_name)
+
+    @property
+    def p_count(self):
+        return len(self.points)
+
+    @property
+    def stl_i0(self):
+        return self.stl_indecies[:,:,0]
+
+    @property
+    def stl_i1(self):
+        return self.stl_indecies[:,:,1]
+
+    def _load_cache(self, file_name):
+        """loads data cached by _save_cache, returns False if unavailable"""
+
+        try:
+            with np.load(file_name) as cached:
+                for name in self._cached:
+                    setattr(self, name, cached[name])
+        except Exception:
+            return False
+        return True
+
+    def _save_cache(self, file_name):
+        """saves loading results to file_name. The file is written under a
+        temporary name and then renamed, so other processes never see a
+        partial file."""
+
+        cache_dir = os.path.dirname(file_name)
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            fd, tmp_name = tempfile.mkstemp(suffix='.npz', dir=cache_dir)
+            with os.fdopen(fd, 'wb') as out:
+                np.savez(out, **dict([(name, getattr(self, name))
+                                      for name in self._cached]))
+            if os.path.exists(file_name):
+                os.remove(tmp_name) #someone else got there first
+            else:
+                os.rename(tmp_name, file_name)
+        except (IOError, OSError):
+            pass #caching is just an optimization
 
 
     def copy(self):
@@ -2,6 +2,7 @@ import struct
 import string
 
 import numpy as np
+from scipy import sparse
 
 from stl import ASCII_FACET, BINARY_HEADER, BINARY_FACET
 
@@ -13,19 +14,13 @@ from openmdao.lib.geometry.geom_data import GeomData
 
 
 
+# Number of points whose derivatives writeFEPOINT makes dense at a time.
+_FEPOINT_BLOCK = 1000
+
+
 def _block_diag(arrays):
-    """ Create block-diagonal matrix from `arrays`. """
-    result = None
-    for arr in arrays:
-        arr[arr == -0] = 0  # Clean -0 for compatibilty with scipy version.
-        if result is None:
-            result = arr
-        else:
-            r_rows, r_cols = result.shape
-            a_rows, a_cols = arr.shape
-            result = np.vstack((np.hstack((result, np.zeros((r_rows, a_cols)))),
-                                np.hstack((np.zeros((a_rows, r_cols)), arr))))
-    return result
+    """ Create sparse block-diagonal matrix from `arrays`. """
+    return sparse.block_diag(arrays, format='csr')
 
 
 class STLGroup(Component):
@@ -237,23 +232,28 @@ class STLGroup(Component):
         j_cols =  (nx+nr+nt)
 
 
-        for i,p in enumerate(self.points):
-            line = "%.8f %.8f %.8f %d "%(p[0],p[1],p[2],i+1) #x,y,z,index coordiantes of point
+        #the jacobians are sparse, so only a block of rows is made dense
+        #at a time
+        for start in xrange(0, self.n_points, _FEPOINT_BLOCK):
+            stop = min(start+_FEPOINT_BLOCK, self.n_points)
 
-            #deriv_values = self.J[i]
-            deriv_values = np.zeros((j_cols,))
-            deriv_values[:nx:3] = self.dXqdC[i]
+            #deriv_values = self.J[start:stop]
+            deriv_values = np.zeros((stop-start, j_cols))
+            deriv_values[:,:nx:3] = self.dXqdC[start:stop].toarray()
 
             #leave x as zero
-            deriv_values[nx+1:nx+nr:3] = self.dYqdCr[i]
-            deriv_values[nx+2:nx+nr:3] = self.dZqdCr[i]
+            deriv_values[:,nx+1:nx+nr:3] = self.dYqdCr[start:stop].toarray()
+            deriv_values[:,nx+2:nx+nr:3] = self.dZqdCr[start:stop].toarray()
 
             #leave x as zero
-            deriv_values[nx+nr+1::3] = self.dYqdCt[i]
-            deriv_values[nx+nr+2::3] = self.dZqdCt[i]
+            deriv_values[:,nx+nr+1::3] = self.dYqdCt[start:stop].toarray()
+            deriv_values[:,nx+nr+2::3] = self.dZqdCt[start:stop].toarray()
 
-            line += " ".join(np.char.mod('%.8f',deriv_values))
-            lines.append(line)
+            for i in xrange(start, stop):
+                p = self.points[i]
+                line = "%.8f %.8f %.8f %d "%(p[0],p[1],p[2],i+1) #x,y,z,index coordiantes of point
+                line += " ".join(np.char.mod('%.8f',deriv_values[i-start]))
+                lines.append(line)
 
         for tri in self.triangles:
             line = "%d %d %d %d"%(tri[0]+1,tri[1]+1,tri[2]+1,tri[2]+1) #tecplot wants 1 bias indecies
@@ -345,15 +345,15 @@ class STLGroup(Component):
                 #zeros for thickness n_pointsx1
                 shape = comp.dXqdC.shape
                 param_name = "%s.thickness"%comp.name #note: this parameter does not exists, so I'll remove the columns from the jacobian
-                jyt.append(np.zeros((shape[0],1)))
-                jzt.append(np.zeros((shape[0],1)))
+                jyt.append(sparse.csr_matrix((shape[0],1)))
+                jzt.append(sparse.csr_matrix((shape[0],1)))
                 param_J_offset_map[param_name] = t_offset
                 t_offset += 1
 
             else:
                 #inner and outer jacobians
                 #have to stack the outer and inner jacobians
-                stackX = np.vstack((comp.dXoqdCc, comp.dXiqdCc))
+                stackX = sparse.vstack((comp.dXoqdCc, comp.dXiqdCc))
                 jx.append(stackX)
                 param_name = "%s.X"%comp.name
                 param_J_offset_map[param_name] = x_offset
@@ -361,8 +361,8 @@ class STLGroup(Component):
                 x_offset += nCx
 
                 #centerline
-                stackY = np.vstack((comp.dYoqdCc, comp.dYiqdCc))
-                stackZ = np.vstack((comp.dZoqdCc, comp.dZiqdCc))
+                stackY = sparse.vstack((comp.dYoqdCc, comp.dYiqdCc))
+                stackZ = sparse.vstack((comp.dZoqdCc, comp.dZiqdCc))
                 jyr.append(stackY) #constant tip radius
                 jzr.append(stackZ)
                 param_name = "%s.R"%comp.name
@@ -371,8 +371,8 @@ class STLGroup(Component):
                 yz_offset += nCr
 
                 #thickness
-                stackY = np.vstack((comp.dYoqdCt, comp.dYiqdCt))
-                stackZ = np.vstack((comp.dZoqdCt, comp.dZiqdCt))
+                stackY = sparse.vstack((comp.dYoqdCt, comp.dYiqdCt))
+                stackZ = sparse.vstack((comp.dZoqdCt, comp.dZiqdCt))
                 jyt.append(stackY) #constant tip radius
                 jzt.append(stackZ)
                 param_name = "%s.thickness"%comp.name
@@ -407,13 +407,14 @@ class STLGroup(Component):
                 self.param_J_map[param_name] = (False, self.dYqdCt[:,offset:offset+nCt], self.dZqdCt[:,offset:offset+nCt])
 
         #go through and remove the extra columns from fake body thicknesses
+        keep = np.ones(t_offset, dtype=bool)
         for comp in self._comps:
             if isinstance(comp, Body):
                 param_name = "%s.thickness"%comp.name
-                offset = param_J_offset_map[param_name]
+                keep[param_J_offset_map[param_name]] = False
 
-                self.dYqdCt = np.delete(self.dYqdCt,offset,1)
-                self.dZqdCt = np.delete(self.dZqdCt,offset,1)
+        self.dYqdCt = self.dYqdCt[:,np.flatnonzero(keep)]
+        self.dZqdCt = self.dZqdCt[:,np.flatnonzero(keep)]
 
         self._needs_linerize = False
 
@@ -0,0 +1,55 @@
+"""
+Testing the B-spline basis and parameter inversion.
+"""
+
+import unittest
+
+import numpy as np
+
+from openmdao.lib.geometry.bspline import Bspline
+
+
+def b_jn(knots, j, n, t):
+    """ Reference Cox-de Boor recursion for a single basis function. """
+    if n == 0:
+        return 1. if knots[j] <= t < knots[j+1] else 0.
+    q1 = q2 = 0.
+    if knots[j+n]-knots[j]:
+        q1 = (t-knots[j])/(knots[j+n]-knots[j])
+    if knots[j+n+1]-knots[j+1]:
+        q2 = (knots[j+n+1]-t)/(knots[j+n+1]-knots[j+1])
+    return q1*b_jn(knots, j, n-1, t) + q2*b_jn(knots, j+1, n-1, t)
+
+
+class TestcaseBspline(unittest.TestCase):
+
+    def setUp(self):
+        self.C = np.array(zip(np.linspace(2., 12., 7), np.zeros(7)))
+        self.x = np.hstack((2., np.random.uniform(2., 12., 50), 12.))
+        self.bs = Bspline(self.C, np.vstack((self.x, self.x)).T)
+
+    def test_basis(self):
+        t = np.linspace(0, 1, 23)
+        B = self.bs.basis(t).toarray()
+        self.assertEqual(B.shape, (23, 7))
+        np.testing.assert_allclose(B.sum(axis=1), 1.)
+
+        expected = [[b_jn(self.bs.knots, j, self.bs.degree, v)
+                     for j in range(7)] for v in t[:-1]]
+        np.testing.assert_allclose(B[:-1], expected, atol=1e-14)
+        np.testing.assert_array_equal(B[-1], [0, 0, 0, 0, 0, 0, 1])
+
+    def test_find(self):
+        t = self.bs.find(self.x)
+        self.assertEqual(t.shape, self.x.shape)
+        self.assertEqual(t[0], 0.)
+        self.assertEqual(t[-1], 1.)
+        np.testing.assert_allclose(self.bs(t)[:, 0], self.x, atol=1e-10)
+        np.testing.assert_allclose(self.bs.calc(self.C)[:, 0], self.x,
+                                   atol=1e-10)
+
+        self.assertEqual(self.bs.find(7.).shape, (1,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import shutil
 import unittest
 
 import numpy as np
+from scipy import sparse
 
 from openmdao.main.api import Component, Assembly, set_as_top
 from openmdao.main.datatypes.api import Float, Array
@@ -42,6 +43,7 @@ class TestFFDDerivatives(unittest.TestCase):
 
         n_c = 5
         body = Body(plug,controls=n_c) #just makes n_C evenly spaced points
+        self.assertTrue(sparse.isspmatrix_csr(body.dYqdC))
 
         step = 1
         f0 = body.stl.points.copy()
@@ -56,7 +58,7 @@ class TestFFDDerivatives(unittest.TestCase):
             f1 = body.stl.points.copy()
 
             dfdx = (f1-f0)/step
-            deriv_checkX = np.all(np.abs(body.dXqdC[:,i] - dfdx[:,0]) < 1e-6)
+            deriv_checkX = np.all(np.abs(body.dXqdC[:,i].toarray()[:,0] - dfdx[:,0]) < 1e-6)
 
             self.assertTrue(deriv_checkX)
 
@@ -71,8 +73,8 @@ class TestFFDDerivatives(unittest.TestCase):
 
             dfdx = (f1-f0)/step
             #deriv_checkX = np.all(np.abs(body.dXqdC[:,i] - dfdx[:,0]) < 1e-6)
-            deriv_checkY = np.all(np.abs(body.dYqdC[:,i] - dfdx[:,1]) < 1e-6)
-            deriv_checkZ = np.all(np.abs(body.dZqdC[:,i] - dfdx[:,2]) < 1e-6)
+            deriv_checkY = np.all(np.abs(body.dYqdC[:,i].toarray()[:,0] - dfdx[:,1]) < 1e-6)
+            deriv_checkZ = np.all(np.abs(body.dZqdC[:,i].toarray()[:,0] - dfdx[:,2]) < 1e-6)
 
             #self.assertTrue(deriv_checkX)
             self.assertTrue(deriv_checkY)
@@ -86,6 +88,7 @@ class TestFFDDerivatives(unittest.TestCase):
         n_c = 5
         step = 1
         shell = Shell(cowl,cowl.copy(),n_c,n_c)
+        self.assertTrue(sparse.isspmatrix_csr(shell.dZiqdCt))
 
         f0_outer = shell.outer_stl.points.copy()
         f0_inner = shell.inner_stl.points.copy()
@@ -100,7 +103,7 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_outer = shell.outer_stl.points.copy()
 
             dfdx_outer = (f1_outer-f0_outer)/step
-            deriv_checkX_outer = np.all(np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) < 1e-6)
+            deriv_checkX_outer = np.all(np.abs(shell.dXoqdCc[:,i].toarray()[:,0] - dfdx_outer[:,0]) < 1e-6)
             #print np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) 
 
             self.assertTrue(deriv_checkX_outer)
@@ -108,10 +111,10 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_inner = shell.inner_stl.points.copy()
 
             dfdx_inner = (f1_inner-f0_inner)/step
-            deriv_checkX_inner = np.all(np.abs(shell.dXiqdCc[:,i] - dfdx_inner[:,0]) < 1e-6)
+            deriv_checkX_inner = np.all(np.abs(shell.dXiqdCc[:,i].toarray()[:,0] - dfdx_inner[:,0]) < 1e-6)
             #print np.abs(shell.dXiqdCc[:,i] - dfdx_inner[:,0]) 
 
-            self.assertTrue(np.any(shell.dXiqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dXiqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkX_inner)
 
         #y,z derivatives centerline
@@ -124,25 +127,25 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_outer = shell.outer_stl.points.copy()
 
             dfdx_outer = (f1_outer-f0_outer)/step
-            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCc[:,i] - dfdx_outer[:,1]) < 1e-6)
-            deriv_checkZ_outer = np.all(np.abs(shell.dZiqdCc[:,i] - dfdx_outer[:,2]) < 1e-6)
+            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCc[:,i].toarray()[:,0] - dfdx_outer[:,1]) < 1e-6)
+            deriv_checkZ_outer = np.all(np.abs(shell.dZiqdCc[:,i].toarray()[:,0] - dfdx_outer[:,2]) < 1e-6)
             #print np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) 
 
-            self.assertTrue(np.any(shell.dYoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYoqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkY_outer)
-            self.assertTrue(np.any(shell.dZoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZoqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkZ_outer)
 
             f1_inner = shell.inner_stl.points.copy()
 
             dfdx_inner = (f1_inner-f0_inner)/step
-            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCc[:,i] - dfdx_inner[:,1]) < 1e-6)
-            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCc[:,i] - dfdx_inner[:,2]) < 1e-6)
+            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCc[:,i].toarray()[:,0] - dfdx_inner[:,1]) < 1e-6)
+            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCc[:,i].toarray()[:,0] - dfdx_inner[:,2]) < 1e-6)
             #print np.abs(shell.dXiqdCc[:,i] - dfdx_inner[:,0]) 
 
-            self.assertTrue(np.any(shell.dYiqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYiqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkY_inner)
-            self.assertTrue(np.any(shell.dZiqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZiqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkZ_inner)
 
         #y,z derivatives thickness
@@ -155,25 +158,25 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_outer = shell.outer_stl.points.copy()
 
             dfdx_outer = (f1_outer-f0_outer)/step
-            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCt[:,i] - dfdx_outer[:,1]) < 1e-6)
-            deriv_checkZ_outer = np.all(np.abs(shell.dZoqdCt[:,i] - dfdx_outer[:,2]) < 1e-6)
+            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCt[:,i].toarray()[:,0] - dfdx_outer[:,1]) < 1e-6)
+            deriv_checkZ_outer = np.all(np.abs(shell.dZoqdCt[:,i].toarray()[:,0] - dfdx_outer[:,2]) < 1e-6)
             #print np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) 
 
-            self.assertTrue(np.any(shell.dYoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYoqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkY_outer)
-            self.assertTrue(np.any(shell.dZoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZoqdCc[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkZ_outer)
 
             f1_inner = shell.inner_stl.points.copy()
 
             dfdx_inner = (f1_inner-f0_inner)/step
-            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCt[:,i] - dfdx_inner[:,1]) < 1e-6)
-            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCt[:,i] - dfdx_inner[:,2]) < 1e-6)
+            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCt[:,i].toarray()[:,0] - dfdx_inner[:,1]) < 1e-6)
+            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCt[:,i].toarray()[:,0] - dfdx_inner[:,2]) < 1e-6)
 
 
-            self.assertTrue(np.any(shell.dYiqdCt[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYiqdCt[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkY_inner)
-            self.assertTrue(np.any(shell.dZiqdCt[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZiqdCt[:,i].toarray()[:,0] > 0.001))
             self.assertTrue(deriv_checkZ_inner)
 
 if __name__ == "__main__": 
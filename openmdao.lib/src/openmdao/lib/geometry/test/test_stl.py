@@ -0,0 +1,73 @@
+"""
+Testing loading of STL files.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from openmdao.lib.geometry import stl
+
+
+class TestcaseSTL(unittest.TestCase):
+
+    def setUp(self):
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_stl-')
+        os.chdir(self.tempdir)
+
+        # Two triangles sharing an edge, one vertex given as -0.
+        self.facets = np.array([
+            [0., 0., 1., 0., 0., 0., 1., 0., 0., 0., 1., 0.],
+            [0., 0., 1., 1., 0., 0., 1., 1., 0., -0., 1., 0.],
+        ])
+        geom = stl.STL.__new__(stl.STL)
+        geom.facets = self.facets
+        with open('ascii.stl', 'w') as out:
+            out.write('\n'.join(geom._build_ascii_stl()))
+        with open('binary.stl', 'wb') as out:
+            out.write(''.join(geom._build_binary_stl()))
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        try:
+            shutil.rmtree(self.tempdir)
+        except OSError:
+            pass
+
+    def test_load(self):
+        for name in ('ascii.stl', 'binary.stl'):
+            geom = stl.STL(name, cache_dir=None)
+            np.testing.assert_array_equal(geom.facets, self.facets)
+            self.assertEqual(geom.p_count, 4)
+            np.testing.assert_array_equal(geom.points,
+                                          [[0., 0., 0.], [1., 0., 0.],
+                                           [0., 1., 0.], [1., 1., 0.]])
+            np.testing.assert_array_equal(geom.triangles, [[0, 1, 2],
+                                                           [1, 3, 2]])
+            np.testing.assert_array_equal(geom.get_facets(), self.facets)
+
+    def test_cache(self):
+        geom = stl.STL('binary.stl', cache_dir='cache')
+        self.assertEqual(len(os.listdir('cache')), 1)
+
+        # Cache is keyed on contents, not file name.
+        shutil.copy('binary.stl', 'copy.stl')
+        cached = stl.STL('copy.stl', cache_dir='cache')
+        self.assertEqual(len(os.listdir('cache')), 1)
+        for name in ('facets', 'points', 'point_indecies', 'triangles',
+                     'stl_indecies'):
+            np.testing.assert_array_equal(getattr(cached, name),
+                                          getattr(geom, name))
+
+        points = cached.points * 2.
+        cached.update_points(points)
+        np.testing.assert_array_equal(cached.get_facets()[:, 3:6],
+                                      points[cached.triangles[:, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
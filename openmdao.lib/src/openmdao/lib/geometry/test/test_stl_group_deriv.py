@@ -255,7 +255,7 @@ class TestcaseSTLGroup(unittest.TestCase):
 
                 FDx = ((p1-p0)/step)[:,0]
 
-                Ax = Jx[:,i]
+                Ax = Jx[:,i].toarray()[:,0]
 
                 #print "%s[%d]"%(param,i), not np.any(np.abs(FDx - Ax) > .00001)
                 self.assertTrue(np.all(np.abs(FDx - Ax) < .00001))
@@ -279,8 +279,8 @@ class TestcaseSTLGroup(unittest.TestCase):
                 FDy = ((p1-p0)/step)[:,1]
                 FDz = ((p1-p0)/step)[:,2]
 
-                Ay = Jy[:,i]
-                Az = Jz[:,i]
+                Ay = Jy[:,i].toarray()[:,0]
+                Az = Jz[:,i].toarray()[:,0]
 
                 #print "%s[%d]"%(param,i), not np.any(np.abs(FDy - Ay) > .00001), not np.any(np.abs(FDz - Az) > .00001)
                 self.assertTrue(np.all(np.abs(FDy - Ay) < .00001))
@@ -305,8 +305,8 @@ class TestcaseSTLGroup(unittest.TestCase):
                 FDy = ((p1-p0)/step)[:,1]
                 FDz = ((p1-p0)/step)[:,2]
 
-                Ay = Jy[:,i]
-                Az = Jz[:,i]
+                Ay = Jy[:,i].toarray()[:,0]
+                Az = Jz[:,i].toarray()[:,0]
 
                 #print "%s[%d]"%(param,i), not np.any(np.abs(FDy - Ay) > .00001), not np.any(np.abs(FDz - Az) > .00001)
 
@@ -1,15 +1,16 @@
 """ Surrogate model based on Kriging. """
-from math import log, e, sqrt
+from math import log, sqrt
 
 # pylint: disable-msg=E0611,F0401
 from numpy import array, zeros, dot, ones, eye, abs, vstack, exp, \
-                  sum, log10
+                  sum, log10, sqrt as vsqrt, log as vlog, newaxis, diag, \
+                  outer, triu_indices, triu, concatenate
 from numpy.linalg import det, linalg, lstsq
-from scipy.linalg import cho_factor, cho_solve
+from scipy.linalg import cho_factor, cho_solve, cholesky, solve_triangular
 from scipy.optimize import minimize
 
 from openmdao.main.api import Container
-from openmdao.main.interfaces import implements, ISurrogate
+from openmdao.main.interfaces import implements, IIncrementalSurrogate
 from openmdao.main.uncertain_distributions import NormalDistribution
 
 
@@ -17,7 +18,7 @@ class KrigingSurrogate(Container):
     """Surrogate Modeling method based on the simple Kriging interpolation.
     Predictions are returned as a NormalDistribution instance."""
 
-    implements(ISurrogate)
+    implements(IIncrementalSurrogate)
 
     def __init__(self):
         super(KrigingSurrogate, self).__init__()
@@ -27,10 +28,30 @@ class KrigingSurrogate(Container):
         self.thetas = None
         self.nugget = 0     # nugget smoothing parameter from [Sasena, 2002]
 
+        # scipy.optimize.minimize method used to find the thetas. COBYLA
+        # is derivative free; bounded gradient methods such as 'L-BFGS-B'
+        # or 'SLSQP' use the analytic log-likelihood gradient.
+        self.training_method = 'COBYLA'
+
+        # number of add_training_points calls (with fixed thetas) after
+        # which the thetas are re-optimized on the full training set
+        self.full_retrain_interval = 10
+        self._n_updates = 0
+
         self.R = None
         self.R_fact = None
         self.mu = None
         self.log_likelihood = None
+        self.log_likelihood_grad = None
+
+        # squared per-dimension distances between each pair of training
+        # points, in the upper triangular order given by _pairs
+        self._pairs = None
+        self._sqdists = None
+
+        # solves against Y - mu and one, cached for batch prediction
+        self._alpha = None
+        self._Rinv_one = None
 
     def get_uncertain_value(self, value):
         """Returns a NormalDistribution centered around the value, with a
@@ -91,6 +112,44 @@ class KrigingSurrogate(Container):
         dist = NormalDistribution(f, RMSE)
         return dist
 
+    def predict_batch(self, X_new):
+        """Calculates predicted values of the response for a whole set of
+        points at once, based on the current trained model.
+
+        X_new: (n_points, n_inputs) array_like
+            Points at which the model is evaluated.
+
+        Returns a tuple ``(mu, rmse)`` of arrays of length *n_points*
+        containing the predicted mean and root mean squared error at each
+        point.
+        """
+        if self.m is None:  # untrained surrogate
+            raise RuntimeError("KrigingSurrogate has not been trained, so no "
+                               "prediction can be made")
+        X_new = array(X_new, dtype=float).reshape(-1, self.m)
+        XX = array(self.X, dtype=float)
+        thetas = 10.**self.thetas
+
+        # correlation of every new point with every training point, (p, n)
+        r = exp(-sum(thetas*(X_new[:, newaxis, :] - XX[newaxis, :, :])**2.,
+                     2))
+
+        one = ones(self.n)
+        if self.R_fact is not None:
+            R_fact = (self.R_fact[0].T, not self.R_fact[1])
+            Rinv_r = cho_solve(R_fact, r.T)
+        else:
+            Rinv_r = lstsq(self.R.T, r.T)[0]
+
+        f = self.mu + dot(r, self._alpha)
+        term1 = sum(r.T*Rinv_r, 0)
+        term2 = (1.0 - dot(one, Rinv_r))**2./dot(one, self._Rinv_one)
+
+        MSE = self.sig2*(1.0 - term1 + term2)
+        RMSE = vsqrt(abs(MSE))
+
+        return f, RMSE
+
     def train(self, X, Y):
         """Train the surrogate model with the given set of inputs and outputs."""
 
@@ -103,66 +162,171 @@ class KrigingSurrogate(Container):
                 self.Y.append(out)
             else: "duplicate training point" """
 
-        self.X = X
-        self.Y = Y
+        # copies, so later changes to the caller's data can't leak in
+        self.X = array(X, dtype=float)
+        self.Y = array(Y, dtype=float)
         self.m = len(X[0])
         self.n = len(X)
+        self._n_updates = 0
 
         thetas = zeros(self.m)
         #print "initial guess", thetas
 
-        def _calcll(thetas):
-            ''' Callback function'''
-            self.thetas = thetas
-            self._calculate_log_likelihood()
-            return -self.log_likelihood
+        self._calculate_distances()
+
+        if self.training_method == 'COBYLA':
+            def _calcll(thetas):
+                ''' Callback function'''
+                self.thetas = thetas
+                self._calculate_log_likelihood()
+                return -self.log_likelihood
+
+            #if self.thetas == None:
+            #self.thetas = fmin(_calcll, thetas, disp=False, ftol=0.0001)
+            def lowerBound(log10t):
+                return log10t - log10(self.thetas)
 
-        #if self.thetas == None:
-        #self.thetas = fmin(_calcll, thetas, disp=False, ftol=0.0001)
-        def lowerBound(log10t):
-            return log10t - log10(self.thetas)
+            def upperBound(log10t):
+                return log10(self.thetas) - log10t
 
-        def upperBound(log10t):
-            return log10(self.thetas) - log10t
+            cons = []
+            for i in xrange(self.m):
+                cons.append({'type': 'ineq', 'fun': lambda log10t: log10t[i] - log10(1e-2)})  # min
+                cons.append({'type': 'ineq', 'fun': lambda log10t: log10(3) - log10t[i]})     # max
+
+            self.thetas = minimize(_calcll, thetas, method='COBYLA', constraints=cons, tol=1e-8).x
+
+        else:
+            def _calcll_grad(thetas):
+                ''' Callback function returning value and gradient'''
+                self.thetas = thetas
+                self._calculate_log_likelihood(gradient=True)
+                return -self.log_likelihood, -self.log_likelihood_grad
 
-        cons = []
-        for i in xrange(self.m):
-            cons.append({'type': 'ineq', 'fun': lambda log10t: log10t[i] - log10(1e-2)})  # min
-            cons.append({'type': 'ineq', 'fun': lambda log10t: log10(3) - log10t[i]})     # max
+            bounds = [(log10(1e-2), log10(3))]*self.m
+            self.thetas = minimize(_calcll_grad, thetas, jac=True,
+                                   method=self.training_method,
+                                   bounds=bounds, tol=1e-8).x
 
-        self.thetas = minimize(_calcll, thetas, method='COBYLA', constraints=cons, tol=1e-8).x
         #print self.thetas
         self._calculate_log_likelihood()
 
-    def _calculate_log_likelihood(self):
+    def add_training_points(self, X, Y):
+        """Updates the trained model with additional training points.
+
+        The current thetas are kept and the Cholesky factor of the
+        correlation matrix is extended with a rank-k update, so adding k
+        points to n costs O(n^2 k) instead of a new O(n^3) factorization.
+        Every *full_retrain_interval* updates the thetas are re-optimized
+        by a full train() on all of the data.
+        """
+        if self.m is None:  # untrained surrogate
+            self.train(X, Y)
+            return
+
+        XX = self.X
+        X_new = array(X, dtype=float).reshape(-1, self.m)
+        X_all = vstack([XX, X_new])
+        Y_all = concatenate([self.Y.ravel(), array(Y, dtype=float).ravel()])
+
+        self._n_updates += 1
+        if self._n_updates >= self.full_retrain_interval:
+            self.train(X_all, Y_all)
+            return
+
+        n, k = self.n, len(X_new)
+        thetas = 10.**self.thetas
+
+        # correlations between old and new points, and among new points
+        B = exp(-dot((XX[:, newaxis, :] - X_new[newaxis, :, :])**2.,
+                     thetas))*(1.0 - self.nugget)
+        C = zeros((k, k))
+        pairs = triu_indices(k, 1)
+        C[pairs] = exp(-dot((X_new[pairs[0]] - X_new[pairs[1]])**2.,
+                            thetas))*(1.0 - self.nugget)
+        C = C + C.T + eye(k)
+
+        R = zeros((n+k, n+k))
+        R[:n, :n] = self.R
+        R[:n, n:] = B
+        R[n:, :n] = B.T
+        R[n:, n:] = C
+
+        self.X = X_all
+        self.Y = Y_all
+        self.n = n + k
+        self.R = R
+        self._pairs = None
+        self._sqdists = None
+
+        if self.R_fact is not None:
+            try:
+                # R = U^T U, extended as [[U, U12], [0, U22]]
+                U = triu(self.R_fact[0])
+                U12 = solve_triangular(U, B, trans='T')
+                U22 = cholesky(C - dot(U12.T, U12))
+
+                U_new = zeros((n+k, n+k))
+                U_new[:n, :n] = U
+                U_new[:n, n:] = U12
+                U_new[n:, n:] = U22
+                self.R_fact = (U_new, False)
+                self._cholesky_statistics(Y_all)
+                return
+            except (linalg.LinAlgError, ValueError):
+                pass
+
+        # no usable factorization to update, so refactor with fixed thetas
+        self._calculate_log_likelihood()
+
+    def _calculate_distances(self):
+        """Computes the squared distances in each dimension between every
+        pair of training points."""
+        XX = array(self.X, dtype=float)
+        self._pairs = triu_indices(self.n, 1)
+        self._sqdists = (XX[self._pairs[0]] - XX[self._pairs[1]])**2
+
+    def _cholesky_statistics(self, Y):
+        """Computes mu, sig2 and the log likelihood from the Cholesky
+        factor of the correlation matrix."""
+        one = ones(self.n)
+        rhs = vstack([Y, one]).T
+        R_fact = (self.R_fact[0].T, not self.R_fact[1])
+        cho = cho_solve(R_fact, rhs).T
+
+        self.mu = dot(one, cho[0])/dot(one, cho[1])
+        ymdotone = Y - dot(one, self.mu)
+        self._alpha = cho_solve(self.R_fact, ymdotone)
+        self._Rinv_one = cho[1]
+        self.sig2 = dot(ymdotone, self._alpha)/self.n
+        #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
+        # log(det(R)) from the diagonal of the Cholesky factor
+        logdet = 2.*sum(vlog(diag(self.R_fact[0])))
+        self.log_likelihood = -self.n/2.*log(self.sig2) - 1./2.*logdet
+
+    def _calculate_log_likelihood(self, gradient=False):
+        """Computes the concentrated log likelihood of the current thetas.
+        If *gradient* is True, its derivative with respect to the thetas
+        is also stored in *log_likelihood_grad*."""
         #if self.m == None:
         #    Give error message
+        if self._sqdists is None:
+            self._calculate_distances()
+
         R = zeros((self.n, self.n))
-        X, Y = array(self.X), array(self.Y)
+        Y = array(self.Y)
         thetas = 10.**self.thetas
 
         #weighted distance formula
-        for i in range(self.n):
-            R[i, i+1:self.n] = e**(-sum(thetas*(X[i] - X[i+1:self.n])**2., 1))
-
-        R = R*(1.0 - self.nugget)
+        corr = exp(-dot(self._sqdists, thetas))*(1.0 - self.nugget)
+        R[self._pairs] = corr
         R = R + R.T + eye(self.n)
         self.R = R
 
         one = ones(self.n)
         try:
             self.R_fact = cho_factor(R)
-            rhs = vstack([Y, one]).T
-            R_fact = (self.R_fact[0].T, not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-
-            self.mu = dot(one, cho[0])/dot(one, cho[1])
-            ymdotone = Y - dot(one, self.mu)
-            self.sig2 = dot(ymdotone, cho_solve(self.R_fact,
-                                                (ymdotone)))/self.n
-            #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
-            self.log_likelihood = -self.n/2.*log(self.sig2) - \
-                                  1./2.*log(abs(det(self.R) + 1.e-16))
+            self._cholesky_statistics(Y)
 
         except (linalg.LinAlgError, ValueError):
             #------LSTSQ---------
@@ -172,11 +336,24 @@ class KrigingSurrogate(Container):
             lsq = lstsq(self.R.T, rhs)[0].T
             self.mu = dot(one, lsq[0])/dot(one, lsq[1])
             ymdotone = Y - dot(one, self.mu)
-            self.sig2 = dot(ymdotone, lstsq(self.R, ymdotone)[0])/self.n
+            self._alpha = lstsq(self.R, ymdotone)[0]
+            self._Rinv_one = lsq[1]
+            self.sig2 = dot(ymdotone, self._alpha)/self.n
             self.log_likelihood = -self.n/2.*log(self.sig2) - \
                                    1./2.*log(abs(det(self.R) + 1.e-16))
             #print self.log_likelihood
 
+        if gradient:
+            # dL/dtheta_k = 1/2 * tr((alpha*alpha^T/sig2 - R^-1) * dR/dtheta_k)
+            # where dR_ij/dtheta_k = -d_ijk**2 * R_ij, summed over i < j
+            if self.R_fact is not None:
+                Rinv = cho_solve(self.R_fact, eye(self.n))
+            else:
+                Rinv = lstsq(self.R, eye(self.n))[0]
+            W = outer(self._alpha, self._alpha)/self.sig2 - Rinv
+            grad = -dot(W[self._pairs]*corr, self._sqdists)
+            self.log_likelihood_grad = grad*thetas*log(10.)
+
 
 class FloatKrigingSurrogate(KrigingSurrogate):
     """Surrogate model based on the simple Kriging interpolation. Predictions are returned as floats,
@@ -186,6 +363,11 @@ class FloatKrigingSurrogate(KrigingSurrogate):
         dist = super(FloatKrigingSurrogate, self).predict(new_x)
         return dist.mu
 
+    def predict_batch(self, X_new):
+        """Returns an array of the predicted means at each point in
+        *X_new*."""
+        return super(FloatKrigingSurrogate, self).predict_batch(X_new)[0]
+
     def get_uncertain_value(self, value):
         """Returns a float"""
         return float(value)
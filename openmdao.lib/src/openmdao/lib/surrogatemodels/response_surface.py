@@ -1,13 +1,14 @@
 """Surrogate Model based on second order response surface equations."""
 
-from numpy import matrix, linalg, power, multiply, concatenate, ones
+from numpy import matrix, linalg, power, multiply, concatenate, ones, eye, \
+                  asarray
 
 from openmdao.main.api import Container
-from openmdao.main.interfaces import implements,ISurrogate
+from openmdao.main.interfaces import implements, IIncrementalSurrogate
 from openmdao.main.datatypes.api import Float, Bool
 
 class ResponseSurface(Container): 
-    implements(ISurrogate) 
+    implements(IIncrementalSurrogate) 
     
     def __init__(self,X=None,Y=None): 
         # must call HasTraits init to set up Traits stuff 
@@ -17,6 +18,13 @@ class ResponseSurface(Container):
         self.n = None #number of independents
         self.betas = None #vector of response surface equation coefficients
         
+        # (X^T X)^-1 of the expanded training inputs, used for recursive
+        # least squares updates. None if X^T X is singular, in which case
+        # the expanded training data is kept for a full refit instead.
+        self._P = None
+        self._X = None
+        self._Y = None
+        
         if X is not None and Y is not None: 
             self.train(X,Y)
             
@@ -34,33 +42,84 @@ class ResponseSurface(Container):
         self.n = X.shape[1]
         
         # Modify X to include constant, squared terms and cross terms
-        X = concatenate((matrix(ones((self.m,1))),X),1) 
-        for i in range(1,self.n+1):
-            X = concatenate((X,power(X[:,i],2)),1)
-        for i in range(1,self.n):
-            for j in range(i+1,self.n+1):
-                X = concatenate((X,multiply(X[:,i],X[:,j])),1)
+        X = self._expand(X)
         
         # Determine response surface equation coefficients (betas) using least squares
         self.betas, rs, r, s = linalg.lstsq(X,Y)
         
+        self._X = X
+        self._Y = Y
+        self._P = None
+        self._update_P(r)
+        
+    def add_training_points(self,X,Y): 
+        """Updates the response surface equation coefficients with additional
+        training points using recursive least squares. Falls back on a full
+        least squares fit while the training set is too small to determine
+        all of the coefficients.""" 
+        
+        if self.m is None: 
+            self.train(X,Y)
+            return
+        
+        X = matrix(X)
+        Y = matrix(asarray(Y).ravel()).T
+        H = self._expand(X)
+        self.m += X.shape[0]
+        
+        if self._P is None: 
+            self._X = concatenate((self._X,H),0)
+            self._Y = concatenate((self._Y,Y),0)
+            self.betas, rs, r, s = linalg.lstsq(self._X,self._Y)
+            self._update_P(r)
+            return
+        
+        # Block recursive least squares update
+        PHt = self._P*H.T
+        K = PHt*linalg.inv(eye(X.shape[0]) + H*PHt)
+        self.betas = self.betas + K*(Y - H*self.betas)
+        self._P = self._P - K*PHt.T
+        
+    def _update_P(self,rank): 
+        """Computes the recursive least squares matrix once the expanded
+        training inputs have full column rank.""" 
+        
+        if rank == self._X.shape[1]:
+            self._P = linalg.inv(self._X.T*self._X)
+            self._X = None
+            self._Y = None
+        
     def predict(self,new_x): 
         """Calculates a predicted value of the response based on the current response surface model for the supplied list of inputs. """ 
         
         new_x = matrix(new_x)
         
         # Modify new_x to include constant, squared terms and cross terms
-        new_x = concatenate((matrix(ones((1,1))),new_x),1) 
-        for i in range(1,self.n+1):
-            new_x = concatenate((new_x,power(new_x[:,i],2)),1)
-        for i in range(1,self.n):
-            for j in range(i+1,self.n+1):
-                new_x = concatenate((new_x,multiply(new_x[:,i],new_x[:,j])),1)
+        new_x = self._expand(new_x)
         
         # Predict new_y using new_x and betas
         new_y = new_x*self.betas
         return new_y[0,0]
 
+    def predict_batch(self,X): 
+        """Returns an array of the predicted values of the response at each
+        row of the (n_points, n_inputs) array X.""" 
+        
+        new_y = self._expand(matrix(X))*self.betas
+        return asarray(new_y).ravel()
+
+    def _expand(self,X): 
+        """Returns the matrix X with columns added for the constant, squared
+        and cross terms of the response surface equation.""" 
+        
+        X = concatenate((matrix(ones((X.shape[0],1))),X),1) 
+        for i in range(1,self.n+1):
+            X = concatenate((X,power(X[:,i],2)),1)
+        for i in range(1,self.n):
+            for j in range(i+1,self.n+1):
+                X = concatenate((X,multiply(X[:,i],X[:,j])),1)
+        return X
+
 
 if __name__ == "__main__":
     
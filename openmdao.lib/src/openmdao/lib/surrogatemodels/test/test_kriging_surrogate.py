@@ -6,7 +6,8 @@ import random
 from numpy import array, linspace, sin, cos, pi
 from scipy.optimize import minimize
 
-from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate
+from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate, \
+                                                      FloatKrigingSurrogate
 from openmdao.main.uncertain_distributions import NormalDistribution
 
 
@@ -68,6 +69,109 @@ class KrigingSurrogateTests(unittest.TestCase):
         self.assertAlmostEqual(5.79, pred.sigma, places=0)
         self.assertAlmostEqual(25.34, pred.mu, places=1)
 
+    def test_log_likelihood_gradient(self):
+        x = array([[-2., 0.], [-0.5, 1.5], [1., 3.], [8.5, 4.5], [-3.5, 6.],
+                   [4., 7.5], [-5., 9.], [5.5, 10.5], [10., 12.], [7., 13.5],
+                   [2.5, 15.]])
+        y = sin(x[:, 0]) + cos(x[:, 1])
+        krig1 = KrigingSurrogate()
+        krig1.train(x, y)
+
+        thetas = array([-0.7, -1.2])
+        krig1.thetas = thetas
+        krig1._calculate_log_likelihood(gradient=True)
+        base = krig1.log_likelihood
+        grad = krig1.log_likelihood_grad.copy()
+
+        step = 1e-7
+        for i in range(2):
+            krig1.thetas = thetas.copy()
+            krig1.thetas[i] += step
+            krig1._calculate_log_likelihood()
+            fd = (krig1.log_likelihood - base)/step
+            self.assertAlmostEqual(fd, grad[i], places=4)
+
+    def test_gradient_training(self):
+        x = array([[0.05], [.25], [0.61], [0.95]])
+        y = array([0.738513784857542, -0.210367746201974, -0.489015457891476, 12.3033138316612])
+        krig1 = KrigingSurrogate()
+        krig1.training_method = 'L-BFGS-B'
+        krig1.train(x, y)
+
+        self.assertAlmostEqual(.4771, krig1.thetas[0], places=4)
+        pred = krig1.predict(array([0.5]))
+        self.assertAlmostEqual(.41552, pred.sigma, places=3)
+        self.assertAlmostEqual( -1.725, pred.mu, places=3)
+
+    def test_predict_batch(self):
+        x = array([[-2., 0.], [-0.5, 1.5], [1., 3.], [8.5, 4.5], [-3.5, 6.],
+                   [4., 7.5], [-5., 9.], [5.5, 10.5], [10., 12.], [7., 13.5],
+                   [2.5, 15.]])
+        y = array([(xi[1]-(5.1/(4.*pi**2.))*xi[0]**2.+5.*xi[0]/pi-6.)**2.
+                   +10.*(1.-1./(8.*pi))*cos(xi[0])+10. for xi in x])
+        krig1 = KrigingSurrogate()
+        krig1.train(x, y)
+
+        new_x = array([[-2., 0.], [5., 5.], [0.3, 7.2], [9., 1.]])
+        mu, rmse = krig1.predict_batch(new_x)
+        self.assertEqual(mu.shape, (4,))
+        self.assertEqual(rmse.shape, (4,))
+        for i, point in enumerate(new_x):
+            pred = krig1.predict(point)
+            self.assertAlmostEqual(pred.mu, mu[i], places=8)
+            self.assertAlmostEqual(pred.sigma, rmse[i], places=6)
+
+        krig2 = FloatKrigingSurrogate()
+        krig2.train(x, y)
+        mu2 = krig2.predict_batch(new_x)
+        for i in range(4):
+            self.assertAlmostEqual(mu[i], mu2[i], places=8)
+
+    def test_predict_batch_lstsq(self):
+        # ill-conditioned case falls back on least squares
+        x = [[case] for case in linspace(0., 1., 40)]
+        y = sin(x).flatten()
+        krig1 = KrigingSurrogate()
+        krig1.train(x, y)
+        mu, rmse = krig1.predict_batch([[0.5], [0.123]])
+        self.assertAlmostEqual(0.479425538688, mu[0], places=7)
+        self.assertAlmostEqual(krig1.predict([0.123]).mu, mu[1], places=7)
+
+    def test_add_training_points(self):
+        x = array([[-2., 0.], [-0.5, 1.5], [1., 3.], [8.5, 4.5], [-3.5, 6.],
+                   [4., 7.5], [-5., 9.], [5.5, 10.5], [10., 12.], [7., 13.5],
+                   [2.5, 15.]])
+        y = sin(x[:, 0]) + cos(x[:, 1])
+
+        krig1 = KrigingSurrogate()
+        krig1.train(x[:8], y[:8])
+        thetas = krig1.thetas.copy()
+        krig1.add_training_points(x[8:], y[8:])
+
+        self.assertEqual(krig1.n, 11)
+        self.assertTrue(krig1.R_fact is not None)
+        self.assertTrue(all(krig1.thetas == thetas))
+
+        # same result as refactoring with the thetas fixed
+        krig2 = KrigingSurrogate()
+        krig2.train(x, y)
+        krig2.thetas = thetas
+        krig2._calculate_log_likelihood()
+
+        self.assertAlmostEqual(krig2.log_likelihood, krig1.log_likelihood,
+                               places=6)
+        for point in ([5., 5.], [-1., 8.]):
+            pred1 = krig1.predict(point)
+            pred2 = krig2.predict(point)
+            self.assertAlmostEqual(pred2.mu, pred1.mu, places=6)
+            self.assertAlmostEqual(pred2.sigma, pred1.sigma, places=6)
+
+        # the thetas are re-optimized after full_retrain_interval updates
+        krig1.full_retrain_interval = 1
+        krig1.add_training_points([[0., 0.]], [sin(0.) + cos(0.)])
+        self.assertEqual(krig1.n, 12)
+        self.assertEqual(krig1._n_updates, 0)
+
     def test_get_uncertain_value(self):
         x = array([[0.05], [.25], [0.61], [0.95]])
         y = array([0.738513784857542, -0.210367746201974, -0.489015457891476, 12.3033138316612])
@@ -88,6 +192,14 @@ class KrigingSurrogateTests(unittest.TestCase):
         else:
             self.fail("RuntimeError Expected")
 
+        try:
+            krig1.predict_batch([[0., 1.]])
+        except RuntimeError, err:
+            self.assertEqual(str(err),
+                "KrigingSurrogate has not been trained, so no prediction can be made")
+        else:
+            self.fail("RuntimeError Expected")
+
 
 if __name__ == "__main__":
     unittest.main()
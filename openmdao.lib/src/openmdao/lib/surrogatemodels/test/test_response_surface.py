@@ -36,3 +36,20 @@ class ResponseSurfaceTest(unittest.TestCase):
         
         self.assertTrue(residual<1e-5)
         
+
+    def test_add_training_points(self):
+        np.random.seed(10)
+        X = np.random.random((30, 3))
+        Y = np.random.random(30)
+
+        full = ResponseSurface(X, Y)
+
+        # starts underdetermined, then switches to recursive least squares
+        rs = ResponseSurface(X[:4], Y[:4])
+        for i in range(4, 30, 5):
+            rs.add_training_points(X[i:i+5], Y[i:i+5])
+
+        self.assertEqual(rs.m, 30)
+        self.assertTrue(rs._P is not None)
+        for x in X[:5]:
+            self.assertAlmostEqual(full.predict(x), rs.predict(x), places=6)
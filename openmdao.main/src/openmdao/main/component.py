@@ -21,6 +21,7 @@ from traits.api import Property
 from openmdao.main.array_helpers import flattened_value
 from openmdao.main.container import Container
 from openmdao.main.derivatives import applyJ, applyJT
+from openmdao.main.evalcache import EvaluationCache
 from openmdao.main.interfaces import implements, obj_has_interface, \
                                      IAssembly, IComponent, IDriver
 from openmdao.main.hasconstraints import HasConstraints, HasEqConstraints, \
@@ -170,6 +171,12 @@ class Component(Container):
         self._case_id = ''
         self._case_uuid = ''
 
+        self._eval_cache = None
+
+        # True if the outputs were last restored from the evaluation cache
+        # rather than computed by execute().
+        self._eval_restored = False
+
     @property
     def dir_context(self):
         """The :class:`DirectoryContext` for this component."""
@@ -497,6 +504,16 @@ class Component(Container):
         if self.force_fd is True:
             return
 
+        # Outputs restored from the evaluation cache skip execute(), so any
+        # state that it keeps for derivatives is from another point. Run
+        # for real at this one first.
+        if first and self._eval_restored:
+            cache, self._eval_cache = self._eval_cache, None
+            try:
+                self.run(case_uuid=self._case_uuid)
+            finally:
+                self._eval_cache = cache
+
         # Calculate first derivatives using the new API.
         if first and hasattr(self, 'provideJ'):
             J = self.provideJ()
@@ -549,7 +566,17 @@ class Component(Container):
             self._pre_execute()
             self._set_exec_state('RUNNING')
 
+            # Skip execution if we've already seen these inputs.
+            cache = self._eval_cache
+            if cache is not None:
+                key = cache.get_key(self)
+                if cache.restore(self, key):
+                    self._eval_restored = True
+                    self._post_run()
+                    return
+
             # Component executes as normal
+            self._eval_restored = False
             self.exec_count += 1
             if tracing.TRACER is not None and \
                not obj_has_interface(self, IDriver, IAssembly):
@@ -558,6 +585,8 @@ class Component(Container):
 
             self.execute()
             self._post_execute()
+            if cache is not None:
+                cache.store(self, key)
             self._post_run()
         except Exception:
             info = sys.exc_info()
@@ -574,6 +603,34 @@ class Component(Container):
             if self.directory and self._dir_stack:
                 self.pop_dir()
 
+    def set_eval_cache(self, max_entries=100, max_bytes=None, filename=None):
+        """Turn on memoization of this component's evaluations. When run()
+        is called with inputs that match a remembered evaluation, the
+        outputs are restored from it and execute() is skipped.
+
+        max_entries: int
+            Maximum number of evaluations to remember. Set to 0 to turn
+            memoization off.
+
+        max_bytes: int
+            If given, the maximum total size of the remembered outputs (as
+            pickled).
+
+        filename: str
+            If given, evaluations are also saved to this file and loaded
+            back from it, so they survive restarts.
+        """
+        if max_entries:
+            self._eval_cache = EvaluationCache(max_entries, max_bytes,
+                                               filename)
+        else:
+            self._eval_cache = None
+
+    def get_eval_cache(self):
+        """Return the :class:`EvaluationCache` of this component, which
+        holds its hit and miss statistics, or None if memoization is off."""
+        return self._eval_cache
+
     @rbac(('owner', 'user'))
     def _run_terminated(self):
         """ Executed at end of top-level run. """
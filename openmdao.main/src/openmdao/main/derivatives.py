@@ -254,6 +254,91 @@ def applyJ(system, variables):
 
     #print 'applyJ', obj.name, arg, result
 
+def jacobian_blocks(system, variables):
+    """Returns the blocks of a component's provideJ Jacobian that applyJ
+    multiplies by, as a list of (output, input, block) tuples that use the
+    system's names for the variables. Inputs that are states are read from
+    the du vector and all other inputs from dp. Returns None if the
+    component doesn't give a Jacobian (e.g., it uses apply_deriv), since
+    applyJ must then be called.
+    """
+
+    J = system.J
+    obj = system.inner()
+    scope = system.scope
+
+    if J is None or ISystem.providedBy(obj) or IAssembly.providedBy(obj):
+        return None
+
+    # Build the same dicts that applyJ does, so the loops below visit the
+    # keys in the same order.
+    arg = {}
+    for item in system.list_states() + system.list_inputs():
+        if scope.name2collapsed.get(item) in variables:
+            arg[item.partition('.')[-1]] = item
+
+    result = {}
+    for item in system.list_outputs():
+        if scope.name2collapsed.get(item) in variables:
+            result[item.partition('.')[-1]] = item
+
+    for item in system.list_residuals():
+        result[item.partition('.')[-1]] = item
+
+    if len(arg) == 0 or len(result) == 0:
+        return []
+
+    if obj._provideJ_bounds is None:
+        input_keys, output_keys = list_deriv_vars(obj)
+        obj._provideJ_bounds = get_bounds(obj, input_keys, output_keys, J)
+    ibounds, obounds = obj._provideJ_bounds
+
+    blocks = []
+    for okey in result:
+
+        odx = None
+        if okey in obounds:
+            o1, o2, osh = obounds[okey]
+        else:
+            basekey, _, odx = okey.partition('[')
+            try:
+                o1, o2, osh = obounds[basekey]
+            except KeyError:
+                if obj.missing_deriv_policy == 'error':
+                    msg = "does not provide analytical derivatives" + \
+                          " for %s" % okey
+                    obj.raise_exception(msg, KeyError)
+                continue
+
+        used = set()
+        for ikey in arg:
+
+            idx = None
+            if ikey in ibounds:
+                i1, i2, ish = ibounds[ikey]
+                if (i1, i2) in used:
+                    continue
+                used.add((i1, i2))
+            else:
+                basekey, _, idx = ikey.partition('[')
+                try:
+                    i1, i2, ish = ibounds[basekey]
+                except KeyError:
+                    if obj.missing_deriv_policy == 'error':
+                        msg = "does not provide analytical derivatives" + \
+                              " for %s" % ikey
+                        obj.raise_exception(msg, KeyError)
+                    continue
+
+                if (i1, i2, idx) in used or (i1, i2) in used:
+                    continue
+                used.add((i1, i2, idx))
+
+            Jsub = reduce_jacobian(J, i1, i2, idx, ish, o1, o2, odx, osh)
+            blocks.append((result[okey], arg[ikey], Jsub))
+
+    return blocks
+
 def applyJT(system, variables):
     """Multiply an input vector by the transposed Jacobian.
     For an Explicit Component, this automatically forms the "fake"
@@ -14,8 +14,8 @@ import networkx as nx
 
 from openmdao.main.mpiwrap import PETSc
 from openmdao.main.component import Component
-from openmdao.main.datatypes.api import Bool, Enum, Float, Int, Slot, \
-                                        List, VarTree
+from openmdao.main.datatypes.api import Bool, Dict, Enum, Float, Int, \
+                                        Slot, List, VarTree
 from openmdao.main.depgraph import find_all_connecting, \
                                    collapse_driver, gsort
 from openmdao.main.hasconstraints import HasConstraints, HasEqConstraints, \
@@ -63,6 +63,34 @@ class GradientOptions(VariableTree):
                                        "the full fd space.",
                                        framework_var=True)
 
+    fd_coloring = Bool(False, desc="Set to True to compress the finite "
+                                    "difference with a column coloring. "
+                                    "Structurally independent inputs are "
+                                    "perturbed together. The sparsity of "
+                                    "the Jacobian is taken from fd_sparsity, "
+                                    "and the columns it doesn't give are "
+                                    "found by a probe at a random point "
+                                    "within one step, at the cost of one "
+                                    "run per column.",
+                       framework_var=True)
+
+    fd_sparsity = Dict({}, desc="Known sparsity of the finite difference "
+                                "Jacobian for fd_coloring, as a dictionary "
+                                "of {output: {input: pattern}}. Each pattern "
+                                "is a boolean array of shape (output size, "
+                                "input size), or anything that broadcasts "
+                                "to it, such as False for no dependency.",
+                       framework_var=True)
+
+    fd_workers = Int(0, low=0, desc="Number of worker processes used to run "
+                                    "the steps of a finite difference in "
+                                    "parallel. The workers are forked with "
+                                    "a copy of the model for each gradient. "
+                                    "Models with components that use files "
+                                    "in their working directory run "
+                                    "serially. 0 or 1 runs them serially.",
+                     framework_var=True)
+
     derivative_direction = Enum('auto',
                                 ['auto', 'forward', 'adjoint'],
                                 desc="Direction for derivative calculation. "
@@ -80,8 +108,12 @@ class GradientOptions(VariableTree):
     #                          framework_var=True)
 
     # Linear Solver settings
-    lin_solver = Enum('scipy_gmres', ['scipy_gmres', 'petsc_ksp', 'linear_gs'],
-                      desc='Method to use for gradient calculation',
+    lin_solver = Enum('scipy_gmres', ['scipy_gmres', 'scipy_direct',
+                                      'petsc_ksp', 'linear_gs'],
+                      desc='Method to use for gradient calculation. '
+                           'scipy_direct assembles and factors the Jacobian '
+                           'once, so it pays off when there are many '
+                           'right-hand sides.',
                       framework_var=True)
 
     atol = Float(1.0e-9, desc='Absolute tolerance for the linear solver.',
@@ -92,6 +124,12 @@ class GradientOptions(VariableTree):
     maxiter = Int(100, desc='Maximum number of iterations for the linear solver.',
                   framework_var=True)
 
+    krylov_recycle = Int(0, low=0, desc='Maximum number of Krylov vectors that '
+                         'scipy_gmres keeps and reuses between the right-hand '
+                         'sides of a gradient calculation. Set to 0 to solve '
+                         'each right-hand side independently.',
+                         framework_var=True)
+
     iprint = Enum(0, [0, 1], desc="Set to 1 to print out residual of the linear solver",
                   framework_var=True)
 
@@ -131,9 +169,30 @@ class Driver(Component):
                             "workflow components into a single serial or "
                             "parallel System.  Note that when not running "
                             "under MPI, this option is ignored and the "
-                            "resulting System will always be serial.",
+                            "resulting System will always be serial, "
+                            "unless parallel_backend is set.",
                        framework_var=True)
 
+    parallel_backend = Enum('none',
+                            ['none', 'threads', 'processes'],
+                            desc="How parallel Systems run their branches "
+                                 "when not running under MPI. 'none' keeps "
+                                 "this driver's workflow in a single serial "
+                                 "System. 'threads' and 'processes' partition "
+                                 "it as system_type says and run independent "
+                                 "branches concurrently in threads or in "
+                                 "forked processes. Threads share the "
+                                 "process, so their components must be "
+                                 "thread-safe, and branches with components "
+                                 "that use files in a directory run in "
+                                 "processes instead. Processes are kept "
+                                 "from one run to the next, and their "
+                                 "branches can only be differentiated by "
+                                 "finite difference. Each ParallelSystem "
+                                 "keeps the wall time of its branches in "
+                                 "branch_times.",
+                            framework_var=True)
+
     def __init__(self):
         self._iter = None
         super(Driver, self).__init__()
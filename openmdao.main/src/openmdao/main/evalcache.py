@@ -0,0 +1,175 @@
+"""
+Memoization of component evaluations, keyed on the component's input values.
+"""
+
+import cPickle
+import hashlib
+import os.path
+from collections import OrderedDict
+
+from numpy import ascontiguousarray
+
+from openmdao.main.array_helpers import flattened_value, NoFlatError
+
+__all__ = ('EvaluationCache',)
+
+
+class EvaluationCache(object):
+    """
+    An LRU store of output snapshots of a :class:`Component`, keyed on a hash
+    of its class, pathname, and input values. Entries are evicted in least recently used order
+    once either `max_entries` or `max_bytes` (if given) is exceeded.
+
+    If `filename` is given, existing entries are loaded from it and every
+    new entry is appended to it, so the cache survives restarts. The file is
+    compacted each time it is loaded.
+
+    Only variable values are cached. Files written by the component (e.g.,
+    by an :class:`ExternalCode`) are not restored on a hit, and changes to
+    the contents of input files aren't detected.
+    """
+
+    def __init__(self, max_entries=100, max_bytes=None, filename=None):
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.filename = filename
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._nbytes = 0
+
+        if filename is not None and os.path.exists(filename):
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """Total size of the stored (pickled) snapshots."""
+        return self._nbytes
+
+    def get_stats(self):
+        """Return a dict of hit, miss, and eviction counts and sizes."""
+        return dict(hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, entries=len(self._entries),
+                    nbytes=self._nbytes)
+
+    def clear(self):
+        """Remove all entries and reset the statistics. The file, if any, is
+        emptied as well."""
+        self._entries.clear()
+        self._nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        if self.filename is not None and os.path.exists(self.filename):
+            open(self.filename, 'wb').close()
+
+    def get_key(self, comp):
+        """Return a hash of the class, pathname, and input values of `comp`,
+        or None if some input can't be hashed. The class and pathname keep
+        components that share a cache file from getting each other's
+        outputs."""
+
+        cls = type(comp)
+        sha = hashlib.sha1()
+        sha.update('%s.%s:%s:' % (cls.__module__, cls.__name__,
+                                  comp.get_pathname()))
+        for name in sorted(comp.list_inputs()):
+            val = getattr(comp, name)
+            try:
+                flat = ascontiguousarray(flattened_value(name, val))
+                data = flat.dtype.str + flat.tobytes()
+            except NoFlatError:
+                try:
+                    data = cPickle.dumps(val, cPickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    return None
+            sha.update('%s:%d:' % (name, len(data)))
+            sha.update(data)
+
+        return sha.hexdigest()
+
+    def restore(self, comp, key):
+        """If there is an entry for `key`, set the outputs of `comp` from it
+        and return True. Otherwise, return False. Updates the hit and miss
+        counts."""
+
+        blob = None if key is None else self._entries.get(key)
+        if blob is None:
+            self.misses += 1
+            return False
+
+        # Most recently used entries go to the end.
+        del self._entries[key]
+        self._entries[key] = blob
+        self.hits += 1
+
+        for name, val in cPickle.loads(blob):
+            setattr(comp, name, val)
+
+        return True
+
+    def store(self, comp, key):
+        """Save a snapshot of the outputs of `comp` under `key`."""
+
+        if key is None:
+            return
+
+        outputs = []
+        for name in comp.list_outputs():
+            if not comp.get_metadata(name, 'framework_var'):
+                outputs.append((name, getattr(comp, name)))
+
+        try:
+            blob = cPickle.dumps(outputs, cPickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+
+        self._add(key, blob)
+
+        if self.filename is not None:
+            with open(self.filename, 'ab') as out:
+                cPickle.dump((key, blob), out, cPickle.HIGHEST_PROTOCOL)
+
+    def _add(self, key, blob):
+        """Add an entry and evict old ones if needed."""
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._nbytes -= len(old)
+
+        self._entries[key] = blob
+        self._nbytes += len(blob)
+
+        while len(self._entries) > 1 and \
+              (len(self._entries) > self.max_entries or
+               (self.max_bytes is not None and self._nbytes > self.max_bytes)):
+            _, old = self._entries.popitem(last=False)
+            self._nbytes -= len(old)
+            self.evictions += 1
+
+    def _load(self):
+        """Read the entries from our file, then rewrite it with only the
+        entries that were kept."""
+
+        with open(self.filename, 'rb') as inp:
+            while True:
+                try:
+                    key, blob = cPickle.load(inp)
+                except (EOFError, cPickle.UnpicklingError):
+                    # A truncated last record is left by a crash mid-write.
+                    break
+                self._add(key, blob)
+
+        # Loading doesn't count as evicting.
+        self.evictions = 0
+
+        with open(self.filename, 'wb') as out:
+            for key, blob in self._entries.iteritems():
+                cPickle.dump((key, blob), out, cPickle.HIGHEST_PROTOCOL)
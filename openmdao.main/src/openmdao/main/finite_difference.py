@@ -2,15 +2,97 @@
 """
 
 # pylint: disable=E0611,F0401
+import atexit
+import os
+from itertools import izip
+from multiprocessing import Pool, current_process
 from sys import float_info
 
 from openmdao.main.array_helpers import flattened_size
-from openmdao.main.interfaces import IVariableTree
+from openmdao.main.interfaces import IVariableTree, IAssembly, IDriver, \
+                                     IComponent
 from openmdao.main.mp_support import has_interface
 from openmdao.main.mpiwrap import MPI
 from openmdao.util.graph import base_var
 
-from numpy import ndarray, zeros, ones, unravel_index, complex128
+from numpy import ndarray, zeros, ones, unravel_index, complex128, \
+                  argsort, hstack, asarray, broadcast_to
+from numpy.random import RandomState
+
+# FiniteDifference, groups, iterbase, and outputs of the parallel FD that is
+# currently running. Forked workers inherit it.
+_PARALLEL_FD = None
+
+# Worker pools that are running, so they can be cleaned up at exit.
+_POOLS = set()
+
+
+def _terminate_pools():
+    """Terminate any worker pools still running when the process exits."""
+    for pool in list(_POOLS):
+        pool.terminate()
+        pool.join()
+    _POOLS.clear()
+
+atexit.register(_terminate_pools)
+
+
+def _run_parallel_group(index):
+    """Run a single group of FD steps in a worker process."""
+    fdiff, groups, iterbase, outputs = _PARALLEL_FD
+    return fdiff.run_group(groups[index], iterbase, outputs)
+
+
+def uses_files(comp):
+    """Returns True if `comp`, or any component it contains, reads or
+    writes files in its working directory. Copies of such a component
+    can't safely run concurrently in the same directory."""
+
+    if not has_interface(comp, IComponent):
+        return False
+
+    if comp.directory or comp.external_files or comp.get_file_vars():
+        return True
+
+    # ExternalCode (in openmdao.lib) always runs its command in files.
+    if any(cls.__name__ == 'ExternalCode' for cls in type(comp).__mro__):
+        return True
+
+    if has_interface(comp, IAssembly):
+        return any(uses_files(getattr(comp, name))
+                   for name in comp.list_components())
+
+    if has_interface(comp, IDriver):
+        return any(uses_files(sub) for sub in comp.workflow)
+
+    return False
+
+
+def color_columns(pattern):
+    """Greedy Curtis-Powell-Reid coloring of the columns of a boolean
+    sparsity pattern. Columns that share a color have no nonzero rows in
+    common, so they can be perturbed together. Returns an integer array
+    with the color of each column."""
+
+    nrows, ncols = pattern.shape
+    colors = zeros(ncols, dtype=int)
+
+    # used[r, c] is True if some column of color c has a nonzero in row r.
+    used = zeros((nrows, 1), dtype=bool)
+
+    # Largest columns first usually gives fewer colors.
+    for col in argsort(-pattern.sum(axis=0), kind='mergesort'):
+        rows = pattern[:, col].nonzero()[0]
+        free = (~used[rows].any(axis=0)).nonzero()[0]
+        if free.size:
+            color = free[0]
+        else:
+            color = used.shape[1]
+            used = hstack((used, zeros((nrows, 1), dtype=bool)))
+        used[rows, color] = True
+        colors[col] = color
+
+    return colors
 
 
 class FiniteDifference(object):
@@ -40,6 +122,11 @@ class FiniteDifference(object):
         self.step_type = options.fd_step_type
         self.step_type_custom = {}
         self.relative_threshold = 1.0e-4
+        self.num_workers = options.fd_workers
+        self._uses_files = None
+        self.use_coloring = options.fd_coloring and not MPI
+        self.sparsity = None
+        self.colors = None
 
         dgraph = self.scope._depgraph
         driver_params = []
@@ -184,6 +271,148 @@ class FiniteDifference(object):
 
         uvec.set_to_array(self.y_base, outputs)
 
+        steps = self.get_steps()
+
+        if self.use_coloring and self.sparsity is None:
+            self.sparsity = self.find_sparsity(steps, iterbase, outputs)
+            self.colors = color_columns(self.sparsity)
+
+        groups = self.get_groups(steps)
+
+        if self._use_workers(len(groups)):
+            deltas = self._run_groups_parallel(groups, iterbase, outputs)
+        else:
+            deltas = (self.run_group(group, iterbase, outputs)
+                      for group in groups)
+
+        for group, delta in izip(groups, deltas):
+            for j, src, i1, i, form, fd_step in group:
+
+                if form == 'central':
+                    Jfd = delta/(2.0*fd_step)
+                else:
+                    Jfd = delta/fd_step
+
+                # Zero the rows that belong to other columns in the group.
+                if len(group) > 1:
+                    Jfd[~self.sparsity[:, i]] = 0.0
+
+                # Pack Jacobian in either an array or a dictionary.
+                if self.return_format == 'dict':
+                    start = end = 0
+                    for okey in outputs:
+
+                        sz = uvec[okey].size
+                        end += sz
+                        #print Jfd, start, end, i, self.J
+                        self.J[okey][src][:, i-i1] = Jfd[start:end]
+                        start += sz
+                else:
+                    self.J[:, i] = Jfd
+
+        # Restore final inputs/outputs.
+        uvec.set_from_array(self.y_base, outputs)
+        uvec.set_to_scope(self.scope)
+
+        #print 'after FD', self.J
+        return self.J
+
+    def given_sparsity(self, ncols, outputs):
+        """Return the nonzero pattern given in the fd_sparsity option, and a
+        mask of the entries that it covers."""
+
+        uvec = self.system.vec['u']
+        given = self.system.options.fd_sparsity
+
+        pattern = zeros((len(self.y), ncols), dtype=bool)
+        known = zeros((len(self.y), ncols), dtype=bool)
+
+        start = end = 0
+        for okey in outputs:
+            end += uvec[okey].size
+            blocks = given.get(okey, {})
+
+            for srcs in self.inputs:
+
+                # Support for parameter groups
+                if isinstance(srcs, basestring):
+                    srcs = [srcs]
+
+                names = [name for name in srcs if name in blocks]
+                if not names:
+                    continue
+
+                i1, i2 = self.in_bounds[srcs[0]]
+                try:
+                    block = broadcast_to(asarray(blocks[names[0]], dtype=bool),
+                                         (end-start, i2-i1))
+                except ValueError:
+                    raise RuntimeError("The fd_sparsity of '%s' with respect "
+                                       "to '%s' should have shape (%d, %d)"
+                                       % (okey, names[0], end-start, i2-i1))
+                pattern[start:end, i1:i2] = block
+                known[start:end, i1:i2] = True
+
+            start = end
+
+        return pattern, known
+
+    def find_sparsity(self, steps, iterbase, outputs):
+        """Return the nonzero pattern of the Jacobian. Entries given in the
+        fd_sparsity option are used as they are. The columns that aren't
+        fully given are found by a probe at a random point inside the region
+        spanned by the steps. Every input element is moved part of the way
+        across its step, then those columns are put back to their current
+        values one at a time. This finds entries that only vanish at the
+        current point (e.g., d(x0*x1)/dx0 at x1 = 0). The elements are set
+        exactly rather than stepped and undone, so any change in an output
+        counts, however small it is next to the output."""
+
+        pattern, known = self.given_sparsity(len(steps), outputs)
+        probed = set(step[3] for step in steps
+                     if not known[:, step[3]].all())
+        if not probed:
+            return pattern
+
+        uvec = self.system.vec['u']
+        fractions = RandomState(len(steps)).uniform(0.25, 0.75, len(steps))
+
+        moves = []
+        for (j, src, i1, i, form, fd_step), fraction in izip(steps,
+                                                              fractions):
+            srcs = [src] if isinstance(src, basestring) else src
+            current = [uvec[name][i-i1] for name in srcs if name in uvec][0]
+            if form == 'backward':
+                fraction = -fraction
+            moves.append((src, i1, i, current, current + fraction*fd_step))
+
+        for src, i1, i, current, moved in moves:
+            self.put_value(src, moved, i-i1)
+        self.system.run(iterbase)
+        y_probe = zeros(len(self.y))
+        self.get_outputs(y_probe, outputs)
+
+        for src, i1, i, current, moved in moves:
+            if i not in probed:
+                continue
+            self.put_value(src, current, i-i1)
+            self.system.run(iterbase)
+            self.get_outputs(self.y, outputs)
+            rows = ~known[:, i]
+            pattern[rows, i] = (self.y != y_probe)[rows]
+            self.put_value(src, moved, i-i1)
+
+        for src, i1, i, current, moved in moves:
+            self.put_value(src, current, i-i1)
+        uvec.set_from_array(self.y_base, outputs)
+
+        return pattern
+
+    def get_steps(self):
+        """Return a list of (j, src, i1, i, form, fd_step) tuples, one for
+        each flattened input element that we need to perturb."""
+
+        steps = []
         for j, src, in enumerate(self.inputs):
 
             # Users can customize relative/absolute step type per variable.
@@ -232,105 +461,179 @@ class FiniteDifference(object):
                     if current_val + fd_step > bound_val:
                         form = 'backward'
 
-                #--------------------
-                # Forward difference
-                #--------------------
-                if form == 'forward':
+                steps.append((j, src, i1, i, form, fd_step))
+
+        return steps
+
+    def get_groups(self, steps):
+        """Split the steps into groups that can be run together. Without a
+        coloring, each step is its own group. With one, steps that have the
+        same color and FD form are grouped."""
+
+        if self.colors is None:
+            return [[step] for step in steps]
 
-                    # Step
-                    self.set_value(src, fd_step, i-i1)
+        groups = {}
+        order = []
+        for step in steps:
+            key = (self.colors[step[3]], step[4])
+            if key not in groups:
+                groups[key] = []
+                order.append(key)
+            groups[key].append(step)
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y, outputs)
+        return [groups[key] for key in order]
 
-                    # Forward difference
-                    Jfd = (self.y - self.y_base)/fd_step
+    def run_group(self, steps, iterbase, outputs):
+        """Perturb all input elements in a group of steps (which share an
+        FD form), run the system, and return the change in the outputs. For
+        central differences, this is the change across both steps. The
+        inputs are restored afterwards."""
 
-                    # Undo step
-                    self.set_value(src, -fd_step, i-i1)
+        form = steps[0][4]
 
-                #--------------------
-                # Backward difference
-                #--------------------
-                elif form == 'backward':
+        #--------------------
+        # Forward difference
+        #--------------------
+        if form == 'forward':
 
-                    # Step
-                    self.set_value(src, -fd_step, i-i1)
+            # Step
+            self._step_group(steps, 1.0)
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y, outputs)
+            self.system.run(iterbase)
+            self.get_outputs(self.y, outputs)
 
-                    # Backward difference
-                    Jfd = (self.y_base - self.y)/fd_step
+            # Forward difference
+            delta = self.y - self.y_base
 
-                    # Undo step
-                    self.set_value(src, fd_step, i-i1)
+            # Undo step
+            self._step_group(steps, -1.0)
 
-                #--------------------
-                # Central difference
-                #--------------------
-                elif form == 'central':
+        #--------------------
+        # Backward difference
+        #--------------------
+        elif form == 'backward':
 
-                    # Forward Step
-                    self.set_value(src, fd_step, i-i1)
+            # Step
+            self._step_group(steps, -1.0)
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y, outputs)
+            self.system.run(iterbase)
+            self.get_outputs(self.y, outputs)
 
-                    # Backward Step
-                    self.set_value(src, -2.0*fd_step, i-i1)
+            # Backward difference
+            delta = self.y_base - self.y
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y2, outputs)
+            # Undo step
+            self._step_group(steps, 1.0)
 
-                    # Central difference
-                    Jfd = (self.y - self.y2)/(2.0*fd_step)
+        #--------------------
+        # Central difference
+        #--------------------
+        elif form == 'central':
 
-                    # Undo step
-                    self.set_value(src, fd_step, i-i1)
+            # Forward Step
+            self._step_group(steps, 1.0)
 
-                #--------------------
-                # Complex Step
-                #--------------------
-                elif form == 'complex_step':
+            self.system.run(iterbase)
+            self.get_outputs(self.y, outputs)
 
-                    complex_step = fd_step
-                    yc = zeros(len(self.y), dtype=complex128)
-                    self.system.set_complex_step(True)
+            # Backward Step
+            self._step_group(steps, -2.0)
 
-                    # Step
-                    self.set_value_complex(src, complex_step, i-i1)
+            self.system.run(iterbase)
+            self.get_outputs(self.y2, outputs)
 
-                    self.system.run(iterbase)
-                    self.get_complex_outputs(yc)
+            # Central difference
+            delta = self.y - self.y2
 
-                    # Forward difference
-                    Jfd = (yc/fd_step).imag
+            # Undo step
+            self._step_group(steps, 1.0)
 
-                    # Undo step
-                    self.set_value_complex(src, complex_step, i-i1,
-                                           undo_complex=True)
-                    self.system.set_complex_step(False)
+        #--------------------
+        # Complex Step
+        #--------------------
+        elif form == 'complex_step':
 
-                # Pack Jacobian in either an array or a dictionary.
-                if self.return_format == 'dict':
-                    start = end = 0
-                    for okey in outputs:
+            yc = zeros(len(self.y), dtype=complex128)
+            self.system.set_complex_step(True)
 
-                        sz = uvec[okey].size
-                        end += sz
-                        #print Jfd, start, end, i, self.J
-                        self.J[okey][src][:, i-i1] = Jfd[start:end]
-                        start += sz
-                else:
-                    self.J[:, i] = Jfd
+            # Step
+            for j, src, i1, i, form, fd_step in steps:
+                self.set_value_complex(src, fd_step, i-i1)
 
-        # Restore final inputs/outputs.
-        uvec.set_from_array(self.y_base, outputs)
-        uvec.set_to_scope(self.scope)
+            self.system.run(iterbase)
+            self.get_complex_outputs(yc)
 
-        #print 'after FD', self.J
-        return self.J
+            # Forward difference
+            delta = yc.imag
+
+            # Undo step
+            for j, src, i1, i, form, fd_step in steps:
+                self.set_value_complex(src, fd_step, i-i1,
+                                       undo_complex=True)
+            self.system.set_complex_step(False)
+
+        return delta
+
+    def _step_group(self, steps, scale):
+        """Add scale times the FD step to each input element in steps."""
+
+        for j, src, i1, i, form, fd_step in steps:
+            self.set_value(src, scale*fd_step, i-i1)
+
+    def _use_workers(self, ngroups):
+        """Returns True if the groups should be run in worker processes."""
+
+        if self.num_workers < 2 or ngroups < 2 or MPI:
+            return False
+
+        # Workers are forked so that each one starts with its own copy of
+        # the model. Pool workers are daemons, which can't have children,
+        # so an FD nested inside a worker runs serially.
+        if not hasattr(os, 'fork') or current_process().daemon:
+            return False
+
+        # All workers share the working directory, so concurrent steps
+        # would overwrite each other's input and output files.
+        if self._uses_files is None:
+            scope = self.scope
+            self._uses_files = any(uses_files(getattr(scope, name, None))
+                                   for name in
+                                   self.system._all_comp_nodes())
+            if self._uses_files:
+                scope._logger.warning("fd_workers ignored for '%s': it "
+                                      "contains components that use files "
+                                      "in the working directory, so its "
+                                      "finite difference runs serially.",
+                                      self.system.name)
+        return not self._uses_files
+
+    def _run_groups_parallel(self, groups, iterbase, outputs):
+        """Run the groups in a pool of forked processes and return their
+        output changes in the same order as groups. The pool is forked for
+        each gradient, so the workers start with the model's current state,
+        and it is shut down before returning."""
+
+        global _PARALLEL_FD
+
+        _PARALLEL_FD = (self, groups, iterbase, outputs)
+        try:
+            pool = Pool(min(self.num_workers, len(groups)))
+            _POOLS.add(pool)
+            try:
+                results = pool.map(_run_parallel_group, range(len(groups)),
+                                   chunksize=1)
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+                _POOLS.discard(pool)
+        finally:
+            _PARALLEL_FD = None
+
+        return results
 
     def get_outputs(self, x, outputs):
         """Return matrix of flattened values from output edges."""
@@ -377,6 +680,22 @@ class FiniteDifference(object):
         if self.system.name.split('.')[-1] == '_inner_asm':
             uvec.set_to_scope(self.system.scope, vnames=srcs)
 
+    def put_value(self, srcs, val, index):
+        """Replace a value in the model"""
+
+        # Support for Parameter Groups:
+        if isinstance(srcs, basestring):
+            srcs = [srcs]
+
+        uvec = self.system.vec['u']
+        for src in srcs:
+            if src in uvec:
+                uvec[src][index] = val
+                break
+
+        if self.system.name.split('.')[-1] == '_inner_asm':
+            uvec.set_to_scope(self.system.scope, vnames=srcs)
+
     def set_value_complex(self, srcs, val, index, undo_complex=False):
         """Set/unset a complex value in the model"""
 
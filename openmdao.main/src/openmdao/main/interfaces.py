@@ -535,6 +535,20 @@ class ISurrogate(IPredictor):
         """
 
 
+class IIncrementalSurrogate(ISurrogate):
+
+    def add_training_points(X, Y):
+        """Updates an already trained surrogate model with additional
+        training points, without retraining from scratch on the full
+        data set.
+
+        X: iterator of lists
+            Values representing the new training case inputs.
+        Y: iterator
+            Training case outputs corresponding to the new inputs in X.
+        """
+
+
 class IMultiFiSurrogate(IPredictor):
 
     def train_multifi(X, Y):
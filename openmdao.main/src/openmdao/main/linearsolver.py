@@ -7,8 +7,10 @@ import traceback
 
 # pylint: disable=E0611, F0401
 import numpy as np
-from scipy.sparse.linalg import gmres, LinearOperator
+from scipy.sparse import csc_matrix, coo_matrix, issparse
+from scipy.sparse.linalg import gmres, splu, LinearOperator
 
+from openmdao.main.derivatives import jacobian_blocks
 from openmdao.main.mpiwrap import MPI, PETSc, get_norm
 from openmdao.util.graph import fix_single_tuple
 from openmdao.util.log import logger
@@ -55,6 +57,10 @@ class LinearSolver(object):
 
         self.indent = '   ' * level
 
+    def reset(self):
+        """ Discard anything cached from the previous linearization. """
+        pass
+
     def print_norm(self, driver_string, iteration, res, res0, msg=None, solver='LN'):
         """ Prints out the norm of the residual in a neat readable format.
         """
@@ -142,6 +148,26 @@ class ScipyGMRES(LinearSolver):
         if system.mode == 'adjoint':
             outputs, inputs = inputs, outputs
 
+        # The output indices don't depend on the RHS, so look them up once.
+        out_maps = []
+        i = 0
+        for item in outputs:
+
+            if isinstance(item, tuple):
+                item = item[0]
+
+            out_indices = system.vec['u'].indices(system, item)
+            nk = len(out_indices)
+            out_maps.append((item, out_indices, i, nk))
+            i += nk
+
+        # Krylov vectors are only valid for the current linearization.
+        self._recycle = None
+        if self.options.krylov_recycle > 0:
+            solve = self._solve_recycled
+        else:
+            solve = self.solve
+
         # If Forward mode, solve linear system for each parameter
         # If Adjoint mode, solve linear system for each requested output
         j = 0
@@ -164,18 +190,11 @@ class ScipyGMRES(LinearSolver):
                 RHS[irhs] = 1.0
 
                 # Call GMRES to solve the linear system
-                dx = self.solve(RHS)
+                dx = solve(RHS)
 
                 RHS[irhs] = 0.0
 
-                i = 0
-                for item in outputs:
-
-                    if isinstance(item, tuple):
-                        item = item[0]
-
-                    out_indices = system.vec['u'].indices(system, item)
-                    nk = len(out_indices)
+                for item, out_indices, i, nk in out_maps:
 
                     if return_format == 'dict':
                         if system.mode == 'forward':
@@ -192,10 +211,11 @@ class ScipyGMRES(LinearSolver):
                             J[i:i+nk, j] = dx[out_indices]
                         else:
                             J[j, i:i+nk] = dx[out_indices]
-                        i += nk
 
                 j += 1
 
+        self._recycle = None
+
         #print inputs, '\n', outputs, '\n', J
         return J
 
@@ -224,6 +244,101 @@ class ScipyGMRES(LinearSolver):
         #print system.name, 'Linear solution vec', -dx
         return dx
 
+    def _solve_recycled(self, arg):
+        """ Solve the linear system with a restarted GMRES that reuses the
+        Krylov subspaces of the previous solves (a simplified GCRO).
+
+        The recycled space is kept as a pair of matrices U and C with
+        A U = C and orthonormal C. The part of the RHS that lies in C is
+        solved directly, and each GMRES cycle is orthogonalized against C.
+        The Krylov vectors of every cycle are then added to U and C, up to
+        krylov_recycle vectors in total.
+        """
+
+        system = self._system
+        options = self.options
+        max_recycle = options.krylov_recycle
+        restart = 20
+
+        n_edge = arg.size
+        if self._recycle is None:
+            self._recycle = (np.zeros((n_edge, 0)), np.zeros((n_edge, 0)))
+        U, C = self._recycle
+
+        x = np.zeros(n_edge)
+        bnorm = np.linalg.norm(arg)
+        if bnorm == 0.0:
+            return x
+        tol = options.atol*bnorm
+
+        Cb = C.T.dot(arg)
+        x += U.dot(Cb)
+        r = arg - C.dot(Cb)
+
+        beta = np.linalg.norm(r)
+        cycle = 0
+        while beta > tol and cycle < options.maxiter:
+            cycle += 1
+            k = C.shape[1]
+
+            V = np.zeros((n_edge, restart+1))
+            H = np.zeros((restart+1, restart))
+            B = np.zeros((k, restart))
+            V[:, 0] = r/beta
+
+            for j in xrange(restart):
+                w = self.mult(V[:, j]).copy()
+
+                # Orthogonalize against the recycled space, then the
+                # current Krylov basis.
+                B[:, j] = C.T.dot(w)
+                w -= C.dot(B[:, j])
+                for i in xrange(j+1):
+                    H[i, j] = V[:, i].dot(w)
+                    w -= H[i, j]*V[:, i]
+                H[j+1, j] = np.linalg.norm(w)
+
+                m = j+1
+                rhs = np.zeros(m+1)
+                rhs[0] = beta
+                y = np.linalg.lstsq(H[:m+1, :m], rhs, rcond=-1)[0]
+                res = np.linalg.norm(rhs - H[:m+1, :m].dot(y))
+
+                if H[j+1, j] <= 1e-14*beta:
+                    break
+                V[:, j+1] = w/H[j+1, j]
+                if res <= tol:
+                    break
+
+            Hm = H[:m+1, :m]
+            Vm = V[:, :m]
+            Zm = Vm - U.dot(B[:, :m])
+
+            # A Zm = V_m+1 Hm, so this updates x and r consistently.
+            x += Zm.dot(y)
+            r -= V[:, :m+1].dot(Hm.dot(y))
+            beta = np.linalg.norm(r)
+
+            # With Hm = QR, A (Zm R^-1) = V_m+1 Q, which has orthonormal
+            # columns that are also orthogonal to C.
+            Q, R = np.linalg.qr(Hm)
+            diag = np.abs(np.diag(R))
+            if diag.min() > 1e-12*diag.max():
+                U = np.hstack((U, np.linalg.solve(R.T, Zm.T).T))
+                C = np.hstack((C, V[:, :m+1].dot(Q)))
+                if C.shape[1] > max_recycle:
+                    U = U[:, -max_recycle:]
+                    C = C[:, -max_recycle:]
+
+        self._recycle = (U, C)
+
+        if beta > tol:
+            msg = "ERROR in calc_gradient in '%s': gmres failed to converge " \
+                  "after %d iterations"
+            logger.error(msg, system.name, cycle)
+
+        return x
+
 
     def mult(self, arg):
         """ GMRES Callback: applies Jacobian matrix. Mode is determined by the
@@ -247,6 +362,333 @@ class ScipyGMRES(LinearSolver):
         return system.rhs_vec.array[:]
 
 
+class ScipyDirect(ScipyGMRES):
+    """ Direct solver that assembles the Jacobian of the system as a
+    sparse matrix and factors it once per linearization with scipy's
+    SuperLU. Every right-hand side is then a pair of triangular solves.
+    This is a serial solver, so it should never be used in an MPI setting.
+
+    The matrix is assembled from the subsystems. Components that provide a
+    Jacobian have its blocks placed directly at the rows of their outputs
+    and the columns of the unknowns that feed their inputs. Any other
+    subsystem (e.g., an assembly, a finite differenced group, a driver, or
+    a component with apply_deriv) is applied once per entry of its own part
+    of the unknown vector and of its inputs, without running the rest of
+    the system. A solver on a system that has no subsystems falls back to
+    one product with the whole system per column.
+    """
+
+    ln_string = 'DIRECT'
+
+    def __init__(self, system):
+        """ Set up ScipyDirect object """
+        super(ScipyDirect, self).__init__(system)
+
+        self._lu = None
+        self._lu_mode = None
+
+    def reset(self):
+        """ Discard the factorization of the previous linearization. """
+        self._lu = None
+
+    def assemble(self):
+        """ Returns the Jacobian of the system as a sparse matrix. In adjoint
+        mode, this is the transpose of the forward Jacobian.
+        """
+        from openmdao.main.systems import CompoundSystem, SimpleSystem, \
+                                          VarSystem
+
+        system = self._system
+        n_edge = system.vec['f'].array.size
+        if n_edge == 0:
+            return csc_matrix((0, 0))
+
+        if not isinstance(system, CompoundSystem):
+            return self._assemble_columns()
+
+        if system._parent_system:
+            vnames = system._parent_system._relevant_vars
+        else:
+            vnames = system.flat_vars.keys()
+
+        # Offset of each system's vectors in ours, and the leaves.
+        offsets = {}
+        leaves = []
+        stack = [(system, 0)]
+        while stack:
+            sub, start = stack.pop()
+            offsets[id(sub)] = start
+            if isinstance(sub, CompoundSystem):
+                if not sub.is_active():
+                    continue
+                for child in sub.local_subsystems():
+                    stack.append((child, start))
+                    start += child.vec['du'].array.size
+            else:
+                leaves.append(sub)
+
+        self._offsets = offsets
+        self._src_maps = {}
+        self._entries = ([], [], [])
+
+        system.sol_vec.array[:] = 0.0
+        system.rhs_vec.array[:] = 0.0
+        system.clear_dp()
+
+        for leaf in leaves:
+            if isinstance(leaf, VarSystem):
+                self._add_diagonal(leaf, vnames)
+                continue
+
+            blocks = None
+            if leaf._comp is not None and \
+               type(leaf).applyJ.im_func is SimpleSystem.applyJ.im_func:
+                blocks = jacobian_blocks(leaf, vnames)
+
+            if blocks is None:
+                self._add_probed(leaf, vnames)
+            else:
+                self._add_blocks(leaf, blocks)
+
+        system.sol_vec.array[:] = 0.0
+        system.rhs_vec.array[:] = 0.0
+        system.clear_dp()
+
+        rows, cols, data = self._entries
+        self._offsets = self._src_maps = self._entries = None
+        if not data:
+            return csc_matrix((n_edge, n_edge))
+
+        A = csc_matrix((np.concatenate(data),
+                        (np.concatenate(rows), np.concatenate(cols))),
+                       shape=(n_edge, n_edge))
+        if system.mode == 'adjoint':
+            A = A.T.tocsc()
+        return A
+
+    def _assemble_columns(self):
+        """ Returns the Jacobian of the system as a sparse matrix, built
+        column by column from matrix-vector products.
+        """
+
+        n_edge = self._system.vec['f'].array.size
+
+        rows = []
+        cols = []
+        data = []
+        unit = np.zeros(n_edge)
+        for icol in xrange(n_edge):
+            unit[icol] = 1.0
+            column = self.mult(unit)
+            unit[icol] = 0.0
+
+            nonzero = column.nonzero()[0]
+            rows.append(nonzero)
+            cols.append(np.repeat(icol, nonzero.size))
+            data.append(column[nonzero])
+
+        return csc_matrix((np.concatenate(data),
+                           (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(n_edge, n_edge))
+
+    def _add(self, rows, cols, data):
+        """ Add entries, in forward mode (row, column) order. """
+        self._entries[0].append(np.asarray(rows, dtype=int))
+        self._entries[1].append(np.asarray(cols, dtype=int))
+        self._entries[2].append(np.asarray(data, dtype=float))
+
+    def _indices(self, sub, vecname, name):
+        """ Returns our indices of a variable in a subsystem's vector. """
+        start, end = sub.vec[vecname].bounds(name)
+        return self._offsets[id(sub)] + np.arange(start, end)
+
+    def _src_map(self, sub):
+        """ Returns an array that gives, for each entry of a system's dp
+        vector, the index in its du vector that the scatter for the current
+        mode connects it to, or -1.
+        """
+        key = id(sub)
+        if key not in self._src_maps:
+            if sub.mode == 'adjoint':
+                transfer = sub.scatter_rev_full
+            else:
+                transfer = sub.scatter_full
+
+            src_map = -np.ones(sub.vec['dp'].array.size, dtype=int)
+            if transfer is not None and transfer.scatter is not None:
+                src = np.arange(sub.vec['du'].array.size)
+                dest = np.arange(src_map.size)
+                src_map[dest[transfer.scatter.dest_idxs]] = \
+                    src[transfer.scatter.src_idxs]
+            self._src_maps[key] = src_map
+
+        return self._src_maps[key]
+
+    def _input_entries(self, leaf, names):
+        """ Returns a (dp array, dp indices, our du indices) tuple for each
+        input that a leaf system reads from the dp vector of an ancestor.
+        The du index of an entry that isn't scattered from our unknowns is
+        -1.
+        """
+
+        entries = {}
+        for name in names:
+            parent = leaf._parent_system
+            while parent is not None and name not in parent.vec['dp']:
+                parent = parent._parent_system
+            if parent is None or id(parent) not in self._offsets:
+                continue
+
+            start, end = parent.vec['dp'].bounds(name)
+            idxs = np.arange(start, end)
+            srcs = self._src_map(parent)[idxs]
+            srcs[srcs >= 0] += self._offsets[id(parent)]
+            entries[name] = (parent.vec['dp'].array, idxs, srcs)
+
+        return entries
+
+    def _state_indices(self, leaf, name):
+        """ Returns our indices of a state that a leaf system reads from the
+        du vector of itself or an ancestor."""
+
+        parent = leaf
+        while name not in parent.vec['du']:
+            parent = parent._parent_system
+        return self._indices(parent, 'du', name)
+
+    def _add_blocks(self, leaf, blocks):
+        """ Add the Jacobian blocks of a component and the identity on its
+        outputs."""
+
+        states = set(leaf.list_states())
+        inputs = self._input_entries(leaf, [name for _, name, _ in blocks
+                                            if name not in states])
+
+        for out, name, block in blocks:
+            rows = self._indices(leaf, 'df', out)
+            if name in states:
+                cols = self._state_indices(leaf, name)
+            elif name in inputs:
+                cols = inputs[name][2]
+            else:
+                continue
+
+            if not issparse(block):
+                block = np.asarray(block).reshape((rows.size, cols.size))
+            block = coo_matrix(block)
+
+            rows = rows[block.row]
+            cols = cols[block.col]
+            mask = cols >= 0
+            self._add(rows[mask], cols[mask], -block.data[mask])
+
+        for out in leaf.list_outputs():
+            idxs = self._indices(leaf, 'df', out)
+            self._add(idxs, idxs, np.ones(idxs.size))
+
+    def _add_diagonal(self, leaf, vnames):
+        """ Add the entries of a variable system, whose Jacobian is part of
+        the identity."""
+
+        system = self._system
+        system.sol_vec.array[:] = 1.0
+        system.rhs_vec.array[:] = 0.0
+        leaf.applyJ(vnames)
+
+        rhs = system.rhs_vec.array
+        nonzero = rhs.nonzero()[0]
+        self._add(nonzero, nonzero, rhs[nonzero])
+
+        system.sol_vec.array[:] = 0.0
+        system.rhs_vec.array[:] = 0.0
+
+    def _add_probed(self, leaf, vnames):
+        """ Add the entries of a leaf system that can't give its Jacobian
+        blocks, by applying it to one unit vector for each of its own
+        unknowns and inputs in forward mode, or each of its own residuals in
+        adjoint mode. Only the leaf is run.
+        """
+
+        system = self._system
+        sol = system.sol_vec.array
+        rhs = system.rhs_vec.array
+        inputs = self._input_entries(leaf, leaf.list_inputs()).values()
+
+        start = self._offsets[id(leaf)]
+        own = np.arange(start, start + leaf.vec['du'].array.size)
+
+        if leaf.mode == 'adjoint':
+            for row in own:
+                rhs[:] = 0.0
+                for dp, idxs, srcs in inputs:
+                    dp[idxs] = 0.0
+                sol[row] = 1.0
+                leaf.applyJ(vnames)
+                sol[row] = 0.0
+
+                nonzero = rhs.nonzero()[0]
+                self._add(np.repeat(row, nonzero.size), nonzero,
+                          rhs[nonzero])
+                for dp, idxs, srcs in inputs:
+                    mask = srcs >= 0
+                    self._add(np.repeat(row, mask.sum()), srcs[mask],
+                              dp[idxs[mask]])
+                    dp[idxs] = 0.0
+
+        else:
+            cols = np.concatenate([own] + [srcs for _, _, srcs in inputs])
+            cols = np.unique(cols[cols >= 0])
+            for col in cols:
+                rhs[:] = 0.0
+                sol[col] = 1.0
+                for dp, idxs, srcs in inputs:
+                    dp[idxs[srcs == col]] = 1.0
+                leaf.applyJ(vnames)
+                sol[col] = 0.0
+                for dp, idxs, srcs in inputs:
+                    dp[idxs] = 0.0
+
+                nonzero = rhs.nonzero()[0]
+                self._add(nonzero, np.repeat(col, nonzero.size),
+                          rhs[nonzero])
+
+        rhs[:] = 0.0
+
+    def _factor(self):
+        """ Assemble and factor the Jacobian for the current mode. """
+
+        system = self._system
+        self._lu = None
+
+        A = self.assemble()
+        if A.shape[0] > 0:
+            try:
+                self._lu = splu(A)
+            except RuntimeError as err:
+                msg = "ERROR in calc_gradient in '%s': sparse LU " \
+                      "factorization failed: %s"
+                raise RuntimeError(msg % (system.name, err))
+
+        self._lu_mode = system.mode
+
+    def solve(self, arg):
+        """ Solve the linear system for one right-hand side, factoring the
+        Jacobian first if it has changed since the last solve."""
+
+        if self._lu is None or self._lu_mode != self._system.mode:
+            self._factor()
+
+        if self._lu is None:
+            return np.zeros(0)
+
+        return self._lu.solve(np.asarray(arg, dtype=float))
+
+    def _solve_recycled(self, arg):
+        """ The factorization already serves all right-hand sides, so there
+        is nothing to recycle."""
+        return self.solve(arg)
+
+
 class PETSc_KSP(LinearSolver):
     """ PETSc's KSP solver with preconditioning. MPI is supported."""
 
@@ -1,7 +1,12 @@
+import atexit
+import os
 import sys
+import time
 from StringIO import StringIO
 from collections import OrderedDict
 from itertools import chain
+from multiprocessing import Pool, current_process
+from multiprocessing.pool import ThreadPool
 
 import numpy
 import networkx as nx
@@ -11,11 +16,14 @@ from zope.interface import implements
 from openmdao.main.mpiwrap import MPI, MPI_info, PETSc, get_norm, make_idx_array,\
                                   to_idx_array, idx_arr_type
 from openmdao.main.exceptions import RunStopped
-from openmdao.main.finite_difference import FiniteDifference, DirectionalFD
-from openmdao.main.linearsolver import ScipyGMRES, PETSc_KSP, LinearGS
+from openmdao.main.finite_difference import FiniteDifference, DirectionalFD, \
+                                            uses_files
+from openmdao.main.linearsolver import ScipyGMRES, ScipyDirect, PETSc_KSP, \
+                                       LinearGS
 from openmdao.main.mp_support import has_interface
 from openmdao.main.interfaces import IDriver, IAssembly, IImplicitComponent, \
-                                     ISolver, IPseudoComp, IComponent, ISystem
+                                     ISolver, IPseudoComp, IComponent, ISystem, \
+                                     IContainer
 from openmdao.main.vecwrapper import VecWrapper, InputVecWrapper, DataTransfer, \
                                      idx_merge, _filter, _filter_subs, \
                                      _filter_flat, _filter_ignored, \
@@ -175,6 +183,12 @@ class System(object):
     def all_subsystems(self):
         return ()
 
+    def shutdown(self):
+        """Stop any worker processes kept by this System or its
+        subsystems."""
+        for sub in self.all_subsystems():
+            sub.shutdown()
+
     def list_subsystems(self, local=False):
         """Returns the names of our subsystems."""
         return [s.name for s in self.subsystems(local)]
@@ -553,6 +567,10 @@ class System(object):
         if not self.is_active():
             return
 
+        # A new FD solver is made for the new vectors, and it finds the
+        # sparsity again.
+        self.fd_solver = None
+
         rank = self.mpi.rank
         if arrays is None:  # we're the top level System in our Assembly
             arrays = {}
@@ -786,16 +804,18 @@ class System(object):
 
             solver_choice = self.options.lin_solver
 
-            # scipy_gmres not supported in MPI, so swap with
+            # scipy solvers not supported in MPI, so swap with
             # petsc KSP.
-            if MPI and solver_choice=='scipy_gmres':
-                solver_choice = 'petsc_ksp'
-                msg = "scipy_gmres optimizer not supported in MPI. " + \
+            if MPI and solver_choice in ('scipy_gmres', 'scipy_direct'):
+                msg = "%s optimizer not supported in MPI. " % solver_choice + \
                       "Using petsc_ksp instead."
+                solver_choice = 'petsc_ksp'
                 self.options.parent._logger.warning(msg)
 
             if solver_choice == 'scipy_gmres':
                 self.ln_solver = ScipyGMRES(self)
+            elif solver_choice == 'scipy_direct':
+                self.ln_solver = ScipyDirect(self)
             elif solver_choice == 'petsc_ksp':
                 self.ln_solver = PETSc_KSP(self)
             elif solver_choice == 'linear_gs':
@@ -807,6 +827,9 @@ class System(object):
         for subsystem in self.local_subsystems():
             subsystem.linearize()
 
+        if self.ln_solver is not None:
+            self.ln_solver.reset()
+
     def set_complex_step(self, complex_step=False):
         """ Toggles complex_step plumbing for this system and all
         local subsystems.
@@ -1977,8 +2000,59 @@ class SerialSystem(CompoundSystem):
             if sub.is_active():
                 self._local_subsystems.append(sub)
 
+# ParallelSystem whose worker processes are being forked. Each worker keeps
+# the copy of it that it inherits.
+_PARALLEL_SYSTEM = None
+
+# Worker pools of ParallelSystems, so they can be cleaned up at exit.
+_POOLS = set()
+
+
+def _terminate_pools():
+    """Terminate any worker pools still running when the process exits."""
+    for pool in list(_POOLS):
+        pool.terminate()
+        pool.join()
+    _POOLS.clear()
+
+atexit.register(_terminate_pools)
+
+
+def _run_branch_in_process(index, parray, uarray, inputs, args):
+    """Run a branch of a ParallelSystem in its worker process, and return
+    its part of the u vector along with its wall time. The worker's copy of
+    the model is first given the parent's inputs and states."""
+    psys = _PARALLEL_SYSTEM
+    scope = psys.scope
+    sub = list(psys.local_subsystems())[index]
+
+    psys.vec['p'].array[:] = parray
+    psys.vec['p'].set_to_scope(scope)
+    for name, val in inputs.iteritems():
+        scope.set(name, val)
+    sub.vec['u'].array[:] = uarray
+    sub.vec['u'].set_to_scope(scope)
+
+    start = time.time()
+    sub.run(*args)
+    return sub.vec['u'].array.copy(), time.time() - start
+
+
 class ParallelSystem(CompoundSystem):
 
+    # Without MPI, branches are run serially ('none'), in threads
+    # ('threads'), or in forked worker processes ('processes').
+    backend = 'none'
+
+    # True if a component in one of our branches uses files, found on the
+    # first concurrent run.
+    _uses_files = None
+
+    # Worker pools for the 'processes' backend, one per branch, and the
+    # inputs to send to each branch's worker on every run.
+    _pools = None
+    _branch_inputs = None
+
     def get_req_cpus(self):
         cpus = []
         for sub in self.all_subsystems():
@@ -2011,8 +2085,159 @@ class ParallelSystem(CompoundSystem):
         #print "POST - scatter for %s" % self.name
         #self.dump_vars()
 
-        for sub in self.local_subsystems():
-            sub.run(iterbase, case_label=case_label, case_uuid=case_uuid)
+        subs = list(self.local_subsystems())
+        args = (iterbase, case_label, case_uuid)
+
+        backend = self._get_backend(subs)
+        if backend == 'none':
+            times = []
+            for sub in subs:
+                start = time.time()
+                sub.run(*args)
+                times.append(time.time() - start)
+        elif backend == 'processes':
+            times = self._run_processes(subs, args)
+        else:
+            times = self._run_threads(subs, args)
+
+        # Wall time of each branch in the last run.
+        self.branch_times = OrderedDict(zip([sub.name for sub in subs],
+                                            times))
+
+    def _get_backend(self, subs):
+        """Returns the backend that subs can actually be run with.
+        Processes fall back to threads where we can't fork. Threads share
+        the working directory, and a component with a directory changes
+        into it while it runs, so branches that use files run in processes
+        instead, or serially if we can't fork."""
+
+        if MPI or self.backend == 'none' or len(subs) < 2:
+            return 'none'
+
+        can_fork = hasattr(os, 'fork') and not current_process().daemon
+        if self.backend == 'processes' and can_fork:
+            return 'processes'
+
+        if self._uses_files is None:
+            scope = self.scope
+            self._uses_files = any(uses_files(getattr(scope, name, None))
+                                   for sub in subs
+                                   for name in sub._all_comp_nodes())
+            if self._uses_files:
+                scope._logger.warning("'%s' has branches with components "
+                                      "that use files, so they aren't run "
+                                      "in threads.", self.name)
+
+        if self._uses_files:
+            return 'processes' if can_fork else 'none'
+
+        return 'threads'
+
+    def _run_threads(self, subs, args):
+        """Run subsystems concurrently in threads. They share our vectors
+        and write to disjoint parts of them. Returns their wall times."""
+
+        def run_branch(sub):
+            start = time.time()
+            sub.run(*args)
+            return time.time() - start
+
+        pool = ThreadPool(len(subs))
+        try:
+            return pool.map(run_branch, subs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _run_processes(self, subs, args):
+        """Run subsystems concurrently in worker processes, one for each
+        branch. The workers are forked on the first run and kept for the
+        life of this System, so a branch's components keep their internal
+        state from one run to the next. Each run sends a worker the
+        scattered inputs, its branch's part of the u vector, and the inputs
+        of its components that aren't in the p vector (except variable
+        trees). Only the branch's part of the u vector is sent back, so
+        outputs that aren't in it and other component state, like
+        exec_count, are not updated here. Returns the wall times of the
+        branches."""
+
+        global _PARALLEL_SYSTEM
+
+        if self._pools is None:
+            self._branch_inputs = [self._list_branch_inputs(sub)
+                                   for sub in subs]
+            _PARALLEL_SYSTEM = self
+            try:
+                self._pools = []
+                for sub in subs:
+                    self._pools.append(Pool(1))
+                    _POOLS.add(self._pools[-1])
+            finally:
+                _PARALLEL_SYSTEM = None
+
+        scope = self.scope
+        parray = self.vec['p'].array
+
+        results = []
+        for i, (sub, pool) in enumerate(zip(subs, self._pools)):
+            inputs = dict((name, scope.get(name))
+                          for name in self._branch_inputs[i])
+            results.append(pool.apply_async(_run_branch_in_process,
+                                            (i, parray, sub.vec['u'].array,
+                                             inputs, args)))
+
+        times = []
+        for sub, result in zip(subs, results):
+            uarray, elapsed = result.get()
+            uvec = sub.vec['u']
+            uvec.array[:] = uarray
+            uvec.set_to_scope(self.scope)
+            times.append(elapsed)
+
+        return times
+
+    def _list_branch_inputs(self, sub):
+        """Returns the names of the inputs of the components in branch
+        sub that don't get their values from our p vector, like
+        unconnected inputs."""
+
+        scope = self.scope
+        flat = set()
+        for name in self.vec['p'].keys():
+            flat.update(name[1] if isinstance(name, tuple) else [name])
+
+        names = []
+        for cname in sub._all_comp_nodes():
+            for name in scope._depgraph.list_inputs(cname):
+                if name not in flat and \
+                   not has_interface(scope.get(name), IContainer):
+                    names.append(name)
+        return names
+
+    def shutdown(self):
+        """Stop our worker processes, and those of our subsystems."""
+        super(ParallelSystem, self).shutdown()
+
+        if self._pools is not None:
+            for pool in self._pools:
+                pool.terminate()
+                pool.join()
+                _POOLS.discard(pool)
+            self._pools = None
+
+    def linearize(self):
+        """ Linearize local subsystems. """
+
+        # The components in our worker processes hold the state of the
+        # last run, not the ones here.
+        if self._get_backend(list(self.local_subsystems())) == 'processes':
+            raise RuntimeError("'%s' runs its branches in worker processes, "
+                               "so it can't be linearized. Use finite "
+                               "difference (force_fd) or the 'threads' "
+                               "backend to calculate derivatives."
+                               % self.name)
+
+        super(ParallelSystem, self).linearize()
 
     def evaluate(self, iterbase, case_label='', case_uuid=None):
         """ Evalutes a component's residuals without invoking its
@@ -2028,6 +2253,15 @@ class ParallelSystem(CompoundSystem):
 
     def setup_communicators(self, comm):
         self.mpi.comm = comm
+
+        # Without MPI, all branches are local.
+        if MPI is None:
+            self._local_subsystems = []
+            for sub in self.all_subsystems():
+                sub._parent_system = self
+                sub.setup_communicators(comm)
+            return
+
         size = comm.size
         rank = comm.rank
 
@@ -2098,6 +2332,10 @@ class ParallelSystem(CompoundSystem):
 
     def setup_variables(self, resid_state_map=None):
         """ Determine variables from local subsystems """
+        if MPI is None:
+            super(ParallelSystem, self).setup_variables(resid_state_map)
+            return
+
         varmeta = self.scope._var_meta
         self.variables = OrderedDict()
         if not self.is_active():
@@ -2227,6 +2465,9 @@ class OpaqueSystem(SimpleSystem):
             for sub in self._inner_system.local_subsystems(recurse):
                 yield sub
 
+    def shutdown(self):
+        self._inner_system.shutdown()
+
     def _all_comp_nodes(self, local=False):
         return self._inner_system._all_comp_nodes(local=local)
 
@@ -2369,6 +2610,10 @@ class DriverSystem(SimpleSystem):
     def all_subsystems(self):
         return (self._comp.workflow._system,)
 
+    def shutdown(self):
+        # Our driver's workflow owns its System and shuts it down.
+        pass
+
     def simple_subsystems(self):
         yield self
         for sub in self._comp.workflow._system.simple_subsystems():
@@ -2508,6 +2753,9 @@ class TransparentDriverSystem(DriverSystem):
         for subsystem in self.local_subsystems():
             subsystem.linearize()
 
+        if self.ln_solver is not None:
+            self.ln_solver.reset()
+
     def solve_linear(self, options=None):
         """ Single linear solve solution applied to whatever input is sitting
         in the RHS vector."""
@@ -2615,7 +2863,7 @@ def _create_simple_sys(scope, graph, name):
 
     return sub
 
-def partition_subsystems(scope, graph, cgraph):
+def partition_subsystems(scope, graph, cgraph, backend='none'):
     """Return a nested system graph with metadata for parallel
     and serial subworkflows.  Graph must acyclic. All subdriver
     iterations sets must have already been collapsed.
@@ -2658,6 +2906,7 @@ def partition_subsystems(scope, graph, cgraph):
     for nodes in parnodes:
         subg = cgraph.subgraph(nodes)
         psys = ParallelSystem(scope, graph, subg, tuple(sorted(subg.nodes())))
+        psys.backend = backend
         collapse_to_system_node(cgraph, psys, tuple(sorted(subg.nodes())))#tuple(psys._nodes))
 
     return cgraph
@@ -4,15 +4,19 @@ Test of Component.
 
 import logging
 import os.path
+import shutil
 import sys
 import stat
+import tempfile
 import unittest
 
+import numpy as np
+
 from nose import SkipTest
 
 from openmdao.main.api import Component, Container, Driver
 from openmdao.main.interfaces import ICaseRecorder, implements
-from openmdao.main.datatypes.api import Float, Array
+from openmdao.main.datatypes.api import Float, Array, Str
 from openmdao.main.container import _get_entry_group
 from openmdao.util.testutil import assert_raises
 
@@ -203,5 +207,154 @@ class BadComponent(Component):
             self.fail("Exception expected")
 
 
+class Quadratic(Component):
+    x = Array(iotype='in')
+    mode = Str('sum', iotype='in')
+    y = Float(iotype='out')
+    z = Array(iotype='out')
+
+    def execute(self):
+        self.z = self.x**2
+        self.y = self.z.sum() if self.mode == 'sum' else self.z.max()
+
+
+class Cubic(Quadratic):
+
+    def execute(self):
+        self.z = self.x**3
+        self.y = self.z.sum() if self.mode == 'sum' else self.z.max()
+
+
+class Square(Component):
+    x = Float(iotype='in')
+    y = Float(iotype='out')
+
+    def execute(self):
+        self.y = self.x**2
+        self._dydx = 2.0*self.x
+
+    def provideJ(self):
+        return np.array([[self._dydx]])
+
+    def list_deriv_vars(self):
+        return ('x',), ('y',)
+
+
+class EvalCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_hits(self):
+        comp = Quadratic()
+        comp.set_eval_cache(max_entries=2)
+        cache = comp.get_eval_cache()
+
+        comp.x = np.array([1., 2.])
+        comp.run()
+        comp.x = np.array([3., 4.])
+        comp.run()
+        self.assertEqual(comp.exec_count, 2)
+
+        comp.x = np.array([1., 2.])
+        comp.z = np.zeros(2)
+        comp.run()
+        self.assertEqual(comp.exec_count, 2)
+        self.assertEqual(comp.y, 5.)
+        np.testing.assert_array_equal(comp.z, [1., 4.])
+
+        # Non-float inputs are part of the key.
+        comp.mode = 'max'
+        comp.run()
+        self.assertEqual(comp.exec_count, 3)
+        self.assertEqual(comp.y, 4.)
+
+        # [3, 4] was least recently used.
+        comp.mode = 'sum'
+        comp.x = np.array([3., 4.])
+        comp.run()
+        self.assertEqual(comp.exec_count, 4)
+
+        self.assertEqual(cache.get_stats(),
+                         dict(hits=1, misses=4, evictions=2, entries=2,
+                              nbytes=cache.nbytes))
+
+        comp.set_eval_cache(0)
+        self.assertEqual(comp.get_eval_cache(), None)
+        comp.run()
+        self.assertEqual(comp.exec_count, 5)
+
+    def test_max_bytes(self):
+        comp = Quadratic()
+        comp.set_eval_cache(max_entries=100, max_bytes=2000)
+        cache = comp.get_eval_cache()
+
+        for i in range(10):
+            comp.x = np.arange(100.) + i
+            comp.run()
+
+        self.assertTrue(cache.nbytes <= 2000)
+        self.assertTrue(0 < len(cache) < 10)
+        self.assertEqual(cache.evictions, 10 - len(cache))
+
+    def test_file(self):
+        filename = os.path.join(self.tempdir, 'cache.pkl')
+
+        comp = Quadratic()
+        comp.set_eval_cache(max_entries=2, filename=filename)
+        for i in range(3):
+            comp.x = np.array([float(i)])
+            comp.run()
+
+        comp = Quadratic()
+        comp.set_eval_cache(max_entries=2, filename=filename)
+        self.assertEqual(len(comp.get_eval_cache()), 2)
+
+        comp.x = np.array([2.])
+        comp.run()
+        comp.x = np.array([0.])
+        comp.run()
+        self.assertEqual(comp.exec_count, 1)
+        self.assertEqual(comp.get_eval_cache().hits, 1)
+
+    def test_shared_file(self):
+        filename = os.path.join(self.tempdir, 'cache.pkl')
+
+        comp = Quadratic()
+        comp.set_eval_cache(filename=filename)
+        comp.x = np.array([2.])
+        comp.run()
+
+        # Same inputs, but a different class.
+        comp = Cubic()
+        comp.set_eval_cache(filename=filename)
+        comp.x = np.array([2.])
+        comp.run()
+        self.assertEqual(comp.exec_count, 1)
+        self.assertEqual(comp.y, 8.)
+
+    def test_linearize_after_hit(self):
+        comp = Square()
+        comp.set_eval_cache()
+
+        comp.x = 1.0
+        comp.run()
+        comp.x = 2.0
+        comp.run()
+
+        # execute() isn't run on a hit, so it runs before linearizing.
+        comp.x = 1.0
+        comp.run()
+        self.assertEqual(comp.exec_count, 2)
+        np.testing.assert_array_equal(comp.linearize(first=True), [[2.0]])
+        self.assertEqual(comp.exec_count, 3)
+
+        comp.linearize(first=True)
+        self.assertEqual(comp.exec_count, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -9,6 +9,7 @@ import numpy as np
 from openmdao.main.api import Component, VariableTree, Driver, Assembly, set_as_top
 from openmdao.main.datatypes.api import Float, Array, File
 from openmdao.main.depgraph import simple_node_iter
+from openmdao.main.finite_difference import color_columns
 from openmdao.main.test.test_derivatives import SimpleDriver, ArrayComp2D
 from openmdao.test.execcomp import ExecCompWithDerivatives, ExecComp
 from openmdao.util.testutil import assert_rel_error
@@ -78,6 +79,31 @@ class ArrayParaboloid(Component):
         x = self.x
         self.f_x = (x[0][0]-3.0)**2 + x[0][0]*x[0][1] + (x[0][1]+4.0)**2 - 3.0
 
+class BandedComp(Component):
+
+    x = Array(np.zeros(10), iotype='in')
+    y = Array(np.zeros(10), iotype='out')
+
+    def execute(self):
+        ''' Tridiagonal Jacobian '''
+
+        x = self.x
+        y = x**2
+        y[1:] += 3.0*x[:-1]
+        y[:-1] -= x[1:]
+        self.y = y
+
+class ProductComp(Component):
+
+    x = Array(np.zeros(3), iotype='in')
+    y = Array(np.zeros(2), iotype='out')
+
+    def execute(self):
+        ''' A product and a tiny change to a large output '''
+
+        x = self.x
+        self.y = np.array([x[0]*x[1], 1.0e6 + 1.0e-2*x[2]])
+
 class TestFiniteDifference(unittest.TestCase):
 
     def test_fd_step(self):
@@ -238,6 +264,194 @@ class TestFiniteDifference(unittest.TestCase):
         self.assertEqual(model.comp.exec_count - old_count, 2)
         self.assertEqual(model.comp.derivative_exec_count, 1)
 
+    def test_fd_workers(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', ArrayComp2D())
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.force_fd = True
+
+        model.comp.x = np.array([[1.0, 2.0], [3.0, 4.0]])
+        model.run()
+        y = model.comp.y.copy()
+
+        J1 = model.driver.calc_gradient(inputs=['comp.x'],
+                                        outputs=['comp.y'])
+        count = model.comp.exec_count
+
+        model.driver.gradient_options.fd_workers = 3
+        J2 = model.driver.calc_gradient(inputs=['comp.x'],
+                                        outputs=['comp.y'])
+
+        # The steps ran in the workers, not here.
+        self.assertEqual(model.comp.exec_count, count)
+        np.testing.assert_allclose(J2, J1)
+        np.testing.assert_array_equal(model.comp.y, y)
+
+        model.driver.gradient_options.fd_form = 'central'
+        J3 = model.driver.calc_gradient(inputs=['comp.x'],
+                                        outputs=['comp.y'],
+                                        return_format='dict')
+        np.testing.assert_allclose(J3['comp.y']['comp.x'], J1, rtol=1e-6)
+
+    def test_fd_workers_state(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', ExecComp(['y = a*x1 + x2*x2']))
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.force_fd = True
+        model.driver.gradient_options.fd_workers = 2
+
+        model.comp.a = 2.0
+        model.comp.x2 = 3.0
+        model.run()
+        J = model.driver.calc_gradient(inputs=['comp.x1', 'comp.x2'],
+                                       outputs=['comp.y'])
+        np.testing.assert_allclose(J, [[2.0, 6.0]], rtol=1e-4)
+
+        # An input that isn't finite differenced changes between gradients,
+        # as an optimizer's other parameters would. The workers see it.
+        model.comp.a = 5.0
+        model.run()
+        J = model.driver._calc_gradient(inputs=['comp.x1', 'comp.x2'],
+                                        outputs=['comp.y'])
+        np.testing.assert_allclose(J, [[5.0, 6.0]], rtol=1e-4)
+
+    def test_fd_workers_files(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', ArrayComp2D())
+        model.comp.directory = '.'
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.force_fd = True
+        model.driver.gradient_options.fd_workers = 3
+
+        model.comp.x = np.array([[1.0, 2.0], [3.0, 4.0]])
+        model.run()
+        count = model.comp.exec_count
+        model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+
+        # The component has a directory, so its steps ran here.
+        self.assertEqual(model.comp.exec_count - count, 4)
+
+    def test_fd_coloring(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', BandedComp())
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.force_fd = True
+        model.driver.gradient_options.fd_coloring = True
+
+        model.comp.x = np.arange(1.0, 11.0)
+        model.run()
+
+        expected = np.diag(2.0*model.comp.x) + 3.0*np.eye(10, k=-1) - \
+                   np.eye(10, k=1)
+
+        # The first FD probes the sparsity at a nearby point, with one run
+        # there and one per column, then runs once per color.
+        count = model.comp.exec_count
+        J = model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        self.assertEqual(model.comp.exec_count - count, 14)
+        np.testing.assert_allclose(J, expected, atol=1e-4)
+
+        # After that, one run per color. (The public calc_gradient rebuilds
+        # the systems, and the FD with them.)
+        model.comp.x = np.arange(2.0, 12.0)
+        model.run()
+        expected = np.diag(2.0*model.comp.x) + 3.0*np.eye(10, k=-1) - \
+                   np.eye(10, k=1)
+
+        count = model.comp.exec_count
+        J = model.driver._calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        self.assertEqual(model.comp.exec_count - count, 3)
+        np.testing.assert_allclose(J, expected, atol=1e-4)
+
+        model.driver.gradient_options.fd_form = 'central'
+        model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        count = model.comp.exec_count
+        J = model.driver._calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        self.assertEqual(model.comp.exec_count - count, 6)
+        np.testing.assert_allclose(J, expected, atol=1e-6)
+
+        model.driver.gradient_options.fd_workers = 2
+        model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'],
+                                   return_format='dict')
+        J = model.driver._calc_gradient(inputs=['comp.x'], outputs=['comp.y'],
+                                        return_format='dict')
+        np.testing.assert_allclose(J['comp.y']['comp.x'], expected, atol=1e-6)
+
+    def test_fd_sparsity(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', BandedComp())
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.force_fd = True
+        model.driver.gradient_options.fd_coloring = True
+
+        model.comp.x = np.arange(1.0, 11.0)
+        model.run()
+
+        expected = np.diag(2.0*model.comp.x) + 3.0*np.eye(10, k=-1) - \
+                   np.eye(10, k=1)
+
+        # With the whole pattern given, there's no probe.
+        pattern = np.eye(10, k=-1) + np.eye(10) + np.eye(10, k=1)
+        model.driver.gradient_options.fd_sparsity = \
+            {'comp.y': {'comp.x': pattern}}
+        count = model.comp.exec_count
+        J = model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        self.assertEqual(model.comp.exec_count - count, 3)
+        np.testing.assert_allclose(J, expected, atol=1e-4)
+
+        model.driver.gradient_options.fd_sparsity = \
+            {'comp.y': {'comp.x': pattern[:5]}}
+        try:
+            model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        except RuntimeError as err:
+            self.assertEqual(str(err), "The fd_sparsity of 'comp.y' with "
+                                       "respect to 'comp.x' should have "
+                                       "shape (10, 10)")
+        else:
+            self.fail('RuntimeError expected')
+
+    def test_fd_coloring_chance_zeros(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', ProductComp())
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.force_fd = True
+        model.driver.gradient_options.fd_coloring = True
+
+        # dy0/dx0 and dy0/dx1 are zero here, but not structurally.
+        model.comp.x = np.zeros(3)
+        model.run()
+        model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        fd = model.driver.workflow._system.fd_solver
+        self.assertTrue(fd.sparsity[0, :2].all())
+        self.assertTrue(fd.sparsity[1, 2])
+        self.assertNotEqual(fd.colors[0], fd.colors[1])
+
+        model.comp.x = np.array([1.0, 2.0, 3.0])
+        model.run()
+        J = model.driver._calc_gradient(inputs=['comp.x'], outputs=['comp.y'])
+        expected = np.array([[2.0, 1.0, 0.0],
+                             [0.0, 0.0, 1.0e-2]])
+        np.testing.assert_allclose(J, expected, rtol=2e-2)
+
+    def test_color_columns(self):
+
+        pattern = np.array([[1, 1, 0, 0],
+                            [0, 1, 1, 0],
+                            [0, 0, 0, 1],
+                            [1, 0, 0, 0]], dtype=bool)
+        colors = color_columns(pattern)
+
+        for color in set(colors):
+            cols = pattern[:, colors == color]
+            self.assertTrue((cols.sum(axis=1) <= 1).all())
+        self.assertEqual(len(set(colors)), 2)
+
     def test_smarter_nondifferentiable_blocks(self):
 
         top = set_as_top(Assembly())
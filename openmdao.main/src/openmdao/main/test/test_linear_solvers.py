@@ -11,6 +11,7 @@ from openmdao.lib.optproblems.sellar import Discipline1_WithDerivatives, \
                                             Discipline2_WithDerivatives
 from openmdao.main.api import Component, Assembly, set_as_top, Driver
 from openmdao.main.datatypes.api import Float
+from openmdao.main.linearsolver import ScipyDirect
 from openmdao.main.test.simpledriver import SimpleDriver
 from openmdao.main.test.test_derivatives import ArrayComp2D
 from openmdao.util.testutil import assert_rel_error
@@ -165,6 +166,127 @@ class Testcase_Scipy_Gmres(unittest.TestCase):
         assert_rel_error(self, J[0, 0], 5.0, 0.0001)
         assert_rel_error(self, J[0, 1], 21.0, 0.0001)
 
+    def test_scipy_gmres_krylov_recycle(self):
+
+        top = set_as_top(Sellar_MDA_subbed_connected())
+        top.driver.gradient_options.lin_solver = 'scipy_gmres'
+        top.driver.gradient_options.atol = 1e-12
+        top.run()
+
+        inputs = ['P1.x', 'd1.z1', 'd1.z2']
+        outputs = ['P2.f_xy', 'd1.y1', 'd2.y2']
+        for mode in ('forward', 'adjoint'):
+            top.driver.gradient_options.krylov_recycle = 0
+            J1 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                          mode=mode)
+            top.driver.gradient_options.krylov_recycle = 10
+            J2 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                          mode=mode)
+            top.driver.gradient_options.krylov_recycle = 1
+            J3 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                          mode=mode)
+
+            self.assertEqual(J1.shape, (3, 3))
+            np.testing.assert_allclose(J2, J1, rtol=1e-8)
+            np.testing.assert_allclose(J3, J1, rtol=1e-8)
+
+
+class Testcase_Scipy_Direct(unittest.TestCase):
+    """ Test sparse direct linear solver. """
+
+    def test_scipy_direct_single_comp(self):
+
+        top = set_as_top(Assembly())
+        top.add('comp', Paraboloid())
+        top.add('driver', SimpleDriver())
+        top.driver.workflow.add(['comp'])
+        top.driver.add_parameter('comp.x', low=-1000, high=1000)
+        top.driver.add_parameter('comp.y', low=-1000, high=1000)
+        top.driver.add_objective('comp.f_xy')
+
+        top.driver.gradient_options.lin_solver = 'scipy_direct'
+
+        top.comp.x = 3
+        top.comp.y = 5
+        top.run()
+
+        J = top.driver.calc_gradient(inputs=['comp.x', 'comp.y'],
+                                     outputs=['comp.f_xy'],
+                                     mode='forward')
+
+        assert_rel_error(self, J[0, 0], 5.0, 0.0001)
+        assert_rel_error(self, J[0, 1], 21.0, 0.0001)
+
+        J = top.driver.calc_gradient(inputs=['comp.x', 'comp.y'],
+                                     mode='adjoint')
+
+        assert_rel_error(self, J[0, 0], 5.0, 0.0001)
+        assert_rel_error(self, J[0, 1], 21.0, 0.0001)
+
+        # New point, so the factorization must be refreshed.
+        top.comp.x = 4
+        top.run()
+        J = top.driver.calc_gradient(inputs=['comp.x', 'comp.y'],
+                                     mode='forward')
+        assert_rel_error(self, J[0, 0], 7.0, 0.0001)
+        assert_rel_error(self, J[0, 1], 22.0, 0.0001)
+
+    def test_scipy_direct_Sellar_subbed_connected(self):
+
+        top = set_as_top(Sellar_MDA_subbed_connected())
+        top.driver.gradient_options.lin_solver = 'scipy_gmres'
+        top.driver.gradient_options.atol = 1e-12
+        top.run()
+
+        inputs = ['P1.x', 'd1.z1', 'd1.z2']
+        outputs = ['P2.f_xy', 'd1.y1', 'd2.y2']
+        for mode in ('forward', 'adjoint'):
+            top.driver.gradient_options.lin_solver = 'scipy_gmres'
+            J1 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                          mode=mode)
+            top.driver.gradient_options.lin_solver = 'scipy_direct'
+            J2 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                          mode=mode)
+
+            np.testing.assert_allclose(J2, J1, rtol=1e-8)
+
+    def test_scipy_direct_assembly(self):
+
+        top = set_as_top(Sellar_MDA_subbed_connected())
+        top.driver.gradient_options.atol = 1e-12
+        top.run()
+
+        inputs = ['P1.x', 'd1.z1', 'd1.z2']
+        outputs = ['P2.f_xy', 'd1.y1', 'd2.y2']
+        for mode in ('forward', 'adjoint'):
+            top.driver.gradient_options.lin_solver = 'scipy_gmres'
+            J1 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                          mode=mode)
+
+            # The matrix comes from the subsystems, not from products with
+            # the whole system.
+            products = []
+            old_mult = ScipyDirect.mult
+            def mult(self, arg):
+                products.append(arg)
+                return old_mult(self, arg)
+            ScipyDirect.mult = mult
+            try:
+                top.driver.gradient_options.lin_solver = 'scipy_direct'
+                J2 = top.driver.calc_gradient(inputs=inputs, outputs=outputs,
+                                              mode=mode)
+            finally:
+                ScipyDirect.mult = old_mult
+
+            self.assertEqual(products, [])
+            np.testing.assert_allclose(J2, J1, rtol=1e-8)
+
+            # Same matrix as one product per column.
+            solver = top.driver.workflow._system.ln_solver
+            np.testing.assert_allclose(solver.assemble().toarray(),
+                                       solver._assemble_columns().toarray(),
+                                       atol=1e-12)
+
 
 class Testcase_Linear_GS(unittest.TestCase):
     """ Test Linear Gauss Siedel linear solver. """
@@ -10,6 +10,7 @@ from openmdao.main.hasparameters import HasParameters
 from openmdao.main.hasobjective import HasObjective
 from openmdao.main.hasconstraints import HasConstraints
 from openmdao.main.interfaces import IHasParameters, implements
+from openmdao.main.systems import ParallelSystem, _POOLS
 from openmdao.util.decorators import add_delegate
 from openmdao.util.testutil import assert_rel_error
 
@@ -428,5 +429,127 @@ class TestArrayConnectErrors(unittest.TestCase):
 
         t.run() # should run without error
 
+
+class Branch(Component):
+
+    x = Float(1.0, iotype='in')
+    a = Float(1.0, iotype='in')
+    y = Float(0.0, iotype='out')
+
+    def execute(self):
+        self.y = self.a*self.x**2
+
+    def provideJ(self):
+        return np.array([[2.0*self.a*self.x]])
+
+    def list_deriv_vars(self):
+        return ('x',), ('y',)
+
+
+class Collector(Component):
+
+    y1 = Float(0.0, iotype='in')
+    y2 = Float(0.0, iotype='in')
+    y3 = Float(0.0, iotype='in')
+    total = Float(0.0, iotype='out')
+
+    def execute(self):
+        self.total = self.y1 + 2.0*self.y2 + 3.0*self.y3
+
+
+class BranchAsmb(Assembly):
+
+    def configure(self):
+        for i in (1, 2, 3):
+            self.add('c%d' % i, Branch())
+        self.c2.a = 2.0
+        self.c3.a = 3.0
+        self.add('sum', Collector())
+        for i in (1, 2, 3):
+            self.connect('c%d.y' % i, 'sum.y%d' % i)
+
+        self.add('driver', SimpleDriver())
+        self.driver.workflow.add(['c1', 'c2', 'c3', 'sum'])
+        self.driver.add_parameter(('c1.x', 'c2.x', 'c3.x'), low=-10, high=10)
+        self.driver.add_objective('sum.total')
+
+
+class TestParallelBackend(unittest.TestCase):
+
+    def _check(self, backend):
+        top = set_as_top(BranchAsmb())
+        top.driver.parallel_backend = backend
+        top.c1.x = 2.0
+        top.run()
+
+        self.assertEqual(top.c3.y, 12.0)
+        self.assertEqual(top.sum.total, 56.0)
+
+        psys = [s for s in top.driver.workflow._system.local_subsystems(True)
+                if isinstance(s, ParallelSystem)]
+        if backend == 'none':
+            self.assertEqual(psys, [])
+        else:
+            self.assertEqual(len(psys), 1)
+            self.assertEqual(sorted(psys[0].branch_times.keys()),
+                             ['c1', 'c2', 'c3'])
+
+        # The components that ran in worker processes can't be linearized
+        # here.
+        if backend == 'processes':
+            self.assertRaises(RuntimeError, top.driver.calc_gradient)
+            top.driver.gradient_options.force_fd = True
+
+        J = top.driver.calc_gradient()
+        assert_rel_error(self, J[0, 0], 56.0, 1e-6)
+
+    def test_none(self):
+        self._check('none')
+
+    def test_threads(self):
+        self._check('threads')
+
+    def test_processes(self):
+        self._check('processes')
+
+    def test_processes_state(self):
+        top = set_as_top(BranchAsmb())
+        top.driver.parallel_backend = 'processes'
+        top.c1.x = 2.0
+        top.run()
+
+        psys = [s for s in top.driver.workflow._system.local_subsystems(True)
+                if isinstance(s, ParallelSystem)][0]
+        pools = psys._pools
+        self.assertEqual(len(pools), 3)
+
+        # The workers are kept, and they get inputs that aren't connected
+        # when they change.
+        top.c3.a = 4.0
+        top.run()
+        self.assertEqual(top.sum.total, 68.0)
+        self.assertTrue(psys._pools is pools)
+
+        top.driver.workflow.config_changed()
+        self.assertEqual(psys._pools, None)
+        self.assertFalse(_POOLS.intersection(pools))
+
+    def test_threads_files(self):
+        top = set_as_top(BranchAsmb())
+        top.driver.parallel_backend = 'threads'
+        top.c2.directory = '.'
+        top.c1.x = 2.0
+        top.run()
+        self.assertEqual(top.sum.total, 56.0)
+
+        # c2 changes into its directory, so the branches can't share the
+        # working directory as threads.
+        psys = [s for s in top.driver.workflow._system.local_subsystems(True)
+                if isinstance(s, ParallelSystem)][0]
+        self.assertTrue(psys._uses_files)
+        self.assertEqual(psys._get_backend(list(psys.local_subsystems())),
+                         'processes')
+
+
 if __name__ == "__main__":
     unittest.main()
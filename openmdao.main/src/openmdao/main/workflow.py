@@ -495,9 +495,17 @@ class Workflow(object):
         """Notifies the Workflow that workflow configuration
         (dependencies, etc.) has changed.
         """
-        self._system = None
+        self._clear_system()
         self._ordering = None
 
+    def _clear_system(self):
+        """Shut down and drop our System."""
+        # This can be called while unpickling, before we have one.
+        system = getattr(self, '_system', None)
+        if system is not None:
+            system.shutdown()
+        self._system = None
+
     def remove(self, compname):
         """Remove a component from the workflow by name. Do not report an
         error if the specified component is not found.
@@ -519,7 +527,7 @@ class Workflow(object):
         raise NotImplementedError("This Workflow has no '__len__' function")
 
     def setup_init(self):
-        self._system = None
+        self._clear_system()
 
         self._rec_required = None  # Case recording configuration.
         self._rec_parameters = None
@@ -614,11 +622,15 @@ class Workflow(object):
 
         self._reduced_graph = reduced
 
-        if system_type == 'auto' and MPI:
-            self._auto_setup_systems(scope, reduced, cgraph)
-        elif MPI and system_type == 'parallel':
+        # Without MPI, parallel systems are only worth having if they can
+        # run their branches concurrently some other way.
+        backend = self.parent.parallel_backend
+        if system_type == 'auto' and (MPI or backend != 'none'):
+            self._auto_setup_systems(scope, reduced, cgraph, backend)
+        elif system_type == 'parallel' and (MPI or backend != 'none'):
             self._system = ParallelSystem(scope, reduced, cgraph,
                                           str(tuple(sorted(cgraph.nodes()))))
+            self._system.backend = backend
         else:
             self._system = SerialSystem(scope, reduced, cgraph,
                                         str(tuple(sorted(cgraph.nodes()))))
@@ -631,12 +643,12 @@ class Workflow(object):
         for comp in self:
             comp.setup_systems()
 
-    def _auto_setup_systems(self, scope, reduced, cgraph):
+    def _auto_setup_systems(self, scope, reduced, cgraph, backend='none'):
         """
         Collapse the graph into nodes representing parallel
         and serial subsystems.
         """
-        cgraph = partition_subsystems(scope, reduced, cgraph)
+        cgraph = partition_subsystems(scope, reduced, cgraph, backend)
 
         if len(cgraph) > 1:
             if len(cgraph.edges()) > 0:
@@ -645,6 +657,7 @@ class Workflow(object):
             else:
                 self._system = ParallelSystem(scope, reduced,
                                               cgraph, str(tuple(cgraph.nodes())))
+                self._system.backend = backend
         elif len(cgraph) == 1:
             name = cgraph.nodes()[0]
             self._system = cgraph.node[name].get('system')
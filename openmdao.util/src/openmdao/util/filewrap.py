@@ -4,14 +4,23 @@ A collection of utilities for file wrapping.
 Note: This is a work in progress.
 """
 
+import hashlib
+import os
 import re
+from bisect import bisect_right
+from collections import OrderedDict
 
 from pyparsing import CaselessLiteral, Combine, OneOrMore, Optional, \
                       TokenConverter, Word, nums, oneOf, printables, \
-                      ParserElement, alphanums
+                      ParserElement, ParseException, alphanums
 
 from numpy import append, array, zeros
 
+# Spellings of infinity and NaN recognized by FileParser.
+_INF_WORDS = ('Inf', '-Inf')
+_NAN_WORDS = ('NaN', 'nan', 'NaN%', 'NaNQ', 'NaNS', 'qNaN', 'sNaN',
+              '1.#SNAN', '1.#QNAN', '-1.#IND')
+
 def _getformat(val):
     # Returns the output format for a floating point number.
     # The general format is used with 16 places of accuracy, except for when
@@ -24,6 +33,48 @@ def _getformat(val):
         return "%.16g"
 
 
+def _tostring(val):
+    # Returns the text that replaces a field in a template.
+
+    if isinstance(val, float):
+        return _getformat(val) % val
+    else:
+        return str(val)
+
+
+def _split_fields(reg, line):
+    # Splits a line into alternating literal text and fields, so that the
+    # n'th field (counting from 1) is at index 2n-1.
+
+    parts = []
+    pos = 0
+    for match in reg.finditer(line):
+        parts.append(line[pos:match.start()])
+        parts.append(match.group())
+        pos = match.end()
+    parts.append(line[pos:])
+    return parts
+
+
+class _Template(object):
+    """The lines of a template file, along with the anchor locations and
+    field boundaries found in it. These are shared by every compiled
+    InputFileGenerator using the same template file."""
+
+    def __init__(self, lines):
+
+        self.lines = tuple(lines)
+        self.anchors = {}
+        self.fields = {}
+
+
+# Compiled templates keyed by absolute filename, least recently used first.
+# Each entry holds a hash of the file's contents, so that an edited template
+# is compiled again.
+_TEMPLATES = OrderedDict()
+_MAX_TEMPLATES = 32
+
+
 class _SubHelper(object):
     """Replaces file text at the correct word location in a line. This
     class contains the Helper Function that is passed to re.sub, etc."""
@@ -61,10 +112,7 @@ class _SubHelper(object):
         self.current_location += 1
 
         if self.current_location == self.replace_location:
-            if isinstance(self.newtext, float):
-                return _getformat(self.newtext) % self.newtext
-            else:
-                return str(self.newtext)
+            return _tostring(self.newtext)
         else:
             return text.group()
 
@@ -79,11 +127,7 @@ class _SubHelper(object):
         if self.current_location >= self.start_location and \
            self.current_location <= self.end_location and \
            self.counter < end:
-            if isinstance(self.newtext[self.counter], float):
-                val = self.newtext[self.counter]
-                newval = _getformat(val) % val
-            else:
-                newval = str(self.newtext[self.counter])
+            newval = _tostring(self.newtext[self.counter])
             self.counter += 1
             return newval
         else:
@@ -116,12 +160,46 @@ class ToInf(TokenConverter):
 
 
 
+def _field_regex(whitechars, textchars):
+    """Returns a compiled regex that matches the next field of a line,
+    trying the same alternatives in the same order as the pyparsing grammar
+    built by ``FileParser._reset_tokens``. The matched alternative is given
+    by the name of the last group."""
+
+    def words(seq):
+        # Longest first, so that 'NaN' doesn't mask 'NaNQ'.
+        return '|'.join(re.escape(word)
+                        for word in sorted(seq, key=len, reverse=True))
+
+    def chars(seq):
+        return ''.join(re.escape(char) for char in seq)
+
+    pattern = r'(?:(?P<inf>%s)|(?P<nan>%s)' \
+              r'|(?P<float>[+-]?(?:\d+\.\d*|\.\d+)(?:[eEdD][+-]?\d+)?)' \
+              r'|(?P<mixed_exp>\d+[eEdD][+-]?\d+)' \
+              r'|(?P<int>[+-]?\d+)|(?P<text>[%s]+))' \
+              % (words(_INF_WORDS), words(_NAN_WORDS), chars(textchars))
+    if whitechars:
+        # Delimiters are skipped without backtracking, like pyparsing.
+        pattern = r'(?=(?P<white>[%s]*))(?P=white)' % chars(whitechars) \
+                  + pattern
+    return re.compile(pattern)
+
+
 class InputFileGenerator(object):
     """Utility to generate an input file from a template.
     Substitution of values is supported. Data is located with
-    a simple API."""
+    a simple API.
 
-    def __init__(self):
+    compiled: bool (optional)
+        If True, the template file is only read once per process, and the
+        anchor locations and field boundaries found in it are remembered, so
+        that later generations from the same template only need to format
+        the new values into their fields. Anchors are then always located in
+        the template text rather than in the partially generated text, and
+        `data` is only up to date after ``generate()``. Default is False."""
+
+    def __init__(self, compiled=False):
 
         self.template_filename = []
         self.output_filename = []
@@ -133,6 +211,12 @@ class InputFileGenerator(object):
         self.current_row = 0
         self.anchored = False
 
+        self.compiled = compiled
+        self._template = None
+
+        # Lines being modified in compiled mode, split by _split_fields().
+        self._parts = {}
+
     def set_template_file(self, filename):
         """Set the name of the template file to be used The template
         file is also read into memory when this method is called.
@@ -142,6 +226,25 @@ class InputFileGenerator(object):
 
         self.template_filename = filename
 
+        if self.compiled:
+            path = os.path.abspath(filename)
+            templatefile = open(filename, 'r')
+            lines = templatefile.readlines()
+            templatefile.close()
+
+            digest = hashlib.sha1(''.join(lines)).digest()
+            entry = _TEMPLATES.pop(path, None)
+            if entry is None or entry[0] != digest:
+                entry = (digest, _Template(lines))
+            _TEMPLATES[path] = entry
+            while len(_TEMPLATES) > _MAX_TEMPLATES:
+                _TEMPLATES.popitem(last=False)
+
+            self._template = entry[1]
+            self._parts = {}
+            self.data = list(self._template.lines)
+            return
+
         templatefile = open(filename, 'r')
         self.data = templatefile.readlines()
         templatefile.close()
@@ -161,6 +264,9 @@ class InputFileGenerator(object):
         delimiter: str
             A string containing characters to be used as delimiters."""
 
+        # Fields found with the old delimiters no longer apply.
+        self._flush()
+
         self.delimiter = delimiter
         self.reg = re.compile('[^' + delimiter + '\n]+')
 
@@ -181,12 +287,33 @@ class InputFileGenerator(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
 
+        if occurrence == 0:
+            raise ValueError("0 is not valid for an anchor occurrence.")
+
+        template = self._template
+        if template is None:
+            self._flush()
+            self.current_row = self._find_anchor(self.data, anchor, occurrence)
+        else:
+            key = (anchor, occurrence, self.current_row, self.anchored)
+            row = template.anchors.get(key)
+            if row is None:
+                row = self._find_anchor(template.lines, anchor, occurrence)
+                template.anchors[key] = row
+            self.current_row = row
+
+        self.anchored = True
+
+    def _find_anchor(self, lines, anchor, occurrence):
+        """Returns the row of the given `occurrence` of `anchor` in
+        `lines`."""
+
         instance = 0
         if occurrence > 0:
             count = 0
-            max_lines = len(self.data)
+            max_lines = len(lines)
             for index in xrange(self.current_row, max_lines):
-                line = self.data[index]
+                line = lines[index]
 
                 # If we are marking a new anchor from an existing anchor, and
                 # the anchor is mid-line, then we still search the line, but
@@ -198,17 +325,15 @@ class InputFileGenerator(object):
 
                     instance += 1
                     if instance == occurrence:
-                        self.current_row += count
-                        self.anchored = True
-                        return
+                        return self.current_row + count
 
                 count += 1
 
-        elif occurrence < 0:
-            max_lines = len(self.data)-1
+        else:
+            max_lines = len(lines)-1
             count = max_lines
             for index in xrange(max_lines, -1, -1):
-                line = self.data[index]
+                line = lines[index]
 
                 # If we are marking a new anchor from an existing anchor, and
                 # the anchor is mid-line, then we still search the line, but
@@ -219,13 +344,9 @@ class InputFileGenerator(object):
                 if line.find(anchor) > -1:
                     instance += -1
                     if instance == occurrence:
-                        self.current_row = count
-                        self.anchored = True
-                        return
+                        return count
 
                 count -= 1
-        else:
-            raise ValueError("0 is not valid for an anchor occurrence.")
 
         raise RuntimeError("Could not find pattern %s in template file %s" % \
                            (anchor, self.template_filename))
@@ -245,6 +366,10 @@ class InputFileGenerator(object):
 
         field - which word in line to replace, as denoted by delimiter(s)"""
 
+        if self.compiled:
+            self._replace_fields(self._row(row), [value], field, field)
+            return
+
         j = self.current_row + row
         line = self.data[j]
 
@@ -285,33 +410,53 @@ class InputFileGenerator(object):
         if row_end == None:
             row_end = row_start
 
-        sub = _SubHelper()
-        for row in range(row_start, row_end+1):
+        if self.compiled:
+            counter = 0
+            for row in range(row_start, row_end+1):
 
-            j = self.current_row + row
-            line = self.data[j]
+                j = self._row(row)
 
-            if row == row_end:
-                f_end = field_end
-            else:
-                f_end = 99999
-            sub.set_array(value, field_start, f_end)
-            field_start = 0
+                if row == row_end:
+                    f_end = field_end
+                else:
+                    f_end = 99999
+                counter = self._replace_fields(j, value, field_start, f_end,
+                                               counter)
+                field_start = 0
 
-            newline = re.sub(self.reg, sub.replace_array, line)
-            self.data[j] = newline
+            # The last line is extended below, so its fields are done with.
+            self._flush(j)
+            newline = self.data[j]
+
+        else:
+            sub = _SubHelper()
+            for row in range(row_start, row_end+1):
+
+                j = self.current_row + row
+                line = self.data[j]
+
+                if row == row_end:
+                    f_end = field_end
+                else:
+                    f_end = 99999
+                sub.set_array(value, field_start, f_end)
+                field_start = 0
+
+                newline = re.sub(self.reg, sub.replace_array, line)
+                self.data[j] = newline
+            counter = sub.counter
 
         # Sometimes an array is too large for the example in the template
         # This is resolved by adding more fields at the end
-        if sub.counter < len(value):
-            for val in value[sub.counter:]:
+        if counter < len(value):
+            for val in value[counter:]:
                 newline = newline.rstrip() + sep + str(val)
 
             self.data[j] = newline
 
         # Sometimes an array is too small for the template
         # This is resolved by removing fields
-        elif sub.counter > len(value):
+        elif counter > len(value):
 
             # TODO - Figure out how to handle this.
             # Ideally, we'd remove the extra field placeholders
@@ -346,6 +491,14 @@ class InputFileGenerator(object):
         sep: str (optional) (currently unsupported)
             Separator to append between values if we go beyond the template."""
 
+        if self.compiled:
+            i = 0
+            for row in range(row_start, row_end+1):
+                self._replace_fields(self._row(row), value[i, :],
+                                     field_start, field_end)
+                i += 1
+            return
+
         sub = _SubHelper()
         i = 0
         for row in range(row_start, row_end+1):
@@ -373,18 +526,104 @@ class InputFileGenerator(object):
 
         self.data[self.current_row + row] = "\n"
 
+        if self.compiled:
+            self._parts.pop(self._row(row), None)
+
     def generate(self):
         """Use the template file to generate the input file."""
 
         infile = open(self.output_filename, 'w')
-        infile.writelines(self.data)
+        if self.compiled:
+            self._flush()
+            infile.write(''.join(self.data))
+        else:
+            infile.writelines(self.data)
         infile.close()
 
+    def _row(self, row):
+        """Returns the index in `data` of `row`, relative to the current
+        anchor."""
+
+        j = self.current_row + row
+        nlines = len(self.data)
+        if j < 0:
+            j += nlines
+        if j < 0 or j >= nlines:
+            raise IndexError('list index out of range')
+        return j
+
+    def _replace_fields(self, j, values, start, end, counter=0):
+        """Compiled version of replacing fields `start` through `end` of line
+        `j` with `values`, beginning at `values[counter]`. Returns the
+        index of the next value to be used."""
+
+        parts = self._parts.get(j)
+        if parts is None:
+            line = self.data[j]
+            template = self._template
+            if template is not None and line is template.lines[j]:
+                key = (self.reg.pattern, j)
+                fields = template.fields.get(key)
+                if fields is None:
+                    fields = _split_fields(self.reg, line)
+                    template.fields[key] = fields
+                parts = list(fields)
+            else:
+                parts = _split_fields(self.reg, line)
+            self._parts[j] = parts
+
+        nvalues = len(values)
+        last = min(end, len(parts)//2)
+        split = False
+        for index in xrange(2*max(start, 1)-1, 2*last, 2):
+            if counter >= nvalues:
+                break
+            text = _tostring(values[counter])
+            parts[index] = text
+            counter += 1
+
+            # Text that is not a single field changes the field
+            # boundaries seen by later replacements on this line.
+            match = self.reg.match(text)
+            if match is None or match.end() != len(text):
+                split = True
+
+        if split:
+            self._flush(j)
+        return counter
+
+    def _flush(self, j=None):
+        """Joins line `j`, or all lines, that are being modified in compiled
+        mode back into `data`."""
+
+        if j is None:
+            for j, parts in self._parts.iteritems():
+                self.data[j] = ''.join(parts)
+            self._parts = {}
+        else:
+            parts = self._parts.pop(j, None)
+            if parts is not None:
+                self.data[j] = ''.join(parts)
+
 
 class FileParser(object):
-    """Utility to locate and read data from a file."""
+    """Utility to locate and read data from a file.
+
+    end_of_line_comment_char: str (optional)
+        Text after this character on a line is ignored.
 
-    def __init__(self, end_of_line_comment_char=None, full_line_comment_char=None):
+    full_line_comment_char: str (optional)
+        Lines starting with this character are ignored.
+
+    fast: bool (optional)
+        If True (the default), lines are split into fields with a compiled
+        regular expression and the fields of each line are only found once.
+        Anchors are located by searching the whole file as a single string.
+        If False, every line is parsed with the original pyparsing grammar,
+        which may be needed for exotic formats."""
+
+    def __init__(self, end_of_line_comment_char=None, full_line_comment_char=None,
+                 fast=True):
 
         self.filename = []
         self.data = []
@@ -392,6 +631,13 @@ class FileParser(object):
         self.delimiter = " \t"
         self.end_of_line_comment_char = end_of_line_comment_char
         self.full_line_comment_char = full_line_comment_char
+        self.fast = fast
+
+        # Index of self.data used by the fast methods.
+        self._indexed_data = None
+        self._text = ''
+        self._offsets = [0]
+        self._fields = {}
 
         self.current_row = 0
         self.anchored = False
@@ -415,6 +661,7 @@ class FileParser(object):
                     continue
                 self.data.append( line.split( self.end_of_line_comment_char )[0] )
         inputfile.close()
+        self._indexed_data = None
 
     def set_delimiters(self, delimiter):
         """Lets you change the delimiter that is used to identify field
@@ -449,6 +696,15 @@ class FileParser(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
 
+        if occurrence and self._searchable(anchor):
+            row = self._find_anchor(anchor, occurrence)
+            if row is None:
+                raise RuntimeError("Could not find pattern %s in output file %s"
+                                   % (anchor, self.filename))
+            self.current_row = row
+            self.anchored = True
+            return
+
         instance = 0
         if occurrence > 0:
             count = 0
@@ -498,6 +754,61 @@ class FileParser(object):
         raise RuntimeError("Could not find pattern %s in output file %s" % \
                            (anchor, self.filename))
 
+    def _searchable(self, anchor):
+        """Returns True if `anchor` can be found with the file index."""
+
+        return self.fast and anchor and '\0' not in anchor
+
+    def _index(self):
+        """Joins the lines of data into one string for searching, with
+        '\\0' separating lines, and resets the cache of fields."""
+
+        if self._indexed_data is not self.data:
+            self._text = '\0'.join(self.data)
+            offsets = [0]
+            for line in self.data:
+                offsets.append(offsets[-1] + len(line) + 1)
+            self._offsets = offsets
+            self._fields = {}
+            self._indexed_data = self.data
+
+    def _find_anchor(self, anchor, occurrence):
+        """Returns the row of the requested occurrence of `anchor`, with the
+        same rules as ``mark_anchor``, or None if it isn't found."""
+
+        self._index()
+        text = self._text
+        offsets = self._offsets
+        nlines = len(self.data)
+        instance = 0
+
+        if occurrence > 0:
+            row = self.current_row
+            # The rest of an anchored line can't hold another anchor.
+            if self.anchored:
+                row += 1
+            while row < nlines:
+                pos = text.find(anchor, offsets[row])
+                if pos < 0:
+                    break
+                row = bisect_right(offsets, pos) - 1
+                instance += 1
+                if instance == occurrence:
+                    return row
+                row += 1
+        else:
+            # The last line is skipped when anchored, like mark_anchor().
+            row = nlines - 1 if self.anchored else nlines
+            while row > 0:
+                pos = text.rfind(anchor, 0, offsets[row])
+                if pos < 0:
+                    break
+                row = bisect_right(offsets, pos) - 1
+                instance -= 1
+                if instance == occurrence:
+                    return row
+        return None
+
     def reset_anchor(self):
         """Resets anchor to the beginning of the file."""
 
@@ -550,9 +861,9 @@ class FileParser(object):
             else:
                 line = line[(field-1):(fieldend)]
 
-            # Let pyparsing figure out if this is a number, and return it
+            # Let the parser figure out if this is a number, and return it
             # as a float or int as appropriate
-            data = self._parse_line().parseString(line)
+            data = self._parse(line)
 
             # data might have been split if it contains whitespace. If so,
             # just return the whole string
@@ -561,7 +872,7 @@ class FileParser(object):
             else:
                 return data[0]
         else:
-            data = self._parse_line().parseString(line)
+            data = self._parse_row(j)
             return data[field-1]
 
     def transfer_keyvar(self, key, field, occurrence=1, rowoffset=0):
@@ -588,7 +899,22 @@ class FileParser(object):
             raise ValueError(msg)
 
         instance = 0
-        if occurrence > 0:
+        if occurrence > 0 and self._searchable(key):
+            self._index()
+            row = len(self.data) - self.current_row
+            pos = self._offsets[self.current_row]
+            while True:
+                pos = self._text.find(key, pos)
+                if pos < 0:
+                    break
+                index = bisect_right(self._offsets, pos) - 1
+                instance += 1
+                if instance == occurrence:
+                    row = index - self.current_row
+                    break
+                pos = self._offsets[index+1]
+
+        elif occurrence > 0:
             row = 0
             for line in self.data[self.current_row:]:
                 if line.find(key) > -1:
@@ -611,7 +937,7 @@ class FileParser(object):
         j = self.current_row + row + rowoffset
         line = self.data[j]
 
-        fields = self._parse_line().parseString(line.replace(key,"KeyField"))
+        fields = self._parse(line.replace(key,"KeyField"))
 
         return fields[field]
 
@@ -650,6 +976,24 @@ class FileParser(object):
 
         data = zeros(shape=(0, 0))
 
+        if self.fast and self.delimiter != "columns":
+            # Gather the fields of all the lines, and convert them in one go
+            # if they're all numbers.
+            values = []
+            start = fieldstart
+            for j in range(j1, j1+len(lines)):
+                parsed = self._parse_row(j)
+                if j == j2-1:
+                    values.extend(parsed[(start-1):fieldend])
+                else:
+                    values.extend(parsed[(start-1):])
+                start = 1
+            for value in values:
+                if not isinstance(value, (int, long, float)):
+                    break
+            else:
+                return array(values, dtype=float)
+
         for i, line in enumerate(lines):
             if self.delimiter == "columns":
                 line = line[(fieldstart-1):fieldend]
@@ -657,9 +1001,9 @@ class FileParser(object):
                 # Stripping whitespace may be controversial.
                 line = line.strip()
 
-                # Let pyparsing figure out if this is a number, and return it
+                # Let the parser figure out if this is a number, and return it
                 # as a float or int as appropriate
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse(line)
 
                 newdata = array(parsed[:])
                 # data might have been split if it contains whitespace. If the
@@ -670,7 +1014,7 @@ class FileParser(object):
                 data = append(data, newdata)
 
             else:
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse_row(j1+i)
                 if i == j2-j1-1:
                     data = append(data, array(parsed[(fieldstart-1):fieldend]))
                 else:
@@ -720,7 +1064,7 @@ class FileParser(object):
             else:
                 line = lines[0][(fieldstart-1):]
 
-            parsed = self._parse_line().parseString(line)
+            parsed = self._parse(line)
             row = array(parsed[:])
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
@@ -731,11 +1075,11 @@ class FileParser(object):
                 else:
                     line = line[(fieldstart-1):]
 
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse(line)
                 data[i+1, :] = array(parsed[:])
 
         else:
-            parsed = self._parse_line().parseString(lines[0])
+            parsed = self._parse_row(j1)
             if fieldend:
                 row = array(parsed[(fieldstart-1):fieldend])
             else:
@@ -744,8 +1088,8 @@ class FileParser(object):
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
 
-            for i, line in enumerate(list(lines[1:])):
-                parsed = self._parse_line().parseString(line)
+            for i in range(len(lines)-1):
+                parsed = self._parse_row(j1+i+1)
 
                 if fieldend:
                     try:
@@ -764,6 +1108,52 @@ class FileParser(object):
 
         return self.line_parse_token
 
+    def _parse(self, line):
+        """Returns the fields of `line`. Float and Int 'words' are converted
+        to their appropriate type."""
+
+        if not self.fast:
+            return self.line_parse_token.parseString(line)
+
+        # pyparsing expands tabs before parsing.
+        line = line.expandtabs()
+        fields = []
+        pos = 0
+        for match in self._field_re.finditer(line):
+            if match.start() != pos:
+                break
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == 'text':
+                fields.append(match.group(kind))
+            elif kind == 'int':
+                fields.append(int(match.group(kind)))
+            elif kind == 'float' or kind == 'mixed_exp':
+                text = match.group(kind)
+                fields.append(float(text.replace('D', 'E').replace('d', 'E')))
+            elif kind == 'nan':
+                fields.append(float('nan'))
+            else:
+                fields.append(float('inf'))
+
+        if not fields:
+            raise ParseException(line, pos, 'Expected a field')
+        return fields
+
+    def _parse_row(self, j):
+        """Returns the fields of line `j` of the data. Each line is only
+        parsed once."""
+
+        if not self.fast:
+            return self._parse(self.data[j])
+
+        self._index()
+        try:
+            return self._fields[j]
+        except KeyError:
+            fields = self._fields[j] = self._parse(self.data[j])
+            return fields
+
     def _reset_tokens(self):
         ''' Sets up the tokens for pyparsing '''
 
@@ -785,6 +1175,10 @@ class FileParser(object):
                 if symbol not in self.delimiter:
                     textchars = textchars + symbol
 
+        self._field_re = _field_regex(ParserElement.DEFAULT_WHITE_CHARS,
+                                      textchars)
+        self._fields = {}
+
         digits = Word(nums)
         dot = "."
         sign = oneOf("+ -")
@@ -801,9 +1195,8 @@ class FileParser(object):
         # special case for a float written like "3e5"
         mixed_exp = ToFloat(Combine( digits + ee + Optional(sign) + digits ))
 
-        nan = ToInf(oneOf("Inf -Inf")) | \
-              ToNan(oneOf("NaN nan NaN%  NaNQ NaNS qNaN sNaN " + \
-                            "1.#SNAN 1.#QNAN -1.#IND"))
+        nan = ToInf(oneOf(" ".join(_INF_WORDS))) | \
+              ToNan(oneOf(" ".join(_NAN_WORDS)))
 
         string_text = Word(textchars)
 
@@ -393,6 +393,8 @@ class Stream(object):
                 self.write_recordmark(self.reclen_floats(data.size))
 
             arr = data
+            if not arr.dtype.isnative:  # Such as a memmap of another file.
+                arr = numpy.array(data, dtype=data.dtype.newbyteorder('='))
             if self.single_precision:
                 if data.itemsize != _SZ_FLOAT:
                     arr = numpy.array(data, dtype=numpy.float32)
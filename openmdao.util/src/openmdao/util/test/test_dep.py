@@ -60,7 +60,8 @@ class DepTestCase(unittest.TestCase):
             'TraitArray',
             'Broadcast', # utility class for bliss2000
             'SubSystemOpt', # utility class for bliss2000
-            'SubSystemObj' # utility class for bliss2000
+            'SubSystemObj', # utility class for bliss2000
+            '_BatchDriver' # private driver of CaseIteratorDriver's replicas
             ])
         cset = cset - excludes
         
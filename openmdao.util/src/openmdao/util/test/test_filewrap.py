@@ -10,6 +10,7 @@ import unittest
 
 from numpy import array, isnan, isinf
 
+from openmdao.util import filewrap
 from openmdao.util.filewrap import InputFileGenerator, FileParser
 
 
@@ -199,6 +200,98 @@ class TestCase(unittest.TestCase):
 
         self.assertEqual(answer, result)
 
+    def test_templated_input_compiled(self):
+
+        template = "Junk\n" + \
+                   "Anchor\n" + \
+                   " A 1, 2 34, Test 1e65\n" + \
+                   " B 4 Stuff\n" + \
+                   "Anchor\n" + \
+                   " C 77 False Inf 333.444\n" + \
+                   " 0 0 0 0 0\n" + \
+                   " 0 0 0 0 0\n"
+
+        outfile = open(self.templatename, 'w')
+        outfile.write(template)
+        outfile.close()
+
+        def generate(compiled, x):
+            gen = InputFileGenerator(compiled=compiled)
+            gen.set_template_file(self.templatename)
+            gen.set_generated_file(self.filename)
+            gen.set_delimiters(', ')
+
+            gen.mark_anchor('Anchor')
+            gen.transfer_var(x, 1, 3)
+            gen.transfer_var('a b', 1, 2)
+            gen.transfer_var(x+1, 1, 3)
+            gen.reset_anchor()
+            gen.mark_anchor('Anchor', 2)
+            gen.transfer_var(x, 1, 4)
+            gen.transfer_array(array([x, 2, x+3, 4.75, 5.0, 6]), 2, 2, 5,
+                               sep=' ')
+            gen.transfer_2Darray(array([[1, 2], [x, 4]]), 1, 2, 2, 3)
+            gen.clearline(-4)
+            gen.generate()
+
+            infile = open(self.filename, 'r')
+            result = infile.read()
+            infile.close()
+            return gen, result
+
+        gen, result = generate(True, 1.5)
+        answer = "\n" + \
+                 "Anchor\n" + \
+                 " A a 2.5, 1.5 34, Test 1e65\n" + \
+                 " B 4 Stuff\n" + \
+                 "Anchor\n" + \
+                 " C 1.0 2.0 1.5 333.444\n" + \
+                 " 0 1.5 4.0 4.5 4.75 5.0 6.0\n" + \
+                 " 0 0 0 0 0\n"
+        self.assertEqual(result, answer)
+        self.assertEqual(gen.data, answer.splitlines(True))
+
+        # Later generations reuse the compiled template.
+        for x in (1.5, 3.25, 7.0):
+            gen2, result = generate(True, x)
+            self.assertTrue(gen2._template is gen._template)
+            self.assertEqual(result, generate(False, x)[1])
+
+        # An edited template is read again.
+        outfile = open(self.templatename, 'w')
+        outfile.write(template.replace('Junk', 'Anchor'))
+        outfile.close()
+        gen2, result = generate(True, 2.0)
+        self.assertFalse(gen2._template is gen._template)
+        self.assertEqual(result, generate(False, 2.0)[1])
+
+        # Even when the size and modification time are the same.
+        os.utime(self.templatename, (1e9, 1e9))
+        gen, result = generate(True, 2.0)
+        outfile = open(self.templatename, 'w')
+        outfile.write(template.replace('Junk', 'Anchor').replace('Test', 'Tset'))
+        outfile.close()
+        os.utime(self.templatename, (1e9, 1e9))
+        gen2, result = generate(True, 2.0)
+        self.assertFalse(gen2._template is gen._template)
+        self.assertEqual(result, generate(False, 2.0)[1])
+        self.assertTrue('Tset' in result)
+
+    def test_compiled_template_eviction(self):
+
+        names = ['template%d.dat' % i
+                 for i in range(filewrap._MAX_TEMPLATES + 1)]
+        for name in names:
+            outfile = open(name, 'w')
+            outfile.write('%s\n' % name)
+            outfile.close()
+            InputFileGenerator(compiled=True).set_template_file(name)
+
+        # The least recently used template was dropped.
+        self.assertEqual(len(filewrap._TEMPLATES), filewrap._MAX_TEMPLATES)
+        self.assertFalse(os.path.abspath(names[0]) in filewrap._TEMPLATES)
+        self.assertTrue(os.path.abspath(names[-1]) in filewrap._TEMPLATES)
+
     def test_output_parse(self):
 
         data = "Junk\n" + \
@@ -594,6 +687,55 @@ class TestCase(unittest.TestCase):
         val = op.transfer_var(4, 4)
         self.assertEqual(val, '#$%')
 
+    def test_fast_parser(self):
+
+        # The fast parser must split fields exactly like pyparsing does.
+        data = "Anchor 1.5D3 -3e5 3e5 12abc .5 -2. +7\n" + \
+               " Information -Inf NaNQ sNaN 1.#SNAN 1.e 'q' a+b\n" + \
+               "\t1\t2,3 Anchor (%#%) x=4\n" + \
+               " 1 2 3\n" + \
+               " 4 5 6\n" + \
+               "Anchor Anchor\n" + \
+               " 1 2 3 Stuff\n"
+
+        outfile = open(self.filename, 'w')
+        outfile.write(data)
+        outfile.close()
+
+        fast = FileParser()
+        slow = FileParser(fast=False)
+        for delimiters in (' \t', ' ', ' \t,=', 'columns'):
+            for gen in (fast, slow):
+                gen.set_file(self.filename)
+                gen.set_delimiters(delimiters)
+            for line in data.split('\n')[:-1]:
+                expected = [str(val) for val in slow._parse(line)]
+                self.assertEqual([str(val) for val in fast._parse(line)],
+                                 expected)
+
+        for gen in (fast, slow):
+            gen.set_delimiters(' ')
+            rows = [gen.current_row]
+            gen.mark_anchor('Anchor')
+            rows.append(gen.current_row)
+            gen.mark_anchor('Anchor')
+            rows.append(gen.current_row)
+            gen.mark_anchor('Anchor')
+            rows.append(gen.current_row)
+            gen.mark_anchor('Anchor', -2)
+            rows.append(gen.current_row)
+            rows.append(gen.transfer_keyvar('Stuff', 2))
+            gen.reset_anchor()
+            rows.append(gen.transfer_keyvar('Anchor', 2, 3, 1))
+            self.assertEqual(rows, [0, 0, 2, 5, 2, 3, 3])
+
+            val = gen.transfer_array(3, 2, 4, 3)
+            self.assertEqual(val.dtype.kind, 'f')
+            self.assertEqual(list(val), [2, 3, 4, 5, 6])
+            val = gen.transfer_array(4, 2, 6, 4)
+            self.assertEqual(list(val), ['5.0', '6.0', 'Anchor', 'Anchor',
+                                         '1', '2', '3', 'Stuff'])
+
 
 
 if __name__ == '__main__':